@@ -3,8 +3,8 @@ from AlgorithmImports import *
 #endregion
 
 from Initialization import SetupBaseStructure
-from Alpha.Utils import Stats
-from Tools import ContractUtils, Logger, Underlying
+from Alpha.Utils import Stats, EntrySchedule
+from Tools import ContractUtils, Logger, Underlying, ChainSnapshot, PositionIndex
 from Strategy import Leg, Position, OrderType, WorkingOrder
 from Order import Order
 
@@ -67,6 +67,12 @@ class Base(AlphaModel):
         "scheduleStopTime": None,  # time(13, 0, 0),
         # Periodic interval with which the algorithm will check to open new positions
         "scheduleFrequency": timedelta(minutes=5),
+        # If True, new positions are only opened every scheduleFrequency minutes starting from scheduleStartTime
+        "enforceScheduleFrequency": False,
+        # List of times at which new positions can be opened (i.e. [time(9, 45, 0), time(13, 0, 0)]). None -> any time within the schedule window
+        "scheduleTimes": None,
+        # Days of the week on which new positions can be opened (0 = Monday, ..., 4 = Friday). None -> every day
+        "scheduleDays": None,
         # Minimum time distance between opening two consecutive trades
         "minimumTradeScheduleDistance": timedelta(days=1),
         # If True, the order is not placed if the legs are already part of an existing position.
@@ -117,6 +123,16 @@ class Base(AlphaModel):
         # If True, the order mid-price is validated to make sure the Bid-Ask spread is not too wide.
         #  - The order is not submitted if the ratio between Bid-Ask spread of the entire order and its mid-price is more than self.bidAskSpreadRatio
         "validateBidAskSpread": False,
+        # If True, the contracts of the chain with an unusable quote are dropped (before any Greeks are computed):
+        #  - Bid below liquidityMinBid (or no Bid at all), crossed quotes (Ask < Bid)
+        #  - Ratio between the Bid-Ask spread and the mid-price above liquidityMaxSpreadRatio (None: no check)
+        #  - Last update older than liquidityMaxQuoteAge (timedelta, None: no check)
+        #  - Open interest below liquidityMinOpenInterest
+        "liquidityFilter": False,
+        "liquidityMinBid": 0.0,
+        "liquidityMaxSpreadRatio": None,
+        "liquidityMaxQuoteAge": None,
+        "liquidityMinOpenInterest": 0,
         # Control whether to allow multiple positions to be opened for the same Expiration date
         "allowMultipleEntriesPerExpiry": False,
         # Controls whether to include details on each leg (open/close fill price and descriptive statistics about mid-price, Greeks, and IV)
@@ -130,6 +146,27 @@ class Base(AlphaModel):
         "greeksIncluded": [],
         # Controls whether to compute the greeks for the strategy. If True, the greeks will be computed and stored in the contract under BSMGreeks.
         "computeGreeks": False,
+        # Method used to compute the Implied Volatility when computing the greeks:
+        #  - "halley": iterative Halley's method (with a bisection fallback)
+        #  - "rational": non-iterative rational approximation ("Let's be rational") refined with at most two Householder steps
+        "ivMethod": "halley",
+        # Incremental Greeks: reuse the last IV of a contract until its inputs move more than the given tolerances (otherwise the IV solver is warm-started from it).
+        # The Greeks are always refreshed with the current spot price and time to expiration
+        "incrementalGreeks": False,
+        # Absolute change of the contract mid-price
+        "incrementalGreeksMidTolerance": 0.0,
+        # Relative change of the underlying price
+        "incrementalGreeksSpotTolerance": 0.0005,
+        # Relative change of the time to expiration
+        "incrementalGreeksTauTolerance": 0.01,
+        # Method used to select the contracts by delta:
+        #  - "bisection": bisection over the sorted contracts (the Greeks are computed on each probe)
+        #  - "closedForm": invert the BSM delta formula using the smile/ATM IV of the expiry and compute the Greeks of the nearest strikes only
+        "deltaMethod": "bisection",
+        # Exercise style used to price the options and compute their IV/Greeks:
+        #  - "european": Black-Scholes-Merton (index options)
+        #  - "american": Barone-Adesi-Whaley approximation (equity options, the early exercise premium of the Puts is priced in)
+        "exerciseStyle": "european",
         # The time (on expiration day) at which any position that is still open will closed
         "marketCloseCutoffTime": time(15, 45, 0),
         # Limit Order Management
@@ -169,6 +206,11 @@ class Base(AlphaModel):
         # - Margin: the profit target is calculted as a percentage of the margin requirement (calculated based on
         # self.portfolioMarginStress percentage upside/downside movement of the underlying)
         "profitTargetMethod": "Premium",
+        # Stress grid used to calculate the margin requirement (profitTargetMethod = "Margin"):
+        # - number of equally spaced moves of the underlying between -portfolioMarginStress and +portfolioMarginStress (2 -> only the two extremes)
+        "portfolioMarginSpotPoints": 2,
+        # - absolute shifts applied to the IV of each leg (i.e. [-0.05, 0.0, 0.05])
+        "portfolioMarginVolShifts": [0.0],
         # Profit Target Factor (Multiplier of the premium received/paid when the position was opened)
         "profitTarget": 0.6,
         # Number of days into the future at which the theta of the position is calculated. Used if profitTargetMethod = "Theta"
@@ -190,6 +232,8 @@ class Base(AlphaModel):
         "butterflyRightWingSize": 10,
         # useSlice determines if we should use the chainOption slice data instead of optionProvider. Default is set to FALSE
         "useSlice": True,
+        # Wrap the option chain into a ChainSnapshot (columns sorted by strike) once per time bar, so that the strike lookups of the OrderBuilder are bisections
+        "useChainSnapshot": True,
     }
 
     def __init__(self, context):
@@ -202,6 +246,7 @@ class Base(AlphaModel):
         self.stats = Stats() # Initialize the stats dictionary
         self.order = Order(context, self)
         self.last_trade_time = None  # Initialize last trade time
+        self.entrySchedule = None  # Compiled entry schedule (see check_market_schedule)
         self.logger.debug(f'{self.name} -> __init__')
 
 
@@ -249,13 +294,10 @@ class Base(AlphaModel):
         self.syncStats()
         self.context.structure.checkOpenPositions()
         
-        if self.isMarketClosed():
+        if not self.canOpenPositions():
             return []
         
-        if not self.check_market_schedule():
-            return []
-        
-        chain = self.dataHandler.getOptionContracts(data)
+        chain = self.getChain(data)
         if chain is None:
             return []
         
@@ -264,6 +306,53 @@ class Base(AlphaModel):
         self.context.executionTimer.stop('Alpha.Base -> Update')
         return Insight.Group(insights)
 
+    def canOpenPositions(self) -> bool:
+        """Checks the entry schedule and the market status before any chain work is done."""
+        # Entry schedule first: outside of the eligible minutes this is a single set lookup (no market checks or chain work)
+        if not self.check_market_schedule():
+            return False
+        return not self.isMarketClosed()
+
+    def getChain(self, data):
+        """
+        Option chain of the strategy for the current time bar.
+
+        Args:
+            data: The data slice containing current market data.
+
+        Returns:
+            The option contracts (a ChainSnapshot if useChainSnapshot is enabled), or None if there is no chain.
+        """
+        chain = self.dataHandler.getOptionContracts(data)
+        if chain is not None and self.parameter("useChainSnapshot", True):
+            chain = ChainSnapshot(self.context, chain)
+        return chain
+
+    def chainView(self, snapshot):
+        """
+        View of a chain snapshot shared with other strategies (see Alpha.CompositeAlpha), restricted to the contracts this
+        strategy would have subscribed to: dte/dteWindow expirations and nStrikesLeft/nStrikesRight strikes around the ATM.
+
+        Args:
+            snapshot (ChainSnapshot): The shared snapshot of the chain.
+
+        Returns:
+            The option contracts (a ChainSnapshot if useChainSnapshot is enabled, otherwise a list).
+        """
+        chain = snapshot.select(
+            minDte=max(0, self.dte - self.dteWindow),
+            maxDte=max(0, self.dte),
+            nStrikesLeft=self.nStrikesLeft,
+            nStrikesRight=self.nStrikesRight,
+        )
+        # Drop the illiquid/stale contracts (same as DataHandler.getOptionContracts)
+        if len(chain) > 0 and self.parameter("liquidityFilter", False) is True:
+            liquid = set(id(contract) for contract in self.dataHandler.liquidityFilter(list(chain)))
+            chain = chain.view([i for i, contract in enumerate(chain) if id(contract) in liquid])
+        if not self.parameter("useChainSnapshot", True):
+            chain = list(chain)
+        return chain
+
     def isMarketClosed(self) -> bool:
         """Check if the market is currently closed or if the algorithm is warming up."""
         return self.context.IsWarmingUp or not self.context.IsMarketOpen(self.underlyingSymbol)
@@ -273,16 +362,16 @@ class Base(AlphaModel):
         Checks if we can trade based on market schedule and configuration parameters.
         Returns True if trading is allowed, False otherwise.
         """
-        current_time = self.context.Time.time()
-        
-        # Check if we're within the schedule window
-        start_time = self.scheduleStartTime
-        stop_time = self.scheduleStopTime
-        
-        if start_time and current_time < start_time:
-            return False
-            
-        if stop_time and current_time > stop_time:
+        # Check if we're within the schedule: the parameters are compiled into a set of eligible minutes (recompiled only if they change)
+        self.entrySchedule = EntrySchedule.compile(
+            getattr(self, "entrySchedule", None),
+            startTime=self.scheduleStartTime,
+            stopTime=self.scheduleStopTime,
+            frequency=getattr(self, "scheduleFrequency", None) if getattr(self, "enforceScheduleFrequency", False) is True else None,
+            times=getattr(self, "scheduleTimes", None),
+            days=getattr(self, "scheduleDays", None),
+        )
+        if not self.entrySchedule.isOpen(self.context.Time):
             return False
             
         # Check minimum trade distance if we have previous trades
@@ -361,6 +450,11 @@ class Base(AlphaModel):
             # Map each contract to the openPosition dictionary (key: expiryStr)
             context.workingOrders[orderTag] = workingOrder
 
+            # Index the legs of the new position and of its opening order (duplicate checks)
+            positionIndex = PositionIndex.of(context)
+            positionIndex.update("open", orderTag)
+            positionIndex.update("working", orderTag)
+
             
         self.logger.debug(f"CreateInsights -> insights: {insights}")
         # Stop the timer
@@ -372,33 +466,16 @@ class Base(AlphaModel):
         if not self.checkForOneDuplicateLeg:
             return False
 
-        # Get the context
-        context = self.context
-
-        # Get the list of contracts
-        contracts = order["contracts"]
-
-        openPositions = context.openPositions
-
-        # Iterate through open positions
-        for orderTag, orderId in list(openPositions.items()):
-            position = context.allPositions[orderId]
-
-            # Check if the expiry matches
-            if position.expiryStr != order["expiry"].strftime("%Y-%m-%d"):
-                continue
-
-            # Check if the strategy matches (if allowMultipleEntriesPerExpiry is False)
-            if not self.allowMultipleEntriesPerExpiry and position.strategyId == order["strategyId"]:
-                return True
+        # Index of the legs of the open positions
+        positionIndex = PositionIndex.of(self.context)
+        expiryStr = order["expiry"].strftime("%Y-%m-%d")
 
-            # Compare legs
-            for leg in position.legs:
-                for contract in contracts:
-                    if leg.strike == contract.strike:
-                        return True
+        # Check if the strategy matches (if allowMultipleEntriesPerExpiry is False)
+        if not self.allowMultipleEntriesPerExpiry and positionIndex.contains("open", ("expiryStrategy", expiryStr, order["strategyId"])):
+            return True
 
-        return False
+        # Check if any open position with the same expiry has a leg on one of the strikes of the order
+        return any(positionIndex.contains("open", ("expiryStrike", expiryStr, contract.Strike)) for contract in order["contracts"])
 
     def hasDuplicateLegs(self, order):
         """
@@ -422,34 +499,17 @@ class Base(AlphaModel):
         if not self.checkForDuplicatePositions:
             return False
 
-        # Get the context
-        context = self.context
-
-        # Get the list of contracts
-        contracts = order["contracts"]
-
-        openPositions = context.openPositions
-
-        # Iterate through open positions
-        for orderTag, orderId in list(openPositions.items()):
-            position = context.allPositions[orderId]
-
-            # Check if the expiry matches
-            if position.expiryStr != order["expiry"].strftime("%Y-%m-%d"):
-                continue
-
-            # Check if the strategy matches (if allowMultipleEntriesPerExpiry is False)
-            if not self.allowMultipleEntriesPerExpiry and position.strategyId == order["strategyId"]:
-                return True
-
-            # Compare legs
-            position_legs = set((leg.strike, leg.contractSide) for leg in position.legs)
-            order_legs = set((contract.Strike, order["contractSide"][contract.Symbol]) for contract in contracts)
+        # Index of the legs of the open positions
+        positionIndex = PositionIndex.of(self.context)
+        expiryStr = order["expiry"].strftime("%Y-%m-%d")
 
-            if position_legs == order_legs:
-                return True
+        # Check if the strategy matches (if allowMultipleEntriesPerExpiry is False)
+        if not self.allowMultipleEntriesPerExpiry and positionIndex.contains("open", ("expiryStrategy", expiryStr, order["strategyId"])):
+            return True
 
-        return False
+        # Compare legs: look for an open position with the same expiry and the same set of (strike, side)
+        orderLegs = frozenset((contract.Strike, order["contractSide"][contract.Symbol]) for contract in order["contracts"])
+        return positionIndex.contains("open", ("expiryStructure", expiryStr, orderLegs))
 
 
     def syncStats(self):
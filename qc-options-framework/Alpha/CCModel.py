@@ -45,6 +45,8 @@ class CCModel(Base):
         "bidAskSpreadRatio": 0.4,
         "validateBidAskSpread": True,
         "marketCloseCutoffTime": None, #time(15, 45, 0),
+        # TSLA options are American style
+        "exerciseStyle": "american",
         # Put/Call Wing size for Iron Condor, Iron Fly
         # "targetPremium": 500,
     }
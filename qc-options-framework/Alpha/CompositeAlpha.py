@@ -0,0 +1,119 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+from Tools import Logger, ChainSnapshot
+
+
+class CompositeAlpha(AlphaModel):
+    """
+    Alpha model hosting several strategies (Alpha.Base subclasses) under a single SetAlpha.
+
+    Each minute the chain of every underlying is read from the slice once, and wrapped into one ChainSnapshot (the quotes,
+    Greeks and strike index of the contracts are built once). Each strategy then receives a read-only view of the snapshot
+    restricted to its own dte/dteWindow/nStrikes parameters (see Alpha.Base.chainView), and the insights of all the
+    strategies are merged.
+
+    Everything else stays with the strategies: parameters, stats, schedule, order tags and position bookkeeping. The
+    strategies that do not use the slice (option chain provider) get their own chain, as the provider filter depends on
+    the strategy (expiry selection, open positions of the strategy).
+
+    Usage (main.py):
+        self.SetAlpha(CompositeAlpha(self, SPXic, SPXCondor, SPXButterfly))
+
+    Attributes:
+        context (QCAlgorithm): The algorithm.
+        strategies (list[Base]): The hosted strategies.
+    """
+
+    def __init__(self, context, *strategies):
+        """
+        Args:
+            context (QCAlgorithm): The algorithm.
+            strategies: The strategies to host: Alpha.Base subclasses (created with the context) or instances.
+        """
+        self.context = context
+        self.name = type(self).__name__
+        self.logger = Logger(context, className=type(self).__name__, logLevel=context.logLevel)
+        self.strategies = [strategy(context) if isinstance(strategy, type) else strategy for strategy in strategies]
+        # The positions and orders of each strategy are identified by its nameTag
+        nameTags = [strategy.nameTag for strategy in self.strategies]
+        duplicates = sorted(set(nameTag for nameTag in nameTags if nameTags.count(nameTag) > 1))
+        if duplicates:
+            raise ValueError(f"{self.name} -> the strategies must have distinct nameTags: {duplicates}")
+        self.logger.debug(f"{self.name} -> __init__ -> strategies: {nameTags}")
+
+    def update(self, algorithm: QCAlgorithm, data: Slice) -> List[Insight]:
+        """
+        Runs all the strategies on the data slice.
+
+        Args:
+            algorithm: The algorithm instance.
+            data: The data slice containing current market data.
+
+        Returns:
+            List[Insight]: The insights of all the strategies (grouped by strategy).
+        """
+        self.context.executionTimer.start('Alpha.CompositeAlpha -> Update')
+
+        # Update performance tracking
+        if hasattr(self.context, 'performance') and data:
+            self.context.performance.OnUpdate(data)
+
+        for strategy in self.strategies:
+            strategy.syncStats()
+        self.context.structure.checkOpenPositions()
+
+        insights = []
+        for strategies in self.groupByChain(s for s in self.strategies if s.canOpenPositions()).values():
+            for strategy, chain in self.getChains(strategies, data):
+                if chain is None:
+                    continue
+                strategyInsights = strategy.CreateInsights(chain, data=data)
+                if strategyInsights:
+                    insights.extend(Insight.Group(strategyInsights))
+
+        self.context.executionTimer.stop('Alpha.CompositeAlpha -> Update')
+        return insights
+
+    @staticmethod
+    def groupByChain(strategies):
+        """
+        Groups the strategies by option chain: (underlyingSymbol, optionSymbol) -> strategies (in hosting order).
+        """
+        groups = {}
+        for strategy in strategies:
+            groups.setdefault((strategy.underlyingSymbol, strategy.optionSymbol), []).append(strategy)
+        return groups
+
+    def getChains(self, strategies, data):
+        """
+        Chains of the strategies trading the same option chain.
+
+        The slice is traversed and the snapshot built once for all the strategies using the slice, each one gets its view.
+
+        Args:
+            strategies (list[Base]): Strategies of the same option chain.
+            data: The data slice containing current market data.
+
+        Returns:
+            list[tuple]: (strategy, chain) pairs (the chain is None if there are no contracts).
+        """
+        snapshot = None
+        shared = [strategy for strategy in strategies if strategy.useSlice]
+        if shared and data is not None:
+            contracts = shared[0].dataHandler.getSliceContracts(data)
+            if contracts:
+                snapshot = ChainSnapshot(self.context, contracts)
+
+        chains = []
+        for strategy in strategies:
+            if snapshot is not None and strategy.useSlice:
+                chains.append((strategy, strategy.chainView(snapshot)))
+            else:
+                chains.append((strategy, strategy.getChain(data)))
+        return chains
+
+    def OnSecuritiesChanged(self, algorithm: QCAlgorithm, changes: SecurityChanges) -> None:
+        for strategy in self.strategies:
+            strategy.OnSecuritiesChanged(algorithm, changes)
@@ -12,6 +12,8 @@ class FutureSpread(Base):
         "scheduleStopTime": time(16, 0, 0),
         # Periodic interval with which the algorithm will check to open new positions
         "scheduleFrequency": timedelta(minutes = 5),
+        # Times at which new positions can be opened
+        "scheduleTimes": [time(9, 35, 0), time(9, 40, 0), time(9, 45, 0)],
         # Maximum number of open positions at any given time
         "maxActivePositions": 10,
         # Maximum number of open orders (not filled) at any given time
@@ -73,15 +75,6 @@ class FutureSpread(Base):
         # https://tradeautomationtoolbox.com/byob-ticks/?save=admZ4dG
         if data.ContainsKey(self.underlyingSymbol):
             self.logger.debug(f"FutureSpread -> getOrder: Data contains key {self.underlyingSymbol}")
-            trade_times = [time(9, 35, 0), time(9, 40, 0), time(9, 45, 0)]
-            # Remove the microsecond from the current time
-            current_time = self.context.Time.time().replace(microsecond=0)
-            self.logger.debug(f"FutureSpread -> getOrder -> current_time: {current_time}")
-            self.logger.debug(f"FutureSpread -> getOrder -> trade_times: {trade_times}")
-            self.logger.debug(f"FutureSpread -> getOrder -> current_time in trade_times: {current_time in trade_times}")
-            if current_time not in trade_times:
-                return None
-
             put = self.order.getSpreadOrder(chain,'put',fromPrice=self.minPremium,toPrice=self.maxPremium,wingSize=self.putWingSize,sell=True)
             self.logger.debug(f"SPXic -> getOrder: Put: {put}")
             if put is not None:
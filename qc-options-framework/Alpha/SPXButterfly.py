@@ -12,6 +12,8 @@ class SPXButterfly(Base):
         "scheduleStopTime": time(16, 0, 0),
         # Periodic interval with which the algorithm will check to open new positions
         "scheduleFrequency": timedelta(minutes = 15),
+        # Times at which new positions can be opened
+        "scheduleTimes": [time(9, 45, 0)],
         # Maximum number of open positions at any given time
         "maxActivePositions": 30,
         # Control whether to allow multiple positions to be opened for the same Expiration date
@@ -61,10 +63,6 @@ class SPXButterfly(Base):
     def getOrder(self, chain, data):
         # Open trades at 13:00
         if data.ContainsKey(self.underlyingSymbol):
-            trade_times = [time(9, 45, 0)]
-            current_time = self.context.Time.time()
-            if current_time not in trade_times:
-                return None
             fly =  self.order.getIronFlyOrder(
                 chain,
                 callWingSize=self.butterflyLeftWingSize,
@@ -12,6 +12,8 @@ class SPXCondor(Base):
         "scheduleStopTime": time(16, 0, 0),
         # Periodic interval with which the algorithm will check to open new positions
         "scheduleFrequency": timedelta(minutes = 15),
+        # Times at which new positions can be opened
+        "scheduleTimes": [time(9, 45, 0), time(13, 10, 0), time(15, 15, 0)],
         # Maximum number of open positions at any given time
         "maxActivePositions": 30,
         # Control whether to allow multiple positions to be opened for the same Expiration date
@@ -63,10 +65,6 @@ class SPXCondor(Base):
         # Best time to open the trade: 9:45 + 10:15 + 12:30 + 13:00 + 13:30 + 13:45 + 14:00 + 15:00 + 15:15 + 15:45
         # https://tradeautomationtoolbox.com/byob-ticks/?save=admZ4dG
         if data.ContainsKey(self.underlyingSymbol):
-            trade_times = [time(9, 45, 0), time(13, 10, 0), time(15, 15, 0)]
-            current_time = self.context.Time.time()
-            if current_time not in trade_times:
-                return None
             strike = self.order.strategyBuilder.getATMStrike(chain)
             condor =  self.order.getIronCondorOrder(
                 chain,
@@ -12,6 +12,10 @@ class SPXic(Base):
         "scheduleStopTime": time(16, 0, 0),
         # Periodic interval with which the algorithm will check to open new positions
         "scheduleFrequency": timedelta(minutes = 5),
+        # Times at which new positions can be opened
+        # "scheduleTimes": [time(9, 45, 0), time(10, 15, 0), time(12, 30, 0), time(13, 0, 0), time(13, 30, 0), time(13, 45, 0), time(14, 0, 0), time(15, 0, 0), time(15, 15, 0), time(15, 45, 0)],
+        "scheduleTimes": [time(9, 45, 0), time(10, 15, 0), time(12, 30, 0), time(13, 0, 0), time(13, 30, 0), time(13, 45, 0), time(14, 0, 0)],
+        # "scheduleTimes": [time(hour, minute, 0) for hour in range(9, 15) for minute in range(0, 60, 30) if not (hour == 15 and minute > 0)],
         # Maximum number of open positions at any given time
         "maxActivePositions": 10,
         # Maximum number of open orders (not filled) at any given time
@@ -73,17 +77,6 @@ class SPXic(Base):
         # https://tradeautomationtoolbox.com/byob-ticks/?save=admZ4dG
         if data.ContainsKey(self.underlyingSymbol):
             self.logger.debug(f"SPXic -> getOrder: Data contains key {self.underlyingSymbol}")
-            # trade_times = [time(9, 45, 0), time(10, 15, 0), time(12, 30, 0), time(13, 0, 0), time(13, 30, 0), time(13, 45, 0), time(14, 0, 0), time(15, 0, 0), time(15, 15, 0), time(15, 45, 0)]
-            trade_times = [time(9, 45, 0), time(10, 15, 0), time(12, 30, 0), time(13, 0, 0), time(13, 30, 0), time(13, 45, 0), time(14, 0, 0)]
-            # trade_times = [time(hour, minute, 0) for hour in range(9, 15) for minute in range(0, 60, 30) if not (hour == 15 and minute > 0)]
-            # Remove the microsecond from the current time
-            current_time = self.context.Time.time().replace(microsecond=0)
-            self.logger.debug(f"SPXic -> getOrder -> current_time: {current_time}")
-            self.logger.debug(f"SPXic -> getOrder -> trade_times: {trade_times}")
-            self.logger.debug(f"SPXic -> getOrder -> current_time in trade_times: {current_time in trade_times}")
-            if current_time not in trade_times:
-                return None
-
             call =  self.order.getSpreadOrder(
                 chain,
                 'call',
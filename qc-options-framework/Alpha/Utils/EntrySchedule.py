@@ -0,0 +1,74 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import math
+from copy import copy
+
+
+class EntrySchedule:
+    """
+    Entry schedule of a strategy compiled into the set of eligible minutes of each day of the week.
+
+    The schedule parameters (start/stop time, frequency, list of entry times, days of the week) are turned once into
+    frozensets of minute indices (hour * 60 + minute), so checking whether the strategy can open a position at a given
+    time is a single integer set lookup.
+
+    Attributes:
+        key (tuple): The parameters the schedule was compiled from.
+        stopMinute (int): Minute index of the stop time (None if there is no stop time).
+        minutes (tuple[frozenset]): Eligible minute indices for each day of the week (0 = Monday).
+    """
+
+    MINUTES_PER_DAY = 24 * 60
+
+    def __init__(self, startTime = None, stopTime = None, frequency = None, times = None, days = None):
+        """
+        Args:
+            startTime (time, optional): No entries before this time.
+            stopTime (time, optional): No entries after this time.
+            frequency (timedelta, optional): Only every [frequency] minutes from the start time.
+            times (list[time], optional): Only at these times (i.e. the trade_times of a strategy).
+            days (list[int], optional): Only on these days of the week (0 = Monday, ..., 6 = Sunday).
+        """
+        # Copy of the lists: a change to the lists of the strategy parameters triggers a recompile
+        self.key = self.keyOf(startTime, stopTime, frequency, copy(times), copy(days))
+
+        # Time window: the first whole minute at/after the start time up to the last whole minute at/before the stop time
+        first = 0 if startTime is None else math.ceil(self.minuteOf(startTime) + startTime.second / 60.0 + startTime.microsecond / 6e7)
+        last = self.MINUTES_PER_DAY - 1 if stopTime is None else self.minuteOf(stopTime)
+        self.stopMinute = None if stopTime is None else last
+        eligible = set(range(first, last + 1))
+        if frequency is not None:
+            step = max(1, int(frequency.total_seconds() // 60))
+            eligible = set(minute for minute in eligible if (minute - first) % step == 0)
+        if times is not None:
+            eligible &= set(self.minuteOf(t) for t in times if t.second == 0 and t.microsecond == 0)
+        eligible = frozenset(eligible)
+        self.minutes = tuple(eligible if days is None or weekday in days else frozenset() for weekday in range(7))
+
+    @staticmethod
+    def minuteOf(value):
+        """Minute index (hour * 60 + minute) of a time/datetime."""
+        return value.hour * 60 + value.minute
+
+    @classmethod
+    def compile(cls, schedule, startTime = None, stopTime = None, frequency = None, times = None, days = None):
+        """Returns the given schedule if it was compiled from the same parameters, otherwise compiles a new one."""
+        if schedule is not None and schedule.key == cls.keyOf(startTime, stopTime, frequency, times, days):
+            return schedule
+        return cls(startTime, stopTime, frequency, times, days)
+
+    @staticmethod
+    def keyOf(startTime = None, stopTime = None, frequency = None, times = None, days = None):
+        return (startTime, stopTime, frequency, times, days)
+
+    def isOpen(self, dttm):
+        """Whether a position can be opened at the given datetime."""
+        minute = dttm.hour * 60 + dttm.minute
+        if minute not in self.minutes[dttm.weekday()]:
+            return False
+        # Between two whole minutes (never the case with minute bars): past the stop time or not one of the entry times
+        if dttm.second or dttm.microsecond:
+            return self.key[3] is None and minute != self.stopMinute
+        return True
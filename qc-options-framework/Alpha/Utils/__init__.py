@@ -4,3 +4,4 @@ from AlgorithmImports import *
 
 # Your New Python File
 from .Stats import Stats
+from .EntrySchedule import EntrySchedule
@@ -10,4 +10,5 @@ from .CCModel import CCModel
 from .SPXButterfly import SPXButterfly
 from .SPXCondor import SPXCondor
 from .AssignmentModel import AssignmentModel
-from .FutureSpread import FutureSpread  # Add this line
\ No newline at end of file
+from .FutureSpread import FutureSpread  # Add this line
+from .CompositeAlpha import CompositeAlpha
\ No newline at end of file
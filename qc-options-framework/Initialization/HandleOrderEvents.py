@@ -4,7 +4,7 @@ from AlgorithmImports import *
 
 import re
 import numpy as np
-from Tools import Logger, Helper
+from Tools import Logger, Helper, PositionLimits, PositionIndex
 
 """
 Details about order types:
@@ -41,6 +41,9 @@ class HandleOrderEvents:
 
         context.executionTimer.start()
 
+        # Keep the position limit counters up to date (open orders and invested securities)
+        PositionLimits.of(context).onOrderEvent(orderEvent)
+
         if not (orderEvent.Status == OrderStatus.Filled or orderEvent.Status == OrderStatus.PartiallyFilled):
             return
 
@@ -132,6 +135,7 @@ class HandleOrderEvents:
         bookPosition.updateOrderStats(self.context, orderType)
         if workingOrder:
             self.context.workingOrders.pop(bookPosition.orderTag, None)
+            PositionIndex.of(self.context).update("working", bookPosition.orderTag)
         bookPosition[orderType + "FilledDttm"] = self.context.Time
         bookPosition[orderType + "OrderMidPrice"] = execOrder.midPrice
 
@@ -168,6 +172,7 @@ class HandleOrderEvents:
         # Safely remove the position from openPositions if it exists
         if bookPosition.orderTag in self.context.openPositions:
             self.context.openPositions.pop(bookPosition.orderTag)
+            PositionIndex.of(self.context).update("open", bookPosition.orderTag)
             self.context.logger.debug(f"Closed position: {bookPosition.orderTag} removed from openPositions.")
         else:
             self.context.logger.warning(f"Attempted to remove position {bookPosition.orderTag} but it was not found in openPositions.")
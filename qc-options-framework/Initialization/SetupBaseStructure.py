@@ -2,7 +2,7 @@
 from AlgorithmImports import *
 #endregion
 
-from Tools import Timer, Logger, DataHandler, Underlying, Charting
+from Tools import Timer, Logger, TimeMemo, BSM, VolatilitySmiles, DataHandler, Underlying, Charting, PositionIndex, PositionLimits, MarketCalendar, OptionSubscriptions, GreeksIndicators
 from Initialization import AlwaysBuyingPowerModel, BetaFillModel, TastyWorksFeeModel
 
 
@@ -63,6 +63,17 @@ class SetupBaseStructure:
         # is computed such that the contribution of each value decays by 95%
         # after <emaMemory> minutes (i.e. decay^emaMemory = 0.05)
         "emaMemory": 200,
+        # Maximum number of entries of the IV/Greeks cache shared by all the BSM instances (0 -> disabled)
+        "greeksCacheSize": 10000,
+        # Memoize the price queries (ContractUtils) and the chain snapshot lookups (OrderBuilder) within each time bar
+        "timeMemoization": True,
+        # Time an option contract added by the DataHandler stays subscribed after it left the chain window of all the
+        # strategies and is not a leg of any open position/working order
+        "subscriptionGracePeriod": timedelta(minutes=30),
+        # Create the Lean Greeks indicators of an option contract added by the DataHandler only while it is in the chain
+        # window of a strategy or a leg of a position (the Greeks are seeded from the BSM model until they are ready).
+        # False -> the indicators are created as soon as the contract is subscribed
+        "greeksOnDemand": False,
     }
 
     def __init__(self, context):
@@ -90,7 +101,7 @@ class SetupBaseStructure:
         self.context.universe_settings.resolution = self.context.timeResolution
 
         # Keep track of the option contract subscriptions
-        self.context.optionContractsSubscriptions = []
+        self.context.optionContractsSubscriptions = set()
         # Set Security Initializer
         self.context.SetSecurityInitializer(self.CompleteSecurityInitializer)
         # Initialize the dictionary to keep track of all positions
@@ -102,6 +113,21 @@ class SetupBaseStructure:
         # Create dictionary to keep track of all the working orders. It stores orderTags
         self.context.workingOrders = {}
 
+        # Hash index of the legs of the open positions and working orders (used by the duplicate order/leg checks)
+        self.context.positionIndex = PositionIndex(self.context)
+        # Counters of the invested securities and open orders (used by the position limit checks)
+        self.context.positionLimits = PositionLimits(self.context)
+        # Trading calendar service (last trading day and market close cutoff of the expiries, business days)
+        self.context.marketCalendar = MarketCalendar(self.context)
+        # Reference counts of the option contract subscriptions (removes the contracts no longer used)
+        self.context.optionSubscriptions = OptionSubscriptions(self.context)
+        # Memo of the price queries and chain lookups within the current time bar (see timeMemoization)
+        self.context.timeMemo = TimeMemo()
+        # Volatility smiles fitted at the current time bar (see BSM.volatilitySmile)
+        self.context.volatilitySmiles = VolatilitySmiles()
+        # Lean Greeks indicators of the option contracts added by the DataHandler (eager or on demand)
+        self.context.greeksIndicators = GreeksIndicators(self.context)
+
         # Create FIFO list to keep track of all the recently closed positions (needed for the Dynamic DTE selection)
         self.context.recentlyClosedDTE = []
 
@@ -127,6 +153,9 @@ class SetupBaseStructure:
         # Assign the DEFAULT_PARAMETERS
         self.AddConfiguration(**SetupBaseStructure.DEFAULT_PARAMETERS)
         self.SetBacktestCutOffTime()
+        # Set the size of the IV/Greeks caches shared by the BSM instances
+        BSM.greeksCache.resize(self.context.greeksCacheSize)
+        BSM.americanGreeksCache.resize(self.context.greeksCacheSize)
 
         # Set charting
         self.context.charting = Charting(
@@ -213,9 +242,8 @@ class SetupBaseStructure:
         Args:
             security (Security): The security object to be cleared.
         """
-        # Remove the security from the optionContractsSubscriptions dictionary
-        if security.Symbol in self.context.optionContractsSubscriptions:
-            self.context.optionContractsSubscriptions.remove(security.Symbol)
+        # Remove the security from the optionContractsSubscriptions set
+        self.context.optionContractsSubscriptions.discard(security.Symbol)
 
         # Remove the security from the algorithm
         self.context.RemoveSecurity(security.Symbol)
@@ -260,8 +288,9 @@ class SetupBaseStructure:
         # Set data normalization mode to Raw
         underlying.SetDataNormalizationMode(DataNormalizationMode.Raw)
         self.context.logger.debug(f"{self.__class__.__name__} -> AddUnderlying -> Underlying: {underlying}")
-        # Keep track of the option contract subscriptions
-        self.context.optionContractsSubscriptions = []
+        # Keep track of the option contract subscriptions (shared by all the strategies)
+        if not isinstance(getattr(self.context, "optionContractsSubscriptions", None), set):
+            self.context.optionContractsSubscriptions = set()
 
         # Store the symbol for the option and the underlying
         strategy.underlyingSymbol = underlying.Symbol
@@ -362,6 +391,7 @@ class SetupBaseStructure:
                 self.context.charting.updateStats(position)
                 self.context.logger.debug(f"  >>>  EXPIRED POSITION-----> Removing expired position {orderTag} from the algorithm.")
                 self.context.openPositions.pop(orderTag)
+                PositionIndex.of(self.context).update("open", orderTag)
 
         # Remove the expired positions from the workingOrders dictionary. These are positions that expired
         # without being filled completely.
@@ -378,13 +408,19 @@ class SetupBaseStructure:
                 # Remove this position from the list of open positions
                 if orderTag in self.context.openPositions:
                     self.context.openPositions.pop(orderTag)
+                    PositionIndex.of(self.context).update("open", orderTag)
                 # Remove the cancelled position from the final output unless we are required to include it
                 if not self.context.includeCancelledOrders:
                     self.context.allPositions.pop(orderId)
                 # Remove the order from the self.context.workingOrders dictionary
                 if orderTag in self.context.workingOrders:
                     self.context.workingOrders.pop(orderTag)
+                    PositionIndex.of(self.context).update("working", orderTag)
                 # Mark the order as being cancelled
                 position.cancelOrder(self.context, orderType=orderType, message=f"order execution expiration or legs expired")
+
+        # Release the legs of the positions removed above and remove the contracts no longer used
+        OptionSubscriptions.of(self.context).sweep()
+        GreeksIndicators.of(self.context).sync()
         self.context.executionTimer.stop()
 
@@ -4,7 +4,7 @@ from AlgorithmImports import *
 
 from Initialization import SetupBaseStructure
 from Strategy import WorkingOrder
-from Tools import Underlying
+from Tools import Underlying, PositionIndex
 
 
 class Base(RiskManagementModel):
@@ -564,6 +564,8 @@ class Base(RiskManagementModel):
             orderType="close",
             fills=0
         )
+        # The closing order replaces the opening one under the same orderTag: index its (reversed) legs
+        PositionIndex.of(context).update("working", orderTag)
 
         # Stop the timer
         context.executionTimer.stop()
@@ -4,7 +4,7 @@ from AlgorithmImports import *
 
 from .Base import Base
 from CustomIndicators import ATRLevels
-from Tools import Underlying
+from Tools import Underlying, PositionIndex
 from Strategy import WorkingOrder
 
 class FPLMonitorModel(Base):
@@ -76,6 +76,7 @@ class FPLMonitorModel(Base):
                 fills=0,
                 quantity=new_quantity
             )
+            PositionIndex.of(self.context).update("working", orderTag)
 
         bar = underlying.Security().GetLastData()
         stats = position.strategy.stats
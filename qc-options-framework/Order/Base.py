@@ -2,7 +2,7 @@
 from AlgorithmImports import *
 # endregion
 from Order import Order
-from Tools import ContractUtils, Logger, Underlying
+from Tools import ContractUtils, Logger, Underlying, PositionIndex, PositionLimits
 from Strategy import Leg, Position, OrderType, WorkingOrder
 
 class Base:
@@ -54,11 +54,8 @@ class Base:
         targetPremium = order["targetPremium"]
         maxOrderQuantity = order["maxOrderQuantity"]
         orderQuantity = order["orderQuantity"]
-        bidAskSpread = order["bidAskSpread"]
         orderMidPrice = order["orderMidPrice"]
         limitOrderPrice = order["limitOrderPrice"]
-        maxLoss = order["maxLoss"]
-        targetProfit = order.get("targetProfit", None)
 
         # Expiry String
         expiryStr = expiry.strftime("%Y-%m-%d")
@@ -75,10 +72,18 @@ class Base:
                 # Make sure the bid-ask spread is not too wide before opening the position.
                 # Only for Market orders. In case of limit orders, this validation is done at the time of execution of the Limit order
                 or (useMarketOrders and self.strategy.validateBidAskSpread
-                    and abs(bidAskSpread) >
+                    and abs(order["bidAskSpread"]) >
                     self.strategy.bidAskSpreadRatio * abs(orderMidPrice))):
             return [None, None]
 
+        # Only read once the order is validated (OrderDetails computes them on first access)
+        bidAskSpread = order["bidAskSpread"]
+        maxLoss = order["maxLoss"]
+        targetProfit = order.get("targetProfit", None)
+        # Compute the Greeks of the legs (BSMGreeks on the contracts, read by ContractUtils while the position is open)
+        if self.strategy.computeGreeks:
+            order.get("greeks", None)
+
         self.logger.debug(f"buildOrderPosition -> orderMidPrice: {orderMidPrice}, orderQuantity: {orderQuantity}, maxOrderQuantity: {maxOrderQuantity}")
 
         # Get the current price of the underlying
@@ -216,16 +221,17 @@ class Base:
         Checks if placing this order would violate position limits.
         Returns True if order is within limits, False otherwise.
         """
+        # Counters of the invested securities and open orders (kept up to date by HandleOrderEvents)
+        limits = PositionLimits.of(self.context)
+
         # Check max active positions
         max_active = self.strategy.parameter("maxActivePositions", 1)
-        active_positions = len([p for p in self.context.Portfolio.Values if p.Invested])
-        if active_positions >= max_active:
+        if limits.activePositions() >= max_active:
             return False
             
         # Check max open orders
         max_open = self.strategy.parameter("maxOpenPositions", 2)
-        open_orders = len([o for o in self.context.Transactions.GetOpenOrders()])
-        if open_orders >= max_open:
+        if limits.openOrderCount() >= max_open:
             return False
             
         # Check for duplicate positions if configured
@@ -239,28 +245,22 @@ class Base:
         """
         Check if any legs in the order are already part of an existing position.
         """
-        # Get all open positions
-        open_positions = [self.context.allPositions[tag] for tag in self.context.openPositions.values()]
-        
+        # Index of the legs of the open positions
+        positionIndex = PositionIndex.of(self.context)
+
         # Get the expiry date from the order
         order_expiry = order["expiry"].strftime("%Y-%m-%d")
-        
-        # Check each open position
-        for position in open_positions:
-            # Skip positions from other strategies
-            if position.strategyId != order["strategyId"]:
-                continue
-                
-            # Skip positions with different expiry dates if allowed
-            if self.strategy.parameter("allowMultipleEntriesPerExpiry", False):
-                if position.expiryStr != order_expiry:
-                    continue
-                    
-            # Check if any legs match
-            for leg in position.legs:
-                for contract in order["contracts"]:
-                    if (leg.strike == contract.Strike and 
-                        leg.contractSide == order["contractSide"][contract.Symbol]):
-                        return True
-                        
+        # Only consider the positions with the same expiry date if multiple entries per expiry are allowed
+        sameExpiry = self.strategy.parameter("allowMultipleEntriesPerExpiry", False)
+
+        # Check if any leg (strike, side) matches a leg of an open position of the same strategy
+        for contract in order["contracts"]:
+            side = order["contractSide"][contract.Symbol]
+            if sameExpiry:
+                signature = ("strategyExpiryLeg", order["strategyId"], order_expiry, contract.Strike, side)
+            else:
+                signature = ("strategyLeg", order["strategyId"], contract.Strike, side)
+            if positionIndex.contains("open", signature):
+                return True
+
         return False
\ No newline at end of file
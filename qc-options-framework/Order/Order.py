@@ -5,7 +5,9 @@ from AlgorithmImports import *
 import numpy as np
 from .Base import Base
 from .OrderBuilder import OrderBuilder
-from Tools import ContractUtils, BSM, Logger
+from .StructureSearch import StructureSearch
+from .OrderDetails import OrderDetails
+from Tools import ContractUtils, BSM, Logger, ScenarioEngine, Payoff, PositionIndex
 from Strategy import Position
 
 
@@ -26,16 +28,30 @@ class Order(Base):
         bsm (BSM): Black-Scholes-Merton pricing model for options valuation.
         contractUtils (ContractUtils): Utility functions for managing contract-related operations.
         strategyBuilder (OrderBuilder): Builder for creating and managing trading strategies and orders.
+        scenarioEngine (ScenarioEngine): Vectorized P&L of a position over a grid of stress scenarios.
+        structureSearch (StructureSearch): Exhaustive search of the multi-leg structures that can be built on the chain.
     """
 
     def __init__(self, context, strategy):
         super().__init__(context, strategy)
         # Initialize the BSM pricing model
-        self.bsm = BSM(context)
+        self.bsm = BSM(
+            context,
+            ivMethod=strategy.parameter("ivMethod", "halley"),
+            incremental=strategy.parameter("incrementalGreeks", False),
+            midTolerance=strategy.parameter("incrementalGreeksMidTolerance", 0.0),
+            spotTolerance=strategy.parameter("incrementalGreeksSpotTolerance", 0.0005),
+            tauTolerance=strategy.parameter("incrementalGreeksTauTolerance", 0.01),
+            exerciseStyle=strategy.parameter("exerciseStyle", "european"),
+        )
         # Initialize the contract utils
         self.contractUtils = ContractUtils(context)
-        # Initialize the Strategy Builder
-        self.strategyBuilder = OrderBuilder(context)
+        # Initialize the Strategy Builder (sharing the same BSM pricing model)
+        self.strategyBuilder = OrderBuilder(context, bsm=self.bsm, deltaMethod=strategy.parameter("deltaMethod", "bisection"))
+        # Initialize the scenario engine (sharing the same BSM pricing model)
+        self.scenarioEngine = ScenarioEngine(self.bsm)
+        # Initialize the structure search
+        self.structureSearch = StructureSearch(context)
 
     def fValue(self, spotPrice, contracts, sides=None, atTime=None, openPremium=None):
         """
@@ -55,7 +71,7 @@ class Order(Base):
             [
                 self.bsm.bsmPrice(
                     contract,
-                    sigma=contract.BSMImpliedVolatility,
+                    sigma=self.bsm.contractIV(contract),
                     spotPrice=spotPrice,
                     atTime=atTime,
                 )
@@ -67,6 +83,58 @@ class Order(Base):
         return value
 
 
+    def scenarioPnL(self, contracts, sides, openPremium=0.0, spotShifts=(0.0,), volShifts=(0.0,), timeOffsets=(timedelta(0),), spotPrice=None, atTime=None):
+        """
+        Calculates the financial value of a set of contracts on a grid of scenarios (spot shifts x IV shifts x time offsets) in one pass.
+
+        Args:
+            contracts (list): List of contract objects involved in the calculation.
+            sides (list): Specifies whether each contract is a buy (+1) or sell (-1).
+            openPremium (float, optional): Initial premium paid or received when the position was opened. Default is 0.
+            spotShifts (list, optional): Relative shifts of the spot price. Default is no shift.
+            volShifts (list, optional): Absolute shifts of the IV of each contract. Default is no shift.
+            timeOffsets (list, optional): Offsets (timedelta) of the valuation time. Default is no offset.
+            spotPrice (float, optional): Spot price of the underlying asset. Default is the last price of the underlying.
+            atTime (datetime, optional): Valuation time. Default is the current time.
+
+        Returns:
+            np.ndarray: Total financial value of the position with shape (len(spotShifts), len(volShifts), len(timeOffsets)).
+        """
+        return self.scenarioEngine.pnl(contracts, sides, openPremium=openPremium, spotShifts=spotShifts, volShifts=volShifts, timeOffsets=timeOffsets, spotPrice=spotPrice, atTime=atTime)
+
+    def searchStructures(self, contracts, structure, topK=10, objective="creditToRisk", sell=True, minWingSize=0.0, maxWingSize=None):
+        """
+        Ranks all the valid combinations of a structure (PutSpread, CallSpread, IronCondor, IronFly, PutButterfly, CallButterfly,
+        Strangle) that can be built on the chain, and returns the best topK. See StructureSearch.search for the details.
+
+        Args:
+            contracts (list): The list of contract objects (or a ChainSnapshot).
+            structure (str): The structure type.
+            topK (int, optional): Number of candidates to return. Default is 10.
+            objective (str | callable, optional): Metric to maximize (i.e. "creditToRisk", "netCredit") or a function of the metrics returning the scores.
+            sell (bool, optional): Credit (True) or debit (False) version of the structure. Default is True.
+            minWingSize (float, optional): Minimum distance between the short strikes and the wings. Default is 0.
+            maxWingSize (float, optional): Maximum distance between the short strikes and the wings. Default is None (no limit).
+
+        Returns:
+            list: The best candidates, sorted by descending score.
+        """
+        return self.structureSearch.search(contracts, structure, topK=topK, objective=objective, sell=sell, minWingSize=minWingSize, maxWingSize=maxWingSize)
+
+    def getStructureOrder(self, candidate):
+        """
+        Create order details for a candidate returned by searchStructures.
+
+        Args:
+            candidate (dict): The candidate structure.
+
+        Returns:
+            dict: The order details for the candidate.
+        """
+        if candidate is None:
+            return
+        return self.getOrderDetails(candidate["contracts"], candidate["sides"], candidate["strategy"], sell=candidate["sell"], sidesDesc=candidate["sidesDesc"])
+
     def getPayoff(self, spotPrice, contracts, sides):
         """
         Calculate the payoff of the position at a given spot price.
@@ -82,20 +150,8 @@ class Order(Base):
         if len(contracts) == 0:
             return 0
 
-        # Initialize the counter
-        n = 0
-        # initialize the payoff
-        payoff = 0
-        for contract in contracts:
-            # direction: Call -> +1, Put -> -1
-            direction = 2*int(contract.Right == OptionRight.Call)-1
-            # Add the payoff of the current contract
-            payoff += sides[n] * max(0, direction * (spotPrice - contract.Strike))
-            # Increment the counter
-            n += 1
-
         # Return the payoff
-        return payoff
+        return Payoff.fromContracts(contracts, sides)(spotPrice)
 
 
     def computeOrderMaxLoss(self, contracts, sides):
@@ -115,16 +171,9 @@ class Order(Base):
 
         # Get the current price of the underlying
         UnderlyingLastPrice = self.contractUtils.getUnderlyingLastPrice(contracts[0])
-        # Evaluate the payoff at the extreme (spotPrice = 0)
-        maxLoss = self.getPayoff(0, contracts, sides)
-        # Evaluate the payoff at each strike
-        for contract in contracts:
-            maxLoss = min(maxLoss, self.getPayoff(contract.Strike, contracts, sides))
-
-        # Evaluate the payoff at the extreme (spotPrice = 10x higher)
-        maxLoss = min(maxLoss, self.getPayoff(UnderlyingLastPrice*10, contracts, sides))
-        # Cap the payoff at zero: we are only interested in losses
-        maxLoss = min(0, maxLoss)
+        # Lowest payoff between spotPrice = 0 and spotPrice = 10x higher (the payoff is linear between the strikes),
+        # capped at zero: we are only interested in losses
+        maxLoss = Payoff.fromContracts(contracts, sides).maxLoss(upper = UnderlyingLastPrice*10)
         # Return the max loss
         return maxLoss
 
@@ -165,38 +214,10 @@ class Order(Base):
         Returns:
             bool: True if the order is a duplicate, False otherwise.
         """
-        # Loop through all working orders of this strategy
-        for orderTag in list(self.context.workingOrders):
-            # Get the current working order
-            workingOrder = self.context.workingOrders.get(orderTag)
-            # Check if the number of contracts of this working order is the same as the number of contracts in the input list
-            if workingOrder and workingOrder.insights == len(contracts):
-                # Initialize the isDuplicate flag. Assume it's duplicate unless we find a mismatch
-                isDuplicate = True
-                # Loop through each pair (contract, side)
-                for contract, side in zip(contracts, sides):
-                    # Get the details of the contract
-                    contractInfo = workingOrder.get(contract.Symbol)
-                # If we cannot find this contract then it's not a duplicate
-                if contractInfo == None:
-                    isDuplicate = False
-                    break
-                # Get the orderSide and expiryStr properties
-                orderSide = contractInfo.get("orderSide")
-                expiryStr = contractInfo.get("expiryStr")
-                # Check for a mismatch
-                if (orderSide != side # Found the contract but it's on a different side (Sell/Buy)
-                    or expiryStr != contract.Expiry.strftime("%Y-%m-%d") # Found the contract but it's on a different Expiry
-                    ):
-                    # It's not a duplicate. Brake this innermost loop
-                    isDuplicate = False
-                    break
-                # Exit if we found a duplicate
-                if isDuplicate:
-                    return isDuplicate
-
-        # If we got this far, there are no duplicates
-        return False
+        # Structure of the order: the same contracts (the symbol identifies the expiry, strike and right) on the same sides
+        signature = ("structure", frozenset(zip([contract.Symbol for contract in contracts], sides)))
+        # Look for a working order with the same structure
+        return PositionIndex.of(self.context).contains("working", signature)
 
     def limitOrderPrice(self, sides, orderMidPrice):
         """
@@ -257,7 +278,8 @@ class Order(Base):
             sidesDesc (list): List of descriptions for each contract side. Default is derived from the contracts and sides.
 
         Returns:
-            dict: Dictionary with the details of the order or None if no valid order is created.
+            OrderDetails: Details of the order (dictionary compatible) or None if no valid order is created. The Greeks of the legs,
+            the bid-ask spread, the max loss, the margin and the profit target are only computed when they are first accessed.
         """
         # Exit if there are no contracts to process
         if not contracts:
@@ -288,26 +310,13 @@ class Order(Base):
         # Dictionary to map each contract symbol to the actual contract object
         contractDictionary = {}
 
-        # Dictionaries to keep track of all the strikes, Delta and IV
+        # Dictionaries to keep track of all the strikes, mid-prices and expirations
         strikes = {}
-        delta = {}
-        gamma = {}
-        vega = {}
-        theta = {}
-        rho = {}
-        vomma = {}
-        elasticity = {}
-        IV = {}
         midPrices = {}
         contractExpiry = {}
 
-        # Compute the Greeks for each contract (if not already available)
-        if self.strategy.computeGreeks:
-            self.bsm.setGreeks(contracts)
-
-        # Compute the Mid-Price and Bid-Ask spread for the full order
+        # Compute the Mid-Price for the full order (the Greeks and the Bid-Ask spread are computed by OrderDetails on first access)
         orderMidPrice = 0.0
-        bidAskSpread = 0.0
         # Get the slippage parameter (if available)
         slippage = self.strategy.slippage or 0.0
 
@@ -348,23 +357,11 @@ class Order(Base):
             strikes[f"{orderSideDesc}"] = contract.Strike
             # Add the contract expiration time and add 16 hours to the market close
             contractExpiry[f"{orderSideDesc}"] = contract.Expiry + timedelta(hours = 16)
-            if hasattr(contract, "BSMGreeks"):
-                # Set the Greeks and IV in the dictionary -> "<short|long><Call|Put>": <greek|IV>
-                delta[f"{orderSideDesc}"] = contract.BSMGreeks.Delta
-                gamma[f"{orderSideDesc}"] = contract.BSMGreeks.Gamma
-                vega[f"{orderSideDesc}"] = contract.BSMGreeks.Vega
-                theta[f"{orderSideDesc}"] = contract.BSMGreeks.Theta
-                rho[f"{orderSideDesc}"] = contract.BSMGreeks.Rho
-                vomma[f"{orderSideDesc}"] = contract.BSMGreeks.Vomma
-                elasticity[f"{orderSideDesc}"] = contract.BSMGreeks.Elasticity
-                IV[f"{orderSideDesc}"] = contract.BSMImpliedVolatility
 
             # Get the latest mid-price
             midPrice = self.contractUtils.midPrice(contract)
             # Store the midPrice in the dictionary -> "<short|long><Call|Put>": midPrice
             midPrices[f"{orderSideDesc}"] = midPrice
-            # Compute the bid-ask spread
-            bidAskSpread += self.contractUtils.bidAskSpread(contract)
             # Adjusted mid-price (include slippage). Take the sign of orderSide to determine the direction of the adjustment
             # adjustedMidPrice = midPrice + np.sign(orderSide) * slippage
             # Keep track of the total credit/debit or the order
@@ -407,47 +404,29 @@ class Order(Base):
                 # Make sure the total price does not exceed the target premium
                 orderQuantity = math.floor(orderQuantity)
 
-        # Get the current price of the underlying
-        security = context.Securities[self.strategy.underlyingSymbol]
-        underlyingPrice = context.GetLastKnownPrice(security).Price
-
-        # Compute MaxLoss
-        maxLoss = self.computeOrderMaxLoss(contracts, sides)
-        # Get the Profit Target percentage is specified (default is 50%)
-        profitTargetPct = self.strategy.parameter("profitTarget", 0.5)
-        # Compute T-Reg margin based on the MaxLoss
-        TReg = min(0, orderMidPrice + maxLoss) * orderQuantity
-
-        portfolioMarginStress = self.context.portfolioMarginStress
-        if self.strategy.computeGreeks:
-            # Compute the projected P&L of the position following a % movement of the underlying up or down
-            portfolioMargin = min(
-                0,
-                self.fValue(underlyingPrice * (1-portfolioMarginStress), contracts, sides=sides, atTime=context.Time, openPremium=midPrice),
-                self.fValue(underlyingPrice * (1+portfolioMarginStress), contracts, sides=sides, atTime=context.Time, openPremium=midPrice)
-            ) * orderQuantity
-
-        order = {
-            "strategyId": strategyId,
-            "expiry": expiry,
-            "orderMidPrice": orderMidPrice,
-            "limitOrderPrice": limitOrderPrice,
-            "bidAskSpread": bidAskSpread,
-            "orderQuantity": orderQuantity,
-            "maxOrderQuantity": maxOrderQuantity,
-            "targetPremium": targetPremium,
-            "strikes": strikes,
-            "sides": sides,
-            "sidesDesc": sidesDesc,
-            "contractSide": contractSide,
-            "contractSideDesc": contractSideDesc,
-            "contracts": contracts,
-            "contractExpiry": contractExpiry,
-            "creditStrategy": sell,
-            "maxLoss": maxLoss,
-            "expiryLastTradingDay": expiryLastTradingDay,
-            "expiryMarketCloseCutoffDttm": expiryMarketCloseCutoffDttm
-        }
+        # The Greeks, the Bid-Ask spread, MaxLoss, T-Reg/portfolio margin and the profit target are computed on first access
+        order = OrderDetails(
+            self,
+            openPremium=midPrice,
+            strategyId=strategyId,
+            expiry=expiry,
+            orderMidPrice=orderMidPrice,
+            limitOrderPrice=limitOrderPrice,
+            orderQuantity=orderQuantity,
+            maxOrderQuantity=maxOrderQuantity,
+            targetPremium=targetPremium,
+            strikes=strikes,
+            sides=sides,
+            sidesDesc=sidesDesc,
+            contractSide=contractSide,
+            contractSideDesc=contractSideDesc,
+            contracts=contracts,
+            contractExpiry=contractExpiry,
+            midPrices=midPrices,
+            creditStrategy=sell,
+            expiryLastTradingDay=expiryLastTradingDay,
+            expiryMarketCloseCutoffDttm=expiryMarketCloseCutoffDttm
+        )
         # Create order details
         # order = {"expiry": expiry
         #         , "expiryStr": expiry.strftime("%Y-%m-%d")
@@ -500,27 +479,6 @@ class Order(Base):
         #                     }
         #         }
 
-        # Determine the method used to calculate the profit target
-        profitTargetMethod = self.strategy.parameter("profitTargetMethod", "Premium").lower()
-        thetaProfitDays = self.strategy.parameter("thetaProfitDays", 0)
-        # Set a custom profit target unless we are using the default Premium based methodology
-        if profitTargetMethod != "premium":
-            if profitTargetMethod == "theta" and thetaProfitDays > 0:
-                # Calculate the P&L of the position at T+[thetaProfitDays]
-                thetaPnL = self.fValue(underlyingPrice, contracts, sides=sides, atTime=context.Time + timedelta(days=thetaProfitDays), openPremium=midPrice)
-                # Profit target is a percentage of the P&L calculated at T+[thetaProfitDays]
-                profitTargetAmt = profitTargetPct * abs(thetaPnL) * orderQuantity
-            elif profitTargetMethod == "treg":
-                # Profit target is a percentage of the TReg requirement
-                profitTargetAmt = profitTargetPct * abs(TReg) * orderQuantity
-            elif profitTargetMethod == "margin":
-                # Profit target is a percentage of the margin requirement
-                profitTargetAmt = profitTargetPct * abs(portfolioMargin) * orderQuantity
-            else:
-                pass
-            # Set the target profit for the position
-            order["targetProfit"] = profitTargetAmt
-
         return order
 
     def getNakedOrder(self, contracts, type, strike = None, delta = None, fromPrice = None, toPrice = None, sell = True):
@@ -2,7 +2,16 @@
 from AlgorithmImports import *
 # endregion
 
-from Tools import Logger, ContractUtils, BSM
+import bisect
+import math
+import numpy as np
+from Tools import Logger, ContractUtils, BSM, StandardNormal, ChainSnapshot, timeMemoized
+
+def chainSnapshotKey(self, contracts, *args, **kwargs):
+    # Only the queries on an (immutable) ChainSnapshot are memoized within the time bar
+    if not isinstance(contracts, ChainSnapshot):
+        return None
+    return (self, contracts, args, tuple(sorted(kwargs.items())))
 
 class LargeStrikeGapError(Exception):
     """Custom exception for large gaps between option strikes."""
@@ -12,10 +21,13 @@ class OrderBuilder:
     """
     Manages the creation and retrieval of option contracts based on specified criteria to facilitate order construction.
     This includes selecting contracts by type, proximity to the money, delta values, and creating spreads and straddles.
+    The contracts can be passed either as a list or as a ChainSnapshot (strike lookups are then done by bisection, and the
+    results are memoized within the time bar if context.timeMemoization is True).
 
     Attributes:
         context (Any): Contextual information and settings from the QCAlgorithm.
         bsm (BSM): An instance of a Black-Scholes-Merton pricing model for options valuation.
+        deltaMethod (str): Method used to find the contract with a given delta ("bisection" or "closedForm").
         logger (Logger): Logger for capturing and reporting runtime information.
         contractUtils (ContractUtils): Utility class for handling operations related to contracts.
     """
@@ -28,9 +40,13 @@ class OrderBuilder:
     #         If targetPremium != None  -> The order is executed only if the number of contracts required
     #           to reach the target credit/debit does not exceed the maxOrderQuantity
    
-    def __init__(self, context):
+    # Number of fixed-point iterations used to account for the volatility smile when inverting the delta formula
+    SMILE_ITERATIONS = 3
+
+    def __init__(self, context, bsm=None, deltaMethod="bisection"):
         self.context = context # Set the context (QCAlgorithm object)
-        self.bsm = BSM(context) # Initialize the BSM pricing model
+        self.bsm = bsm or BSM(context) # Initialize the BSM pricing model (unless one is provided)
+        self.deltaMethod = deltaMethod # Method used to find the contract with a given delta
         self.logger = Logger(context, className=type(self).__name__, logLevel=context.logLevel) # Set the logger
         self.contractUtils = ContractUtils(context) # Initialize the contract utils
 
@@ -56,17 +72,23 @@ class OrderBuilder:
         else:
             return True
 
+    @timeMemoized(chainSnapshotKey)
     def getATM(self, contracts, type = None):
         """
         Retrieves At-The-Money (ATM) contracts based on the underlying asset's current price.
 
         Args:
-            contracts (list[OptionContract]): List of option contracts.
+            contracts (list[OptionContract] | ChainSnapshot): List of option contracts.
             type (str, optional): Filters the contracts by type ('call', 'put', or 'both').
 
         Returns:
             list[OptionContract]: List of ATM option contracts.
         """
+        # Select the first two contracts (one Put and one Call) or the first contract (either Put or Call, based on the type specified)
+        if isinstance(contracts, ChainSnapshot):
+            Ncontracts = 2 if type == None or type.lower() == "both" else 1
+            return contracts.nearestContracts(Ncontracts, type = type)
+
         # Initialize result
         atm_contracts = []
 
@@ -93,12 +115,13 @@ class OrderBuilder:
         # Return result
         return atm_contracts
 
+    @timeMemoized(chainSnapshotKey)
     def getATMStrike(self, contracts):
         """
         Retrieves the strike price of the ATM contract.
 
         Args:
-            contracts (list[OptionContract]): List of option contracts.
+            contracts (list[OptionContract] | ChainSnapshot): List of option contracts.
 
         Returns:
             float: The strike price of the ATM contract, or None if no ATM contract is found.
@@ -113,9 +136,36 @@ class OrderBuilder:
         # Return result
         return ATMStrike
 
+    def fitVolatilitySmiles(self, contracts):
+        """
+        Fits the volatility smile of each expiry of the chain (only once per time bar, see BSM.volatilitySmile), so that
+        getClosedFormDeltaContract and BSM.contractIV use the IV of the smile.
+
+        Args:
+            contracts (list[OptionContract] | ChainSnapshot): The option chain (Puts and Calls).
+        """
+        contracts = list(contracts)
+        for expiry in sorted(set(contract.Expiry for contract in contracts)):
+            self.bsm.volatilitySmile(contracts, expiry = expiry)
+
     def getDeltaContract(self, contracts, delta = None):
         """
-        Retrieves the contract closest to a specified delta value.
+        Retrieves the contract closest to a specified delta value, using the method selected by deltaMethod.
+
+        Args:
+            contracts (list[OptionContract]): Sorted list of option contracts.
+            delta (float, optional): The target delta value.
+
+        Returns:
+            OptionContract: The contract closest to the specified delta, or None if not found.
+        """
+        if self.deltaMethod == "closedForm":
+            return self.getClosedFormDeltaContract(contracts, delta = delta)
+        return self.getBisectionDeltaContract(contracts, delta = delta)
+
+    def getBisectionDeltaContract(self, contracts, delta = None):
+        """
+        Retrieves the contract closest to a specified delta value by bisecting the list of contracts (the Greeks are computed on each probe).
 
         Args:
             contracts (list[OptionContract]): Sorted list of option contracts.
@@ -186,6 +236,114 @@ class OrderBuilder:
 
         return deltaContract
 
+    def getDeltaTargetStrike(self, contract, delta, sigma, tau = None, spotPrice = None):
+        """
+        Computes the strike at which an option of the same type and expiry as the given contract has the requested delta,
+        by inverting the BSM delta formula:
+          - Call: Delta = N(d1) -> d1 = N^-1(Delta)
+          - Put: Delta = -N(-d1) -> d1 = -N^-1(|Delta|)
+          - K = S * exp((r + sigma^2/2)*tau - d1*sigma*sqrt(tau))
+
+        Args:
+            contract (OptionContract): Contract defining the type (Put/Call) and the expiry.
+            delta (float): The target delta value (in percent, i.e. 30 -> 0.3).
+            sigma (float): The Implied Volatility at the target strike.
+            tau (float, optional): Time to expiration (default: time to expiration of the contract).
+            spotPrice (float, optional): Price of the underlying (default: last price of the underlying).
+
+        Returns:
+            float: The strike with the requested delta.
+        """
+        if tau == None:
+            tau = self.bsm.optionTau(contract)
+        if spotPrice == None:
+            spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
+        d1 = StandardNormal.ppf(abs(delta)/100.0)
+        if contract.Right == OptionRight.Put:
+            d1 = -d1
+        return spotPrice * math.exp((self.bsm.riskFreeRate + 0.5*sigma**2)*tau - d1*sigma*math.sqrt(tau))
+
+    def getClosedFormDeltaContract(self, contracts, delta = None):
+        """
+        Retrieves the contract closest to a specified delta value without bisecting the chain.
+
+        The strike with the requested delta is obtained by inverting the BSM delta formula, using the volatility smile of the expiry
+        (fitted by getContracts at this time, see fitVolatilitySmiles) or the IV of the ATM contract. The result is snapped to the listed strikes
+        and the exact Greeks are computed only for the two contracts around it. If the IV estimate is off and both contracts are on
+        the same side of the requested delta, the search moves to the next strike until the requested delta is bracketed.
+
+        Args:
+            contracts (list[OptionContract]): Sorted list of option contracts (same type and expiry).
+            delta (float, optional): The target delta value.
+
+        Returns:
+            OptionContract: The contract closest to the specified delta, or None if not found.
+        """
+        # Skip processing if the option type or Delta has not been specified
+        if delta == None or not contracts:
+            return
+
+        strikes = [contract.Strike for contract in contracts]
+        spotPrice = self.contractUtils.getUnderlyingLastPrice(contracts[0])
+        tau = self.bsm.optionTau(contracts[0])
+
+        # Use the volatility smile of the expiry if it has already been fitted at this time bar
+        smile = self.bsm.fittedSmile(contracts[0])
+        if smile is not None:
+            sigma = smile.atmIV
+        else:
+            # Get the IV of the contract closest to the money
+            atmIdx = min(bisect.bisect_left(strikes, spotPrice), len(contracts)-1)
+            if atmIdx > 0 and spotPrice - strikes[atmIdx-1] < strikes[atmIdx] - spotPrice:
+                atmIdx -= 1
+            sigma = self.bsm.contractIV(contracts[atmIdx])
+
+        # The delta formula cannot be inverted: fall back to the bisection
+        if not (tau > 0 and sigma and math.isfinite(sigma) and sigma > 0 and 0 < abs(delta) < 100):
+            return self.getBisectionDeltaContract(contracts, delta = delta)
+
+        # Compute the strike with the requested delta
+        targetStrike = self.getDeltaTargetStrike(contracts[0], delta, sigma, tau = tau, spotPrice = spotPrice)
+        if smile is not None:
+            # The IV depends on the strike: refine with a few fixed-point iterations
+            for _ in range(self.SMILE_ITERATIONS):
+                targetStrike = self.getDeltaTargetStrike(contracts[0], delta, smile.iv(targetStrike), tau = tau, spotPrice = spotPrice)
+
+        # Snap to the listed strikes around the target
+        idx = bisect.bisect_left(strikes, targetStrike)
+        leftIdx = max(0, idx-1)
+        rightIdx = min(idx, len(contracts)-1)
+        # Compute the Greeks of the candidate contracts
+        self.bsm.setGreeks(contracts[leftIdx:rightIdx+1])
+
+        # The absolute Delta decreases with the strike for the Calls and increases for the Puts
+        isCall = contracts[0].Right == OptionRight.Call
+        while True:
+            leftAbove = abs(contracts[leftIdx].BSMGreeks.Delta) > delta/100.0
+            rightAbove = abs(contracts[rightIdx].BSMGreeks.Delta) > delta/100.0
+            # Stop as soon as the requested delta is bracketed by the candidates
+            if leftAbove != rightAbove:
+                break
+            if leftAbove == isCall and rightIdx < len(contracts)-1:
+                # The requested delta is on the right side
+                leftIdx, rightIdx = rightIdx, rightIdx+1
+                self.bsm.setGreeks([contracts[rightIdx]])
+            elif leftAbove != isCall and leftIdx > 0:
+                # The requested delta is on the left side
+                leftIdx, rightIdx = leftIdx-1, leftIdx
+                self.bsm.setGreeks([contracts[leftIdx]])
+            else:
+                # The requested delta is outside of the range of the contracts
+                break
+
+        # Choose the contract with the closest Delta
+        deltaContract = sorted([contracts[leftIdx], contracts[rightIdx]]
+                                , key = lambda x: abs(abs(x.BSMGreeks.Delta) - delta/100.0)
+                                , reverse = False
+                                )[0]
+
+        return deltaContract
+
     def getDeltaStrike(self, contracts, delta = None):
         """
         Retrieves the strike price of the contract with the closest delta value.
@@ -312,12 +470,13 @@ class OrderBuilder:
         """
         return self.getToDeltaStrike(contracts, delta = delta, default = 0)
 
+    @timeMemoized(chainSnapshotKey)
     def getContracts(self, contracts, type = None, fromDelta = None, toDelta = None, fromStrike = None, toStrike = None, fromPrice = None, toPrice = None, reverse = False):
         """
         Filters and sorts option contracts based on specified criteria.
 
         Args:
-            contracts (list[OptionContract]): List of option contracts.
+            contracts (list[OptionContract] | ChainSnapshot): List of option contracts.
             type (str, optional): The type of option to filter ('call', 'put', or 'both').
             fromDelta (float, optional): The minimum delta value.
             toDelta (float, optional): The maximum delta value.
@@ -338,7 +497,10 @@ class OrderBuilder:
 
         # Get the Put contracts, sorted by ascending strike. Apply the Strike/Price constraints
         puts = []
-        if type == None or type.lower() == "put":
+        if (type == None or type.lower() == "put") and isinstance(contracts, ChainSnapshot):
+            # The snapshot is already sorted by strike: bisect the strike range
+            puts = contracts.getContracts("put", fromStrike = fromStrike, toStrike = toStrike, fromPrice = fromPrice, toPrice = toPrice)
+        elif type == None or type.lower() == "put":
             puts = sorted([contract
                             for contract in contracts
                                 if self.optionTypeFilter(contract, "Put")
@@ -355,7 +517,10 @@ class OrderBuilder:
 
         # Get the Call contracts, sorted by ascending strike. Apply the Strike/Price constraints
         calls = []
-        if type == None or type.lower() == "call":
+        if (type == None or type.lower() == "call") and isinstance(contracts, ChainSnapshot):
+            # The snapshot is already sorted by strike: bisect the strike range
+            calls = contracts.getContracts("call", fromStrike = fromStrike, toStrike = toStrike, fromPrice = fromPrice, toPrice = toPrice)
+        elif type == None or type.lower() == "call":
             calls = sorted([contract
                             for contract in contracts
                                 if self.optionTypeFilter(contract, "Call")
@@ -375,6 +540,9 @@ class OrderBuilder:
         deltaFilteredCalls = calls
         # Check if we need to filter by Delta
         if (fromDelta or toDelta):
+            if self.deltaMethod == "closedForm":
+                # Invert the delta formula with the volatility smile of the expiry (fitted on the whole chain)
+                self.fitVolatilitySmiles(contracts)
             # Find the strike range for the Puts based on the From/To Delta
             putFromDeltaStrike = self.getPutFromDeltaStrike(puts, delta = fromDelta)
             putToDeltaStrike = self.getPutToDeltaStrike(puts, delta = toDelta)
@@ -508,6 +676,64 @@ class OrderBuilder:
 
         return wingContract
 
+    def getWingIndices(self, contracts, wingSize = None):
+        """
+        Finds the wing of every candidate first leg in a single pass: the i-th element is the index (within contracts) of the wing
+        returned by getWing(contracts[i:], wingSize). Since the contracts are sorted by their distance from the first leg, the wing
+        is the furthest contract within wingSize of the first leg (or the next contract if none is that close), which is found for all
+        the first legs at once with a binary search on the strikes.
+
+        Args:
+            contracts (list[OptionContract]): List of option contracts, sorted by strike (ascending or descending).
+            wingSize (float, optional): The maximum allowed distance between the legs.
+
+        Returns:
+            np.ndarray: Index of the wing of each of the first len(contracts)-1 contracts, or None if no wing can be found.
+
+        Raises:
+            LargeStrikeGapError: Same as the first getWing(contracts[i:], wingSize) call raising it.
+        """
+        # Make sure the wingSize is specified
+        wingSize = wingSize or 0
+
+        if len(contracts) < 2 or wingSize <= 0:
+            return None
+
+        strikes = np.array([contract.Strike for contract in contracts], dtype = float)
+        # Minimum difference between consecutive strikes in each suffix of the list
+        differences = np.abs(np.diff(strikes))
+        suffixMinDifference = np.minimum.accumulate(differences[::-1])[::-1]
+        # getWing(contracts[i:]) raises if no pair of consecutive strikes in the suffix is within the wing size
+        gaps = np.flatnonzero(~(suffixMinDifference <= wingSize))
+        if gaps.size > 0:
+            minDifference = float(suffixMinDifference[gaps[0]])
+            raise LargeStrikeGapError(
+                f"No consecutive strikes found within the specified wing size. "
+                f"SUGGESTION: Change your parameter wingSize in the model to {minDifference}!"
+                f"Allowed wing size: {wingSize}, "
+                f"Minimum difference found: {minDifference}"
+            )
+
+        # Distance from the first leg increases along the list: x[j] - x[i] = abs(strike[j] - strike[i])
+        x = strikes if strikes[-1] >= strikes[0] else -strikes
+        n = x.size
+        # Last contract within wingSize of each first leg (corrected for the rounding of x + wingSize)
+        last = np.searchsorted(x, x + wingSize, side = "right") - 1
+        while True:
+            extend = (last < n-1) & (x[np.minimum(last + 1, n-1)] - x <= wingSize)
+            if not extend.any():
+                break
+            last[extend] += 1
+        while True:
+            shrink = x[last] - x > wingSize
+            if not shrink.any():
+                break
+            last[shrink] -= 1
+        # If the next contract is already further than wingSize, it is the closest wing
+        first = np.arange(n-1)
+        return np.where(last[:-1] > first, last[:-1], first + 1)
+
+    @timeMemoized(chainSnapshotKey)
     def getSpread(self, contracts, type, strike = None, delta = None, wingSize = None, sortByStrike = False, fromPrice = None, toPrice = None, premiumOrder = 'max'):
         """
         Retrieves the best spread contract based on specified criteria.
@@ -560,21 +786,27 @@ class OrderBuilder:
                     # Add the wing
                     best_spread.append(wing)
         else:
-            # Iterate over sorted contracts
-            for i in range(len(sorted_contracts) - 1):
-                # Get the wing
-                wing = self.getWing(sorted_contracts[i:], wingSize = wingSize)
-                self.logger.debug(f"NO STRIKE: wing: {wing}")
-                if wing is not None:
-                    # Calculate the net premium
-                    net_premium = abs(self.contractUtils.midPrice(sorted_contracts[i]) - self.contractUtils.midPrice(wing))
-                    self.logger.debug(f"fromPrice: {fromPrice} <= net_premium: {net_premium} <= toPrice: {toPrice}")
-                    # Check if the net premium is within the specified price range
-                    if fromPrice <= net_premium <= toPrice:
-                        # Check if this spread has a better premium
-                        if (premiumOrder == 'max' and net_premium > best_premium) or (premiumOrder == 'min' and net_premium < best_premium):
-                            best_spread = [sorted_contracts[i], wing]
-                            best_premium = net_premium
+            # Get the wing of each candidate first leg in one pass
+            wings = self.getWingIndices(sorted_contracts, wingSize = wingSize)
+            self.logger.debug(f"NO STRIKE: wings: {wings}")
+            if wings is not None:
+                # Calculate the net premium of all the spreads
+                midPrices = np.array([self.contractUtils.midPrice(contract) for contract in sorted_contracts], dtype = float)
+                net_premiums = np.abs(midPrices[:-1] - midPrices[wings])
+                # Check if the net premium is within the specified price range and better than the initial best premium
+                candidates = (fromPrice <= net_premiums) & (net_premiums <= toPrice)
+                if premiumOrder == 'max':
+                    candidates &= net_premiums > best_premium
+                elif premiumOrder == 'min':
+                    candidates &= net_premiums < best_premium
+                else:
+                    candidates[:] = False
+                candidates = np.flatnonzero(candidates)
+                if candidates.size > 0:
+                    # Select the first spread with the best premium
+                    best = candidates[np.argmax(net_premiums[candidates]) if premiumOrder == 'max' else np.argmin(net_premiums[candidates])]
+                    best_spread = [sorted_contracts[best], sorted_contracts[wings[best]]]
+                    best_premium = net_premiums[best]
 
         # By default, the legs of a spread are sorted based on their distance from the ATM strike.
         # - For Call spreads, they are already sorted by increasing strike
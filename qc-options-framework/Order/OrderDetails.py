@@ -0,0 +1,191 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+from collections.abc import MutableMapping
+
+# Marker of a lazy field that has not been computed yet
+_PENDING = object()
+
+
+class OrderDetails(MutableMapping):
+    """
+    Details of an order candidate built by Order.getOrderDetails.
+
+    The fields needed to decide whether the order is placed (prices, quantities, strikes, sides, expiry) are set when the
+    object is created. The expensive ones (Greeks of the legs, bid-ask spread, max loss, T-Reg and portfolio margin, profit
+    target) are only computed on first access and then cached, so a candidate rejected by the duplicate/validation checks
+    costs almost nothing.
+
+    The object is slotted and behaves like the dictionary previously returned by getOrderDetails (order["maxLoss"],
+    order.get("targetProfit"), "expiry" in order, keys(), items(), order["key"] = value). Keys that are not fields are
+    stored in a side dictionary.
+    """
+
+    # Fields set at creation
+    FIELDS = ("strategyId", "expiry", "orderMidPrice", "limitOrderPrice", "orderQuantity", "maxOrderQuantity", "targetPremium",
+              "strikes", "sides", "sidesDesc", "contractSide", "contractSideDesc", "contracts", "contractExpiry", "midPrices",
+              "creditStrategy", "expiryLastTradingDay", "expiryMarketCloseCutoffDttm")
+    # Fields computed on first access
+    LAZY_FIELDS = ("bidAskSpread", "maxLoss", "TReg", "portfolioMargin", "targetProfit", "greeks")
+    # Greeks/IV of the legs: <greek> -> {"<short|long><Call|Put>": value}
+    GREEKS = ("delta", "gamma", "vega", "theta", "rho", "vomma", "elasticity", "IV")
+
+    __slots__ = FIELDS + tuple(f"_{name}" for name in LAZY_FIELDS) + ("_order", "_openPremium", "_underlyingPrice", "_extra")
+
+    def __init__(self, order, openPremium = 0.0, **fields):
+        """
+        Args:
+            order (Order): The Order module of the strategy (used to compute the lazy fields).
+            openPremium (float, optional): Premium used as the starting value of the stress/theta scenarios.
+            **fields: Values of the FIELDS.
+        """
+        self._order = order
+        self._openPremium = openPremium
+        self._underlyingPrice = _PENDING
+        self._extra = {}
+        for name in self.FIELDS:
+            setattr(self, name, fields.pop(name, None))
+        for name in self.LAZY_FIELDS:
+            setattr(self, f"_{name}", _PENDING)
+        # Anything else is kept as an extra key
+        self._extra.update(fields)
+
+    def _cached(self, slot, compute):
+        value = getattr(self, slot)
+        if value is _PENDING:
+            value = compute()
+            setattr(self, slot, value)
+        return value
+
+    def isComputed(self, name):
+        """Whether the given lazy field has already been computed (or set)."""
+        return getattr(self, f"_{name}") is not _PENDING
+
+    @property
+    def strategy(self):
+        return self._order.strategy
+
+    @property
+    def underlyingPrice(self):
+        def compute():
+            context = self._order.context
+            security = context.Securities[self.strategy.underlyingSymbol]
+            return context.GetLastKnownPrice(security).Price
+        return self._cached("_underlyingPrice", compute)
+
+    @property
+    def bidAskSpread(self):
+        """Bid-ask spread of the full order."""
+        return self._cached("_bidAskSpread", lambda: sum(self._order.contractUtils.bidAskSpread(contract) for contract in self.contracts))
+
+    @property
+    def maxLoss(self):
+        """Maximum loss at expiration (see Order.computeOrderMaxLoss)."""
+        return self._cached("_maxLoss", lambda: self._order.computeOrderMaxLoss(self.contracts, self.sides))
+
+    @property
+    def TReg(self):
+        """T-Reg margin based on the MaxLoss."""
+        return self._cached("_TReg", lambda: min(0, self.orderMidPrice + self.maxLoss) * self.orderQuantity)
+
+    @property
+    def greeks(self):
+        """Greeks and IV of the legs: <greek> -> {"<short|long><Call|Put>": value} (the Greeks are computed if computeGreeks is set)."""
+        def compute():
+            if self.strategy.computeGreeks:
+                self._order.bsm.setGreeks(self.contracts)
+            greeks = {name: {} for name in self.GREEKS}
+            for contract, sideDesc in zip(self.contracts, self.sidesDesc):
+                if hasattr(contract, "BSMGreeks"):
+                    for name in self.GREEKS[:-1]:
+                        greeks[name][sideDesc] = getattr(contract.BSMGreeks, name.title())
+                    greeks["IV"][sideDesc] = contract.BSMImpliedVolatility
+            return greeks
+        return self._cached("_greeks", compute)
+
+    @property
+    def portfolioMargin(self):
+        """Portfolio margin: P&L of the worst scenario of the stress grid (None unless computeGreeks is set)."""
+        def compute():
+            strategy = self.strategy
+            if not strategy.computeGreeks:
+                return None
+            # Make sure the Greeks/IV of the legs are available
+            self.greeks
+            portfolioMarginStress = self._order.context.portfolioMarginStress
+            # Stress grid: spot moves from -portfolioMarginStress to +portfolioMarginStress (just the two extremes by default) and IV shifts
+            spotPoints = max(2, strategy.parameter("portfolioMarginSpotPoints", 2))
+            spotShifts = np.linspace(-portfolioMarginStress, portfolioMarginStress, spotPoints)
+            volShifts = strategy.parameter("portfolioMarginVolShifts", [0.0])
+            # Compute the projected P&L of the position in the worst scenario of the grid
+            stressPnL = self._order.scenarioPnL(self.contracts, self.sides, openPremium=self._openPremium, spotShifts=spotShifts, volShifts=volShifts, spotPrice=self.underlyingPrice, atTime=self._order.context.Time)
+            return min(0, float(stressPnL.min())) * self.orderQuantity
+        return self._cached("_portfolioMargin", compute)
+
+    @property
+    def targetProfit(self):
+        """Custom profit target of the position (None when the default Premium based methodology is used)."""
+        def compute():
+            strategy = self.strategy
+            # Get the Profit Target percentage is specified (default is 50%)
+            profitTargetPct = strategy.parameter("profitTarget", 0.5)
+            # Determine the method used to calculate the profit target
+            profitTargetMethod = strategy.parameter("profitTargetMethod", "Premium").lower()
+            thetaProfitDays = strategy.parameter("thetaProfitDays", 0)
+            if profitTargetMethod == "theta" and thetaProfitDays > 0:
+                # Calculate the P&L of the position at T+[thetaProfitDays]
+                thetaPnL = float(self._order.scenarioPnL(self.contracts, self.sides, openPremium=self._openPremium, timeOffsets=[timedelta(days=thetaProfitDays)], spotPrice=self.underlyingPrice, atTime=self._order.context.Time)[0, 0, 0])
+                # Profit target is a percentage of the P&L calculated at T+[thetaProfitDays]
+                return profitTargetPct * abs(thetaPnL) * self.orderQuantity
+            elif profitTargetMethod == "treg":
+                # Profit target is a percentage of the TReg requirement
+                return profitTargetPct * abs(self.TReg) * self.orderQuantity
+            elif profitTargetMethod == "margin" and self.portfolioMargin is not None:
+                # Profit target is a percentage of the margin requirement
+                return profitTargetPct * abs(self.portfolioMargin) * self.orderQuantity
+            return None
+        return self._cached("_targetProfit", compute)
+
+    def __getitem__(self, key):
+        if key in self.GREEKS:
+            return self.greeks[key]
+        if key in self.FIELDS or key in self.LAZY_FIELDS:
+            return getattr(self, key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        elif key in self.LAZY_FIELDS:
+            setattr(self, f"_{key}", value)
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(f"{key} is a field of the order and cannot be removed")
+
+    def __iter__(self):
+        yield from self.FIELDS
+        yield from self.LAZY_FIELDS
+        yield from self.GREEKS
+        yield from self._extra
+
+    def __len__(self):
+        return len(self.FIELDS) + len(self.LAZY_FIELDS) + len(self.GREEKS) + len(self._extra)
+
+    def __contains__(self, key):
+        return key in self.FIELDS or key in self.LAZY_FIELDS or key in self.GREEKS or key in self._extra
+
+    def toDict(self):
+        """Plain dictionary with all the fields (the lazy ones are computed)."""
+        return dict(self.items())
+
+    def __repr__(self):
+        # Only show what is already known: formatting the order must not trigger the lazy computations
+        fields = {name: getattr(self, name) for name in ("strategyId", "expiry", "orderMidPrice", "limitOrderPrice", "orderQuantity", "strikes")}
+        fields.update({name: getattr(self, f"_{name}") for name in self.LAZY_FIELDS if name != "greeks" and self.isComputed(name)})
+        return f"OrderDetails({fields})"
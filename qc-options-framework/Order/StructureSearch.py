@@ -0,0 +1,250 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import numpy as np
+from Tools import ChainSnapshot, Payoff
+
+
+class StructureSearch:
+    """
+    Exhaustive search of the multi-leg structures (spreads, Iron Condors, Iron Flies, Butterflies, Strangles) that can be
+    built on an option chain, ranked by a user supplied objective.
+
+    Instead of picking a single structure greedily (as the Order.get<Structure>Order methods do), every valid combination of
+    short strikes x wing widths x sides is enumerated on each expiration of the chain. The net credit, max loss, max profit,
+    breakevens and credit/risk ratio of all the candidates are computed at once on arrays of shape (candidates, legs), using
+    the piecewise linear payoff at expiration of all the candidates (Payoff, same bounds as Order.computeOrderMaxLoss).
+
+    For each expiration and right, only the first tradable contract (in chain order) of each strike is used. The number of
+    candidates grows with the square (spreads) or the fourth power (Iron Condors) of the number of strikes, so the wing
+    widths should be bounded with minWingSize/maxWingSize on large chains.
+
+    Attributes:
+        context (QCAlgorithm): The algorithm.
+    """
+
+    # Legs of each structure (rights, in the same order used by the Order class) and sides of the credit (sell) version
+    STRUCTURES = {
+        "PutSpread": {"rights": ("put", "put"), "sides": [-1, 1], "strategy": ("Put Credit Spread", "Put Debit Spread")},
+        "CallSpread": {"rights": ("call", "call"), "sides": [-1, 1], "strategy": ("Call Credit Spread", "Call Debit Spread")},
+        "IronCondor": {"rights": ("put", "put", "call", "call"), "sides": [1, -1, -1, 1], "strategy": ("Iron Condor", "Reverse Iron Condor")},
+        "IronFly": {"rights": ("put", "put", "call", "call"), "sides": [1, -1, -1, 1], "strategy": ("Iron Fly", "Reverse Iron Fly")},
+        "PutButterfly": {"rights": ("put", "put", "put"), "sides": [-1, 2, -1], "strategy": ("Credit Butterfly", "Debit Butterfly")},
+        "CallButterfly": {"rights": ("call", "call", "call"), "sides": [-1, 2, -1], "strategy": ("Credit Butterfly", "Debit Butterfly")},
+        "Strangle": {"rights": ("put", "call"), "sides": [-1, -1], "strategy": ("Short Strangle", "Long Strangle")},
+    }
+
+    # Metrics that can be used as objective (by name)
+    METRICS = ("netCredit", "maxLoss", "maxProfit", "risk", "creditToRisk", "lowerBreakeven", "upperBreakeven")
+
+    def __init__(self, context):
+        self.context = context
+
+    @staticmethod
+    def joinRanges(starts, stops):
+        """All the pairs (i, j) with starts[i] <= j < stops[i], sorted by i and j."""
+        counts = np.maximum(stops - starts, 0)
+        i = np.repeat(np.arange(counts.size), counts)
+        j = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - starts, counts)
+        return i, j
+
+    @staticmethod
+    def strikePairs(strikes, minWingSize = 0.0, maxWingSize = None):
+        """All the pairs (lower, upper) of positions in the (sorted, distinct) strikes with minWingSize <= width <= maxWingSize."""
+        lower, upper = np.triu_indices(strikes.size, k = 1)
+        width = strikes[upper] - strikes[lower]
+        keep = width >= minWingSize
+        if maxWingSize is not None:
+            keep &= width <= maxWingSize
+        return lower[keep], upper[keep]
+
+    def legs(self, contracts):
+        """
+        Strikes, mid-prices and contracts available for the legs, grouped by expiration and right.
+
+        Returns:
+            list[dict]: One entry per expiration: {"put"|"call": (strikes, mids, contracts)}, strikes sorted and distinct.
+        """
+        columns = contracts.columns
+        groups = {}
+        for right in contracts.RIGHTS:
+            positions = contracts.order[right]
+            positions = positions[columns["tradable"][positions]]
+            for expiry in dict.fromkeys(columns["expiry"][positions]):
+                # Sorted by strike (stable), so the first occurrence is the first contract of the strike in chain order
+                selected = positions[columns["expiry"][positions] == expiry]
+                strikes, first = np.unique(columns["strike"][selected], return_index = True)
+                selected = selected[first]
+                groups.setdefault(expiry, {})[right] = (strikes, columns["mid"][selected], [contracts[i] for i in selected])
+        empty = (np.empty(0), np.empty(0), [])
+        return [{right: group.get(right, empty) for right in contracts.RIGHTS} for group in groups.values()]
+
+    def enumerate(self, structure, legs, minWingSize = 0.0, maxWingSize = None):
+        """
+        Enumerates all the valid combinations of a structure on a single expiration.
+
+        Args:
+            structure (str): The structure type (see STRUCTURES).
+            legs (dict): {"put"|"call": (strikes, mids, contracts)} (see legs()).
+            minWingSize (float, optional): Minimum distance between the short strike and its wing.
+            maxWingSize (float, optional): Maximum distance between the short strike and its wing.
+
+        Returns:
+            list[np.ndarray]: For each leg of the structure, the position of the leg in the strikes of its right.
+        """
+        putStrikes = legs["put"][0]
+        callStrikes = legs["call"][0]
+        if structure == "PutSpread":
+            longPut, shortPut = self.strikePairs(putStrikes, minWingSize, maxWingSize)
+            return [shortPut, longPut]
+        if structure == "CallSpread":
+            shortCall, longCall = self.strikePairs(callStrikes, minWingSize, maxWingSize)
+            return [shortCall, longCall]
+        if structure in ("IronCondor", "IronFly"):
+            longPut, shortPut = self.strikePairs(putStrikes, minWingSize, maxWingSize)
+            shortCall, longCall = self.strikePairs(callStrikes, minWingSize, maxWingSize)
+            # Call spreads sorted by short strike: match each Put spread with the Call spreads above (Condor) or on (Fly) its short strike
+            order = np.argsort(callStrikes[shortCall], kind = "stable")
+            keys = callStrikes[shortCall][order]
+            side = "right" if structure == "IronCondor" else "left"
+            starts = np.searchsorted(keys, putStrikes[shortPut], side = side)
+            stops = np.full(starts.size, keys.size) if structure == "IronCondor" else np.searchsorted(keys, putStrikes[shortPut], side = "right")
+            put, call = self.joinRanges(starts, stops)
+            call = order[call]
+            return [longPut[put], shortPut[put], shortCall[call], longCall[call]]
+        if structure in ("PutButterfly", "CallButterfly"):
+            lower, upper = self.strikePairs(putStrikes if structure == "PutButterfly" else callStrikes, minWingSize, maxWingSize)
+            # Match each left wing (lower, middle) with the right wings (middle, upper) on the same middle strike (pairs are sorted by lower)
+            starts = np.searchsorted(lower, upper, side = "left")
+            stops = np.searchsorted(lower, upper, side = "right")
+            left, right = self.joinRanges(starts, stops)
+            return [lower[left], upper[left], upper[right]]
+        if structure == "Strangle":
+            # Any Put below any Call
+            starts = np.searchsorted(callStrikes, putStrikes, side = "right")
+            put, call = self.joinRanges(starts, np.full(starts.size, callStrikes.size))
+            return [put, call]
+        raise ValueError(f"Invalid structure {structure}. Valid values: {', '.join(self.STRUCTURES)}")
+
+    def metrics(self, strikes, premiums, isCall, sides, spotPrice):
+        """
+        Net credit, max loss/profit, breakevens and credit/risk ratio of the candidates (piecewise linear payoff at expiration).
+
+        Args:
+            strikes (np.ndarray): Strikes of the legs, shape (candidates, legs).
+            premiums (np.ndarray): Mid-prices of the legs, shape (candidates, legs).
+            isCall (np.ndarray): Right of each leg, shape (legs,).
+            sides (np.ndarray): Side of each leg (+n: long, -n: short), shape (legs,).
+            spotPrice (float): Price of the underlying (the extremes of the payoff are searched up to 10x this price).
+
+        Returns:
+            dict: Arrays of shape (candidates,) for each of the METRICS.
+        """
+        # Premium received (> 0) or paid (< 0) to open the position
+        netCredit = -(premiums @ sides)
+        # Payoff of all the candidates, with the extremes searched between 0 and 10x the spot price
+        payoff = Payoff(strikes, isCall, sides)
+        maxLoss = payoff.maxLoss(upper = 10.0 * spotPrice)
+        maxProfit = payoff.maxProfit(netCredit, upper = 10.0 * spotPrice)
+        risk = np.maximum(0.0, -(netCredit + maxLoss))
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            creditToRisk = np.where(risk > 0, netCredit / risk, np.where(netCredit > 0, np.inf, np.nan))
+        roots = payoff.breakevens(netCredit)
+        return {
+            "netCredit": netCredit,
+            "maxLoss": maxLoss,
+            "maxProfit": maxProfit,
+            "risk": risk,
+            "creditToRisk": creditToRisk,
+            "lowerBreakeven": np.fmin.reduce(roots, axis = 1),
+            "upperBreakeven": np.fmax.reduce(roots, axis = 1),
+            "breakevens": roots,
+        }
+
+    def search(self, contracts, structure, topK = 10, objective = "creditToRisk", sell = True, minWingSize = 0.0, maxWingSize = None, spotPrice = None):
+        """
+        Enumerates all the valid combinations of a structure on the chain and returns the best ones.
+
+        Args:
+            contracts (list | ChainSnapshot): The option contracts (any number of expirations).
+            structure (str): The structure type: PutSpread, CallSpread, IronCondor, IronFly, PutButterfly, CallButterfly or Strangle.
+            topK (int, optional): Number of candidates to return.
+            objective (str | callable, optional): Name of one of the METRICS, or a function receiving the dictionary of the
+                metrics (plus "strikes" and "premiums" of the legs) and returning an array of scores. Higher scores are better,
+                candidates with a NaN score are discarded.
+            sell (bool, optional): Credit (True) or debit (False) version of the structure (the sides are reversed).
+            minWingSize (float, optional): Minimum distance between the short strike and its wing.
+            maxWingSize (float, optional): Maximum distance between the short strike and its wing.
+            spotPrice (float, optional): Price of the underlying (default: the last price of the underlying).
+
+        Returns:
+            list[dict]: The best candidates (sorted by descending score, ties in enumeration order), each with the legs
+                ("contracts", "sides", "strikes", "expiry", "strategy", "sidesDesc"), the metrics and the "score".
+        """
+        if structure not in self.STRUCTURES:
+            raise ValueError(f"Invalid structure {structure}. Valid values: {', '.join(self.STRUCTURES)}")
+        if not isinstance(contracts, ChainSnapshot):
+            contracts = ChainSnapshot(self.context, contracts, spotPrice = spotPrice)
+        if len(contracts) == 0 or topK < 1:
+            return []
+        spotPrice = contracts.spotPrice if spotPrice is None else spotPrice
+
+        definition = self.STRUCTURES[structure]
+        rights = definition["rights"]
+        sides = np.array(definition["sides"], dtype = float) * (1 if sell else -1)
+        isCall = np.array([right == "call" for right in rights])
+
+        # Enumerate the candidates of each expiration
+        strikes = []
+        premiums = []
+        legContracts = []
+        for legs in self.legs(contracts):
+            positions = self.enumerate(structure, legs, minWingSize = minWingSize, maxWingSize = maxWingSize)
+            strikes.append(np.column_stack([legs[right][0][position] for right, position in zip(rights, positions)]))
+            premiums.append(np.column_stack([legs[right][1][position] for right, position in zip(rights, positions)]))
+            legContracts.append((legs, positions))
+        strikes = np.concatenate(strikes)
+        premiums = np.concatenate(premiums)
+        if strikes.shape[0] == 0:
+            return []
+
+        # Evaluate and rank all the candidates
+        metrics = self.metrics(strikes, premiums, isCall, sides, spotPrice)
+        if callable(objective):
+            scores = np.asarray(objective({**metrics, "strikes": strikes, "premiums": premiums}), dtype = float)
+        elif objective in self.METRICS:
+            scores = metrics[objective]
+        else:
+            raise ValueError(f"Invalid objective {objective}. Valid values: {', '.join(self.METRICS)} or a function of the metrics.")
+        candidates = np.flatnonzero(~np.isnan(scores))
+        best = candidates[np.argsort(-scores[candidates], kind = "stable")][:topK]
+
+        # Description of the legs (same as Order.getButterflyOrder for the Butterflies, default descriptions otherwise)
+        sidesDesc = None
+        if structure.endswith("Butterfly"):
+            optionSides = {-1: "Short", 1: "Long"}
+            sidesDesc = [f"{prefix}{optionSides[np.sign(side)]}{rights[0].title()}" for side, prefix in zip(sides, ["left", "", "right"])]
+
+        # Offsets of the candidates of each expiration
+        offsets = np.cumsum([0] + [positions[0].size for _, positions in legContracts])
+        results = []
+        for candidate in best:
+            group = np.searchsorted(offsets, candidate, side = "right") - 1
+            legs, positions = legContracts[group]
+            row = candidate - offsets[group]
+            legsContracts = [legs[right][2][position[row]] for right, position in zip(rights, positions)]
+            results.append({
+                "structure": structure,
+                "strategy": definition["strategy"][0 if sell else 1],
+                "sell": sell,
+                "contracts": legsContracts,
+                "sides": [int(side) for side in sides],
+                "sidesDesc": sidesDesc,
+                "strikes": strikes[candidate].tolist(),
+                "expiry": legsContracts[0].Expiry,
+                **{metric: float(metrics[metric][candidate]) for metric in self.METRICS},
+                "breakevens": metrics["breakevens"][candidate][~np.isnan(metrics["breakevens"][candidate])].tolist(),
+                "score": float(scores[candidate]),
+            })
+        return results
@@ -2,5 +2,7 @@
 from AlgorithmImports import *
 from .Order import Order
 from .OrderBuilder import OrderBuilder
+from .StructureSearch import StructureSearch
+from .OrderDetails import OrderDetails
 # endregion
 
@@ -8,7 +8,7 @@ from operator import attrgetter
 from typing import Dict, List, Optional
 from Tools import ContractUtils
 import importlib
-from Tools import Helper, ContractUtils, Logger, Underlying
+from Tools import Helper, ContractUtils, Logger, Underlying, Payoff
 
 
 """
@@ -365,6 +365,13 @@ class Position(_ParentBase):
     def isDebitStrategy(self):
         return self.strategyId in ["DebitButterfly", "ReverseIronFly", "ReverseIronCondor", "CallDebitSpread", "PutDebitSpread", "LongStrangle", "LongStraddle", "LongCall", "LongPut"]
 
+    def payoff(self):
+        """
+        Payoff at expiration of the position (per unit of orderQuantity) as a piecewise linear function of the underlying price.
+        The premium received (> 0) or paid (< 0) per unit can be passed to its maxLoss/maxProfit/breakevens methods.
+        """
+        return Payoff([leg.strike for leg in self.legs], [leg.isCall for leg in self.legs], [leg.contractSide for leg in self.legs])
+
     # Slippage used to set Limit orders
     def getPositionValue(self, context):
         """
@@ -0,0 +1,4 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+# Empty file to make the directory a Python package 
\ No newline at end of file
@@ -0,0 +1,41 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Shared helpers for the benchmark scripts.
+
+The benchmarks are plain scripts (they are not collected by mamba). Run them from the project root:
+
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/<name>_benchmark.py
+"""
+import timeit
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+
+
+def create_algorithm():
+    """Creates a mocked algorithm with the attributes required by the pricing code."""
+    with patch_imports()[0], patch_imports()[1]:
+        algorithm = Factory.create_algorithm()
+        algorithm.executionTimer = MagicMock()
+        algorithm.logger = MagicMock()
+    return algorithm
+
+
+def measure(function, repeat=5, number=None):
+    """Returns the best time (in seconds) per call of the given function."""
+    timer = timeit.Timer(function)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(title, rows, headers):
+    """Prints a simple fixed width table."""
+    print(f"\n{title}")
+    widths = [max(len(str(header)), *(len(str(row[i])) for row in rows)) for i, header in enumerate(headers)]
+    print("  ".join(str(header).rjust(widths[i]) for i, header in enumerate(headers)))
+    for row in rows:
+        print("  ".join(str(value).rjust(widths[i]) for i, value in enumerate(row)))
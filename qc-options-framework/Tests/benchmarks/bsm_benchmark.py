@@ -0,0 +1,122 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+BSM pricing kernel benchmark: SciPy-free normal distribution and Halley solver vs the legacy SciPy implementation.
+
+  - import time of Tools.BSMLibrary in a fresh interpreter, with and without the SciPy modules it used to import
+  - per-call cost of the normal CDF/PDF/PPF (scalar and 500-element arrays)
+  - per-call cost of BSM.computeGreeks and BSM.bsmIV on a single contract
+
+The legacy numbers are obtained by swapping scipy.stats.norm and scipy.optimize.root_scalar back into the BSM library.
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/bsm_benchmark.py
+"""
+import os
+import subprocess
+import sys
+import warnings
+import numpy as np
+from datetime import timedelta
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import create_algorithm, measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    import Tools.BSMLibrary as BSMLibrary
+    from Tools.BSMLibrary import BSM
+    from Tools.StandardNormal import StandardNormal
+    from Tests.mocks.algorithm_imports import OptionContract, OptionRight
+
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+from Tests.spec_helper import patch_imports
+with patch_imports()[0], patch_imports()[1]:
+    {statement}
+print(time.perf_counter() - start)
+"""
+
+
+def importTime(statement, repeat=5):
+    """Best wall time (in seconds) to run the import statement in a fresh interpreter."""
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT.format(statement=statement)], capture_output=True, text=True, env=os.environ, check=True)
+        times.append(float(output.stdout.strip().splitlines()[-1]))
+    return min(times)
+
+
+class LegacyHalley:
+    """Legacy scalar solver: scipy.optimize.root_scalar(method='halley')."""
+    @staticmethod
+    def halley(f, fprime, fprime2, x0, args=(), xtol=1e-6, maxIter=50):
+        from scipy import optimize
+        sol = optimize.root_scalar(f, x0=x0, args=args, fprime=fprime, fprime2=fprime2, method='halley', xtol=xtol, maxiter=maxIter)
+        return sol.root, sol.converged
+
+
+def main():
+    warnings.simplefilter("ignore")
+
+    # Import time
+    base = importTime("import numpy")
+    fast = importTime("import Tools.BSMLibrary")
+    legacy = importTime("from scipy import optimize; from scipy.stats import norm; import Tools.BSMLibrary")
+    report("Import time (fresh interpreter, including numpy/pandas and the mocked AlgorithmImports)", [
+        ["baseline (numpy only)", f"{base * 1e3:.1f}"],
+        ["Tools.BSMLibrary (SciPy-free)", f"{fast * 1e3:.1f}"],
+        ["Tools.BSMLibrary + scipy.optimize/stats (legacy)", f"{legacy * 1e3:.1f}"],
+    ], ["import", "ms"])
+
+    # Normal distribution
+    from scipy.stats import norm
+    x = np.linspace(-8.0, 8.0, 500)
+    p = np.linspace(1e-6, 1 - 1e-6, 500)
+    rows = []
+    for name, function, argument in [("cdf", "cdf", 0.3), ("pdf", "pdf", 0.3), ("ppf", "ppf", 0.3)]:
+        rows.append([f"{name} (scalar)", f"{measure(lambda: getattr(norm, function)(argument)) * 1e6:.2f}", f"{measure(lambda: getattr(StandardNormal, function)(argument)) * 1e6:.2f}"])
+    for name, function, argument in [("cdf", "cdf", x), ("pdf", "pdf", x), ("ppf", "ppf", p)]:
+        rows.append([f"{name} (500 values)", f"{measure(lambda: getattr(norm, function)(argument)) * 1e6:.2f}", f"{measure(lambda: getattr(StandardNormal, function)(argument)) * 1e6:.2f}"])
+    report("Normal distribution (us/call)", rows, ["function", "scipy.stats.norm", "StandardNormal"])
+
+    # Single contract pricing
+    algorithm = create_algorithm()
+    with patch_imports()[0], patch_imports()[1]:
+        bsm = BSM(algorithm)
+        BSM.greeksCache.resize(0)
+        contract = OptionContract()
+        contract._strike = 5050.0
+        contract._right = OptionRight.Call
+        contract._expiry = algorithm.Time + timedelta(days=7)
+        bsm.contractUtils.getUnderlyingLastPrice = lambda contract: 5000.0
+        bsm.contractUtils.midPrice = lambda contract: 21.35
+
+        def pricing():
+            return [
+                measure(lambda: bsm.bsmPrice(contract, 0.15)),
+                measure(lambda: bsm.computeGreeks(contract, sigma=0.15)),
+                measure(lambda: bsm.bsmIV(contract, tau=bsm.optionTau(contract), x0=0.1)),
+            ]
+
+        fastTimes = pricing()
+        fastIV = bsm.bsmIV(contract, tau=bsm.optionTau(contract), x0=0.1)
+        # Swap the legacy SciPy implementation back in
+        BSMLibrary.norm, halley = norm, BSM.halley
+        BSM.halley = LegacyHalley.halley
+        try:
+            legacyTimes = pricing()
+            legacyIV = bsm.bsmIV(contract, tau=bsm.optionTau(contract), x0=0.1)
+        finally:
+            BSMLibrary.norm, BSM.halley = StandardNormal, halley
+
+        rows = [[name, f"{legacyTime * 1e6:.1f}", f"{fastTime * 1e6:.1f}", f"{legacyTime / fastTime:.1f}x"]
+                for name, legacyTime, fastTime in zip(["bsmPrice", "computeGreeks (given IV)", "bsmIV (Halley)"], legacyTimes, fastTimes)]
+        report("Single contract (us/call)", rows, ["method", "legacy (scipy)", "SciPy-free", "speedup"])
+        print(f"\nIV: legacy {legacyIV:.12f}, SciPy-free {fastIV:.12f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Chain lookups benchmark: OrderBuilder on a plain list of contracts vs a ChainSnapshot.
+
+  - list: every call filters the chain by right, strike, tradability and price, and sorts it by strike
+  - ChainSnapshot: built once per time bar, each call bisects the strike columns
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/chain_snapshot_benchmark.py
+"""
+import numpy as np
+from datetime import timedelta
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import create_algorithm, measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Order.OrderBuilder import OrderBuilder
+    from Tools import ChainSnapshot
+    from Tests.mocks.algorithm_imports import OptionContract, OptionRight
+
+
+def create_chain(algorithm, nStrikes):
+    contracts = []
+    for strike in np.linspace(4000.0, 6000.0, nStrikes):
+        for right in [OptionRight.Put, OptionRight.Call]:
+            contract = OptionContract()
+            contract._strike = float(strike)
+            contract._right = right
+            contract._expiry = algorithm.Time + timedelta(days=30)
+            contract.IsTradable = True
+            contract.symbol.Value = f"SPX {right} {strike}"
+            contracts.append(contract)
+    # The chains of the slice are not sorted by strike
+    return [contracts[i] for i in np.random.default_rng(1).permutation(len(contracts))]
+
+
+def main():
+    algorithm = create_algorithm()
+    algorithm.riskFreeRate = 0.02
+    with patch_imports()[0], patch_imports()[1]:
+        builder = OrderBuilder(algorithm)
+        builder.contractUtils.getUnderlyingLastPrice = MagicMock(return_value=5000.0)
+        rows = []
+        for nStrikes in [50, 100, 200]:
+            chain = create_chain(algorithm, nStrikes)
+            snapshot = ChainSnapshot(algorithm, chain, spotPrice=5000.0)
+            lookups = [
+                ("getATMStrike", lambda contracts: builder.getATMStrike(contracts)),
+                ("getPuts(toStrike)", lambda contracts: builder.getPuts(contracts, toStrike=4900.0)),
+                ("getCalls(fromStrike, price)", lambda contracts: builder.getCalls(contracts, fromStrike=5100.0, fromPrice=0.5, toPrice=2.0)),
+            ]
+            for name, lookup in lookups:
+                assert lookup(chain) == lookup(snapshot)
+                listTime = measure(lambda: lookup(chain))
+                snapshotTime = measure(lambda: lookup(snapshot))
+                rows.append([len(chain), name, f"{listTime * 1e6:.1f}", f"{snapshotTime * 1e6:.1f}", f"{listTime / snapshotTime:.1f}x"])
+            rows.append([len(chain), "ChainSnapshot (build once)", "", f"{measure(lambda: ChainSnapshot(algorithm, chain, spotPrice=5000.0)) * 1e6:.1f}", ""])
+        report("OrderBuilder lookups (us/call)", rows, ["contracts", "lookup", "list", "snapshot", "speedup"])
+
+
+if __name__ == "__main__":
+    main()
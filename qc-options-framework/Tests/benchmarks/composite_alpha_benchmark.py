@@ -0,0 +1,64 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Composite alpha benchmark: per-minute chain work of several strategies on the same underlying.
+
+  - separate: each strategy (its own AlphaModel) wraps the chain of the slice into its own ChainSnapshot
+  - shared: CompositeAlpha builds one ChainSnapshot and each strategy gets a view filtered by its dte/nStrikes (select)
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/composite_alpha_benchmark.py
+"""
+import numpy as np
+from datetime import timedelta
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import create_algorithm, measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools import ChainSnapshot
+    from Tests.mocks.algorithm_imports import OptionContract, OptionRight
+
+
+# (dte, dteWindow, nStrikesLeft, nStrikesRight) of SPXic, SPXCondor and SPXButterfly
+STRATEGIES = [(0, 0, 18, 18), (0, 0, 30, 30), (0, 0, 25, 25)]
+
+
+def create_chain(algorithm, nStrikes, expiries=(0, 1, 2)):
+    contracts = []
+    for days in expiries:
+        for strike in np.linspace(50.0, 150.0, nStrikes):
+            for right in [OptionRight.Put, OptionRight.Call]:
+                contract = OptionContract()
+                contract._strike = float(strike)
+                contract._right = right
+                contract._expiry = algorithm.Time + timedelta(days=days)
+                contract.IsTradable = True
+                contract.symbol.Value = f"SPX {right} {strike} {days}"
+                contracts.append(contract)
+    return contracts
+
+
+def main():
+    algorithm = create_algorithm()
+    with patch_imports()[0], patch_imports()[1]:
+        rows = []
+        for nStrikes in [50, 100, 200]:
+            chain = create_chain(algorithm, nStrikes)
+
+            def separate():
+                return [ChainSnapshot(algorithm, chain) for _ in STRATEGIES]
+
+            def shared():
+                snapshot = ChainSnapshot(algorithm, chain)
+                return [snapshot.select(max(0, dte - dteWindow), max(0, dte), left, right) for dte, dteWindow, left, right in STRATEGIES]
+
+            separateTime = measure(separate, repeat=3)
+            sharedTime = measure(shared, repeat=3)
+            rows.append([len(chain), len(STRATEGIES), f"{separateTime * 1e3:.2f}", f"{sharedTime * 1e3:.2f}", f"{separateTime / sharedTime:.1f}x"])
+        report("Chain work per minute (ms)", rows, ["contracts", "strategies", "separate", "shared", "speedup"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Greeks indicators benchmark: Lean Greeks indicators alive during a trading day with a drifting ATM (option chain
+provider path, one strategy).
+
+  - eager: the six indicators are created as soon as a contract is subscribed (until it is removed by the sweep)
+  - on-demand: the indicators only exist while the contract is in the chain window or a leg of a position
+
+The cost of Lean is proportional to the indicator updates: each live indicator is updated on every minute bar. Each
+set created also has to warm up (the Greeks are seeded from the BSM model meanwhile).
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/greeks_indicators_benchmark.py
+"""
+import random
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.GreeksIndicators import GreeksIndicators
+    from Tools.OptionSubscriptions import OptionSubscriptions
+    from AlgorithmImports import Symbol, SecurityType, OptionRight, Market
+
+
+def createAlgorithm(onDemand, gracePeriod):
+    algorithm = SimpleNamespace(
+        Time=datetime(2024, 1, 8, 9, 31), timeResolution="Minute", optionContractsSubscriptions=set(), openPositions={},
+        workingOrders={}, allPositions={}, Portfolio={}, Securities={}, logger=MagicMock(),
+        subscriptionGracePeriod=gracePeriod, greeksOnDemand=onDemand,
+    )
+    algorithm.RemoveOptionContract = lambda symbol: None
+    algorithm.DeregisterIndicator = lambda indicator: None
+    for name in ["iv", "d", "g", "v", "r", "t"]:
+        setattr(algorithm, name, lambda symbol, mirror, resolution: SimpleNamespace(is_ready=True))
+    return algorithm
+
+
+def simulate(onDemand, gracePeriod, nStrikes=18, volatility=3.0, seed=3):
+    """Runs a day of minute bars. Returns the indicator counts, their peak and the number of indicator updates."""
+    rng = random.Random(seed)
+    algorithm = createAlgorithm(onDemand, gracePeriod)
+    subscriptions = OptionSubscriptions.of(algorithm)
+    indicators = GreeksIndicators.of(algorithm)
+    symbols = {}
+    spot = 5000.0
+    peak = 0
+    updates = 0
+    for minute in range(390):
+        spot += rng.gauss(0.0, volatility)
+        atm = round(spot / 5.0) * 5.0
+        window = []
+        for key in [(right, atm + 5.0 * i) for i in range(-nStrikes, nStrikes + 1) for right in (OptionRight.Put, OptionRight.Call)]:
+            if key not in symbols:
+                symbol = Symbol.create_option("SPX", Market.USA, "European", key[0], key[1], datetime(2024, 1, 8))
+                symbols[key] = symbol
+                algorithm.Securities[symbol] = SimpleNamespace(symbol=symbol, Type=SecurityType.IndexOption)
+            window.append(symbols[key])
+        # DataHandler.AddOptionContracts + optionChainProviderFilter
+        for symbol in window:
+            if symbol not in algorithm.optionContractsSubscriptions:
+                algorithm.optionContractsSubscriptions.add(symbol)
+                if not onDemand:
+                    indicators.attach(algorithm.Securities[symbol])
+        subscriptions.setOwned(("chain", "SPXic"), window)
+        indicators.sync()
+        # A position opened at 10:00 on the ATM strikes, held until the close
+        if minute == 29:
+            subscriptions.setOwned(("position", "#1"), [symbols[(OptionRight.Put, atm)], symbols[(OptionRight.Call, atm)]])
+        # SetupBaseStructure.checkOpenPositions
+        subscriptions.sweep()
+        indicators.sync()
+        peak = max(peak, len(indicators.attached))
+        updates += len(indicators.attached) * len(GreeksIndicators.NAMES)
+        algorithm.Time += timedelta(minutes=1)
+    return indicators.counts(), peak, updates
+
+
+def main():
+    rows = []
+    for minutes in [30, 60]:
+        for name, onDemand in [("eager", False), ("on-demand", True)]:
+            gracePeriod = timedelta(minutes=minutes)
+            counts, peak, updates = simulate(onDemand, gracePeriod)
+            dayTime = measure(lambda: simulate(onDemand, gracePeriod), repeat=3, number=1)
+            rows.append([name, minutes, peak * len(GreeksIndicators.NAMES), counts["created"], counts["detached"], updates, f"{dayTime / 390 * 1e6:.0f}"])
+    report("Greeks indicators during one day (37 strikes window, puts and calls)", rows, ["mode", "grace (min)", "peak indicators", "sets created", "sets detached", "indicator updates", "us/minute"])
+
+
+if __name__ == "__main__":
+    main()
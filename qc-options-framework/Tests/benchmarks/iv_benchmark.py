@@ -0,0 +1,89 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Implied Volatility benchmark: speed and accuracy of the available solvers on synthetic SPX-like chains.
+
+  - scalar halley: BSM.bsmIV (scalar Halley iteration, one contract at a time)
+  - batch halley:  BSM.bsmIVArray (lockstep safeguarded Halley + vectorized bisection)
+  - rational:      BSM.bsmIVRational (rational initial guess + two Householder steps)
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/iv_benchmark.py
+"""
+import warnings
+import numpy as np
+from datetime import timedelta
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import create_algorithm, measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.BSMLibrary import BSM
+    from Tests.mocks.algorithm_imports import OptionContract, OptionRight
+
+
+class BenchmarkContract(OptionContract):
+    # Plain attribute for the IV saved by the BSM library
+    BSMImpliedVolatility = property(lambda self: self.__dict__.get("_iv", 0.1), lambda self, value: self.__dict__.update(_iv=value))
+
+
+def chain(spot, minutes, nStrikes=200, strikeStep=5.0):
+    """Synthetic chain of OTM puts and calls with a skewed smile."""
+    strikes = spot + strikeStep * np.arange(-nStrikes // 2, nStrikes // 2)
+    tau = minutes / (390.0 * 365.0)
+    isCall = strikes >= spot
+    moneyness = np.log(strikes / spot)
+    sigma = np.clip(0.15 - 0.8 * moneyness + 6.0 * moneyness**2, 0.05, 3.0)
+    return strikes, np.full(strikes.shape, tau), isCall, sigma
+
+
+def main():
+    warnings.simplefilter("ignore")
+    algorithm = create_algorithm()
+    with patch_imports()[0], patch_imports()[1]:
+        bsm = BSM(algorithm)
+        spot = 5000.0
+        rows = []
+        for label, minutes, minPrice in [("0DTE (2h)", 120, 1e-8), ("0DTE wings", 30, 1e-12), ("1DTE", 390 * 1.5, 1e-8), ("30DTE", 390 * 30, 1e-8)]:
+            strikes, tau, isCall, sigma = chain(spot, minutes)
+            price = bsm.bsmGreeksArray(spot, strikes, tau, sigma, isCall)["price"]
+            # Only keep the prices that carry information about the volatility
+            keep = price > minPrice
+            strikes, tau, isCall, sigma, price = strikes[keep], tau[keep], isCall[keep], sigma[keep], price[keep]
+            n = len(price)
+
+            # Scalar Halley on every contract (current per-contract path)
+            contracts = []
+            for K, call, p in zip(strikes, isCall, price):
+                contract = BenchmarkContract()
+                contract._strike = K
+                contract._right = OptionRight.Call if call else OptionRight.Put
+                contract._bid_price = p
+                contract._ask_price = p
+                contract._underlying_last_price = spot
+                contracts.append(contract)
+            bsm.contractUtils.getUnderlyingLastPrice = lambda contract: spot
+            bsm.contractUtils.midPrice = lambda contract: 0.5 * (contract.BidPrice + contract.AskPrice)
+            scalarIV = np.array([bsm.bsmIV(contract, tau=tau[0]) for contract in contracts])
+            scalarTime = measure(lambda: [bsm.bsmIV(contract, tau=tau[0]) for contract in contracts], repeat=1, number=1)
+
+            batchIV, batchConverged = bsm.bsmIVArray(price, spot, strikes, tau, isCall)
+            batchTime = measure(lambda: bsm.bsmIVArray(price, spot, strikes, tau, isCall))
+
+            rationalIV, rationalConverged = bsm.bsmIVRational(price, spot, strikes, tau, isCall)
+            rationalTime = measure(lambda: bsm.bsmIVRational(price, spot, strikes, tau, isCall))
+
+            def accuracy(IV, converged):
+                error = np.abs(IV - sigma) / sigma
+                return f"{converged.mean():.1%}", f"{error[converged].max():.1e}" if converged.any() else "-"
+
+            rows.append([label, n, "scalar halley", f"{scalarTime * 1e3:.2f}", *accuracy(scalarIV, scalarIV > 0)])
+            rows.append([label, n, "batch halley", f"{batchTime * 1e3:.2f}", *accuracy(batchIV, batchConverged)])
+            rows.append([label, n, "rational", f"{rationalTime * 1e3:.2f}", *accuracy(rationalIV, rationalConverged)])
+
+        report("Implied Volatility solvers", rows, ["chain", "contracts", "method", "ms/chain", "converged", "max rel error"])
+
+
+if __name__ == "__main__":
+    main()
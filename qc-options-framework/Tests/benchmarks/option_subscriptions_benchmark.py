@@ -0,0 +1,59 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Option subscriptions benchmark: number of option contracts subscribed during a trading day with a drifting ATM.
+
+  - append-only: every contract selected by the chain window stays subscribed until the end of the day
+  - OptionSubscriptions: the contracts that left the window are removed after the grace period
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/option_subscriptions_benchmark.py
+"""
+import random
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.OptionSubscriptions import OptionSubscriptions
+
+
+def simulate(gracePeriod, nStrikes=18, volatility=3.0, seed=3):
+    """Runs a day of minute bars. Returns the peak and final number of subscriptions (None -> append-only)."""
+    rng = random.Random(seed)
+    algorithm = SimpleNamespace(
+        Time=datetime(2024, 1, 8, 9, 31), optionContractsSubscriptions=set(), openPositions={}, workingOrders={},
+        allPositions={}, Portfolio={}, logger=MagicMock(), subscriptionGracePeriod=gracePeriod,
+    )
+    algorithm.RemoveOptionContract = lambda symbol: None
+    subscriptions = OptionSubscriptions(algorithm)
+    spot = 5000.0
+    peak = 0
+    for _ in range(390):
+        spot += rng.gauss(0.0, volatility)
+        atm = round(spot / 5.0) * 5.0
+        window = [(right, atm + 5.0 * i) for i in range(-nStrikes, nStrikes + 1) for right in ("P", "C")]
+        algorithm.optionContractsSubscriptions.update(window)
+        if gracePeriod is not None:
+            subscriptions.setOwned(("chain", "SPXic"), window)
+            subscriptions.sweep()
+        peak = max(peak, len(algorithm.optionContractsSubscriptions))
+        algorithm.Time += timedelta(minutes=1)
+    return peak, len(algorithm.optionContractsSubscriptions)
+
+
+def main():
+    rows = []
+    for name, gracePeriod in [("append-only", None), ("grace 60 min", timedelta(minutes=60)), ("grace 30 min", timedelta(minutes=30)), ("grace 5 min", timedelta(minutes=5))]:
+        peak, final = simulate(gracePeriod)
+        dayTime = measure(lambda: simulate(gracePeriod), repeat=3, number=1)
+        rows.append([name, peak, final, f"{dayTime / 390 * 1e6:.0f}"])
+    report("Option contracts subscribed during one day (37 strikes window, puts and calls)", rows, ["policy", "peak", "end of day", "us/minute"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Provider contract selection benchmark: per-minute selection of the contracts on the option chain provider path.
+
+  - list: the previous selection on the full provider list (DTE filter, expiry selection, two sorts by distance from the
+    price and the sorted strike list), repeated every minute
+  - ProviderChain: the list is bucketed by expiry once per day, each minute selects the expiry and bisects the strikes
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/provider_chain_benchmark.py
+"""
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.ProviderChain import ProviderChain
+
+
+def create_symbols(today, nStrikes, nExpiries):
+    return [
+        SimpleNamespace(ID=SimpleNamespace(Date=today + timedelta(days=days), StrikePrice=4000.0 + 5.0 * i))
+        for days in range(nExpiries)
+        for i in range(nStrikes)
+        for right in range(2)
+    ]
+
+
+def listSelection(symbols, today, price, minRank, maxRank, minDte, maxDte):
+    filteredSymbols = [symbol for symbol in symbols if minDte <= (symbol.ID.Date.date() - today).days <= maxDte]
+    expiry = sorted(set(symbol.ID.Date for symbol in filteredSymbols), reverse=True)[-1]
+    filteredSymbols = [symbol for symbol in filteredSymbols if symbol.ID.Date == expiry]
+    atm_strike = sorted(filteredSymbols, key=lambda x: abs(x.ID.StrikePrice - price))[0].ID.StrikePrice
+    strike_list = sorted(set([i.ID.StrikePrice for i in filteredSymbols]))
+    atm_strike = sorted(filteredSymbols, key=lambda x: abs(x.ID.StrikePrice - price))[0].ID.StrikePrice
+    atm_index = strike_list.index(atm_strike)
+    min_strike = strike_list[max(0, atm_index + minRank)]
+    max_strike = strike_list[min(len(strike_list) - 1, atm_index + maxRank)]
+    return [symbol for symbol in filteredSymbols if min_strike <= symbol.ID.StrikePrice <= max_strike]
+
+
+def chainSelection(chain, today, price, minRank, maxRank, minDte, maxDte):
+    expiry = chain.expiriesWithin(today, minDte, maxDte)[0]
+    return chain.contracts[expiry].strikeRange(price, minRank, maxRank)
+
+
+def main():
+    today = datetime(2024, 1, 8)
+    rows = []
+    for nStrikes, nExpiries in [(200, 10), (400, 20), (800, 40)]:
+        symbols = create_symbols(today, nStrikes, nExpiries)
+        chain = ProviderChain(symbols)
+        arguments = (today.date(), 4000.0 + 2.5 * nStrikes, -18, 18, 0, 0)
+        assert listSelection(symbols, *arguments) == chainSelection(chain, *arguments)
+        listTime = measure(lambda: listSelection(symbols, *arguments), repeat=3)
+        chainTime = measure(lambda: chainSelection(chain, *arguments))
+        buildTime = measure(lambda: ProviderChain(symbols), repeat=3)
+        rows.append([len(symbols), f"{listTime * 1e3:.3f}", f"{chainTime * 1e3:.3f}", f"{listTime / chainTime:.0f}x", f"{buildTime * 1e3:.2f}"])
+    report("Provider contract selection (ms/minute)", rows, ["contracts", "list", "ProviderChain", "speedup", "daily build"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Scenario grid benchmark: vectorized ScenarioEngine vs scalar Order.fValue evaluations.
+
+  - legacy portfolio margin: two fValue calls (underlying -/+ portfolioMarginStress)
+  - ScenarioEngine: same two scenarios, and richer grids (41 spot points x 5 IV shifts, x 3 time offsets)
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/scenario_benchmark.py
+"""
+import numpy as np
+from datetime import timedelta
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import create_algorithm, measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Order.Order import Order
+    from Tests.mocks.algorithm_imports import OptionContract, OptionRight
+
+
+def main():
+    algorithm = create_algorithm()
+    algorithm.riskFreeRate = 0.02
+    algorithm.portfolioMarginStress = 0.12
+    strategy = MagicMock()
+    strategy.parameter = MagicMock(side_effect=lambda name, default=None: default)
+    with patch_imports()[0], patch_imports()[1]:
+        order = Order(algorithm, strategy)
+        # Iron Condor
+        contracts = []
+        for strike, right in [(4800.0, OptionRight.Put), (4850.0, OptionRight.Put), (5150.0, OptionRight.Call), (5200.0, OptionRight.Call)]:
+            contract = OptionContract()
+            contract._strike = strike
+            contract._right = right
+            contract._expiry = algorithm.Time + timedelta(days=30)
+            contracts.append(contract)
+        sides = [1, -1, -1, 1]
+        IVs = {contract.Symbol: IV for contract, IV in zip(contracts, [0.22, 0.2, 0.14, 0.13])}
+        order.bsm.contractIV = lambda contract: IVs[contract.Symbol]
+        spotPrice = 5000.0
+        stress = algorithm.portfolioMarginStress
+
+        def legacy():
+            return min(0, order.fValue(spotPrice * (1 - stress), contracts, sides=sides, atTime=algorithm.Time, openPremium=-10.0),
+                       order.fValue(spotPrice * (1 + stress), contracts, sides=sides, atTime=algorithm.Time, openPremium=-10.0))
+
+        grids = [
+            ("2 spot points", np.array([-stress, stress]), [0.0], [timedelta(0)]),
+            ("41 spot x 5 IV", np.linspace(-stress, stress, 41), [-0.05, -0.025, 0.0, 0.025, 0.05], [timedelta(0)]),
+            ("41 spot x 5 IV x 3 times", np.linspace(-stress, stress, 41), [-0.05, -0.025, 0.0, 0.025, 0.05], [timedelta(0), timedelta(days=7), timedelta(days=14)]),
+        ]
+        rows = [["fValue x 2 (legacy margin)", 2, f"{measure(legacy) * 1e6:.1f}"]]
+        for name, spotShifts, volShifts, timeOffsets in grids:
+            def grid():
+                return order.scenarioPnL(contracts, sides, openPremium=-10.0, spotShifts=spotShifts, volShifts=volShifts, timeOffsets=timeOffsets, spotPrice=spotPrice)
+            rows.append([f"ScenarioEngine ({name})", len(spotShifts) * len(volShifts) * len(timeOffsets), f"{measure(grid) * 1e6:.1f}"])
+        report("Iron Condor stress scenarios (us/call)", rows, ["method", "scenarios", "us"])
+
+        gridMargin = min(0, float(order.scenarioPnL(contracts, sides, openPremium=-10.0, spotShifts=[-stress, stress], spotPrice=spotPrice).min()))
+        print(f"\nMargin: legacy {legacy():.10f}, ScenarioEngine {gridMargin:.10f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Entry schedule benchmark: cost of the schedule gate and number of minutes of a trading day that reach the chain work.
+
+  - datetime: the previous window check (time of the algorithm compared with the start/stop time). The trade times of
+    the strategies were only checked in getOrder, after the market checks and the chain filtering
+  - EntrySchedule: the parameters (window and trade times) are compiled once into the eligible minutes of each day,
+    each call is a set lookup done before any market check or chain work
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/schedule_benchmark.py
+"""
+from datetime import datetime, time, timedelta
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Alpha.Utils.EntrySchedule import EntrySchedule
+
+
+def previousCheck(dttm, startTime, stopTime):
+    current_time = dttm.time()
+    if startTime and current_time < startTime:
+        return False
+    if stopTime and current_time > stopTime:
+        return False
+    return True
+
+
+def main():
+    # One trading day of minute bars
+    minutes = [datetime(2024, 1, 8, 9, 31) + timedelta(minutes=n) for n in range(390)]
+    scenarios = [
+        ("window", time(9, 35), time(15, 45), None),
+        ("window + 3 times", time(9, 35), time(16, 0), [time(9, 45), time(13, 10), time(15, 15)]),
+        ("window + 7 times", time(9, 35), time(16, 0), [time(9, 45), time(10, 15), time(12, 30), time(13, 0), time(13, 30), time(13, 45), time(14, 0)]),
+    ]
+    rows = []
+    for name, startTime, stopTime, times in scenarios:
+        parameters = dict(startTime=startTime, stopTime=stopTime, times=times)
+        schedule = EntrySchedule.compile(None, **parameters)
+        previousOpen = [previousCheck(dttm, startTime, stopTime) for dttm in minutes]
+        scheduleOpen = [schedule.isOpen(dttm) for dttm in minutes]
+        assert scheduleOpen == [isOpen and (times is None or dttm.time() in times) for dttm, isOpen in zip(minutes, previousOpen)]
+        datetimeTime = measure(lambda: [previousCheck(dttm, startTime, stopTime) for dttm in minutes])
+        # Including the check that the parameters did not change (as done on each call of Alpha.Base.check_market_schedule)
+        compiledTime = measure(lambda: [EntrySchedule.compile(schedule, **parameters).isOpen(dttm) for dttm in minutes])
+        rows.append([name, f"{datetimeTime / len(minutes) * 1e9:.0f}", f"{compiledTime / len(minutes) * 1e9:.0f}", sum(previousOpen), sum(scheduleOpen)])
+    report("Schedule gate (ns/minute) and minutes reaching the chain work (per day)", rows, ["schedule", "datetime", "EntrySchedule", "chain (before)", "chain (after)"])
+
+
+if __name__ == "__main__":
+    main()
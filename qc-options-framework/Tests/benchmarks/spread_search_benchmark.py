@@ -0,0 +1,64 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Spread search benchmark: OrderBuilder.getSpread without a strike (best premium within a price range).
+
+  - suffix search: getWing on every suffix of the sorted contracts (previous implementation, O(n^2))
+  - getSpread: all the wings found at once with getWingIndices (binary search on the strikes)
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/spread_search_benchmark.py
+"""
+import numpy as np
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import create_algorithm, measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Order.OrderBuilder import OrderBuilder
+    from Tests.mocks.algorithm_imports import OptionContract, OptionRight
+
+
+def suffixSearch(builder, contracts, wingSize, fromPrice, toPrice):
+    # Previous implementation of getSpread (strike = None, premiumOrder = 'max')
+    best_spread = []
+    best_premium = -float('inf')
+    for i in range(len(contracts) - 1):
+        wing = builder.getWing(contracts[i:], wingSize=wingSize)
+        if wing is not None:
+            net_premium = abs(builder.contractUtils.midPrice(contracts[i]) - builder.contractUtils.midPrice(wing))
+            if fromPrice <= net_premium <= toPrice and net_premium > best_premium:
+                best_spread = [contracts[i], wing]
+                best_premium = net_premium
+    return best_spread
+
+
+def main():
+    algorithm = create_algorithm()
+    algorithm.riskFreeRate = 0.02
+    with patch_imports()[0], patch_imports()[1]:
+        builder = OrderBuilder(algorithm)
+        builder.contractUtils.midPrice = lambda contract: 0.5 * (contract.BidPrice + contract.AskPrice)
+        rows = []
+        for nStrikes in [50, 100, 200, 400]:
+            # Calls sorted by strike, priced with a decreasing premium
+            contracts = []
+            for strike in np.linspace(4000.0, 4000.0 + 5.0 * (nStrikes - 1), nStrikes):
+                contract = OptionContract()
+                contract._strike = float(strike)
+                contract._right = OptionRight.Call
+                contract._bid_price = contract._ask_price = 100.0 * np.exp(-(strike - 4000.0) / 500.0)
+                contracts.append(contract)
+            builder.getContracts = MagicMock(return_value=contracts)
+            arguments = dict(wingSize=50, fromPrice=0.5, toPrice=2.0)
+            assert suffixSearch(builder, contracts, **arguments) == builder.getSpread(contracts, "Call", **arguments)
+            suffixTime = measure(lambda: suffixSearch(builder, contracts, **arguments))
+            searchTime = measure(lambda: builder.getSpread(contracts, "Call", **arguments))
+            rows.append([nStrikes, f"{suffixTime * 1e3:.2f}", f"{searchTime * 1e3:.3f}", f"{suffixTime / searchTime:.0f}x"])
+        report("getSpread without strike (ms/call)", rows, ["strikes", "suffix search", "getSpread", "speedup"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Structure search benchmark: exhaustive Iron Condor search vs a single greedy pick.
+
+  - greedy: the two spreads of Order.getIronCondorOrder picked by strike and delta (OrderBuilder.getSpread)
+  - StructureSearch: all the Iron Condors (short strikes x wing widths) evaluated at once, top 10 by credit/risk
+
+Usage (from the project root):
+    export PYTHONPATH="$(pwd):$(pwd)/Tests"
+    python Tests/benchmarks/structure_search_benchmark.py
+"""
+import numpy as np
+from datetime import timedelta
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.benchmarks.benchmark_helper import create_algorithm, measure, report
+
+with patch_imports()[0], patch_imports()[1]:
+    from Order.OrderBuilder import OrderBuilder
+    from Order.StructureSearch import StructureSearch
+    from Tools import ChainSnapshot
+    from Tests.mocks.algorithm_imports import OptionContract, OptionRight
+
+
+def create_chain(algorithm, nStrikes):
+    contracts = []
+    for strike in np.linspace(4500.0, 5500.0, nStrikes):
+        for right in [OptionRight.Put, OptionRight.Call]:
+            contract = OptionContract()
+            contract._strike = float(strike)
+            contract._right = right
+            contract._expiry = algorithm.Time + timedelta(days=30)
+            # OTM premium decaying away from the spot
+            premium = 60.0 * np.exp(-abs(strike - 5000.0) / 150.0) + max(0.0, (strike - 5000.0) if right == OptionRight.Put else (5000.0 - strike))
+            contract._bid_price = premium - 0.1
+            contract._ask_price = premium + 0.1
+            contract.IsTradable = True
+            contract.symbol.Value = f"SPX {right} {strike}"
+            contracts.append(contract)
+    return contracts
+
+
+def main():
+    algorithm = create_algorithm()
+    algorithm.riskFreeRate = 0.02
+    with patch_imports()[0], patch_imports()[1]:
+        builder = OrderBuilder(algorithm)
+        builder.contractUtils.getUnderlyingLastPrice = MagicMock(return_value=5000.0)
+        search = StructureSearch(algorithm)
+        rows = []
+        for nStrikes in [25, 50, 100]:
+            chain = create_chain(algorithm, nStrikes)
+            snapshot = ChainSnapshot(algorithm, chain, spotPrice=5000.0)
+            step = 1000.0 / (nStrikes - 1)
+
+            def greedy():
+                puts = builder.getSpread(chain, "Put", strike=4900.0, delta=10, wingSize=5 * step, sortByStrike=True)
+                calls = builder.getSpread(chain, "Call", strike=5100.0, delta=10, wingSize=5 * step)
+                return puts + calls
+
+            def exhaustive():
+                return search.search(snapshot, "IronCondor", topK=10, maxWingSize=5 * step)
+
+            candidates = len(search.search(snapshot, "IronCondor", topK=10**9, objective="netCredit", maxWingSize=5 * step))
+            greedyTime = measure(greedy, repeat=3)
+            searchTime = measure(exhaustive, repeat=3)
+            rows.append([nStrikes, candidates, f"{greedyTime * 1e3:.2f}", f"{searchTime * 1e3:.2f}", f"{searchTime / candidates * 1e6:.2f}"])
+        report("Iron Condor selection (ms/call)", rows, ["strikes", "candidates", "greedy pick", "search (top 10)", "us/candidate"])
+
+
+if __name__ == "__main__":
+    main()
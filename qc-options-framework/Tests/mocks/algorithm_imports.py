@@ -307,7 +307,7 @@ class QCAlgorithm:
         self.Plot = MagicMock()
         self.openPositions = MagicMock(Count=0)
         self.timeResolution = Resolution.Minute
-        self.optionContractsSubscriptions = []
+        self.optionContractsSubscriptions = set()
         
         # Add missing attributes
         self.universe_settings = MagicMock(resolution=None)
@@ -492,6 +492,13 @@ class OrderStatus:
     Submitted = "Submitted"
     None_ = "None"
 
+class TradingDayType:
+    """Mock of QuantConnect's TradingDayType enum"""
+    BusinessDay = "BusinessDay"
+    PublicHoliday = "PublicHoliday"
+    Weekend = "Weekend"
+    OptionExpiration = "OptionExpiration"
+
 class SeriesType:
     Line = "Line"
     Scatter = "Scatter"
@@ -809,6 +816,7 @@ __all__ = [
     'date',
     'time',
     'OrderStatus',
+    'TradingDayType',
     'SeriesType',
     'Color',
     'ScatterMarkerSymbol',
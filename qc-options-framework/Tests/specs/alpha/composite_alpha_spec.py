@@ -0,0 +1,140 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_false, have_length, raise_error
+from unittest.mock import MagicMock
+from datetime import datetime, timedelta, time
+
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+from Tests.mocks.alpha_mocks import MockBase
+
+with patch_imports()[0], patch_imports()[1]:
+    from Alpha.Base import Base
+    from Alpha.CompositeAlpha import CompositeAlpha
+    from Tools import ChainSnapshot
+    from Tests.mocks.algorithm_imports import OptionRight, OptionContract, SecuritiesDict
+
+
+def create_contract(algorithm, strike, right, days):
+    contract = OptionContract()
+    contract._strike = strike
+    contract._right = right
+    contract._expiry = algorithm.Time + timedelta(days=days)
+    contract._bid_price = 1.0
+    contract._ask_price = 1.2
+    contract.IsTradable = True
+    contract.symbol.Value = f"TEST {right} {strike} {days}"
+    return contract
+
+
+class RecordingStrategy(Base):
+    """Strategy recording the chains it receives and returning one insight per call."""
+
+    def __init__(self, context, nameTag, **parameters):
+        super().__init__(context)
+        self.nameTag = nameTag
+        for key, value in {**MockBase.DEFAULT_PARAMETERS, **parameters}.items():
+            setattr(self, key, value)
+        self.underlyingSymbol = "SPX"
+        self.optionSymbol = "?SPXW"
+        self.chains = []
+
+    def CreateInsights(self, chain, lastClosedOrderTag=None, data=None):
+        self.chains.append(chain)
+        return [f"{self.nameTag}-insight"]
+
+
+with description('Alpha.CompositeAlpha') as self:
+    with before.each:
+        with patch_imports()[0], patch_imports()[1]:
+            self.algorithm = Factory.create_algorithm()
+            self.algorithm.logger = MagicMock()
+            self.algorithm.executionTimer = MagicMock()
+            self.algorithm.Securities = SecuritiesDict()
+            self.algorithm.Time = datetime(2024, 1, 8, 10, 0)
+            self.algorithm.IsWarmingUp = False
+            self.algorithm.IsMarketOpen = MagicMock(return_value=True)
+            self.algorithm.performance = MagicMock()
+            self.algorithm.structure = MagicMock()
+            self.algorithm.structure.checkOpenPositions = MagicMock()
+
+            self.contracts = [
+                create_contract(self.algorithm, strike, right, days)
+                for days in [0, 1, 7]
+                for strike in [90.0, 95.0, 100.0, 105.0, 110.0]
+                for right in [OptionRight.Put, OptionRight.Call]
+            ]
+            self.dataHandler = MagicMock()
+            self.dataHandler.getSliceContracts = MagicMock(return_value=self.contracts)
+
+            self.zeroDte = RecordingStrategy(self.algorithm, "ZeroDTE", dte=0, dteWindow=0, nStrikesLeft=1, nStrikesRight=1)
+            self.weekly = RecordingStrategy(self.algorithm, "Weekly", dte=7, dteWindow=1, nStrikesLeft=2, nStrikesRight=0)
+            for strategy in [self.zeroDte, self.weekly]:
+                strategy.dataHandler = self.dataHandler
+                strategy.syncStats = MagicMock()
+            self.composite = CompositeAlpha(self.algorithm, self.zeroDte, self.weekly)
+            self.data = MagicMock()
+
+    with context('initialization'):
+        with it('creates the strategies given as classes'):
+            class Hosted(RecordingStrategy):
+                def __init__(self, context):
+                    super().__init__(context, "Hosted")
+
+            composite = CompositeAlpha(self.algorithm, Hosted, self.zeroDte)
+            expect(composite.strategies).to(have_length(2))
+            expect(isinstance(composite.strategies[0], Hosted)).to(be_true)
+            expect(composite.strategies[1] is self.zeroDte).to(be_true)
+
+        with it('requires distinct nameTags'):
+            other = RecordingStrategy(self.algorithm, "ZeroDTE")
+            expect(lambda: CompositeAlpha(self.algorithm, self.zeroDte, other)).to(raise_error(ValueError))
+
+    with context('update'):
+        with it('reads the chain from the slice once for all the strategies'):
+            self.composite.update(self.algorithm, self.data)
+            self.dataHandler.getSliceContracts.assert_called_once_with(self.data)
+            self.dataHandler.getOptionContracts.assert_not_called()
+            self.algorithm.structure.checkOpenPositions.assert_called_once()
+            self.algorithm.performance.OnUpdate.assert_called_once_with(self.data)
+            self.zeroDte.syncStats.assert_called_once()
+            self.weekly.syncStats.assert_called_once()
+
+        with it('gives each strategy a view filtered by its own parameters'):
+            self.composite.update(self.algorithm, self.data)
+            zeroDteChain = self.zeroDte.chains[0]
+            weeklyChain = self.weekly.chains[0]
+            expect(isinstance(zeroDteChain, ChainSnapshot)).to(be_true)
+            # Same snapshot: the views share the time and spot price
+            expect(zeroDteChain.spotPrice).to(equal(weeklyChain.spotPrice))
+            atm = zeroDteChain.nearestStrike()
+            expect(atm).to(equal(100.0))
+            expect(list(zeroDteChain)).to(equal([
+                contract for contract in self.contracts
+                if contract.Expiry.date() == self.algorithm.Time.date() and abs(contract.Strike - atm) <= 5.0
+            ]))
+            expect(list(weeklyChain)).to(equal([
+                contract for contract in self.contracts
+                if (contract.Expiry.date() - self.algorithm.Time.date()).days in [6, 7] and atm - 10.0 <= contract.Strike <= atm
+            ]))
+            expect(len(zeroDteChain)).to(equal(6))
+            expect(len(weeklyChain)).to(equal(6))
+
+        with it('only runs the strategies within their entry schedule'):
+            self.weekly.scheduleStartTime = time(11, 0)
+            insights = self.composite.update(self.algorithm, self.data)
+            expect(insights).to(equal(["ZeroDTE-insight"]))
+            expect(self.weekly.chains).to(have_length(0))
+
+        with it('merges the insights of the strategies'):
+            insights = self.composite.update(self.algorithm, self.data)
+            expect(insights).to(equal(["ZeroDTE-insight", "Weekly-insight"]))
+
+        with it('falls back to the chain of each strategy when the slice has no chain'):
+            self.dataHandler.getSliceContracts = MagicMock(return_value=None)
+            self.dataHandler.getOptionContracts = MagicMock(return_value=self.contracts)
+            self.composite.update(self.algorithm, self.data)
+            expect(self.dataHandler.getOptionContracts.call_count).to(equal(2))
+            expect(list(self.zeroDte.chains[0])).to(equal(self.contracts))
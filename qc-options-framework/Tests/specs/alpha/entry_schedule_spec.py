@@ -0,0 +1,88 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_false
+from Tests.spec_helper import patch_imports
+from datetime import datetime, time, timedelta
+
+with patch_imports()[0], patch_imports()[1]:
+    from Alpha.Utils.EntrySchedule import EntrySchedule
+
+
+def previousCheck(dttm, startTime, stopTime):
+    # Same as the previous window check of Alpha.Base.check_market_schedule
+    current_time = dttm.time()
+    if startTime and current_time < startTime:
+        return False
+    if stopTime and current_time > stopTime:
+        return False
+    return True
+
+
+def everyMinute(day):
+    dttm = datetime.combine(day, time(0, 0))
+    for _ in range(24 * 60):
+        yield dttm
+        dttm += timedelta(minutes=1)
+
+
+with description('EntrySchedule') as self:
+    with before.each:
+        # Monday
+        self.day = datetime(2024, 1, 8)
+
+    with context('window'):
+        with it('is open between the start and the stop time (inclusive)'):
+            schedule = EntrySchedule(startTime=time(9, 35), stopTime=time(15, 45))
+            expect(schedule.isOpen(datetime(2024, 1, 8, 9, 34))).to(be_false)
+            expect(schedule.isOpen(datetime(2024, 1, 8, 9, 35))).to(be_true)
+            expect(schedule.isOpen(datetime(2024, 1, 8, 15, 45))).to(be_true)
+            expect(schedule.isOpen(datetime(2024, 1, 8, 15, 46))).to(be_false)
+
+        with it('is always open without parameters'):
+            schedule = EntrySchedule()
+            expect(all(schedule.isOpen(dttm) for dttm in everyMinute(self.day))).to(be_true)
+
+        with it('matches the previous datetime comparison on every minute'):
+            windows = [(None, None), (time(9, 35), None), (None, time(13, 0)), (time(9, 35), time(15, 45)), (time(9, 35, 30), time(15, 45, 30))]
+            for startTime, stopTime in windows:
+                schedule = EntrySchedule(startTime=startTime, stopTime=stopTime)
+                for dttm in everyMinute(self.day):
+                    expect((startTime, stopTime, dttm, schedule.isOpen(dttm))).to(equal((startTime, stopTime, dttm, previousCheck(dttm, startTime, stopTime))))
+
+        with it('matches the previous datetime comparison between two minutes'):
+            schedule = EntrySchedule(startTime=time(9, 35), stopTime=time(15, 45))
+            for dttm in [datetime(2024, 1, 8, 9, 34, 59), datetime(2024, 1, 8, 9, 35, 1), datetime(2024, 1, 8, 15, 44, 59), datetime(2024, 1, 8, 15, 45, 0, 1)]:
+                expect(schedule.isOpen(dttm)).to(equal(previousCheck(dttm, time(9, 35), time(15, 45))))
+
+    with context('frequency'):
+        with it('only opens every [frequency] minutes from the start time'):
+            schedule = EntrySchedule(startTime=time(9, 35), stopTime=time(10, 30), frequency=timedelta(minutes=15))
+            opened = [dttm.time() for dttm in everyMinute(self.day) if schedule.isOpen(dttm)]
+            expect(opened).to(equal([time(9, 35), time(9, 50), time(10, 5), time(10, 20)]))
+
+    with context('times'):
+        with it('only opens at the given times within the window'):
+            schedule = EntrySchedule(startTime=time(9, 40), stopTime=time(15, 0), times=[time(9, 35), time(9, 45), time(13, 10), time(15, 15)])
+            opened = [dttm.time() for dttm in everyMinute(self.day) if schedule.isOpen(dttm)]
+            expect(opened).to(equal([time(9, 45), time(13, 10)]))
+
+        with it('is closed between two minutes'):
+            schedule = EntrySchedule(times=[time(9, 45)])
+            expect(schedule.isOpen(datetime(2024, 1, 8, 9, 45))).to(be_true)
+            expect(schedule.isOpen(datetime(2024, 1, 8, 9, 45, 30))).to(be_false)
+
+    with context('days'):
+        with it('only opens on the given days of the week'):
+            schedule = EntrySchedule(startTime=time(9, 45), days=[0, 2, 4])
+            opened = [(self.day + timedelta(days=n, hours=10)).weekday() for n in range(7) if schedule.isOpen(self.day + timedelta(days=n, hours=10))]
+            expect(opened).to(equal([0, 2, 4]))
+
+    with context('compile'):
+        with it('reuses the schedule while the parameters do not change'):
+            schedule = EntrySchedule.compile(None, startTime=time(9, 35), times=[time(9, 45)])
+            expect(EntrySchedule.compile(schedule, startTime=time(9, 35), times=[time(9, 45)]) is schedule).to(be_true)
+
+        with it('recompiles the schedule when the parameters change'):
+            schedule = EntrySchedule.compile(None, startTime=time(9, 35), times=[time(9, 45)])
+            recompiled = EntrySchedule.compile(schedule, startTime=time(9, 35), times=[time(9, 45), time(13, 0)])
+            expect(recompiled is schedule).to(be_false)
+            expect(recompiled.isOpen(datetime(2024, 1, 8, 13, 0))).to(be_true)
@@ -12,6 +12,7 @@ from datetime import datetime, timedelta, time
 # Import after patching
 with patch_imports()[0], patch_imports()[1]:
     from Initialization.SetupBaseStructure import SetupBaseStructure
+    from Tools.BSMLibrary import BSM
     from Tests.mocks.algorithm_imports import (
         SecurityType, DataNormalizationMode, BrokerageName, 
         AccountType, Resolution, OptionRight, Symbol,
@@ -51,12 +52,21 @@ with description('SetupBaseStructure') as self:
             expect(hasattr(self.algorithm, 'logger')).to(be_true)
             expect(hasattr(self.algorithm, 'executionTimer')).to(be_true)
             expect(hasattr(self.algorithm, 'optionContractsSubscriptions')).to(be_true)
-            expect(self.algorithm.optionContractsSubscriptions).to(equal([]))
+            expect(self.algorithm.optionContractsSubscriptions).to(equal(set()))
             
             # Verify method calls
             self.algorithm.SetSecurityInitializer.assert_called_once()
             self.algorithm.Portfolio.SetPositions.assert_called_once()
 
+        with it('sets the size of the shared Greeks caches'):
+            with patch.dict(SetupBaseStructure.DEFAULT_PARAMETERS, {"greeksCacheSize": 500}):
+                self.setup.Setup()
+            expect(BSM.greeksCache.maxSize).to(equal(500))
+            expect(BSM.americanGreeksCache.maxSize).to(equal(500))
+            self.setup.Setup()
+            expect(BSM.greeksCache.maxSize).to(equal(10000))
+            expect(BSM.americanGreeksCache.maxSize).to(equal(10000))
+
     with context('CompleteSecurityInitializer'):
         with before.each:
             self.security = MagicMock()
@@ -140,7 +150,7 @@ with description('SetupBaseStructure') as self:
             self.algorithm.RemoveSecurity = MagicMock(side_effect=remove_security)
             self.algorithm.openPositions = {}
             self.algorithm.workingOrders = {}
-            self.algorithm.optionContractsSubscriptions = []  # Add this line
+            self.algorithm.optionContractsSubscriptions = set()  # Add this line
             
             # Add working orders setup with concrete datetime values
             current_time = datetime.now()
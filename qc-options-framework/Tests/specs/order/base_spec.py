@@ -17,6 +17,21 @@ with patch_imports()[0], patch_imports()[1]:
         Insight, InsightDirection, PortfolioTarget
     )
 
+class RecordingOrder(dict):
+    """Order details recording the keys that are read."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read = set()
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.read.add(key)
+        return super().get(key, default)
+
+
 with description('Base') as self:
     with before.each:
         with patch_imports()[0], patch_imports()[1]:
@@ -136,6 +151,18 @@ with description('Base') as self:
             expect(result[0]).to(be_none)
             expect(result[1]).to(be_none)
 
+        with it('computes the Greeks of the legs of the validated orders if computeGreeks is set'):
+            for computeGreeks in [True, False]:
+                self.base.strategy.computeGreeks = computeGreeks
+                order = RecordingOrder(self.order)
+                self.base.buildOrderPosition(order)
+                expect("greeks" in order.read).to(equal(computeGreeks))
+            # Rejected orders: nothing is computed
+            self.base.strategy.computeGreeks = True
+            order = RecordingOrder(self.order, orderQuantity=3)
+            self.base.buildOrderPosition(order)
+            expect("greeks" in order.read).to(be_false)
+
     with context('getNextOrderId'):
         with it('increments order count correctly'):
             Base.orderCount = 0
@@ -1,16 +1,18 @@
 # region imports
 from AlgorithmImports import *
 # endregion
-from mamba import description, context, it, before
-from expects import expect, equal, be_true, be_false, contain, have_length, have_key, be_none, be_below
+from mamba import description, context, it, before, after
+from expects import expect, equal, be_true, be_false, contain, have_length, have_key, be_none, be_below, raise_error
 from unittest.mock import patch, MagicMock, call
+import numpy as np
 from Tests.spec_helper import patch_imports
 from Tests.factories import Factory
 from Tests.mocks.module_mocks import ModuleMocks
 
 # Import after patching
 with patch_imports()[0], patch_imports()[1]:
-    from Order.OrderBuilder import OrderBuilder
+    from Order.OrderBuilder import OrderBuilder, LargeStrikeGapError
+    from Tools import BSM, ChainSnapshot
     from Tests.mocks.algorithm_imports import (
         OptionRight, Symbol, datetime, timedelta,
         OptionContract, Resolution
@@ -227,6 +229,73 @@ with description('OrderBuilder') as self:
             result = self.builder.getWing([self.mock_contract], wingSize=5)
             expect(result).to(be_none)
 
+    with context('getWingIndices'):
+        with before.each:
+            self.rng = np.random.default_rng(5)
+
+        def create_sorted_contracts(self, right, n):
+            # Strikes on a 5 points grid with random gaps and duplicated strikes (i.e. two expiries)
+            strikes = np.cumsum(self.rng.choice([0.0, 5.0, 5.0, 5.0, 10.0, 25.0], size=n)) + 4000.0
+            contracts = []
+            for strike in (strikes[::-1] if right == OptionRight.Put else strikes):
+                contract = OptionContract()
+                contract._strike = float(strike)
+                contract._right = right
+                contract._bid_price = contract._ask_price = float(np.round(self.rng.uniform(0.05, 20.0), 2))
+                contracts.append(contract)
+            return contracts
+
+        def reference_spread(self, contracts, wingSize, fromPrice, toPrice, premiumOrder):
+            # Previous implementation: getWing on each suffix of the list
+            best_spread = []
+            best_premium = -float('inf') if premiumOrder == 'max' else float('inf')
+            for i in range(len(contracts) - 1):
+                wing = self.builder.getWing(contracts[i:], wingSize=wingSize)
+                if wing is not None:
+                    net_premium = abs(self.builder.contractUtils.midPrice(contracts[i]) - self.builder.contractUtils.midPrice(wing))
+                    if fromPrice <= net_premium <= toPrice:
+                        if (premiumOrder == 'max' and net_premium > best_premium) or (premiumOrder == 'min' and net_premium < best_premium):
+                            best_spread = [contracts[i], wing]
+                            best_premium = net_premium
+            return best_spread
+
+        def outcome(self, function):
+            try:
+                return function()
+            except LargeStrikeGapError as error:
+                return str(error)
+
+        with it('returns the same wing as getWing on each suffix'):
+            for right in [OptionRight.Put, OptionRight.Call]:
+                for _ in range(20):
+                    contracts = self.create_sorted_contracts(right, 40)
+                    for wingSize in [5, 10, 15, 30]:
+                        wings = self.outcome(lambda: self.builder.getWingIndices(contracts, wingSize=wingSize))
+                        if isinstance(wings, str):
+                            expect(wings).to(equal(self.outcome(lambda: [self.builder.getWing(contracts[i:], wingSize=wingSize) for i in range(len(contracts) - 1)])))
+                        else:
+                            expect([contracts[j] for j in wings]).to(equal([self.builder.getWing(contracts[i:], wingSize=wingSize) for i in range(len(contracts) - 1)]))
+
+        with it('selects the same spread as the search over each suffix'):
+            self.builder.contractUtils.midPrice = lambda contract: 0.5 * (contract.BidPrice + contract.AskPrice)
+            for right, type in [(OptionRight.Put, "Put"), (OptionRight.Call, "Call")]:
+                for _ in range(20):
+                    contracts = self.create_sorted_contracts(right, 40)
+                    self.builder.getContracts = MagicMock(return_value=contracts)
+                    for wingSize, fromPrice, toPrice, premiumOrder in [(25, 0.0, float('inf'), 'max'), (30, 1.0, 5.0, 'max'), (50, 2.0, 6.0, 'min'), (25, 100.0, 200.0, 'max'), (25, 0.0, 10.0, 'other')]:
+                        expected = self.outcome(lambda: self.reference_spread(contracts, wingSize, fromPrice, toPrice, premiumOrder))
+                        result = self.outcome(lambda: self.builder.getSpread(contracts, type, wingSize=wingSize, fromPrice=fromPrice, toPrice=toPrice, premiumOrder=premiumOrder))
+                        expect(result).to(equal(expected))
+
+        with it('raises a LargeStrikeGapError like getWing'):
+            contracts = []
+            for strike in [100.0, 105.0, 120.0]:
+                contract = OptionContract()
+                contract._strike = strike
+                contracts.append(contract)
+            expect(lambda: self.builder.getWingIndices(contracts, wingSize=5)).to(raise_error(LargeStrikeGapError))
+            expect(self.builder.getWingIndices(contracts, wingSize=0)).to(be_none)
+
     with context('getContracts'):
         with before.each:
             # Create mock contracts with different strikes and prices
@@ -507,4 +576,143 @@ with description('OrderBuilder') as self:
             self.atm_contracts.append(put_contract)
             
             result = self.builder.getATMStrike(self.atm_contracts)
-            expect(result).to(equal(100.0))  # Should still return ATM strike
\ No newline at end of file
+            expect(result).to(equal(100.0))  # Should still return ATM strike
+    with context('getClosedFormDeltaContract'):
+        with before.each:
+            with patch_imports()[0], patch_imports()[1]:
+                BSM.greeksCache.clear()
+                self.bsm = BSM(self.algorithm)
+                self.bsm.contractUtils.midPrice = lambda contract: 0.5 * (contract.BidPrice + contract.AskPrice)
+                self.closedForm = OrderBuilder(self.algorithm, bsm=self.bsm, deltaMethod="closedForm")
+                self.bisection = OrderBuilder(self.algorithm, bsm=self.bsm)
+                for builder in [self.closedForm, self.bisection]:
+                    builder.contractUtils.getUnderlyingLastPrice = MagicMock(return_value=100.0)
+                    builder.contractUtils.getSecurity = MagicMock(return_value=MagicMock(IsTradable=True))
+                    builder.contractUtils.midPrice = self.bsm.contractUtils.midPrice
+
+        def create_chain(self, right, smile=False):
+            # Chain priced with a flat IV (or a smile) on strikes from 60 to 140
+            contracts = []
+            for strike in np.arange(60.0, 141.0, 1.0):
+                contract = OptionContract()
+                contract._strike = float(strike)
+                contract._right = right
+                contract._expiry = self.algorithm.Time + timedelta(days=30)
+                moneyness = np.log(strike / 100.0)
+                sigma = 0.2 - 0.2 * moneyness + 0.5 * moneyness**2 if smile else 0.2
+                price = self.bsm.bsmPrice(contract, sigma, spotPrice=100.0)
+                contract._bid_price = price
+                contract._ask_price = price
+                contracts.append(contract)
+            return contracts
+
+        with it('inverts the delta formula'):
+            with patch_imports()[0], patch_imports()[1]:
+                contract = self.create_chain(OptionRight.Call)[40]
+                tau = self.bsm.optionTau(contract)
+                strike = self.closedForm.getDeltaTargetStrike(contract, 30, 0.2)
+                contract._strike = strike
+                expect(abs(self.bsm.bsmDelta(contract, 0.2, tau=tau, spotPrice=100.0) - 0.3) < 1e-9).to(be_true)
+                contract._right = OptionRight.Put
+                contract._strike = self.closedForm.getDeltaTargetStrike(contract, 30, 0.2)
+                expect(abs(self.bsm.bsmDelta(contract, 0.2, tau=tau, spotPrice=100.0) + 0.3) < 1e-9).to(be_true)
+
+        with it('selects the same contract as the bisection'):
+            with patch_imports()[0], patch_imports()[1]:
+                for right in [OptionRight.Put, OptionRight.Call]:
+                    for smile in [False, True]:
+                        contracts = self.create_chain(right, smile=smile)
+                        for delta in [1, 5, 10, 16, 25, 30, 45, 50, 70, 90, 99]:
+                            expected = self.bisection.getDeltaContract(contracts, delta=delta)
+                            result = self.closedForm.getDeltaContract(contracts, delta=delta)
+                            expect(result.Strike).to(equal(expected.Strike))
+
+        with it('computes the Greeks of a couple of contracts only'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = self.create_chain(OptionRight.Put)
+                self.bsm.setGreeks = MagicMock(side_effect=self.bsm.setGreeks)
+                self.closedForm.getDeltaContract(contracts, delta=25)
+                evaluated = sum(len(args[0]) for args, _ in self.bsm.setGreeks.call_args_list)
+                expect(evaluated <= 2).to(be_true)
+
+        with it('uses the volatility smile of the expiry when available'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = self.create_chain(OptionRight.Call, smile=True)
+                expected = self.bisection.getDeltaContract(contracts, delta=20)
+                self.bsm.volatilitySmile(contracts)
+                self.bsm.contractIV = MagicMock()
+                self.bsm.setGreeks = MagicMock(side_effect=self.bsm.setGreeks)
+                result = self.closedForm.getDeltaContract(contracts, delta=20)
+                expect(result.Strike).to(equal(expected.Strike))
+                expect(self.bsm.contractIV.called).to(be_false)
+                evaluated = sum(len(args[0]) for args, _ in self.bsm.setGreeks.call_args_list)
+                expect(evaluated <= 3).to(be_true)
+
+        with it('filters the contracts by delta like the bisection'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = self.create_chain(OptionRight.Put, smile=True) + self.create_chain(OptionRight.Call, smile=True)
+                expected = self.bisection.getContracts(contracts, fromDelta=10, toDelta=30)
+                result = self.closedForm.getContracts(contracts, fromDelta=10, toDelta=30)
+                expect([(c.Strike, c.Right) for c in result]).to(equal([(c.Strike, c.Right) for c in expected]))
+                expect(len(result) > 0).to(be_true)
+
+        with it('handles empty lists and missing deltas'):
+            expect(self.closedForm.getDeltaContract([], delta=30)).to(be_none)
+            expect(self.closedForm.getDeltaContract(self.create_chain(OptionRight.Call))).to(be_none)
+
+    with context('ChainSnapshot'):
+        with before.each:
+            with patch_imports()[0], patch_imports()[1]:
+                BSM.greeksCache.clear()
+                self.bsm = BSM(self.algorithm)
+                self.bsm.contractUtils.getUnderlyingLastPrice = MagicMock(return_value=100.0)
+                self.snapshotBuilder = OrderBuilder(self.algorithm, bsm=self.bsm)
+                self.snapshotBuilder.contractUtils.getUnderlyingLastPrice = MagicMock(return_value=100.0)
+                # Shuffled chain of Puts and Calls on two expiries, with a few non-tradable contracts
+                rng = np.random.default_rng(11)
+                self.chain = []
+                for days in [30, 9]:
+                    for strike in np.arange(70.0, 131.0, 2.5):
+                        for right in [OptionRight.Put, OptionRight.Call]:
+                            contract = OptionContract()
+                            contract._strike = float(strike)
+                            contract._right = right
+                            contract._expiry = self.algorithm.Time + timedelta(days=days)
+                            price = self.bsm.bsmPrice(contract, 0.25, spotPrice=100.0)
+                            contract._bid_price = max(0.0, price - 0.05)
+                            contract._ask_price = price + 0.05
+                            contract.IsTradable = bool(rng.uniform() > 0.1)
+                            contract.symbol.Value = f"TEST {right} {strike} {days}"
+                            self.chain.append(contract)
+                self.chain = [self.chain[i] for i in rng.permutation(len(self.chain))]
+                self.snapshot = ChainSnapshot(self.algorithm, self.chain, spotPrice=100.0)
+
+        def expect_same(self, method, *args, **kwargs):
+            expected = getattr(self.snapshotBuilder, method)(self.chain, *args, **kwargs)
+            result = getattr(self.snapshotBuilder, method)(self.snapshot, *args, **kwargs)
+            expect(result).to(equal(expected))
+
+        with it('returns the same ATM contracts as the list of contracts'):
+            with patch_imports()[0], patch_imports()[1]:
+                for type in [None, "both", "put", "Call"]:
+                    self.expect_same('getATM', type=type)
+                self.expect_same('getATMStrike')
+
+        with it('returns the same contracts as the list of contracts'):
+            with patch_imports()[0], patch_imports()[1]:
+                for type in [None, "put", "call"]:
+                    for reverse in [False, True]:
+                        self.expect_same('getContracts', type=type, reverse=reverse)
+                        self.expect_same('getContracts', type=type, fromStrike=85.0, toStrike=112.5, reverse=reverse)
+                        self.expect_same('getContracts', type=type, fromPrice=0.5, toPrice=3.0, reverse=reverse)
+                        self.expect_same('getContracts', type=type, fromDelta=10, toDelta=30, reverse=reverse)
+                self.expect_same('getPuts', toDelta=20, toStrike=99.0)
+                self.expect_same('getCalls', toDelta=20, fromStrike=101.0, fromPrice=0.2)
+
+        with it('returns the same spreads as the list of contracts'):
+            with patch_imports()[0], patch_imports()[1]:
+                for type in ["Put", "Call"]:
+                    self.expect_same('getSpread', type, strike=100.0, wingSize=5)
+                    self.expect_same('getSpread', type, delta=15, wingSize=5, sortByStrike=True, fromPrice=0.0, toPrice=10.0)
+                    self.expect_same('getSpread', type, wingSize=5, fromPrice=0.3, toPrice=1.5)
+                    self.expect_same('getSpread', type, wingSize=10, fromPrice=0.3, toPrice=1.5, premiumOrder='min')
@@ -0,0 +1,130 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_false, be_none, have_key, raise_error
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+from datetime import datetime
+import numpy as np
+from Tests.spec_helper import patch_imports
+
+with patch_imports()[0], patch_imports()[1]:
+    from Order.OrderDetails import OrderDetails
+
+
+with description('OrderDetails') as self:
+    with before.each:
+        self.params = {"profitTarget": 0.5, "profitTargetMethod": "Premium"}
+        self.strategy = MagicMock()
+        self.strategy.computeGreeks = True
+        self.strategy.parameter = MagicMock(side_effect=lambda name, default=None: self.params.get(name, default))
+        self.orderModule = SimpleNamespace(
+            strategy=self.strategy,
+            context=MagicMock(portfolioMarginStress=0.12, Time=datetime(2024, 1, 2, 10, 0)),
+            contractUtils=MagicMock(),
+            bsm=MagicMock(),
+            computeOrderMaxLoss=MagicMock(return_value=-3.5),
+            scenarioPnL=MagicMock(return_value=np.array([[[-2.0]], [[1.0]]])),
+        )
+        self.orderModule.contractUtils.bidAskSpread = MagicMock(return_value=0.1)
+        self.contracts = [
+            MagicMock(BSMGreeks=SimpleNamespace(Delta=-0.2, Gamma=0.01, Vega=0.3, Theta=-0.05, Rho=-0.02, Vomma=0.1, Elasticity=-5.0), BSMImpliedVolatility=0.2),
+            MagicMock(BSMGreeks=SimpleNamespace(Delta=-0.1, Gamma=0.005, Vega=0.2, Theta=-0.03, Rho=-0.01, Vomma=0.05, Elasticity=-6.0), BSMImpliedVolatility=0.22),
+        ]
+        self.order = OrderDetails(
+            self.orderModule,
+            openPremium=1.0,
+            strategyId="PutSpread",
+            orderMidPrice=1.5,
+            orderQuantity=2,
+            contracts=self.contracts,
+            sides=[-1, 1],
+            sidesDesc=["shortPut", "longPut"],
+            creditStrategy=True,
+        )
+
+    with context('lazy fields'):
+        with it('does not compute anything when created'):
+            expect(self.orderModule.computeOrderMaxLoss.called).to(be_false)
+            expect(self.orderModule.contractUtils.bidAskSpread.called).to(be_false)
+            expect(self.orderModule.bsm.setGreeks.called).to(be_false)
+            expect(self.orderModule.scenarioPnL.called).to(be_false)
+            expect(self.order.isComputed("maxLoss")).to(be_false)
+
+        with it('computes the fields on first access and caches them'):
+            expect(self.order["maxLoss"]).to(equal(-3.5))
+            expect(self.order.maxLoss).to(equal(-3.5))
+            expect(self.orderModule.computeOrderMaxLoss.call_count).to(equal(1))
+            expect(self.order["bidAskSpread"]).to(equal(0.2))
+            expect(self.order["TReg"]).to(equal(-4.0))
+            expect(self.orderModule.computeOrderMaxLoss.call_count).to(equal(1))
+
+        with it('computes the portfolio margin on the stress grid'):
+            expect(self.order["portfolioMargin"]).to(equal(-4.0))
+            self.orderModule.bsm.setGreeks.assert_called_once_with(self.contracts)
+            _, kwargs = self.orderModule.scenarioPnL.call_args
+            expect(kwargs["openPremium"]).to(equal(1.0))
+            expect(kwargs["spotShifts"].tolist()).to(equal([-0.12, 0.12]))
+
+        with it('has no portfolio margin without the Greeks'):
+            self.strategy.computeGreeks = False
+            expect(self.order["portfolioMargin"]).to(be_none)
+            expect(self.orderModule.scenarioPnL.called).to(be_false)
+
+        with it('exposes the Greeks of the legs'):
+            expect(self.order["delta"]).to(equal({"shortPut": -0.2, "longPut": -0.1}))
+            expect(self.order["IV"]).to(equal({"shortPut": 0.2, "longPut": 0.22}))
+            expect(self.order.greeks["elasticity"]["longPut"]).to(equal(-6.0))
+            expect(self.orderModule.bsm.setGreeks.call_count).to(equal(1))
+
+    with context('targetProfit'):
+        with it('is None with the Premium method'):
+            expect(self.order.get("targetProfit", None)).to(be_none)
+
+        with it('uses the TReg requirement'):
+            self.params["profitTargetMethod"] = "TReg"
+            expect(self.order["targetProfit"]).to(equal(0.5 * 4.0 * 2))
+
+        with it('uses the margin requirement'):
+            self.params["profitTargetMethod"] = "Margin"
+            expect(self.order["targetProfit"]).to(equal(0.5 * 4.0 * 2))
+
+        with it('uses the theta decay'):
+            self.params.update({"profitTargetMethod": "Theta", "thetaProfitDays": 3})
+            expect(self.order["targetProfit"]).to(equal(0.5 * 2.0 * 2))
+            _, kwargs = self.orderModule.scenarioPnL.call_args
+            expect(kwargs["timeOffsets"][0].days).to(equal(3))
+
+    with context('dictionary compatibility'):
+        with it('behaves like a dictionary'):
+            expect(self.order).to(have_key("strategyId"))
+            expect(self.order).to(have_key("maxLoss"))
+            expect("missing" in self.order).to(be_false)
+            expect(self.order.get("missing", 7)).to(equal(7))
+            expect(self.order["strategyId"]).to(equal("PutSpread"))
+            expect(set(self.order.keys()) >= {"strategyId", "maxLoss", "targetProfit", "delta"}).to(be_true)
+            expect(lambda: self.order["missing"]).to(raise_error(KeyError))
+
+        with it('stores new keys and overrides the lazy fields'):
+            self.order["note"] = "manual"
+            self.order["maxLoss"] = -1.0
+            self.order["orderQuantity"] = 5
+            expect(self.order["note"]).to(equal("manual"))
+            expect(self.order["maxLoss"]).to(equal(-1.0))
+            expect(self.order["orderQuantity"]).to(equal(5))
+            expect(self.orderModule.computeOrderMaxLoss.called).to(be_false)
+            del self.order["note"]
+            expect("note" in self.order).to(be_false)
+            expect(lambda: self.order.pop("maxLoss")).to(raise_error(KeyError))
+
+        with it('converts to a plain dictionary'):
+            result = self.order.toDict()
+            expect(result["maxLoss"]).to(equal(-3.5))
+            expect(result["strategyId"]).to(equal("PutSpread"))
+
+        with it('is slotted'):
+            expect(hasattr(self.order, "__dict__")).to(be_false)
+            expect(lambda: setattr(self.order, "unknown", 1)).to(raise_error(AttributeError))
+
+        with it('does not compute the lazy fields when formatted'):
+            text = f"{self.order}"
+            expect("PutSpread" in text).to(be_true)
+            expect(self.orderModule.computeOrderMaxLoss.called).to(be_false)
@@ -5,6 +5,7 @@ from mamba import description, context, it, before
 from expects import expect, equal, be_true, be_false, contain, have_length, have_key, be_none
 from unittest.mock import patch, MagicMock, call
 from datetime import datetime, timedelta, time
+import numpy as np
 from Tests.spec_helper import patch_imports
 from Tests.factories import Factory
 from Tests.mocks.module_mocks import ModuleMocks
@@ -12,12 +13,45 @@ from Tests.mocks.module_mocks import ModuleMocks
 # Import after patching
 with patch_imports()[0], patch_imports()[1]:
     from Order.Order import Order
+    from Tools.VolatilitySmile import VolatilitySmiles
     from Tests.mocks.algorithm_imports import (
         OrderStatus, Symbol, TradeBar, datetime, timedelta,
         Insight, InsightDirection, PortfolioTarget, OptionRight,
         OptionContract
     )
 
+class ChainContract(OptionContract):
+    # Keep the IV as a plain (settable) attribute: the specs below patch the property of the mock class
+    @property
+    def BSMImpliedVolatility(self):
+        if '_bsm_iv' not in self.__dict__:
+            raise AttributeError('BSMImpliedVolatility')
+        return self.__dict__['_bsm_iv']
+
+    @BSMImpliedVolatility.setter
+    def BSMImpliedVolatility(self, value):
+        self.__dict__['_bsm_iv'] = value
+
+
+def smile_chain(bsm, algorithm, spot=100.0):
+    # Chain of Puts and Calls priced with a volatility smile
+    contracts = []
+    expiry = algorithm.Time + timedelta(days=30)
+    for strike in np.arange(60.0, 141.0, 1.0):
+        for right in [OptionRight.Put, OptionRight.Call]:
+            contract = ChainContract()
+            contract._strike = float(strike)
+            contract._right = right
+            contract._expiry = expiry
+            contract.IsTradable = True
+            moneyness = np.log(strike / spot)
+            price = bsm.bsmPrice(contract, 0.2 - 0.2 * moneyness + 0.5 * moneyness**2, spotPrice=spot)
+            contract._bid_price = price
+            contract._ask_price = price
+            contracts.append(contract)
+    return contracts
+
+
 with description('Order') as self:
     with before.each:
         with patch_imports()[0], patch_imports()[1]:
@@ -281,6 +315,23 @@ with description('Order') as self:
             expect(result).to(have_key("orderQuantity"))
             expect(result["creditStrategy"]).to(be_true)
 
+        with it('computes the margin profit target on the stress grid'):
+            params = {"profitTarget": 0.5, "profitTargetMethod": "Margin", "portfolioMarginSpotPoints": 5, "portfolioMarginVolShifts": [0.0, 0.05]}
+            self.strategy.parameter = MagicMock(side_effect=lambda name, default=None: params.get(name, default))
+            grid = np.array([[[-3.0], [-4.0]], [[1.0], [2.0]], [[0.5], [0.0]], [[-1.0], [-2.0]], [[-2.0], [-2.5]]])
+            self.order.scenarioEngine.pnl = MagicMock(return_value=grid)
+
+            result = self.order.getOrderDetails(**self.order_params)
+            # The margin (and the profit target) are only computed on first access
+            expect(self.order.scenarioEngine.pnl.called).to(be_false)
+            targetProfit = result["targetProfit"]
+
+            _, kwargs = self.order.scenarioEngine.pnl.call_args
+            expect(kwargs["spotShifts"].tolist()).to(equal([-0.12, -0.06, 0.0, 0.06, 0.12]))
+            expect(kwargs["volShifts"]).to(equal([0.0, 0.05]))
+            # Worst scenario of the grid (the portfolio margin is already scaled by the order quantity)
+            expect(targetProfit).to(equal(0.5 * 4.0 * result["orderQuantity"] ** 2))
+
     with context('order type methods'):
         with before.each:
             self.order.strategyBuilder.getPuts = MagicMock(return_value=[self.mock_contract])
@@ -382,4 +433,33 @@ with description('Order') as self:
                 deltas=[0.3],
                 sides=[1]
             )
-            expect(result).to(equal({"test": "order"})) 
\ No newline at end of file
+            expect(result).to(equal({"test": "order"})) 
+
+    with context('closed form delta selection'):
+        with before.each:
+            with patch_imports()[0], patch_imports()[1]:
+                self.strategy.parameter = MagicMock(side_effect=lambda name, default=None: {"deltaMethod": "closedForm"}.get(name, default))
+                self.closedForm = Order(self.algorithm, self.strategy)
+                self.strategy.parameter = MagicMock(side_effect=lambda name, default=None: default)
+                self.bisection = Order(self.algorithm, self.strategy)
+                self.chain = smile_chain(self.closedForm.bsm, self.algorithm)
+                for order in [self.closedForm, self.bisection]:
+                    order.getOrderDetails = MagicMock(side_effect=lambda legs, sides, strategy, sell: legs)
+
+        with it('fits the volatility smile of the expiry once and selects the legs with it'):
+            with patch_imports()[0], patch_imports()[1]:
+                expected = self.bisection.getStrangleOrder(self.chain, callDelta=20, putDelta=20)
+                self.closedForm.bsm.contractIV = MagicMock()
+                self.closedForm.bsm.volatilitySmile = MagicMock(side_effect=self.closedForm.bsm.volatilitySmile)
+                legs = self.closedForm.getStrangleOrder(self.chain, callDelta=20, putDelta=20)
+                expect(len(legs)).to(equal(2))
+                expect([(leg.Strike, leg.Right) for leg in legs]).to(equal([(leg.Strike, leg.Right) for leg in expected]))
+                # The ATM IV is not used: the delta formula is inverted with the smile
+                expect(self.closedForm.bsm.contractIV.called).to(be_false)
+                smiles = VolatilitySmiles.of(self.algorithm)
+                expect(len(smiles)).to(equal(1))
+                smile = smiles.get(self.algorithm.Time, (self.chain[0].UnderlyingSymbol, self.chain[0].Expiry, "european"))
+                expect(smile is None).to(be_false)
+                expect(self.closedForm.bsm.fittedSmile(self.chain[0]) is smile).to(be_true)
+                # Fitted on the Put side, reused on the Call side
+                expect(self.closedForm.bsm.volatilitySmile.call_count).to(equal(2))
@@ -0,0 +1,176 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_none, raise_error, have_length, be_above
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+from datetime import timedelta
+import itertools
+import math
+import numpy as np
+
+with patch_imports()[0], patch_imports()[1]:
+    from Order.Order import Order
+    from Order.StructureSearch import StructureSearch
+    from Tools.ChainSnapshot import ChainSnapshot
+    from Tests.mocks.algorithm_imports import OptionRight, OptionContract
+
+
+def create_contract(algorithm, strike, right, days=30, tradable=True):
+    contract = OptionContract()
+    contract._strike = strike
+    contract._right = right
+    contract._expiry = algorithm.Time + timedelta(days=days)
+    # Black-Scholes prices (spot 100, IV 20%, no rates): no arbitrage between the strikes
+    tau = days / 365.0
+    d1 = (math.log(100.0 / strike) + 0.02 * tau) / (0.2 * math.sqrt(tau))
+    d2 = d1 - 0.2 * math.sqrt(tau)
+    N = lambda x: 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+    call = 100.0 * N(d1) - strike * N(d2)
+    mid = call if right == OptionRight.Call else call - 100.0 + strike
+    contract._bid_price = mid - 0.05
+    contract._ask_price = mid + 0.05
+    contract.IsTradable = tradable
+    # Not in the Securities of the algorithm: the quotes are read from the contract itself
+    contract.symbol.Value = f"TEST {right} {strike} {days}"
+    return contract
+
+
+with description('StructureSearch') as self:
+    with before.each:
+        with patch_imports()[0], patch_imports()[1]:
+            self.algorithm = Factory.create_algorithm()
+            self.algorithm.executionTimer = MagicMock()
+            self.algorithm.riskFreeRate = 0.02
+            self.strikes = [90.0, 92.5, 95.0, 97.5, 100.0, 102.5, 105.0, 107.5, 110.0]
+            self.contracts = [
+                create_contract(self.algorithm, strike, right)
+                for strike in reversed(self.strikes)
+                for right in [OptionRight.Call, OptionRight.Put]
+            ]
+            self.search = StructureSearch(self.algorithm)
+            self.strategy = MagicMock()
+            self.strategy.parameter = lambda key, default=None: default
+            self.order = Order(self.algorithm, self.strategy)
+            self.order.contractUtils.getUnderlyingLastPrice = MagicMock(return_value=100.0)
+
+    def bruteForce(self, structure, minWingSize=0.0, maxWingSize=np.inf):
+        # All the combinations of strikes satisfying the constraints of the structure
+        def wing(width):
+            return minWingSize <= width <= maxWingSize
+        strikes = self.strikes
+        if structure == "PutSpread":
+            return [(s, l) for s, l in itertools.product(strikes, strikes) if l < s and wing(s - l)]
+        if structure == "CallSpread":
+            return [(s, l) for s, l in itertools.product(strikes, strikes) if l > s and wing(l - s)]
+        if structure in ("IronCondor", "IronFly"):
+            combos = []
+            for lp, sp, sc, lc in itertools.product(strikes, repeat=4):
+                if lp < sp and sc < lc and wing(sp - lp) and wing(lc - sc) and (sp < sc if structure == "IronCondor" else sp == sc):
+                    combos.append((lp, sp, sc, lc))
+            return combos
+        if structure.endswith("Butterfly"):
+            return [(l, m, r) for l, m, r in itertools.product(strikes, repeat=3) if l < m < r and wing(m - l) and wing(r - m)]
+        if structure == "Strangle":
+            return [(p, c) for p, c in itertools.product(strikes, strikes) if p < c]
+
+    with context('enumeration'):
+        with it('enumerates the same combinations as a brute force search'):
+            for structure in StructureSearch.STRUCTURES:
+                for minWingSize, maxWingSize in [(0.0, None), (2.5, 5.0)]:
+                    expected = self.bruteForce(structure, minWingSize, np.inf if maxWingSize is None else maxWingSize)
+                    found = self.search.search(self.contracts, structure, topK=10000, objective=lambda metrics: np.zeros(len(metrics["netCredit"])), minWingSize=minWingSize, maxWingSize=maxWingSize, spotPrice=100.0)
+                    expect(sorted(tuple(candidate["strikes"]) for candidate in found)).to(equal(sorted(expected)))
+
+        with it('uses the contracts of the right type on each leg'):
+            for candidate in self.search.search(self.contracts, "IronCondor", topK=50, spotPrice=100.0):
+                rights = [contract.Right for contract in candidate["contracts"]]
+                expect(rights).to(equal([OptionRight.Put, OptionRight.Put, OptionRight.Call, OptionRight.Call]))
+                expect([contract.Strike for contract in candidate["contracts"]]).to(equal(candidate["strikes"]))
+
+        with it('skips the non-tradable contracts and never mixes expirations'):
+            self.contracts[0].IsTradable = False
+            contracts = self.contracts + [create_contract(self.algorithm, strike, OptionRight.Put, days=7) for strike in self.strikes]
+            found = self.search.search(contracts, "PutSpread", topK=10000, spotPrice=100.0)
+            expect(found).to(have_length(2 * len(self.bruteForce("PutSpread"))))
+            for candidate in found:
+                expect(len({contract.Expiry for contract in candidate["contracts"]})).to(equal(1))
+            found = self.search.search(contracts, "CallSpread", topK=10000, spotPrice=100.0)
+            expect(any(self.contracts[0] in candidate["contracts"] for candidate in found)).to(equal(False))
+            expect(found).to(have_length(len(self.bruteForce("CallSpread")) - (len(self.strikes) - 1)))
+
+        with it('returns an empty list when there are no candidates'):
+            expect(self.search.search([], "IronCondor", spotPrice=100.0)).to(equal([]))
+            puts = [contract for contract in self.contracts if contract.Right == OptionRight.Put]
+            expect(self.search.search(puts, "Strangle", spotPrice=100.0)).to(equal([]))
+
+        with it('rejects an invalid structure or objective'):
+            expect(lambda: self.search.search(self.contracts, "Condor")).to(raise_error(ValueError))
+            expect(lambda: self.search.search(self.contracts, "IronCondor", objective="theta", spotPrice=100.0)).to(raise_error(ValueError))
+
+    with context('metrics'):
+        with it('matches the net credit and max loss of the order'):
+            for structure in StructureSearch.STRUCTURES:
+                for sell in [True, False]:
+                    for candidate in self.search.search(self.contracts, structure, topK=10000, sell=sell, objective="netCredit", spotPrice=100.0):
+                        contracts, sides = candidate["contracts"], candidate["sides"]
+                        netCredit = -sum(side * self.order.contractUtils.midPrice(contract) for contract, side in zip(contracts, sides))
+                        expect(abs(candidate["netCredit"] - netCredit) < 1e-9).to(be_true)
+                        expect(abs(candidate["maxLoss"] - self.order.computeOrderMaxLoss(contracts, sides)) < 1e-9).to(be_true)
+                        expect(abs(candidate["risk"] - max(0.0, -(netCredit + candidate["maxLoss"]))) < 1e-9).to(be_true)
+
+        with it('computes the breakevens'):
+            # Highest credit among the Iron Condors with both short strikes OTM
+            def objective(metrics):
+                strikes = metrics["strikes"]
+                return np.where((strikes[:, 1] < 100.0) & (strikes[:, 2] > 100.0), metrics["netCredit"], np.nan)
+            candidate = self.search.search(self.contracts, "IronCondor", topK=1, objective=objective, maxWingSize=5.0, spotPrice=100.0)[0]
+            expect(candidate["sides"]).to(equal([1, -1, -1, 1]))
+            longPut, shortPut, shortCall, longCall = candidate["strikes"]
+            credit = candidate["netCredit"]
+            expect(credit).to(be_above(0))
+            expect(candidate["breakevens"]).to(have_length(2))
+            expect(abs(candidate["lowerBreakeven"] - (shortPut - credit)) < 1e-9).to(be_true)
+            expect(abs(candidate["upperBreakeven"] - (shortCall + credit)) < 1e-9).to(be_true)
+            expect(abs(candidate["creditToRisk"] - credit / candidate["risk"]) < 1e-9).to(be_true)
+
+        with it('reverses the sides of the debit structures'):
+            candidate = self.search.search(self.contracts, "PutButterfly", topK=1, sell=False, objective="maxProfit", maxWingSize=2.5, spotPrice=100.0)[0]
+            expect(candidate["sides"]).to(equal([1, -2, 1]))
+            expect(candidate["strategy"]).to(equal("Debit Butterfly"))
+            expect(candidate["sidesDesc"]).to(equal(["leftLongPut", "ShortPut", "rightLongPut"]))
+            expect(candidate["netCredit"] < 0).to(be_true)
+
+    with context('ranking'):
+        with it('returns the top-k candidates by descending score'):
+            found = self.search.search(self.contracts, "IronCondor", topK=5, objective="creditToRisk", spotPrice=100.0)
+            everything = self.search.search(self.contracts, "IronCondor", topK=10000, objective="creditToRisk", spotPrice=100.0)
+            expect(found).to(have_length(5))
+            expect([candidate["strikes"] for candidate in found]).to(equal([candidate["strikes"] for candidate in everything[:5]]))
+            scores = [candidate["score"] for candidate in everything]
+            expect(scores).to(equal(sorted(scores, reverse=True)))
+            expect(found[0]["score"]).to(equal(max(candidate["creditToRisk"] for candidate in everything)))
+
+        with it('accepts a custom objective and discards the NaN scores'):
+            # Widest breakeven range among the Strangles collecting at least 1.0
+            def objective(metrics):
+                width = metrics["upperBreakeven"] - metrics["lowerBreakeven"]
+                return np.where(metrics["netCredit"] >= 1.0, width, np.nan)
+            found = self.search.search(self.contracts, "Strangle", topK=10000, objective=objective, spotPrice=100.0)
+            expect(all(candidate["netCredit"] >= 1.0 for candidate in found)).to(be_true)
+            expect(len(found) < len(self.bruteForce("Strangle"))).to(be_true)
+            expect(found[0]["score"]).to(equal(found[0]["upperBreakeven"] - found[0]["lowerBreakeven"]))
+
+        with it('accepts a ChainSnapshot'):
+            snapshot = ChainSnapshot(self.algorithm, self.contracts, spotPrice=100.0)
+            found = self.search.search(snapshot, "IronFly", topK=3)
+            expect([candidate["strikes"] for candidate in found]).to(equal(
+                [candidate["strikes"] for candidate in self.search.search(self.contracts, "IronFly", topK=3, spotPrice=100.0)]
+            ))
+
+    with context('Order'):
+        with it('creates the order details of a candidate'):
+            self.order.getOrderDetails = MagicMock(return_value={"strategyId": "IronCondor"})
+            candidate = self.order.searchStructures(self.contracts, "IronCondor", topK=1, maxWingSize=5.0)[0]
+            expect(self.order.getStructureOrder(candidate)).to(equal({"strategyId": "IronCondor"}))
+            self.order.getOrderDetails.assert_called_once_with(candidate["contracts"], [1, -1, -1, 1], "Iron Condor", sell=True, sidesDesc=None)
+            expect(self.order.getStructureOrder(None)).to(be_none)
@@ -0,0 +1,111 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_none
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+import numpy as np
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.AmericanPricer import AmericanPricer
+    from Tools.BSMLibrary import BSM
+
+
+def binomialPut(spotPrice, strike, tau, sigma, ir, steps=2000):
+    # Reference: Cox-Ross-Rubinstein tree of an American Put
+    dt = tau/steps
+    u = np.exp(sigma*np.sqrt(dt))
+    d = 1/u
+    p = (np.exp(ir*dt) - d)/(u - d)
+    discount = np.exp(-ir*dt)
+    S = spotPrice*u**(2*np.arange(steps + 1) - steps)
+    V = np.maximum(strike - S, 0.0)
+    for _ in range(steps):
+        S = S[:-1]*u
+        V = np.maximum(discount*(p*V[1:] + (1 - p)*V[:-1]), strike - S)
+    return V[0]
+
+
+with description('AmericanPricer') as self:
+    with before.each:
+        with patch_imports()[0], patch_imports()[1]:
+            self.algorithm = Factory.create_algorithm()
+            self.algorithm.executionTimer = MagicMock()
+            self.algorithm.riskFreeRate = 0.05
+            self.european = BSM(self.algorithm)
+            self.pricer = AmericanPricer()
+            self.strikes = np.linspace(60.0, 140.0, 81)
+
+    with context('price'):
+        with it('prices the Calls as European Calls'):
+            with patch_imports()[0], patch_imports()[1]:
+                american = self.pricer.price(100.0, self.strikes, 0.25, 0.3, True, 0.05)
+                european = self.european.bsmPriceArray(100.0, self.strikes, 0.25, 0.3, True)
+                expect(bool(np.allclose(american, european, rtol=0, atol=1e-12))).to(be_true)
+
+        with it('prices the Puts above the European Puts and the intrinsic value'):
+            with patch_imports()[0], patch_imports()[1]:
+                american = self.pricer.price(100.0, self.strikes, 0.25, 0.3, False, 0.05)
+                european = self.european.bsmPriceArray(100.0, self.strikes, 0.25, 0.3, False)
+                expect(bool(np.all(american >= european - 1e-12))).to(be_true)
+                expect(bool(np.all(american >= np.maximum(self.strikes - 100.0, 0.0)))).to(be_true)
+                # The early exercise premium is worth something for ITM Puts
+                expect(bool(american[-1] > european[-1] + 0.1)).to(be_true)
+
+        with it('matches the binomial tree within 1%'):
+            with patch_imports()[0], patch_imports()[1]:
+                for spotPrice, strike, tau, sigma in [(100, 100, 0.25, 0.2), (90, 100, 0.5, 0.3), (110, 100, 1.0, 0.25), (80, 100, 0.1, 0.4)]:
+                    american = self.pricer.price(spotPrice, strike, tau, sigma, False, 0.05)
+                    reference = binomialPut(spotPrice, strike, tau, sigma, 0.05)
+                    expect(bool(abs(american/reference - 1) < 0.01)).to(be_true)
+
+        with it('matches the published Barone-Adesi-Whaley values'):
+            with patch_imports()[0], patch_imports()[1]:
+                # Barone-Adesi and Whaley (1987), Table IV: K = 100, r = 0.08, T = 0.25
+                spotPrices = np.array([90.0, 100.0, 110.0])
+                expect(bool(np.allclose(self.pricer.price(spotPrices, 100.0, 0.25, 0.2, False, 0.08), [10.01, 3.22, 0.68], atol=0.01))).to(be_true)
+
+        with it('handles expired contracts and missing volatility'):
+            with patch_imports()[0], patch_imports()[1]:
+                prices = self.pricer.price(100.0, [90.0, 110.0, 90.0, 110.0], [0.0, 0.0, 0.1, 0.1], [0.3, 0.3, 0.0, 0.0], False, 0.05)
+                expect(prices.tolist()).to(equal([0.0, 10.0, 0.0, 10.0]))
+
+    with context('greeks'):
+        with it('matches the analytical Greeks of the Calls'):
+            with patch_imports()[0], patch_imports()[1]:
+                american = self.pricer.greeks(100.0, self.strikes, 0.25, 0.3, True, 0.05)
+                european = self.european.bsmGreeksArray(100.0, self.strikes, 0.25, 0.3, True)
+                for key, tolerance in [("delta", 1e-5), ("gamma", 1e-5), ("vega", 1e-4), ("rho", 1e-4), ("theta", 1e-3)]:
+                    expect(bool(np.allclose(american[key], european[key], rtol=0, atol=tolerance))).to(be_true)
+
+        with it('returns a Put delta between -1 and the European delta'):
+            with patch_imports()[0], patch_imports()[1]:
+                american = self.pricer.greeks(100.0, self.strikes, 0.25, 0.3, False, 0.05)
+                european = self.european.bsmGreeksArray(100.0, self.strikes, 0.25, 0.3, False)
+                expect(bool(np.all(american["delta"] >= -1 - 1e-9))).to(be_true)
+                expect(bool(np.all(american["delta"] <= european["delta"] + 1e-6))).to(be_true)
+
+    with context('BSM with exerciseStyle = "american"'):
+        with before.each:
+            with patch_imports()[0], patch_imports()[1]:
+                self.bsm = BSM(self.algorithm, exerciseStyle="american")
+
+        with it('prices the options with the American pricer'):
+            with patch_imports()[0], patch_imports()[1]:
+                expect(self.european.americanPricer).to(be_none)
+                prices = self.bsm.bsmPriceArray(100.0, self.strikes, 0.25, 0.3, False)
+                expect(bool(np.array_equal(prices, self.pricer.price(100.0, self.strikes, 0.25, 0.3, False, 0.05)))).to(be_true)
+
+        with it('recovers the IV from American prices'):
+            with patch_imports()[0], patch_imports()[1]:
+                isCall = np.arange(self.strikes.size) % 2 == 0
+                prices = self.bsm.bsmPriceArray(100.0, self.strikes, 0.25, 0.3, isCall)
+                IV, converged = self.bsm.bsmIVArray(prices, 100.0, self.strikes, 0.25, isCall)
+                # Deep ITM Puts priced at their intrinsic value do not have an IV
+                solvable = prices > np.maximum(np.where(isCall, 100.0 - self.strikes, self.strikes - 100.0), 0.0) + 1e-6
+                expect(bool(np.all(converged[solvable]))).to(be_true)
+                expect(bool(np.max(np.abs(IV[solvable] - 0.3)) < 1e-3)).to(be_true)
+
+        with it('uses a separate Greeks cache'):
+            with patch_imports()[0], patch_imports()[1]:
+                expect(self.bsm.greeksCache is BSM.americanGreeksCache).to(be_true)
+                expect(self.european.greeksCache is BSM.greeksCache).to(be_true)
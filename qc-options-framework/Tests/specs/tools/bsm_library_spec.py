@@ -0,0 +1,330 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+from mamba import description, context, it, before, after
+from expects import expect, equal, be_true, be_within, have_keys, be, be_below
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+from datetime import datetime, timedelta
+import numpy as np
+import os
+import subprocess
+import sys
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.BSMLibrary import BSM, BSMGreeks
+    from Tools.GreeksCache import GreeksCache
+    from Tests.mocks.algorithm_imports import OptionRight, OptionContract
+
+
+class ChainContract(OptionContract):
+    # Keep the IV as a plain (settable) attribute even if other specs patch the mock class
+    @property
+    def BSMImpliedVolatility(self):
+        if '_bsm_iv' not in self.__dict__:
+            raise AttributeError('BSMImpliedVolatility')
+        return self.__dict__['_bsm_iv']
+
+    @BSMImpliedVolatility.setter
+    def BSMImpliedVolatility(self, value):
+        self.__dict__['_bsm_iv'] = value
+
+
+def create_contract(strike, right, days=30, bid=None, ask=None):
+    contract = ChainContract()
+    contract._strike = strike
+    contract._right = right
+    contract._expiry = datetime.now() + timedelta(days=days)
+    if bid is not None:
+        contract._bid_price = bid
+    if ask is not None:
+        contract._ask_price = ask
+    return contract
+
+
+with description('BSMLibrary') as self:
+    with before.each:
+        with patch_imports()[0], patch_imports()[1]:
+            self.algorithm = Factory.create_algorithm()
+            self.algorithm.executionTimer = MagicMock()
+            self.bsm = BSM(self.algorithm)
+            BSM.greeksCache.clear()
+            # Spot price is 100.0 (see QCAlgorithm.GetLastKnownPrice mock)
+            self.contracts = [
+                create_contract(95.0, OptionRight.Put, bid=1.10, ask=1.20),
+                create_contract(100.0, OptionRight.Put, bid=2.40, ask=2.50),
+                create_contract(100.0, OptionRight.Call, bid=2.45, ask=2.55),
+                create_contract(105.0, OptionRight.Call, bid=0.95, ask=1.05),
+                create_contract(110.0, OptionRight.Call, days=0, bid=0.0, ask=0.05),
+            ]
+
+    with after.each:
+        BSM.greeksCache.resize(GreeksCache().maxSize)
+        BSM.greeksCache.clear()
+
+    with context('computeChainGreeks'):
+        with it('returns the same Greeks as the scalar computeGreeks'):
+            with patch_imports()[0], patch_imports()[1]:
+                BSM.greeksCache.resize(0)
+                greeks = self.bsm.computeChainGreeks(self.contracts, saveIt=False)
+                expect(greeks).to(have_keys('delta', 'gamma', 'vega', 'theta', 'rho', 'vomma', 'elasticity', 'IV'))
+                for i, contract in enumerate(self.contracts[:4]):
+                    scalar = self.bsm.computeGreeks(contract)
+                    expect(round(greeks['IV'][i], 5)).to(be_within(scalar.IV - 1e-5, scalar.IV + 1e-5))
+                    expect(round(greeks['delta'][i], 5)).to(be_within(scalar.Delta - 1e-5, scalar.Delta + 1e-5))
+                    expect(round(greeks['gamma'][i], 5)).to(be_within(scalar.Gamma - 1e-5, scalar.Gamma + 1e-5))
+                    expect(round(greeks['vega'][i], 5)).to(be_within(scalar.Vega - 1e-5, scalar.Vega + 1e-5))
+                    expect(round(greeks['theta'][i], 5)).to(be_within(scalar.Theta - 1e-5, scalar.Theta + 1e-5))
+                    expect(round(greeks['rho'][i], 5)).to(be_within(scalar.Rho - 1e-5, scalar.Rho + 1e-5))
+
+        with it('computes the Greeks with a given volatility'):
+            with patch_imports()[0], patch_imports()[1]:
+                greeks = self.bsm.computeChainGreeks(self.contracts, sigma=0.2, saveIt=False)
+                for i, contract in enumerate(self.contracts[:4]):
+                    expected = self.bsm.bsmDelta(contract, 0.2, spotPrice=100.0)
+                    expect(greeks['delta'][i]).to(be_within(expected - 1e-12, expected + 1e-12))
+                    expected = self.bsm.bsmPrice(contract, 0.2, spotPrice=100.0)
+                    expect(greeks['price'][i]).to(be_within(expected - 1e-12, expected + 1e-12))
+
+        with it('handles expired or zero volatility contracts as the scalar methods'):
+            with patch_imports()[0], patch_imports()[1]:
+                greeks = self.bsm.computeChainGreeks(self.contracts, sigma=0.0, saveIt=False)
+                # ITM put -> Delta = -1, OTM call -> Delta = 0
+                expect(greeks['delta'][1]).to(equal(0.0))
+                expect(greeks['delta'][4]).to(equal(0.0))
+                expect(greeks['gamma'][4]).to(equal(float('inf')))
+
+        with it('stores the BSMGreeks on the contracts'):
+            with patch_imports()[0], patch_imports()[1]:
+                self.bsm.setGreeks(self.contracts)
+                for contract in self.contracts:
+                    expect(isinstance(contract.BSMGreeks, BSMGreeks)).to(be_true)
+                    expect(contract.BSMGreeks.lastUpdated).to(equal(self.algorithm.Time))
+                expect(self.contracts[1].BSMGreeks.Delta < 0).to(be_true)
+                expect(self.contracts[2].BSMGreeks.Delta > 0).to(be_true)
+
+        with it('does not recompute the contracts already updated at the current time'):
+            with patch_imports()[0], patch_imports()[1]:
+                existing = BSMGreeks(delta=0.5, IV=0.25, lastUpdated=self.algorithm.Time, precision=None)
+                self.contracts[2].BSMGreeks = existing
+                self.bsm.bsmIVArray = MagicMock(side_effect=lambda price, *args, **kwargs: (np.full(len(price), 0.2), np.full(len(price), True)))
+                greeks = self.bsm.computeChainGreeks(self.contracts)
+                expect(len(self.bsm.bsmIVArray.call_args[0][0])).to(equal(len(self.contracts) - 1))
+                expect(self.contracts[2].BSMGreeks).to(equal(existing))
+                expect(greeks['IV'][2]).to(equal(0.25))
+
+    with context('bsmIVArray'):
+        with it('recovers the volatility used to price the options'):
+            with patch_imports()[0], patch_imports()[1]:
+                strike = np.array([80.0, 90.0, 100.0, 110.0, 120.0, 100.0])
+                isCall = np.array([False, False, True, True, True, False])
+                tau = np.array([30.0, 30.0, 30.0, 30.0, 30.0, 0.5])/365.0
+                sigma = np.array([0.35, 0.25, 0.2, 0.18, 0.22, 0.15])
+                price = self.bsm.bsmGreeksArray(100.0, strike, tau, sigma, isCall)['price']
+                IV, converged = self.bsm.bsmIVArray(price, 100.0, strike, tau, isCall)
+                expect(bool(converged.all())).to(be_true)
+                expect(float(np.max(np.abs(IV - sigma)))).to(be_within(0, 1e-6))
+
+        with it('matches the scalar bsmIV'):
+            with patch_imports()[0], patch_imports()[1]:
+                inputs = self.bsm.chainArrays(self.contracts[:4])
+                IV, converged = self.bsm.bsmIVArray(inputs['mid'], inputs['spot'], inputs['strike'], inputs['tau'], inputs['isCall'])
+                for i, contract in enumerate(self.contracts[:4]):
+                    expected = self.bsm.bsmIV(contract)
+                    expect(IV[i]).to(be_within(expected - 1e-5, expected + 1e-5))
+
+        with it('flags the prices outside of the no-arbitrage bounds as not converged'):
+            with patch_imports()[0], patch_imports()[1]:
+                # Below intrinsic value, above the spot price and expired
+                IV, converged = self.bsm.bsmIVArray([4.0, 101.0, 1.0], 100.0, [95.0, 100.0, 100.0], [0.1, 0.1, 0.0], [True, True, True])
+                expect(converged.tolist()).to(equal([False, False, False]))
+                expect(IV.tolist()).to(equal([0.0, 0.0, 0.0]))
+
+    with context('bsmIVRational'):
+        with it('recovers the volatility on all the branches with at most two refinement steps'):
+            with patch_imports()[0], patch_imports()[1]:
+                # Grid of log-moneyness and total volatility covering the lower, middle and upper branches
+                x, s = np.meshgrid(-np.geomspace(1e-4, 3, 25), np.geomspace(1e-3, 4, 25))
+                # Out-of-the-money calls (x = ln(F/K) <= 0, with F = 100 * e^(r * tau))
+                tau = 1.0
+                strike = 100.0 * np.exp(0.01 * tau - x.ravel())
+                sigma = s.ravel()
+                price = self.bsm.bsmGreeksArray(100.0, strike, tau, sigma, True)['price']
+                keep = price > 1e-200
+                IV, converged = self.bsm.bsmIVRational(price[keep], 100.0, strike[keep], tau, True, iterations=2)
+                expect(bool(converged.all())).to(be_true)
+                expect(float(np.max(np.abs(IV - sigma[keep]) / sigma[keep]))).to(be_within(0, 1e-10))
+
+        with it('handles puts, calls, in-the-money and at-the-money options'):
+            with patch_imports()[0], patch_imports()[1]:
+                strike = np.array([90.0, 90.0, 100.0 * np.exp(0.01 * 0.1), 110.0, 110.0])
+                isCall = np.array([True, False, True, True, False])
+                sigma = np.array([0.3, 0.25, 0.2, 0.18, 0.22])
+                price = self.bsm.bsmGreeksArray(100.0, strike, 0.1, sigma, isCall)['price']
+                IV, converged = self.bsm.bsmIVRational(price, 100.0, strike, 0.1, isCall)
+                expect(bool(converged.all())).to(be_true)
+                expect(float(np.max(np.abs(IV - sigma)))).to(be_within(0, 1e-10))
+
+        with it('solves options with a near-zero time value'):
+            with patch_imports()[0], patch_imports()[1]:
+                # Far OTM 0DTE put with 30 minutes to the close
+                tau = 30.0 / (390.0 * 365.0)
+                price = self.bsm.bsmGreeksArray(5000.0, 4925.0, tau, 0.2, False)['price']
+                expect(float(price[()])).to(be_within(0, 1e-6))
+                IV, converged = self.bsm.bsmIVRational(price, 5000.0, 4925.0, tau, False)
+                expect(bool(converged[0])).to(be_true)
+                expect(IV[0]).to(be_within(0.2 - 1e-9, 0.2 + 1e-9))
+
+        with it('flags the prices without time value as not converged'):
+            with patch_imports()[0], patch_imports()[1]:
+                IV, converged = self.bsm.bsmIVRational([5.0, 101.0, 1.0], 100.0, [95.0, 100.0, 100.0], [0.1, 0.1, 0.0], True)
+                expect(converged.tolist()).to(equal([False, False, False]))
+                expect(IV.tolist()).to(equal([0.0, 0.0, 0.0]))
+
+        with it('is used by bsmIV and computeChainGreeks when selected'):
+            with patch_imports()[0], patch_imports()[1]:
+                BSM.greeksCache.resize(0)
+                bsm = BSM(self.algorithm, ivMethod='rational')
+                bsm.bsmIVArray = MagicMock()
+                greeks = bsm.computeChainGreeks(self.contracts[:4], saveIt=False)
+                expect(bsm.bsmIVArray.called).to(equal(False))
+                for i, contract in enumerate(self.contracts[:4]):
+                    expected = self.bsm.bsmIV(contract)
+                    expect(greeks['IV'][i]).to(be_within(expected - 1e-5, expected + 1e-5))
+                    expect(bsm.bsmIV(contract)).to(be_within(expected - 1e-5, expected + 1e-5))
+
+    with context('shared Greeks cache'):
+        with before.each:
+            # Same contracts (and quotes) recreated at the same time bar, e.g. by the optionChainProviderFilter
+            self.recreated = []
+            for contract in self.contracts[:4]:
+                copy = create_contract(contract.Strike, contract.Right, bid=contract.BidPrice, ask=contract.AskPrice)
+                copy._expiry = contract.Expiry
+                copy.symbol = contract.Symbol
+                self.recreated.append(copy)
+
+        with it('reuses the IV and Greeks computed by another BSM instance'):
+            with patch_imports()[0], patch_imports()[1]:
+                self.bsm.setGreeks(self.contracts[:4])
+                other = BSM(self.algorithm)
+                other.bsmIVArray = MagicMock()
+                other.setGreeks(self.recreated)
+                expect(other.bsmIVArray.called).to(equal(False))
+                for contract, copy in zip(self.contracts[:4], self.recreated):
+                    expect(copy.BSMGreeks).to(be(contract.BSMGreeks))
+                    expect(copy.BSMImpliedVolatility).to(equal(contract.BSMImpliedVolatility))
+                expect(BSM.greeksCache.stats()['hits']).to(equal(4))
+
+        with it('is shared by the scalar and chain paths'):
+            with patch_imports()[0], patch_imports()[1]:
+                greeks = self.bsm.computeGreeks(self.contracts[0])
+                expect(BSM.greeksCache.stats()['misses']).to(equal(1))
+                expect(self.bsm.computeGreeks(self.recreated[0])).to(be(greeks))
+                IV = self.bsm.contractIV(self.recreated[0])
+                chain = self.bsm.computeChainGreeks(self.recreated[:1], saveIt=False)
+                expect(round(IV, 5)).to(equal(greeks.IV))
+                expect(chain['IV'][0]).to(equal(IV))
+                expect(BSM.greeksCache.stats()['hits']).to(equal(3))
+
+        with it('solves again when the quotes or the time change'):
+            with patch_imports()[0], patch_imports()[1]:
+                self.bsm.setGreeks(self.contracts[:4])
+                self.recreated[0]._bid_price += 0.05
+                self.algorithm.Time = self.algorithm.Time + timedelta(minutes=1)
+                self.bsm.bsmIVArray = MagicMock(side_effect=lambda price, *args, **kwargs: (np.full(len(price), 0.2), np.full(len(price), True)))
+                self.bsm.setGreeks(self.recreated[:1])
+                expect(len(self.bsm.bsmIVArray.call_args[0][0])).to(equal(1))
+                expect(BSM.greeksCache.stats()['hits']).to(equal(0))
+
+        with it('does not share the values of instances with different model parameters'):
+            with patch_imports()[0], patch_imports()[1]:
+                self.bsm.setGreeks(self.contracts[:4])
+                other = BSM(self.algorithm, tradingDays=252.0)
+                other.riskFreeRate = self.bsm.riskFreeRate + 0.03
+                other.setGreeks(self.recreated)
+                expect(BSM.greeksCache.stats()['hits']).to(equal(0))
+                for contract, copy in zip(self.contracts[:4], self.recreated):
+                    expect(copy.BSMGreeks.Theta).not_to(equal(contract.BSMGreeks.Theta))
+
+        with it('is not resized by the BSM instances'):
+            with patch_imports()[0], patch_imports()[1]:
+                self.algorithm.greeksCacheSize = 5
+                BSM(self.algorithm)
+                expect(BSM.greeksCache.maxSize).to(equal(GreeksCache().maxSize))
+
+        with it('does not cache the Greeks computed with a custom volatility'):
+            with patch_imports()[0], patch_imports()[1]:
+                self.bsm.computeChainGreeks(self.contracts[:4], sigma=0.2)
+                self.bsm.computeGreeks(self.recreated[0], sigma=0.2)
+                expect(len(BSM.greeksCache)).to(equal(0))
+
+    with context('incremental mode'):
+        with before.each:
+            self.incremental = BSM(self.algorithm, incremental=True)
+            # Use the quotes of the contracts
+            self.incremental.contractUtils.midPrice = lambda contract: 0.5 * (contract.BidPrice + contract.AskPrice)
+            self.solver = MagicMock(side_effect=lambda price, *args, **kwargs: (np.full(len(price), 0.3), np.full(len(price), True)))
+
+        with it('reuses the last IV of the contracts whose inputs did not move'):
+            with patch_imports()[0], patch_imports()[1]:
+                first = self.incremental.computeChainGreeks(self.contracts[:4], saveIt=False)
+                self.algorithm.Time = self.algorithm.Time + timedelta(minutes=1)
+                self.incremental.bsmIVArray = self.solver
+                second = self.incremental.computeChainGreeks(self.contracts[:4], saveIt=False)
+                expect(self.solver.called).to(equal(False))
+                expect(second['IV'].tolist()).to(equal(first['IV'].tolist()))
+                expect(self.incremental.incrementalSkips).to(equal(4))
+                expect(self.incremental.incrementalSolves).to(equal(4))
+
+        with it('solves again the contracts whose inputs moved, starting from the last IV'):
+            with patch_imports()[0], patch_imports()[1]:
+                first = self.incremental.computeChainGreeks(self.contracts[:4], saveIt=False)
+                self.algorithm.Time = self.algorithm.Time + timedelta(minutes=1)
+                self.contracts[1]._ask_price += 0.05
+                self.incremental.bsmIVArray = self.solver
+                second = self.incremental.computeChainGreeks(self.contracts[:4], saveIt=False)
+                expect(len(self.solver.call_args[0][0])).to(equal(1))
+                expect(self.solver.call_args[1]['x0'].tolist()).to(equal([first['IV'][1]]))
+                expect(second['IV'][1]).to(equal(0.3))
+                expect(second['IV'][0]).to(equal(first['IV'][0]))
+
+        with it('refreshes the Greeks with the current time to expiration'):
+            with patch_imports()[0], patch_imports()[1]:
+                self.incremental.tauTolerance = 1.0
+                first = self.incremental.computeChainGreeks(self.contracts[:4], saveIt=False)
+                self.algorithm.Time = self.algorithm.Time + timedelta(days=1)
+                self.incremental.bsmIVArray = self.solver
+                second = self.incremental.computeChainGreeks(self.contracts[:4], saveIt=False)
+                expect(self.solver.called).to(equal(False))
+                expect(second['tau'][0]).to(be_below(first['tau'][0]))
+                expect(second['theta'][0] == first['theta'][0]).to(equal(False))
+                self.incremental.tauTolerance = 0.01
+                self.algorithm.Time = self.algorithm.Time + timedelta(days=1)
+                self.incremental.computeChainGreeks(self.contracts[:4], saveIt=False)
+                expect(len(self.solver.call_args[0][0])).to(equal(4))
+
+        with it('is also used by the scalar computeGreeks'):
+            with patch_imports()[0], patch_imports()[1]:
+                first = self.incremental.computeGreeks(self.contracts[0])
+                self.algorithm.Time = self.algorithm.Time + timedelta(minutes=1)
+                self.incremental.bsmIV = MagicMock()
+                second = self.incremental.computeGreeks(self.contracts[0])
+                expect(self.incremental.bsmIV.called).to(equal(False))
+                expect(second.IV).to(equal(first.IV))
+
+    with context('SciPy-free kernel'):
+        with it('does not import SciPy when the library is imported'):
+            script = "import sys\nfrom Tests.spec_helper import patch_imports\nwith patch_imports()[0], patch_imports()[1]:\n    import Tools.BSMLibrary\nprint(any(name.startswith('scipy') for name in sys.modules))"
+            output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=os.environ)
+            expect(output.stdout.strip().splitlines()[-1]).to(equal("False"))
+
+        with it('computes the IV with the scalar Halley iteration'):
+            with patch_imports()[0], patch_imports()[1]:
+                contract = self.contracts[2]
+                self.bsm.contractUtils.midPrice = lambda contract: self.bsm.bsmPrice(contract, 0.23)
+                expect(self.bsm.bsmIV(contract, tau=self.bsm.optionTau(contract))).to(be_within(0.23 - 1e-6, 0.23 + 1e-6))
+
+        with it('stops the Halley iteration when the derivative is zero'):
+            root, converged = BSM.halley(lambda x: 1.0, lambda x: 0.0, lambda x: 0.0, 0.5)
+            expect((root, converged)).to(equal((0.5, False)))
@@ -0,0 +1,114 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_false, be_none, raise_error
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+from datetime import timedelta
+import numpy as np
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.ChainSnapshot import ChainSnapshot
+    from Tests.mocks.algorithm_imports import OptionRight, OptionContract
+
+
+def create_contract(algorithm, strike, right, days=30, bid=1.0, ask=1.2, tradable=True):
+    contract = OptionContract()
+    contract._strike = strike
+    contract._right = right
+    contract._expiry = algorithm.Time + timedelta(days=days)
+    contract._bid_price = bid
+    contract._ask_price = ask
+    contract.IsTradable = tradable
+    # Not in the Securities of the algorithm: the quotes are read from the contract itself
+    contract.symbol.Value = f"TEST {right} {strike} {days}"
+    return contract
+
+
+with description('ChainSnapshot') as self:
+    with before.each:
+        with patch_imports()[0], patch_imports()[1]:
+            self.algorithm = Factory.create_algorithm()
+            self.algorithm.executionTimer = MagicMock()
+            # Unsorted chain with two expiries (same strikes) and one non-tradable contract
+            self.contracts = []
+            for days in [30, 7]:
+                for strike in [110.0, 90.0, 100.0, 95.0, 105.0]:
+                    price = max(0.05, 0.1*abs(strike - 100.0))
+                    self.contracts.append(create_contract(self.algorithm, strike, OptionRight.Call, days, bid=price, ask=price + 0.1))
+                    self.contracts.append(create_contract(self.algorithm, strike, OptionRight.Put, days, bid=price, ask=price + 0.1, tradable=strike != 95.0))
+            self.snapshot = ChainSnapshot(self.algorithm, self.contracts, spotPrice=101.0)
+
+    with it('behaves as the list of contracts it was built from'):
+        expect(len(self.snapshot)).to(equal(len(self.contracts)))
+        expect(list(self.snapshot)).to(equal(self.contracts))
+        expect(self.snapshot[3]).to(equal(self.contracts[3]))
+
+    with it('stores read-only columns'):
+        expect(self.snapshot.columns["strike"].tolist()).to(equal([contract.Strike for contract in self.contracts]))
+        expect(bool(self.snapshot.columns["tradable"].sum() == 18)).to(be_true)
+        expect(lambda: self.snapshot.columns["mid"].__setitem__(0, 1.0)).to(raise_error(ValueError))
+        # Only the quotes read when the snapshot is built (no Greeks left over from a previous time bar)
+        expect(sorted(self.snapshot.columns)).to(equal(sorted(["strike", "isCall", "expiry", "dte", "bid", "ask", "mid", "tradable", "volume", "openInterest"])))
+
+    with it('sorts the contracts of each right by strike, keeping the chain order on the same strike'):
+        puts = self.snapshot.sortedContracts("Put")
+        expect([contract.Strike for contract in puts]).to(equal([90.0, 90.0, 95.0, 95.0, 100.0, 100.0, 105.0, 105.0, 110.0, 110.0]))
+        expect(all(contract.Right == OptionRight.Put for contract in puts)).to(be_true)
+        expect(puts).to(equal(sorted([contract for contract in self.contracts if contract.Right == OptionRight.Put], key=lambda x: x.Strike)))
+        expect(self.snapshot.column("strike", "call").tolist()).to(equal([90.0, 90.0, 95.0, 95.0, 100.0, 100.0, 105.0, 105.0, 110.0, 110.0]))
+
+    with context('queries'):
+        with it('returns the contracts within a strike range'):
+            calls = self.snapshot.strikeRange("call", fromStrike=95.0, toStrike=105.0)
+            expect([contract.Strike for contract in calls]).to(equal([95.0, 95.0, 100.0, 100.0, 105.0, 105.0]))
+            expect(self.snapshot.strikeRange("call", fromStrike=111.0)).to(equal([]))
+
+        with it('returns the contracts within a price range'):
+            puts = self.snapshot.priceRange("put", fromPrice=0.5, toPrice=0.6)
+            expect([contract.Strike for contract in puts]).to(equal([95.0, 95.0, 105.0, 105.0]))
+
+        with it('filters the tradable contracts'):
+            puts = self.snapshot.getContracts("put", fromPrice=0.5, toPrice=0.6)
+            expect([contract.Strike for contract in puts]).to(equal([105.0, 105.0]))
+
+        with it('returns the nearest strike'):
+            expect(self.snapshot.nearestStrike()).to(equal(100.0))
+            expect(self.snapshot.nearestStrike(103.0)).to(equal(105.0))
+            expect(self.snapshot.nearestStrike(200.0, type="put")).to(equal(110.0))
+            expect(ChainSnapshot(self.algorithm, [], spotPrice=100.0).nearestStrike()).to(be_none)
+
+        with it('returns the nearest contracts in the same order as a stable sort by distance'):
+            rng = np.random.default_rng(7)
+            for price in rng.uniform(85.0, 115.0, 50).tolist() + [97.5, 100.0, 102.5]:
+                for type in [None, "put", "call"]:
+                    for count in [1, 2, 3, 5]:
+                        expected = sorted([contract for contract in self.contracts if type is None or (contract.Right == OptionRight.Call) == (type == "call")], key=lambda x: abs(x.Strike - price))[:count]
+                        expect(self.snapshot.nearestContracts(count, type=type, price=price)).to(equal(expected))
+
+        with it('returns the k-th OTM contract'):
+            expect(self.snapshot.kthOTM("call", 1).Strike).to(equal(105.0))
+            expect(self.snapshot.kthOTM("call", 2).Strike).to(equal(110.0))
+            expect(self.snapshot.kthOTM("call", 3)).to(be_none)
+            expect(self.snapshot.kthOTM("put", 1).Strike).to(equal(100.0))
+            expect(self.snapshot.kthOTM("put", 3).Strike).to(equal(90.0))
+            expect(self.snapshot.kthOTM("put", 1, price=100.0).Strike).to(equal(95.0))
+            # First contract of the chain on that strike
+            expect(self.snapshot.kthOTM("put", 2)).to(equal(self.contracts[7]))
+            expect(self.snapshot.kthOTM("put", 0)).to(be_none)
+
+    with context('views'):
+        with it('selects the contracts within a DTE range and a number of strikes around the ATM'):
+            view = self.snapshot.select(minDte=0, maxDte=7, nStrikesLeft=1, nStrikesRight=1)
+            expected = [contract for contract in self.contracts if contract.Expiry == self.algorithm.Time + timedelta(days=7) and 95.0 <= contract.Strike <= 105.0]
+            expect(list(view)).to(equal(expected))
+            expect(view.spotPrice).to(equal(101.0))
+            expect(view.kthOTM("call", 1).Strike).to(equal(105.0))
+            expect(view.kthOTM("call", 2)).to(be_none)
+            expect(len(self.snapshot.select(minDte=8, nStrikesLeft=10, nStrikesRight=0))).to(equal(6))
+
+        with it('builds read-only views from the columns'):
+            view = self.snapshot.view([5, 1, 3])
+            expect(list(view)).to(equal([self.contracts[5], self.contracts[1], self.contracts[3]]))
+            expect(view.columns["mid"].tolist()).to(equal(self.snapshot.columns["mid"][[5, 1, 3]].tolist()))
+            expect(lambda: view.columns["bid"].__setitem__(0, 1.0)).to(raise_error(ValueError))
+            expect(len(self.snapshot.view([]))).to(equal(0))
@@ -8,7 +8,7 @@ from Tests.spec_helper import patch_imports
 from Tests.factories import Factory
 from Tests.mocks.module_mocks import ModuleMocks
 from Tests.mocks.algorithm_imports import (
-    SecurityType, Resolution, Symbol, Market, SecuritiesDict
+    SecurityType, Resolution, Symbol, Market, SecuritiesDict, OptionContract
 )
 from datetime import timedelta, datetime
 
@@ -16,6 +16,7 @@ from datetime import timedelta, datetime
 patch_contexts = patch_imports()
 with patch_contexts[0], patch_contexts[1]:
     from Tools.DataHandler import DataHandler
+    from Tools.OptionSubscriptions import OptionSubscriptions
 
 with description('DataHandler') as self:
     with before.each:
@@ -39,7 +40,7 @@ with description('DataHandler') as self:
             self.data_handler = DataHandler(self.algorithm, self.ticker, self.strategy)
             self.algorithm.logger = MagicMock()
             self.algorithm.executionTimer = MagicMock()
-            self.algorithm.optionContractsSubscriptions = []
+            self.algorithm.optionContractsSubscriptions = set()
 
     with context('initialization'):
         with it('sets context, ticker and strategy correctly'):
@@ -254,6 +255,76 @@ with description('DataHandler') as self:
             self.algorithm.OptionChainProvider.GetOptionContractList.assert_called_once()
             expect(result).to(have_length(1))
 
+        with it('loads the provider contracts once per day'):
+            self.algorithm.OptionChainProvider.GetOptionContractList.return_value = self.test_symbols
+
+            self.data_handler.getOptionContracts()
+            self.algorithm.Time = self.current_time + timedelta(minutes=1)
+            result = self.data_handler.getOptionContracts()
+
+            self.algorithm.OptionChainProvider.GetOptionContractList.assert_called_once()
+            expect(result).to(have_length(1))
+            expect(self.algorithm.optionContractsSubscriptions).to(have_length(1))
+            # The selected contracts are owned by the chain window of the strategy
+            expect(OptionSubscriptions.of(self.algorithm).refCount(self.test_symbols[0])).to(equal(1))
+
+    with context('liquidityFilter'):
+        with before.each:
+            self.algorithm.Time = datetime(2024, 1, 2, 10, 0)
+            self.parameters = {"liquidityFilter": True}
+            self.strategy.parameter = lambda key, default=None: self.parameters.get(key, default)
+            self.contracts = []
+            # (bid, ask, open interest, minutes since the last update)
+            for i, (bid, ask, oi, age) in enumerate([
+                (1.0, 1.1, 100, 1),  # liquid
+                (0.0, 0.1, 100, 1),  # no bid
+                (1.2, 1.1, 100, 1),  # crossed
+                (1.0, 2.0, 100, 1),  # wide spread
+                (1.0, 1.1, 100, 30),  # stale
+                (1.0, 1.1, 5, 1),  # low open interest
+            ]):
+                contract = OptionContract()
+                contract.symbol.Value = f"TEST {i}"
+                contract._bid_price = bid
+                contract._ask_price = ask
+                contract._open_interest = oi
+                contract._time = self.algorithm.Time - timedelta(minutes=age)
+                self.contracts.append(contract)
+
+        with it('only drops the zero bid and crossed quotes by default'):
+            result = self.data_handler.liquidityFilter(self.contracts)
+            expect(result).to(equal([self.contracts[0]] + self.contracts[3:]))
+
+        with it('applies the thresholds of the strategy and counts the drops by reason'):
+            self.parameters.update({
+                "liquidityMaxSpreadRatio": 0.5,
+                "liquidityMaxQuoteAge": timedelta(minutes=15),
+                "liquidityMinOpenInterest": 10
+            })
+            result = self.data_handler.liquidityFilter(self.contracts)
+            expect(result).to(equal([self.contracts[0]]))
+            # The zero bid quote is also counted as a wide spread
+            expect(self.data_handler.liquidityStats).to(equal({
+                "checked": 6, "dropped": 5, "noBid": 1, "crossed": 1, "lowOpenInterest": 1, "wideSpread": 2, "stale": 1
+            }))
+            self.data_handler.liquidityFilter(self.contracts)
+            expect(self.data_handler.liquidityStats["dropped"]).to(equal(10))
+
+        with it('drops the bids below the minimum bid'):
+            self.parameters["liquidityMinBid"] = 1.1
+            expect(self.data_handler.liquidityFilter(self.contracts)).to(equal([]))
+
+        with it('is applied to the contracts of getOptionContracts only when enabled'):
+            self.strategy.useSlice = True
+            slice = MagicMock()
+            chain = MagicMock(Key=None)
+            chain.Value.Contracts = MagicMock(Count=len(self.contracts))
+            chain.Value.__iter__ = lambda _: iter(self.contracts)
+            slice.OptionChains = [chain]
+            expect(self.data_handler.getOptionContracts(slice)).to(have_length(4))
+            self.parameters["liquidityFilter"] = False
+            expect(self.data_handler.getOptionContracts(slice)).to(have_length(6))
+
     with context('AddOptionContracts'):
         with before.each:
             self.contracts = [Factory.create_symbol(), Factory.create_symbol()]
@@ -0,0 +1,79 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_none, be_true, be_false
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+from datetime import datetime
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.GreeksCache import GreeksCache
+
+with description('GreeksCache') as self:
+    with before.each:
+        self.cache = GreeksCache(maxSize=2)
+        self.time = datetime(2024, 1, 2, 10, 30)
+        self.keyA = GreeksCache.key("A", self.time, 100.0, 1.0, 0.01, 365.0)
+        self.keyB = GreeksCache.key("B", self.time, 100.0, 2.0, 0.01, 365.0)
+        self.keyC = GreeksCache.key("C", self.time, 100.0, 3.0, 0.01, 365.0)
+
+    with context('get/put'):
+        with it('counts the hits and misses'):
+            expect(self.cache.get(self.keyA)).to(be_none)
+            self.cache.put(self.keyA, 0.2, "greeks")
+            expect(self.cache.get(self.keyA)).to(equal((0.2, "greeks")))
+            stats = self.cache.stats()
+            expect(stats['hits']).to(equal(1))
+            expect(stats['misses']).to(equal(1))
+            expect(stats['hitRate']).to(equal(0.5))
+
+        with it('uses the quotes and the time as part of the key'):
+            self.cache.put(self.keyA, 0.2)
+            expect(GreeksCache.key("A", self.time, 100.0, 1.05, 0.01, 365.0) in self.cache).to(be_false)
+            expect(GreeksCache.key("A", datetime(2024, 1, 2, 10, 31), 100.0, 1.0, 0.01, 365.0) in self.cache).to(be_false)
+            expect(GreeksCache.key("A", self.time, 100, 1, 0.01, 365) in self.cache).to(be_true)
+
+        with it('uses the model parameters as part of the key'):
+            self.cache.put(self.keyA, 0.2)
+            expect(GreeksCache.key("A", self.time, 100.0, 1.0, 0.05, 365.0) in self.cache).to(be_false)
+            expect(GreeksCache.key("A", self.time, 100.0, 1.0, 0.01, 252.0) in self.cache).to(be_false)
+
+        with it('keeps the Greeks when only the IV is stored'):
+            self.cache.put(self.keyA, 0.2, "greeks")
+            self.cache.put(self.keyA, 0.2)
+            expect(self.cache.get(self.keyA)).to(equal((0.2, "greeks")))
+
+    with context('eviction'):
+        with it('evicts the least recently used entry'):
+            self.cache.put(self.keyA, 0.1)
+            self.cache.put(self.keyB, 0.2)
+            self.cache.get(self.keyA)
+            self.cache.put(self.keyC, 0.3)
+            expect(self.keyA in self.cache).to(be_true)
+            expect(self.keyB in self.cache).to(be_false)
+            expect(self.keyC in self.cache).to(be_true)
+            expect(len(self.cache)).to(equal(2))
+
+        with it('shrinks when resized'):
+            self.cache.put(self.keyA, 0.1)
+            self.cache.put(self.keyB, 0.2)
+            self.cache.resize(1)
+            expect(self.keyA in self.cache).to(be_false)
+            expect(self.keyB in self.cache).to(be_true)
+
+        with it('does not store anything when the size is zero'):
+            self.cache.resize(0)
+            self.cache.put(self.keyA, 0.1)
+            expect(self.cache.enabled).to(be_false)
+            expect(len(self.cache)).to(equal(0))
+
+    with context('clear'):
+        with it('removes the entries and resets the counters'):
+            self.cache.put(self.keyA, 0.1)
+            self.cache.get(self.keyA)
+            self.cache.clear()
+            expect(self.cache.stats()).to(equal({"hits": 0, "misses": 0, "hitRate": None, "size": 0, "maxSize": 2}))
+
+    with context('showStats'):
+        with it('logs the statistics'):
+            algorithm = Factory.create_algorithm()
+            self.cache.showStats(algorithm)
+            expect(algorithm.Log.call_count).to(equal(6))
@@ -0,0 +1,153 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_none
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.GreeksIndicators import GreeksIndicators
+    from Tools.OptionSubscriptions import OptionSubscriptions
+    from Tools.ProviderOptionContract import ProviderOptionContract
+    from AlgorithmImports import Symbol, SecurityType, OptionRight, Market
+
+
+class FakeIndicator:
+    def __init__(self, value, ready):
+        self.current = SimpleNamespace(value=value)
+        self.is_ready = ready
+
+
+class FakeBSM:
+    def __init__(self, context):
+        self.context = context
+        self.calls = 0
+
+    def setGreeks(self, contract):
+        self.calls += 1
+        contract.BSMImpliedVolatility = 0.2
+        contract.BSMGreeks = SimpleNamespace(Delta=0.45, Gamma=0.01, Vega=0.3, Theta=-0.5, Rho=0.02, lastUpdated=self.context.Time)
+
+
+def create_algorithm(strikes):
+    algorithm = SimpleNamespace(
+        Time=datetime(2024, 1, 8, 10, 0),
+        timeResolution="Minute",
+        optionContractsSubscriptions=set(),
+        openPositions={},
+        workingOrders={},
+        allPositions={},
+        Portfolio={},
+        Securities={},
+        logger=MagicMock(),
+        RemoveOptionContract=MagicMock(),
+        DeregisterIndicator=MagicMock(),
+        greeksOnDemand=True,
+        ready=False,
+    )
+    # Lean indicator helpers (iv, d, g, v, r, t): the value identifies the indicator
+    for name, value in zip(["iv", "d", "g", "v", "r", "t"], [0.25, 0.5, 0.02, 0.4, 0.03, -0.6]):
+        setattr(algorithm, name, MagicMock(side_effect=lambda symbol, mirror, resolution, value=value: FakeIndicator(value, algorithm.ready)))
+    algorithm.symbols = []
+    for strike in strikes:
+        symbol = Symbol.create_option("SPX", Market.USA, "European", OptionRight.Put, strike, datetime(2024, 1, 8))
+        symbol.Underlying = "SPX"
+        algorithm.Securities[symbol] = SimpleNamespace(symbol=symbol, Type=SecurityType.IndexOption, iv=None, delta=None, gamma=None, vega=None, rho=None, theta=None)
+        algorithm.optionContractsSubscriptions.add(symbol)
+        algorithm.symbols.append(symbol)
+    return algorithm
+
+
+with description('GreeksIndicators') as self:
+    with before.each:
+        self.algorithm = create_algorithm([4990.0, 4995.0, 5000.0, 5005.0, 5010.0])
+        self.indicators = GreeksIndicators.of(self.algorithm)
+        self.subscriptions = OptionSubscriptions.of(self.algorithm)
+        self.A, self.B, self.C, self.D, self.E = self.algorithm.symbols
+
+    with context('of'):
+        with it('creates the manager on first use and reuses it'):
+            expect(self.algorithm.greeksIndicators is self.indicators).to(be_true)
+            expect(GreeksIndicators.of(self.algorithm) is self.indicators).to(be_true)
+
+    with context('attach'):
+        with it('creates the six indicators against the mirror contract once'):
+            security = self.algorithm.Securities[self.A]
+            self.indicators.attach(security)
+            self.indicators.attach(security)
+            expect(security.delta.current.value).to(equal(0.5))
+            expect(security.theta.current.value).to(equal(-0.6))
+            expect(self.algorithm.d.call_count).to(equal(1))
+            mirror = self.algorithm.d.call_args[0][1]
+            expect(mirror.ID.option_right).to(equal(OptionRight.Call))
+            expect(mirror.ID.strike_price).to(equal(4990.0))
+            expect(self.indicators.counts()["indicators"]).to(equal(6))
+
+    with context('sync'):
+        with it('only keeps the indicators of the owned contracts in on-demand mode'):
+            self.subscriptions.setOwned(("chain", "SPXic"), [self.A, self.B, self.C])
+            self.indicators.sync()
+            expect(set(self.indicators.attached)).to(equal({self.A, self.B, self.C}))
+            # The window moves, B is a leg of a position
+            self.subscriptions.setOwned(("position", "#1"), [self.B])
+            self.subscriptions.setOwned(("chain", "SPXic"), [self.C, self.D, self.E])
+            self.indicators.sync()
+            expect(set(self.indicators.attached)).to(equal({self.B, self.C, self.D, self.E}))
+            released = self.algorithm.Securities[self.A]
+            expect(released.delta).to(be_none)
+            expect(self.algorithm.DeregisterIndicator.call_count).to(equal(6))
+            expect(self.indicators.counts()).to(equal({"attached": 4, "indicators": 24, "warmingUp": 4, "created": 5, "detached": 1, "seeds": 0}))
+
+        with it('reattaches a contract owned again'):
+            self.subscriptions.setOwned(("chain", "SPXic"), [self.A])
+            self.indicators.sync()
+            self.subscriptions.release(("chain", "SPXic"))
+            self.indicators.sync()
+            self.subscriptions.setOwned(("chain", "SPXic"), [self.A])
+            self.indicators.sync()
+            expect(self.algorithm.Securities[self.A].delta.current.value).to(equal(0.5))
+            expect(self.indicators.counts()["created"]).to(equal(2))
+
+        with it('keeps the indicators of all the subscribed contracts in eager mode'):
+            self.algorithm.greeksOnDemand = False
+            for symbol in self.algorithm.symbols:
+                self.indicators.attach(self.algorithm.Securities[symbol])
+            self.subscriptions.setOwned(("chain", "SPXic"), [self.A])
+            self.indicators.sync()
+            expect(len(self.indicators.attached)).to(equal(5))
+            expect(self.indicators.counts()["warmingUp"]).to(equal(0))
+            # Removed by the subscription sweep
+            self.algorithm.optionContractsSubscriptions.discard(self.E)
+            self.indicators.sync()
+            expect(set(self.indicators.attached)).to(equal({self.A, self.B, self.C, self.D}))
+
+    with context('seed'):
+        with before.each:
+            self.indicators.bsm = FakeBSM(self.algorithm)
+            self.subscriptions.setOwned(("chain", "SPXic"), [self.A])
+            self.indicators.sync()
+            self.contract = ProviderOptionContract(self.A, 5000.0, self.algorithm)
+
+        with it('reads the BSM values until the indicators are ready'):
+            expect(self.contract.greeks.delta).to(equal(0.45))
+            expect(self.contract.greeks.theta).to(equal(-0.5))
+            expect(self.contract.implied_volatility).to(equal(0.2))
+            # Computed once per time bar
+            expect(self.indicators.bsm.calls).to(equal(1))
+            self.algorithm.Time += timedelta(minutes=1)
+            expect(self.contract.greeks.gamma).to(equal(0.01))
+            expect(self.indicators.bsm.calls).to(equal(2))
+            for name in GreeksIndicators.NAMES:
+                getattr(self.algorithm.Securities[self.A], name).is_ready = True
+            expect(self.contract.greeks.delta).to(equal(0.5))
+            expect(self.contract.implied_volatility).to(equal(0.25))
+            self.indicators.sync()
+            expect(self.indicators.counts()["warmingUp"]).to(equal(0))
+
+        with it('does not seed the contracts attached eagerly'):
+            self.algorithm.greeksOnDemand = False
+            self.indicators.attach(self.algorithm.Securities[self.B])
+            contract = ProviderOptionContract(self.B, 5000.0, self.algorithm)
+            expect(contract.greeks.delta).to(equal(0.5))
+            expect(self.indicators.seed(contract, "delta")).to(be_none)
+            expect(self.indicators.bsm.calls).to(equal(0))
@@ -0,0 +1,97 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_false
+from Tests.spec_helper import patch_imports
+from types import SimpleNamespace
+from datetime import datetime, date, time, timedelta
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.MarketCalendar import MarketCalendar
+
+
+HOLIDAYS = {date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29), date(2024, 5, 27), date(2024, 7, 4)}
+
+
+class FakeTradingCalendar:
+    def __init__(self):
+        self.calls = 0
+
+    def GetDaysByType(self, dayType, start, end):
+        self.calls += 1
+        days = []
+        day = start
+        while day <= end:
+            if day.weekday() < 5 and day.date() not in HOLIDAYS:
+                days.append(SimpleNamespace(Date=day))
+            day += timedelta(days=1)
+        return days
+
+
+def bruteForceLastTradingDay(expiry):
+    # Same as the previous implementation of CentralAlgorithm.lastTradingDay
+    return list(FakeTradingCalendar().GetDaysByType("BusinessDay", expiry - timedelta(days=20), expiry))[-1].Date
+
+
+with description('MarketCalendar') as self:
+    with before.each:
+        self.context = SimpleNamespace(Time=datetime(2024, 1, 10, 10, 30), TradingCalendar=FakeTradingCalendar())
+        self.calendar = MarketCalendar.of(self.context)
+
+    with context('lastTradingDay'):
+        with it('matches the lookup over the 20 days before the expiry'):
+            expiry = datetime(2024, 1, 10)
+            for _ in range(200):
+                expect(self.calendar.lastTradingDay(expiry)).to(equal(bruteForceLastTradingDay(expiry)))
+                expiry += timedelta(days=1)
+
+        with it('moves the expiries falling on a holiday to the previous business day'):
+            expect(self.calendar.lastTradingDay(datetime(2024, 3, 29))).to(equal(datetime(2024, 3, 28)))
+            expect(self.calendar.lastTradingDay(datetime(2024, 1, 15))).to(equal(datetime(2024, 1, 12)))
+            expect(self.calendar.lastTradingDay(datetime(2024, 1, 13))).to(equal(datetime(2024, 1, 12)))
+
+        with it('loads the calendar once per day'):
+            for day in range(20):
+                self.calendar.lastTradingDay(datetime(2024, 1, 12) + timedelta(days=day))
+            expect(self.context.TradingCalendar.calls).to(equal(1))
+            self.context.Time += timedelta(minutes=30)
+            self.calendar.lastTradingDay(datetime(2024, 1, 19))
+            expect(self.context.TradingCalendar.calls).to(equal(1))
+            self.context.Time += timedelta(days=1)
+            self.calendar.lastTradingDay(datetime(2024, 1, 19))
+            expect(self.context.TradingCalendar.calls).to(equal(2))
+
+        with it('extends the table for far expiries'):
+            expect(self.calendar.lastTradingDay(datetime(2024, 7, 4))).to(equal(datetime(2024, 7, 3)))
+            expect(self.context.TradingCalendar.calls).to(equal(2))
+            expect(self.calendar.lastTradingDay(datetime(2024, 5, 27))).to(equal(datetime(2024, 5, 24)))
+            expect(self.context.TradingCalendar.calls).to(equal(2))
+
+    with context('marketCloseCutoffDttm'):
+        with it('combines the last trading day with the cutoff time'):
+            cutoff = self.calendar.marketCloseCutoffDttm(datetime(2024, 2, 19), time(15, 45))
+            expect(cutoff).to(equal(datetime(2024, 2, 16, 15, 45)))
+            expect(self.calendar.marketCloseCutoffDttm(datetime(2024, 2, 19), time(15, 45)) is cutoff).to(be_true)
+
+    with context('business days'):
+        with it('knows the trading days'):
+            expect(self.calendar.isTradingDay(date(2024, 1, 12))).to(be_true)
+            expect(self.calendar.isTradingDay(date(2024, 1, 13))).to(be_false)
+            expect(self.calendar.isTradingDay(date(2024, 1, 15))).to(be_false)
+
+        with it('counts the business days between two dates'):
+            # Jan 11, 12, 16, 17, 18, 19 (Jan 15 is a holiday)
+            expect(self.calendar.businessDays(date(2024, 1, 10), date(2024, 1, 19))).to(equal(6))
+            expect(self.calendar.businessDays(date(2024, 1, 19), date(2024, 1, 10))).to(equal(-6))
+            expect(self.calendar.businessDays(date(2024, 1, 13), date(2024, 1, 15))).to(equal(0))
+
+        with it('adds business days'):
+            expect(self.calendar.addBusinessDays(date(2024, 1, 12), 1)).to(equal(date(2024, 1, 16)))
+            expect(self.calendar.addBusinessDays(date(2024, 1, 16), -1)).to(equal(date(2024, 1, 12)))
+            expect(self.calendar.addBusinessDays(date(2024, 1, 13), 1)).to(equal(date(2024, 1, 16)))
+            # Beyond the table: it is extended
+            businessDays = [day.Date.date() for day in FakeTradingCalendar().GetDaysByType("BusinessDay", datetime(2024, 1, 11), datetime(2025, 6, 1))]
+            expect(self.calendar.addBusinessDays(date(2024, 1, 10), 250)).to(equal(businessDays[249]))
+
+        with it('computes the business DTE and DIT'):
+            expect(self.calendar.dte(datetime(2024, 1, 20))).to(equal(6))
+            expect(self.calendar.dit(datetime(2024, 1, 2, 9, 31))).to(equal(6))
+            expect(self.calendar.dit(datetime(2024, 1, 10, 9, 31))).to(equal(0))
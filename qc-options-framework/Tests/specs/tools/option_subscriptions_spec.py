@@ -0,0 +1,107 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_false
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.OptionSubscriptions import OptionSubscriptions
+
+
+class FakePortfolio(dict):
+    def __missing__(self, symbol):
+        raise KeyError(symbol)
+
+
+def create_position(orderId, orderTag, symbols):
+    return SimpleNamespace(orderId=orderId, orderTag=orderTag, legs=[SimpleNamespace(symbol=symbol) for symbol in symbols])
+
+
+def advance(spec, minutes):
+    spec.algorithm.Time += timedelta(minutes=minutes)
+    spec.subscriptions.sweep()
+
+
+with description('OptionSubscriptions') as self:
+    with before.each:
+        self.algorithm = SimpleNamespace(
+            Time=datetime(2024, 1, 8, 10, 0),
+            optionContractsSubscriptions={"A", "B", "C", "D"},
+            openPositions={},
+            workingOrders={},
+            allPositions={},
+            Portfolio=FakePortfolio(),
+            RemoveOptionContract=MagicMock(),
+            logger=MagicMock(),
+            subscriptionGracePeriod=timedelta(minutes=10),
+        )
+        self.subscriptions = OptionSubscriptions.of(self.algorithm)
+
+    with context('of'):
+        with it('creates the manager on first use and reuses it'):
+            expect(self.algorithm.optionSubscriptions is self.subscriptions).to(be_true)
+            expect(OptionSubscriptions.of(self.algorithm) is self.subscriptions).to(be_true)
+
+    with context('reference counts'):
+        with it('counts the owners of each contract'):
+            self.subscriptions.setOwned(("chain", "SPXic"), ["A", "B"])
+            self.subscriptions.setOwned(("chain", "SPXCondor"), ["B", "C"])
+            expect(self.subscriptions.refCount("A")).to(equal(1))
+            expect(self.subscriptions.refCount("B")).to(equal(2))
+            expect(self.subscriptions.refCount("D")).to(equal(0))
+            self.subscriptions.release(("chain", "SPXCondor"))
+            expect(self.subscriptions.refCount("B")).to(equal(1))
+            expect(self.subscriptions.counts()).to(equal({"subscribed": 4, "owned": 2, "pendingRemoval": 1, "removed": 0, "owners": 1}))
+
+    with context('sweep'):
+        with it('removes the contracts left without owners after the grace period'):
+            self.subscriptions.setOwned(("chain", "SPXic"), ["A", "B"])
+            # The window moves: A is released
+            self.subscriptions.setOwned(("chain", "SPXic"), ["B", "C"])
+            advance(self, 9)
+            self.algorithm.RemoveOptionContract.assert_not_called()
+            advance(self, 1)
+            self.algorithm.RemoveOptionContract.assert_called_once_with("A")
+            expect(self.algorithm.optionContractsSubscriptions).to(equal({"B", "C", "D"}))
+            expect(self.subscriptions.counts()["removed"]).to(equal(1))
+
+        with it('keeps the contracts acquired again within the grace period'):
+            self.subscriptions.setOwned(("chain", "SPXic"), ["A"])
+            self.subscriptions.setOwned(("chain", "SPXic"), ["B"])
+            advance(self, 5)
+            self.subscriptions.setOwned(("chain", "SPXic"), ["A"])
+            advance(self, 30)
+            self.algorithm.RemoveOptionContract.assert_called_once_with("B")
+
+        with it('keeps the legs of the open positions and working orders'):
+            self.algorithm.allPositions = {1: create_position(1, "IC-1", ["A", "B"]), 2: create_position(2, "PS-2", ["C"])}
+            self.algorithm.openPositions = {"IC-1": 1}
+            self.algorithm.workingOrders = {"PS-2": SimpleNamespace(orderId=2)}
+            self.subscriptions.setOwned(("chain", "SPXic"), ["A", "B", "C", "D"])
+            self.subscriptions.release(("chain", "SPXic"))
+            advance(self, 30)
+            self.algorithm.RemoveOptionContract.assert_called_once_with("D")
+            # The position is closed: its legs are released
+            self.algorithm.openPositions = {}
+            advance(self, 1)
+            expect(self.subscriptions.refCount("A")).to(equal(0))
+            expect(self.algorithm.RemoveOptionContract.call_count).to(equal(1))
+            advance(self, 10)
+            expect(sorted(call.args[0] for call in self.algorithm.RemoveOptionContract.call_args_list)).to(equal(["A", "B", "D"]))
+
+        with it('does not remove the contracts held in the portfolio'):
+            self.algorithm.Portfolio["A"] = SimpleNamespace(Invested=True)
+            self.subscriptions.setOwned(("chain", "SPXic"), ["A"])
+            self.subscriptions.release(("chain", "SPXic"))
+            advance(self, 30)
+            self.algorithm.RemoveOptionContract.assert_not_called()
+            self.algorithm.Portfolio["A"] = SimpleNamespace(Invested=False)
+            advance(self, 30)
+            self.algorithm.RemoveOptionContract.assert_called_once_with("A")
+
+        with it('only removes the contracts added by the DataHandler'):
+            self.subscriptions.setOwned(("chain", "SPXic"), ["A", "Universe"])
+            self.subscriptions.release(("chain", "SPXic"))
+            advance(self, 30)
+            self.algorithm.RemoveOptionContract.assert_called_once_with("A")
@@ -0,0 +1,118 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true
+from Tests.spec_helper import patch_imports
+import numpy as np
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.Payoff import Payoff
+    from Tests.mocks.algorithm_imports import OptionRight, OptionContract
+
+
+def legPayoff(price, strikes, isCall, sides):
+    # Payoff evaluated leg by leg (same as the previous implementation of Order.getPayoff)
+    return sum(side * max(0.0, (1 if call else -1) * (price - strike)) for strike, call, side in zip(strikes, isCall, sides))
+
+
+with description('Payoff') as self:
+    with before.each:
+        # Iron Condor: [longPut, shortPut, shortCall, longCall]
+        self.condor = Payoff([90.0, 95.0, 105.0, 110.0], [False, False, True, True], [1, -1, -1, 1])
+
+    with context('evaluation'):
+        with it('matches the leg by leg payoff of random positions'):
+            rng = np.random.default_rng(3)
+            for _ in range(50):
+                n = rng.integers(1, 7)
+                strikes = rng.choice([90.0, 95.0, 100.0, 105.0, 110.0], n)
+                isCall = rng.random(n) < 0.5
+                sides = rng.integers(-3, 4, n)
+                payoff = Payoff(strikes, isCall, sides)
+                prices = np.concatenate([[0.0], strikes, rng.uniform(0.0, 200.0, 20)])
+                expected = [legPayoff(price, strikes, isCall, sides) for price in prices]
+                expect(bool(np.allclose(payoff(prices), expected))).to(be_true)
+                expect(bool(abs(payoff(float(prices[-1])) - expected[-1]) < 1e-9)).to(be_true)
+
+        with it('describes the payoff with breakpoints, values and slopes'):
+            expect(self.condor.breakpoints.tolist()).to(equal([90.0, 95.0, 105.0, 110.0]))
+            expect(self.condor.values.tolist()).to(equal([-5.0, 0.0, 0.0, -5.0]))
+            expect(self.condor.slopes.tolist()).to(equal([0.0, 1.0, 0.0, -1.0, 0.0]))
+            expect(self.condor.value0).to(equal(-5.0))
+
+        with it('builds the payoff from the contracts'):
+            contracts = []
+            for strike, right in [(95.0, OptionRight.Put), (105.0, OptionRight.Call)]:
+                contract = OptionContract()
+                contract._strike = strike
+                contract._right = right
+                contracts.append(contract)
+            strangle = Payoff.fromContracts(contracts, [-1, -1])
+            expect(strangle([80.0, 100.0, 120.0]).tolist()).to(equal([-15.0, 0.0, -15.0]))
+
+        with it('handles a position without legs'):
+            empty = Payoff([], [], [])
+            expect(empty(100.0)).to(equal(0.0))
+            expect(empty.maxLoss()).to(equal(0.0))
+            expect(empty.breakevens()).to(equal([]))
+
+    with context('extremes'):
+        with it('computes the exact max loss and max profit'):
+            expect(self.condor.maxLoss(premium=1.5)).to(equal(-3.5))
+            expect(self.condor.maxProfit(premium=1.5)).to(equal(1.5))
+
+        with it('reports the unbounded extremes'):
+            shortCall = Payoff([100.0], [True], [-1])
+            expect(shortCall.minimum()).to(equal(-np.inf))
+            expect(shortCall.maxProfit(premium=2.0)).to(equal(2.0))
+            expect(Payoff([100.0], [True], [1]).maximum()).to(equal(np.inf))
+
+        with it('bounds the extremes with an upper price'):
+            shortCall = Payoff([100.0], [True], [-1])
+            expect(shortCall.maxLoss(upper=1000.0)).to(equal(-900.0))
+            # The extremes are searched within [0, upper] only
+            expect(Payoff([100.0, 200.0], [True, True], [-1, 2]).minimum(upper=150.0)).to(equal(-50.0))
+
+        with it('matches the extremes of a dense grid'):
+            rng = np.random.default_rng(5)
+            grid = np.linspace(0.0, 300.0, 30001)
+            for _ in range(30):
+                n = rng.integers(1, 6)
+                strikes = rng.choice([90.0, 95.0, 100.0, 105.0, 110.0], n)
+                isCall = rng.random(n) < 0.5
+                sides = rng.integers(-2, 3, n)
+                payoff = Payoff(strikes, isCall, sides)
+                values = payoff(grid)
+                expect(bool(abs(payoff.minimum(upper=300.0) - values.min()) < 1e-9)).to(be_true)
+                expect(bool(abs(payoff.maximum(upper=300.0) - values.max()) < 1e-9)).to(be_true)
+
+    with context('several positions'):
+        with it('matches the payoff of each position'):
+            rng = np.random.default_rng(7)
+            isCall = np.array([False, False, True, True])
+            sides = np.array([1, -1, -1, 1])
+            strikes = rng.choice([85.0, 90.0, 95.0, 100.0, 105.0, 110.0], (40, 4))
+            premiums = rng.uniform(-2.0, 4.0, 40)
+            payoffs = Payoff(strikes, isCall, sides)
+            expect(payoffs.breakpoints.shape).to(equal((40, 4)))
+            expect(payoffs(100.0).shape).to(equal((40,)))
+            maxLoss = payoffs.maxLoss(upper=1000.0)
+            maxProfit = payoffs.maxProfit(premiums, upper=1000.0)
+            breakevens = payoffs.breakevens(premiums)
+            for row in range(40):
+                payoff = Payoff(strikes[row], isCall, sides)
+                expect(payoffs(np.array([[0.0, 97.5, 200.0]] * 40))[row].tolist()).to(equal(payoff([0.0, 97.5, 200.0]).tolist()))
+                expect(maxLoss[row]).to(equal(payoff.maxLoss(upper=1000.0)))
+                expect(maxProfit[row]).to(equal(payoff.maxProfit(premiums[row], upper=1000.0)))
+                expect(breakevens[row][~np.isnan(breakevens[row])].tolist()).to(equal(payoff.breakevens(premiums[row])))
+
+    with context('breakevens'):
+        with it('finds the breakevens of an Iron Condor'):
+            expect(self.condor.breakevens(premium=1.5)).to(equal([93.5, 106.5]))
+
+        with it('finds the breakevens on the tails'):
+            straddle = Payoff([100.0, 100.0], [False, True], [1, 1])
+            expect(straddle.breakevens(premium=-4.0)).to(equal([96.0, 104.0]))
+            expect(Payoff([100.0], [True], [-1]).breakevens(premium=2.5)).to(equal([102.5]))
+
+        with it('returns no breakevens when the position is always profitable or losing'):
+            expect(self.condor.breakevens(premium=6.0)).to(equal([]))
+            expect(self.condor.breakevens(premium=-0.5)).to(equal([]))
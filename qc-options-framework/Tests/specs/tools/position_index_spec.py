@@ -0,0 +1,155 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_false
+from Tests.spec_helper import patch_imports
+from types import SimpleNamespace
+import random
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.PositionIndex import PositionIndex
+
+
+def createPosition(orderId, strategyId, expiryStr, legs):
+    # legs: list of (strike, contractSide)
+    return SimpleNamespace(
+        orderId=orderId,
+        strategyId=strategyId,
+        expiryStr=expiryStr,
+        legs=[SimpleNamespace(strike=strike, contractSide=side, symbol=f"{expiryStr} {strike}") for strike, side in legs],
+    )
+
+
+def setEntry(spec, source, orderTag, value):
+    # Same as the places updating the dictionaries of the context (i.e. Alpha.Base.CreateInsights)
+    getattr(spec.context, PositionIndex.SOURCES[source])[orderTag] = value
+    spec.index.update(source, orderTag)
+
+
+def popEntry(spec, source, orderTag):
+    getattr(spec.context, PositionIndex.SOURCES[source]).pop(orderTag, None)
+    spec.index.update(source, orderTag)
+
+
+def bruteForceOneLeg(context, expiryStr, strategyId, strikes, allowMultipleEntriesPerExpiry):
+    # Same checks as the previous implementation of Alpha.Base.hasOneDuplicateLeg
+    for orderId in context.openPositions.values():
+        position = context.allPositions[orderId]
+        if position.expiryStr != expiryStr:
+            continue
+        if not allowMultipleEntriesPerExpiry and position.strategyId == strategyId:
+            return True
+        for leg in position.legs:
+            if leg.strike in strikes:
+                return True
+    return False
+
+
+def bruteForceStructure(context, expiryStr, orderLegs):
+    # Same checks as the previous implementation of Alpha.Base.hasDuplicateLegs (without the strategy check)
+    for orderId in context.openPositions.values():
+        position = context.allPositions[orderId]
+        if position.expiryStr == expiryStr and set((leg.strike, leg.contractSide) for leg in position.legs) == set(orderLegs):
+            return True
+    return False
+
+
+with description('PositionIndex') as self:
+    with before.each:
+        self.context = SimpleNamespace(openPositions={}, workingOrders={}, allPositions={})
+        self.condor = createPosition(1, "IronCondor", "2024-01-19", [(90, 1), (95, -1), (105, -1), (110, 1)])
+        self.context.allPositions[1] = self.condor
+        self.index = PositionIndex.of(self.context)
+
+    with context('of'):
+        with it('creates the index on first use and reuses it'):
+            expect(self.context.positionIndex is self.index).to(be_true)
+            expect(PositionIndex.of(self.context) is self.index).to(be_true)
+
+    with context('open positions'):
+        with it('indexes the positions added to openPositions'):
+            expect(self.index.contains("open", ("expiryStrategy", "2024-01-19", "IronCondor"))).to(be_false)
+            setEntry(self, "open", "IronCondor-1", 1)
+            expect(self.index.contains("open", ("expiryStrategy", "2024-01-19", "IronCondor"))).to(be_true)
+            expect(self.index.contains("open", ("expiryStrike", "2024-01-19", 95))).to(be_true)
+            expect(self.index.contains("open", ("expiryStrike", "2024-02-16", 95))).to(be_false)
+            expect(self.index.contains("open", ("strategyLeg", "IronCondor", 95, -1))).to(be_true)
+            expect(self.index.contains("open", ("strategyLeg", "IronCondor", 95, 1))).to(be_false)
+            expect(self.index.find("open", ("expiryStructure", "2024-01-19", frozenset([(110, 1), (105, -1), (95, -1), (90, 1)])))).to(equal({"IronCondor-1"}))
+
+        with it('drops the positions removed from openPositions'):
+            setEntry(self, "open", "IronCondor-1", 1)
+            expect(len(self.index.find("open", ("expiryStrike", "2024-01-19", 90)))).to(equal(1))
+            popEntry(self, "open", "IronCondor-1")
+            expect(self.index.contains("open", ("expiryStrike", "2024-01-19", 90))).to(be_false)
+            expect(len(self.index)).to(equal(0))
+
+        with it('rebuilds the index when openPositions is replaced'):
+            setEntry(self, "open", "IronCondor-1", 1)
+            expect(self.index.contains("open", ("expiryStrike", "2024-01-19", 90))).to(be_true)
+            self.context.allPositions[2] = createPosition(2, "PutSpread", "2024-02-16", [(4500, -1), (4490, 1)])
+            self.context.openPositions = {"PutSpread-2": 2}
+            expect(self.index.contains("open", ("expiryStrike", "2024-01-19", 90))).to(be_false)
+            expect(self.index.contains("open", ("expiryStrike", "2024-02-16", 4500))).to(be_true)
+
+        with it('retries the positions that are not in allPositions yet'):
+            setEntry(self, "open", "PutSpread-2", 2)
+            expect(self.index.contains("open", ("expiryStrategy", "2024-02-16", "PutSpread"))).to(be_false)
+            self.context.allPositions[2] = createPosition(2, "PutSpread", "2024-02-16", [(4500, -1), (4490, 1)])
+            expect(self.index.contains("open", ("expiryStrategy", "2024-02-16", "PutSpread"))).to(be_true)
+
+    with context('working orders'):
+        with it('indexes the structure of the working orders'):
+            setEntry(self, "working", "IronCondor-1", SimpleNamespace(orderId=1, orderType="open"))
+            legs = frozenset((leg.symbol, leg.contractSide) for leg in self.condor.legs)
+            expect(self.index.contains("working", ("structure", legs))).to(be_true)
+            expect(self.index.contains("open", ("structure", legs))).to(be_false)
+
+        with it('reverses the sides of the closing orders'):
+            setEntry(self, "working", "IronCondor-1", SimpleNamespace(orderId=1, orderType="close"))
+            legs = frozenset((leg.symbol, leg.contractSide) for leg in self.condor.legs)
+            closingLegs = frozenset((leg.symbol, -leg.contractSide) for leg in self.condor.legs)
+            expect(self.index.contains("working", ("structure", legs))).to(be_false)
+            expect(self.index.contains("working", ("structure", closingLegs))).to(be_true)
+
+        with it('indexes the closing order replacing the opening one under the same orderTag'):
+            legs = frozenset((leg.symbol, leg.contractSide) for leg in self.condor.legs)
+            closingLegs = frozenset((leg.symbol, -leg.contractSide) for leg in self.condor.legs)
+            setEntry(self, "working", "IronCondor-1", SimpleNamespace(orderId=1, orderType="open"))
+            expect(self.index.contains("working", ("structure", legs))).to(be_true)
+            # Open order filled (HandleOrderEvents.handleFullyFilledOrder), then close order submitted (Monitor.Base) before the next lookup
+            popEntry(self, "working", "IronCondor-1")
+            setEntry(self, "working", "IronCondor-1", SimpleNamespace(orderId=1, orderType="close"))
+            expect(self.index.contains("working", ("structure", legs))).to(be_false)
+            expect(self.index.contains("working", ("structure", closingLegs))).to(be_true)
+            # Close order filled
+            popEntry(self, "working", "IronCondor-1")
+            expect(self.index.contains("working", ("structure", closingLegs))).to(be_false)
+            expect(len(self.index)).to(equal(0))
+
+    with context('equivalence'):
+        with it('matches the scan of all the open positions'):
+            rng = random.Random(7)
+            expiries = ["2024-01-19", "2024-01-26", "2024-02-02"]
+            strategies = ["PutSpread", "IronCondor"]
+            strikes = [90, 95, 100, 105, 110]
+            for step in range(200):
+                # Open or close a random position
+                if self.context.openPositions and rng.random() < 0.4:
+                    popEntry(self, "open", rng.choice(list(self.context.openPositions)))
+                else:
+                    legs = [(strike, rng.choice([-1, 1])) for strike in rng.sample(strikes, rng.randint(1, 3))]
+                    position = createPosition(step, rng.choice(strategies), rng.choice(expiries), legs)
+                    self.context.allPositions[step] = position
+                    setEntry(self, "open", f"{position.strategyId}-{step}", step)
+
+                expiryStr = rng.choice(expiries)
+                strategyId = rng.choice(strategies)
+                orderLegs = [(strike, rng.choice([-1, 1])) for strike in rng.sample(strikes, rng.randint(1, 3))]
+                for allowMultipleEntriesPerExpiry in [True, False]:
+                    expected = bruteForceOneLeg(self.context, expiryStr, strategyId, [strike for strike, _ in orderLegs], allowMultipleEntriesPerExpiry)
+                    found = (
+                        (not allowMultipleEntriesPerExpiry and self.index.contains("open", ("expiryStrategy", expiryStr, strategyId)))
+                        or any(self.index.contains("open", ("expiryStrike", expiryStr, strike)) for strike, _ in orderLegs)
+                    )
+                    expect(found).to(equal(expected))
+                expected = bruteForceStructure(self.context, expiryStr, orderLegs)
+                expect(self.index.contains("open", ("expiryStructure", expiryStr, frozenset(orderLegs)))).to(equal(expected))
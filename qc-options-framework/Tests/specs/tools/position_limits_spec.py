@@ -0,0 +1,137 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_false, raise_error
+from Tests.spec_helper import patch_imports
+from types import SimpleNamespace
+import random
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.PositionLimits import PositionLimits
+    from Tests.mocks.algorithm_imports import OrderStatus
+
+
+class FakePortfolio(dict):
+    # symbol -> holding (SimpleNamespace(Symbol, Quantity, Invested))
+    @property
+    def Values(self):
+        return list(self.values())
+
+    def __missing__(self, symbol):
+        return SimpleNamespace(Symbol=symbol, Quantity=0, Invested=False)
+
+
+class FakeTransactions:
+    def __init__(self):
+        self.orders = {}
+        self.open = set()
+
+    def GetOpenOrders(self):
+        return [self.orders[orderId] for orderId in self.open]
+
+    def GetOrderById(self, orderId):
+        return self.orders.get(orderId)
+
+
+class FakeAlgorithm:
+    """Minimal broker: orders are submitted, filled (changing the holdings) or canceled, and each step emits an order event."""
+
+    def __init__(self):
+        self.Portfolio = FakePortfolio()
+        self.Transactions = FakeTransactions()
+        self.nextId = 1
+
+    def event(self, orderId, status, symbol):
+        return SimpleNamespace(OrderId=orderId, Status=status, Symbol=symbol)
+
+    def submit(self, tag, symbol, quantity):
+        orderId = self.nextId
+        self.nextId += 1
+        self.Transactions.orders[orderId] = SimpleNamespace(Id=orderId, Tag=tag, Symbol=symbol, Quantity=quantity)
+        self.Transactions.open.add(orderId)
+        return self.event(orderId, OrderStatus.Submitted, symbol)
+
+    def fill(self, orderId, status=OrderStatus.Filled):
+        order = self.Transactions.orders[orderId]
+        if status == OrderStatus.Filled:
+            self.Transactions.open.discard(orderId)
+        quantity = self.Portfolio[order.Symbol].Quantity + order.Quantity
+        if quantity == 0:
+            self.Portfolio.pop(order.Symbol, None)
+        else:
+            self.Portfolio[order.Symbol] = SimpleNamespace(Symbol=order.Symbol, Quantity=quantity, Invested=True)
+        return self.event(orderId, status, order.Symbol)
+
+    def cancel(self, orderId):
+        self.Transactions.open.discard(orderId)
+        return self.event(orderId, OrderStatus.Canceled, self.Transactions.orders[orderId].Symbol)
+
+
+with description('PositionLimits') as self:
+    with before.each:
+        self.algorithm = FakeAlgorithm()
+        self.limits = PositionLimits.of(self.algorithm)
+
+    with context('of'):
+        with it('creates the counters on first use and reuses them'):
+            expect(self.algorithm.positionLimits is self.limits).to(be_true)
+            expect(PositionLimits.of(self.algorithm) is self.limits).to(be_true)
+
+    with context('counters'):
+        with it('starts from a full recount'):
+            self.algorithm.submit("IronCondor-1", "SPX 4500P", -1)
+            self.algorithm.fill(self.algorithm.submit("PutSpread-2", "SPX 4400P", -1).OrderId)
+            expect(self.limits.activePositions()).to(equal(1))
+            expect(self.limits.openOrderCount()).to(equal(1))
+            expect(self.limits.openOrderCount("IronCondor")).to(equal(1))
+            expect(self.limits.openOrderCount("PutSpread")).to(equal(0))
+
+        with it('ignores the events received before the first recount'):
+            self.limits.onOrderEvent(self.algorithm.submit("IronCondor-1", "SPX 4500P", -1))
+            expect(self.limits.invested is None).to(be_true)
+            expect(self.limits.openOrderCount()).to(equal(1))
+
+        with it('follows the order events'):
+            expect(self.limits.activePositions()).to(equal(0))
+            submitted = self.algorithm.submit("IronCondor-1 - Warning: stale price", "SPX 4500P", -1)
+            self.limits.onOrderEvent(submitted)
+            expect(self.limits.openOrderCount("IronCondor")).to(equal(1))
+            self.limits.onOrderEvent(self.algorithm.fill(submitted.OrderId))
+            expect(self.limits.openOrderCount()).to(equal(0))
+            expect(self.limits.activePositions()).to(equal(1))
+            # Closing the position
+            closing = self.algorithm.submit("IronCondor-1", "SPX 4500P", 1)
+            self.limits.onOrderEvent(closing)
+            self.limits.onOrderEvent(self.algorithm.fill(closing.OrderId))
+            expect(self.limits.activePositions()).to(equal(0))
+            # Canceled order
+            canceled = self.algorithm.submit("PutSpread-2", "SPX 4400P", -1)
+            self.limits.onOrderEvent(canceled)
+            expect(self.limits.openOrderCount("PutSpread")).to(equal(1))
+            self.limits.onOrderEvent(self.algorithm.cancel(canceled.OrderId))
+            expect(self.limits.openOrderCount("PutSpread")).to(equal(0))
+
+    with context('self-check'):
+        with it('matches a full recount after any sequence of events'):
+            self.limits.selfCheck = True
+            rng = random.Random(11)
+            symbols = [f"SPX {strike}P" for strike in range(4400, 4600, 25)]
+            self.limits.activePositions()
+            for step in range(500):
+                working = list(self.algorithm.Transactions.open)
+                action = rng.random()
+                if working and action < 0.3:
+                    event = self.algorithm.fill(rng.choice(working), rng.choice([OrderStatus.Filled, OrderStatus.PartiallyFilled]))
+                elif working and action < 0.4:
+                    event = self.algorithm.cancel(rng.choice(working))
+                else:
+                    event = self.algorithm.submit(f"{rng.choice(['IronCondor', 'PutSpread'])}-{step}", rng.choice(symbols), rng.choice([-1, 1]))
+                self.limits.onOrderEvent(event)
+                # Each query compares the counters with the recount
+                self.limits.activePositions()
+                self.limits.openOrderCount()
+
+        with it('detects counters out of sync'):
+            self.limits.selfCheck = True
+            self.limits.activePositions()
+            # Order submitted without notifying the counters
+            self.algorithm.submit("IronCondor-1", "SPX 4500P", -1)
+            expect(lambda: self.limits.openOrderCount()).to(raise_error(RuntimeError))
@@ -7,10 +7,13 @@ from datetime import datetime, date
 import json
 from unittest.mock import MagicMock
 
-from Tools.PositionsStore import PositionsStore, PositionEncoder, PositionDecoder
-from Tests.mocks.algorithm_imports import Symbol, OptionContract
-from Tests.mocks.tools_mocks import MockContext, MockObjectStore
-from Strategy.Position import Position, Leg, OrderType, WorkingOrder
+from Tests.spec_helper import patch_imports
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.PositionsStore import PositionsStore, PositionEncoder, PositionDecoder
+    from Tests.mocks.algorithm_imports import Symbol, OptionContract
+    from Tests.mocks.tools_mocks import MockContext, MockObjectStore
+    from Strategy.Position import Position, Leg, OrderType, WorkingOrder
 
 with description('PositionsStore') as self:
     with before.each:
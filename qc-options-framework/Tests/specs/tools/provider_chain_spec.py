@@ -0,0 +1,74 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true, be_none
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+import random
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.ProviderChain import ProviderChain, ExpiryContracts
+
+
+def create_symbol(expiry, strike):
+    return SimpleNamespace(ID=SimpleNamespace(Date=expiry, StrikePrice=strike))
+
+
+def previousSelection(symbols, price, minRank, maxRank):
+    # Same as the previous strike selection of DataHandler.optionChainProviderFilter
+    atm_strike = sorted(symbols, key=lambda x: abs(x.ID.StrikePrice - price))[0].ID.StrikePrice
+    strike_list = sorted(set([i.ID.StrikePrice for i in symbols]))
+    atm_index = strike_list.index(atm_strike)
+    min_strike = strike_list[max(0, atm_index + minRank)]
+    max_strike = strike_list[min(len(strike_list) - 1, atm_index + maxRank)]
+    return [symbol for symbol in symbols if min_strike <= symbol.ID.StrikePrice <= max_strike]
+
+
+with description('ProviderChain') as self:
+    with before.each:
+        self.today = datetime(2024, 1, 8)
+        rng = random.Random(5)
+        self.expiries = [self.today + timedelta(days=days) for days in [0, 1, 2, 7, 30]]
+        self.symbols = [create_symbol(expiry, strike) for expiry in self.expiries for strike in range(4800, 5200, 5)]
+        rng.shuffle(self.symbols)
+        self.chain = ProviderChain(self.symbols)
+
+    with context('buckets'):
+        with it('buckets the contracts by expiry with sorted strikes'):
+            expect(self.chain.expiries).to(equal(self.expiries))
+            for expiry in self.expiries:
+                contracts = self.chain.contracts[expiry]
+                expect(contracts.strikes).to(equal(sorted(contracts.strikes)))
+                expect(contracts.providerOrder()).to(equal([symbol for symbol in self.symbols if symbol.ID.Date == expiry]))
+
+        with it('selects the expiries within a DTE range'):
+            expect(self.chain.expiriesWithin(self.today.date(), 1, 7)).to(equal(self.expiries[1:4]))
+            expect(self.chain.expiriesWithin(self.today.date(), 8, 29)).to(equal([]))
+
+    with context('strike selection'):
+        with it('matches the previous selection (including the ties and the provider order)'):
+            rng = random.Random(7)
+            for _ in range(300):
+                # Duplicate strikes and prices exactly between two strikes
+                symbols = [create_symbol(self.today, rng.choice(range(90, 111)) * 5.0) for _ in range(rng.randint(1, 40))]
+                contracts = ExpiryContracts([(symbol.ID.StrikePrice, position, symbol) for position, symbol in enumerate(symbols)])
+                price = rng.choice([rng.uniform(440.0, 560.0), rng.choice(range(90, 111)) * 5.0 + 2.5])
+                minRank, maxRank = -rng.randint(0, 5), rng.randint(0, 5)
+                expect(contracts.strikeRange(price, minRank, maxRank)).to(equal(previousSelection(symbols, price, minRank, maxRank)))
+
+        with it('returns None without contracts'):
+            expect(ExpiryContracts([]).strikeRange(100.0, -1, 1)).to(be_none)
+
+    with context('of'):
+        with it('queries the provider once per day'):
+            algorithm = SimpleNamespace(Time=self.today.replace(hour=9, minute=31), OptionChainProvider=MagicMock())
+            algorithm.OptionChainProvider.GetOptionContractList = MagicMock(return_value=self.symbols)
+            chain = ProviderChain.of(algorithm, "?SPXW")
+            for minute in range(389):
+                algorithm.Time += timedelta(minutes=1)
+                expect(ProviderChain.of(algorithm, "?SPXW") is chain).to(be_true)
+            expect(algorithm.OptionChainProvider.GetOptionContractList.call_count).to(equal(1))
+            algorithm.Time += timedelta(days=1)
+            ProviderChain.of(algorithm, "?SPXW")
+            ProviderChain.of(algorithm, "?SPY")
+            expect(algorithm.OptionChainProvider.GetOptionContractList.call_count).to(equal(3))
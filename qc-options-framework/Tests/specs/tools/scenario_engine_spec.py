@@ -0,0 +1,72 @@
+from mamba import description, context, it, before
+from expects import expect, equal, be_true
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+from datetime import timedelta
+import numpy as np
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.BSMLibrary import BSM
+    from Tools.ScenarioEngine import ScenarioEngine
+    from Tests.mocks.algorithm_imports import OptionRight, OptionContract
+
+
+def create_contract(algorithm, strike, right, days):
+    contract = OptionContract()
+    contract._strike = strike
+    contract._right = right
+    contract._expiry = algorithm.Time + timedelta(days=days)
+    return contract
+
+
+with description('ScenarioEngine') as self:
+    with before.each:
+        with patch_imports()[0], patch_imports()[1]:
+            self.algorithm = Factory.create_algorithm()
+            self.algorithm.executionTimer = MagicMock()
+            self.bsm = BSM(self.algorithm)
+            BSM.greeksCache.clear()
+            self.engine = ScenarioEngine(self.bsm)
+            # Iron Condor with different IVs on each leg
+            self.contracts = [
+                create_contract(self.algorithm, 85.0, OptionRight.Put, 30),
+                create_contract(self.algorithm, 90.0, OptionRight.Put, 30),
+                create_contract(self.algorithm, 110.0, OptionRight.Call, 30),
+                create_contract(self.algorithm, 115.0, OptionRight.Call, 30),
+            ]
+            self.sides = [1, -1, -1, 1]
+            self.IVs = {contract.Symbol: IV for contract, IV in zip(self.contracts, [0.28, 0.25, 0.18, 0.17])}
+            self.bsm.contractIV = lambda contract: self.IVs[contract.Symbol]
+
+    def scalarValue(self, spotPrice, volShift=0.0, atTime=None, openPremium=0.0):
+        # Reference: same as Order.fValue with scalar bsmPrice calls
+        return openPremium + sum(
+            side * self.bsm.bsmPrice(contract, sigma=max(0.0, self.IVs[contract.Symbol] + volShift), spotPrice=spotPrice, atTime=atTime)
+            for contract, side in zip(self.contracts, self.sides)
+        )
+
+    with context('pnl'):
+        with it('returns the full grid of scenarios'):
+            with patch_imports()[0], patch_imports()[1]:
+                grid = self.engine.pnl(self.contracts, self.sides, spotShifts=np.linspace(-0.2, 0.2, 41), volShifts=[-0.05, 0.0, 0.05, 0.1, 0.2], timeOffsets=[timedelta(0), timedelta(days=7)], spotPrice=100.0)
+                expect(grid.shape).to(equal((41, 5, 2)))
+
+        with it('matches the scalar valuation in every scenario'):
+            with patch_imports()[0], patch_imports()[1]:
+                spotShifts = [-0.12, -0.05, 0.0, 0.03, 0.12]
+                volShifts = [-0.3, 0.0, 0.05]
+                timeOffsets = [timedelta(0), timedelta(days=10), timedelta(days=40)]
+                grid = self.engine.pnl(self.contracts, self.sides, openPremium=1.5, spotShifts=spotShifts, volShifts=volShifts, timeOffsets=timeOffsets, spotPrice=100.0)
+                for i, spotShift in enumerate(spotShifts):
+                    for j, volShift in enumerate(volShifts):
+                        for k, offset in enumerate(timeOffsets):
+                            expected = self.scalarValue(100.0 * (1 + spotShift), volShift=volShift, atTime=self.algorithm.Time + offset, openPremium=1.5)
+                            expect(bool(abs(grid[i, j, k] - expected) < 1e-10)).to(be_true)
+
+        with it('defaults to the current spot price and time'):
+            with patch_imports()[0], patch_imports()[1]:
+                grid = self.engine.pnl(self.contracts, self.sides, openPremium=-2.0)
+                expect(grid.shape).to(equal((1, 1, 1)))
+                spotPrice = self.bsm.contractUtils.getUnderlyingLastPrice(self.contracts[0])
+                expect(bool(abs(grid[0, 0, 0] - self.scalarValue(spotPrice, openPremium=-2.0)) < 1e-10)).to(be_true)
@@ -0,0 +1,67 @@
+from mamba import description, context, it
+from expects import expect, equal, be_true, be_a
+from Tests.spec_helper import patch_imports
+import math
+import numpy as np
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.StandardNormal import StandardNormal
+
+
+def maxRelativeError(values, expected):
+    values, expected = np.asarray(values), np.asarray(expected)
+    return float(np.max(np.abs(values - expected) / np.abs(expected)))
+
+
+with description('StandardNormal') as self:
+    with context('erfc'):
+        with it('matches math.erfc on small arrays'):
+            x = np.linspace(-6.0, 6.0, 101)
+            expected = [math.erfc(v) for v in x]
+            expect(maxRelativeError(StandardNormal.erfc(x), expected) < 1e-15).to(be_true)
+
+        with it('matches math.erfc with the vectorized approximation, also in the tails'):
+            x = np.linspace(-26.0, 26.0, 20001)
+            expected = [math.erfc(v) for v in x]
+            expect(x.size >= StandardNormal.VECTORIZED_MIN_SIZE).to(be_true)
+            expect(maxRelativeError(StandardNormal.erfc(x), expected) < 5e-15).to(be_true)
+
+        with it('handles infinite and missing values'):
+            x = np.concatenate([[np.inf, -np.inf, np.nan, 40.0], np.zeros(StandardNormal.VECTORIZED_MIN_SIZE)])
+            result = StandardNormal.erfc(x)
+            expect(result[:2].tolist()).to(equal([0.0, 2.0]))
+            expect(bool(np.isnan(result[2]))).to(be_true)
+            expect(result[3]).to(equal(0.0))
+
+    with context('cdf and pdf'):
+        with it('returns floats for scalar inputs'):
+            expect(StandardNormal.cdf(0.0)).to(equal(0.5))
+            expect(StandardNormal.cdf(np.float64(1.0))).to(be_a(float))
+            expect(StandardNormal.pdf(0.0)).to(equal(1.0 / math.sqrt(2.0 * math.pi)))
+
+        with it('keeps the shape of array inputs'):
+            x = np.array([[-1.0, 0.0], [1.0, 2.0]])
+            expect(StandardNormal.cdf(x).shape).to(equal((2, 2)))
+            expect(StandardNormal.pdf(x).shape).to(equal((2, 2)))
+
+        with it('evaluates arrays as the scalar inputs'):
+            x = np.linspace(-10.0, 10.0, 401)
+            expect(maxRelativeError(StandardNormal.cdf(x), [StandardNormal.cdf(float(v)) for v in x]) < 1e-15).to(be_true)
+            expect(maxRelativeError(StandardNormal.pdf(x), [StandardNormal.pdf(float(v)) for v in x]) < 1e-15).to(be_true)
+
+    with context('ppf'):
+        with it('inverts the cdf'):
+            # The upper tail is limited by the resolution of the probabilities close to 1
+            x = np.linspace(-8.0, 5.0, 261)
+            p = StandardNormal.cdf(x)
+            expect(float(np.max(np.abs(StandardNormal.ppf(p) - x))) < 1e-9).to(be_true)
+            expect(float(max(abs(StandardNormal.ppf(float(pi)) - xi) for pi, xi in zip(p, x))) < 1e-9).to(be_true)
+
+        with it('inverts the cdf deep in the lower tail'):
+            x = np.array([-37.0, -20.0, -10.0])
+            expect(maxRelativeError(StandardNormal.ppf(StandardNormal.cdf(x)), x) < 1e-12).to(be_true)
+
+        with it('returns the limits outside of (0, 1)'):
+            expect(StandardNormal.ppf(np.array([0.0, 1.0])).tolist()).to(equal([-np.inf, np.inf]))
+            expect(StandardNormal.ppf(0.0)).to(equal(-math.inf))
+            expect(math.isnan(StandardNormal.ppf(1.5))).to(be_true)
@@ -0,0 +1,161 @@
+from mamba import description, context, it, before, after
+from expects import expect, equal, be_none, be_true, be_false
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+from datetime import timedelta
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.TimeMemo import TimeMemo, timeMemoized
+    from Tools.ContractUtils import ContractUtils
+    from Tools.ChainSnapshot import ChainSnapshot
+    from Order.OrderBuilder import OrderBuilder
+    from Tests.mocks.algorithm_imports import OptionRight, OptionContract
+
+
+class Counter:
+    def __init__(self, context):
+        self.context = context
+        self.calls = 0
+
+    @timeMemoized(lambda self, value, skip=False: None if skip else value)
+    def square(self, value, skip=False):
+        self.calls += 1
+        return value * value
+
+    @timeMemoized(lambda self, size: size)
+    def items(self, size):
+        self.calls += 1
+        return list(range(size))
+
+
+with description('TimeMemo') as self:
+    with before.each:
+        with patch_imports()[0], patch_imports()[1]:
+            self.algorithm = Factory.create_algorithm()
+            self.algorithm.executionTimer = MagicMock()
+            self.algorithm.timeMemoization = True
+
+    with context('of'):
+        with it('creates the memo on first use and reuses it'):
+            memo = TimeMemo.of(self.algorithm)
+            expect(self.algorithm.timeMemo is memo).to(be_true)
+            expect(TimeMemo.of(self.algorithm) is memo).to(be_true)
+
+    with context('lookup'):
+        with it('computes each key once per time and tracks the hit rate'):
+            memo = TimeMemo()
+            compute = MagicMock(return_value=42)
+            for _ in range(3):
+                expect(memo.lookup(1, "f", ("a",), compute)).to(equal(42))
+            memo.lookup(1, "f", ("b",), compute)
+            expect(compute.call_count).to(equal(2))
+            expect(memo.stats()).to(equal({"f": {"hits": 2, "misses": 2, "hitRate": 0.5}}))
+
+        with it('invalidates the results when the time advances'):
+            memo = TimeMemo()
+            memo.lookup(1, "f", 1, lambda: "old")
+            expect(memo.lookup(2, "f", 1, lambda: "new")).to(equal("new"))
+            expect(len(memo)).to(equal(1))
+            expect(memo.stats()["f"]["hits"]).to(equal(0))
+
+    with context('timeMemoized'):
+        with it('memoizes the calls within the same time'):
+            counter = Counter(self.algorithm)
+            expect(counter.square(3)).to(equal(9))
+            expect(counter.square(3)).to(equal(9))
+            expect(counter.calls).to(equal(1))
+            self.algorithm.Time = self.algorithm.Time + timedelta(minutes=1)
+            counter.square(3)
+            expect(counter.calls).to(equal(2))
+
+        with it('is disabled unless context.timeMemoization is True'):
+            for value in [False, MagicMock()]:
+                self.algorithm.timeMemoization = value
+                counter = Counter(self.algorithm)
+                counter.square(3)
+                counter.square(3)
+                expect(counter.calls).to(equal(2))
+
+        with it('does not share the results between algorithms at the same time'):
+            with patch_imports()[0], patch_imports()[1]:
+                other = Factory.create_algorithm()
+            other.timeMemoization = True
+            other.Time = self.algorithm.Time
+            counter = Counter(self.algorithm)
+            otherCounter = Counter(other)
+            counter.square(3)
+            otherCounter.square(3)
+            expect(counter.calls).to(equal(1))
+            expect(otherCounter.calls).to(equal(1))
+            expect(TimeMemo.of(self.algorithm) is TimeMemo.of(other)).to(be_false)
+
+        with it('skips the calls without a key'):
+            counter = Counter(self.algorithm)
+            counter.square(3, skip=True)
+            counter.square(3, skip=True)
+            expect(counter.calls).to(equal(2))
+
+        with it('returns a copy of the list results'):
+            counter = Counter(self.algorithm)
+            counter.items(3).append(10)
+            expect(counter.items(3)).to(equal([0, 1, 2]))
+            expect(counter.calls).to(equal(1))
+
+    with context('ContractUtils'):
+        with it('memoizes the price queries by symbol'):
+            with patch_imports()[0], patch_imports()[1]:
+                contractUtils = ContractUtils(self.algorithm)
+                contract = OptionContract()
+                contract.symbol.Value = "TEST 100 C"
+                expect(contractUtils.midPrice(contract)).to(equal(1.0))
+                # The quote is not read again within the same time bar
+                contract._bid_price = 2.0
+                expect(contractUtils.midPrice(contract)).to(equal(1.0))
+                expect(ContractUtils(self.algorithm).midPrice(contract)).to(equal(1.0))
+                stats = TimeMemo.of(self.algorithm).stats()[ContractUtils.midPrice.__qualname__]
+                expect(stats).to(equal({"hits": 2, "misses": 1, "hitRate": 2/3}))
+                self.algorithm.Time = self.algorithm.Time + timedelta(minutes=1)
+                expect(contractUtils.midPrice(contract)).to(equal(1.525))
+
+        with it('does not memoize the fallback on contracts missing from the Securities'):
+            with patch_imports()[0], patch_imports()[1]:
+                contractUtils = ContractUtils(self.algorithm)
+                self.algorithm.Securities = {}
+                contract = OptionContract()
+                contract._underlying_last_price = 150.0
+                expect(contractUtils.getUnderlyingLastPrice(contract)).to(equal(150.0))
+                expect(contractUtils.getSecurity(contract) is contract).to(be_true)
+                # Another object with the same symbol is not served the first one
+                other = OptionContract()
+                other.symbol = contract.symbol
+                other._underlying_last_price = 160.0
+                expect(contractUtils.getUnderlyingLastPrice(other)).to(equal(160.0))
+                expect(contractUtils.getSecurity(other) is other).to(be_true)
+                expect(len(TimeMemo.of(self.algorithm))).to(equal(0))
+
+    with context('OrderBuilder'):
+        with before.each:
+            with patch_imports()[0], patch_imports()[1]:
+                self.algorithm.riskFreeRate = 0.02
+                self.builder = OrderBuilder(self.algorithm)
+                self.contracts = []
+                for strike in [95.0, 100.0, 105.0]:
+                    contract = OptionContract()
+                    contract._strike = strike
+                    contract._right = OptionRight.Put
+                    contract.IsTradable = True
+                    contract.symbol.Value = f"TEST {strike} P"
+                    self.contracts.append(contract)
+
+        with it('memoizes the lookups on a ChainSnapshot only'):
+            with patch_imports()[0], patch_imports()[1]:
+                snapshot = ChainSnapshot(self.algorithm, self.contracts, spotPrice=101.0)
+                expect(self.builder.getATMStrike(snapshot)).to(equal(100.0))
+                expect(self.builder.getATMStrike(snapshot)).to(equal(100.0))
+                expect(self.builder.getPuts(snapshot, toStrike=100.0)).to(equal(self.contracts[1::-1]))
+                expect(self.builder.getPuts(snapshot, toStrike=100.0)).to(equal(self.contracts[1::-1]))
+                expect(TimeMemo.of(self.algorithm).stats()[OrderBuilder.getATMStrike.__qualname__]["hits"]).to(equal(1))
+                expect(TimeMemo.of(self.algorithm).stats()[OrderBuilder.getContracts.__qualname__]["hits"]).to(equal(1))
+                self.builder.getContracts(self.contracts, type="put")
+                expect(TimeMemo.of(self.algorithm).stats()[OrderBuilder.getContracts.__qualname__]["misses"]).to(equal(1))
@@ -0,0 +1,144 @@
+from mamba import description, context, it, before, after
+from expects import expect, equal, be_true, be_none, be, be_within
+from unittest.mock import MagicMock
+from Tests.spec_helper import patch_imports
+from Tests.factories import Factory
+from datetime import datetime, timedelta
+import numpy as np
+
+with patch_imports()[0], patch_imports()[1]:
+    from Tools.BSMLibrary import BSM
+    from Tools.VolatilitySmile import VolatilitySmile, VolatilitySmiles
+    from Tests.mocks.algorithm_imports import OptionRight, OptionContract
+
+
+def smileIV(strike, spot=100.0):
+    moneyness = np.log(strike / spot)
+    return 0.2 - 0.5 * moneyness + 2.0 * moneyness**2
+
+
+def create_chain(bsm, algorithm, spot=100.0, days=30):
+    # Quoted chain (Puts and Calls) priced with a known smile
+    contracts = []
+    expiry = algorithm.Time + timedelta(days=days)
+    for strike in np.arange(80.0, 121.0, 2.5):
+        for right in [OptionRight.Put, OptionRight.Call]:
+            contract = OptionContract()
+            contract._strike = float(strike)
+            contract._right = right
+            contract._expiry = expiry
+            price = bsm.bsmPrice(contract, smileIV(strike), spotPrice=spot)
+            contract._bid_price = price
+            contract._ask_price = price
+            contracts.append(contract)
+    return contracts
+
+
+with description('VolatilitySmile') as self:
+    with before.each:
+        with patch_imports()[0], patch_imports()[1]:
+            self.algorithm = Factory.create_algorithm()
+            self.algorithm.executionTimer = MagicMock()
+            self.bsm = BSM(self.algorithm)
+            self.bsm.contractUtils.midPrice = lambda contract: 0.5 * (contract.BidPrice + contract.AskPrice)
+            BSM.greeksCache.clear()
+
+    with context('fit'):
+        with it('goes through the quotes and exposes the residuals'):
+            strikes = np.array([90.0, 95.0, 100.0, 105.0, 110.0])
+            smile = VolatilitySmile(strikes, smileIV(strikes), forward=100.0, tau=0.1)
+            expect(smile.residuals.shape).to(equal((5,)))
+            expect(float(np.max(np.abs(smile.residuals))) < 1e-4).to(be_true)
+            expect(smile.rmse < 1e-4).to(be_true)
+            expect(smile.atmIV).to(be_within(0.2 - 1e-4, 0.2 + 1e-4))
+
+        with it('does not overshoot between the quotes'):
+            strikes = np.array([90.0, 95.0, 100.0, 105.0, 110.0])
+            IVs = np.array([0.30, 0.30, 0.20, 0.18, 0.18])
+            smile = VolatilitySmile(strikes, IVs, forward=100.0, tau=0.1)
+            values = smile.iv(np.linspace(90.0, 110.0, 401))
+            expect(bool(np.all(np.diff(values) <= 1e-12))).to(be_true)
+            expect(bool(values.max() <= 0.30 + 1e-12 and values.min() >= 0.18 - 1e-12)).to(be_true)
+
+        with it('extrapolates flat outside of the quotes'):
+            smile = VolatilitySmile([95.0, 100.0, 105.0], [0.25, 0.2, 0.22], forward=100.0, tau=0.1)
+            expect(smile.iv(50.0)).to(equal(smile.iv(95.0)))
+            expect(smile.iv(500.0)).to(equal(smile.iv(105.0)))
+
+        with it('averages the IVs of the same strike and handles a single quote'):
+            smile = VolatilitySmile([100.0, 100.0], [0.2, 0.3], forward=100.0, tau=0.1)
+            expect(smile.iv(120.0)).to(be_within(0.25 - 1e-12, 0.25 + 1e-12))
+            expect(smile.iv(np.array([90.0, 110.0])).tolist()).to(equal([smile.iv(90.0), smile.iv(110.0)]))
+
+    with context('fromContracts'):
+        with it('fits the smile from the liquid OTM quotes of the chain'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = create_chain(self.bsm, self.algorithm)
+                smile = VolatilitySmile.fromContracts(self.bsm, contracts, minPrice=0.05)
+                expect(smile.time).to(equal(self.algorithm.Time))
+                # Only one IV per strike (OTM side)
+                expect(len(smile.strikes)).to(equal(len(set(smile.strikes.tolist()))))
+                expect(bool(np.all(smile.strikes >= 80.0))).to(be_true)
+                # Accurate within the range of the liquid quotes
+                strikes = np.linspace(smile.strikes.min(), smile.strikes.max(), 61)
+                expect(float(np.max(np.abs(smile.iv(strikes) - smileIV(strikes)))) < 1e-3).to(be_true)
+
+        with it('returns None if there are no usable quotes'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = create_chain(self.bsm, self.algorithm)
+                expect(VolatilitySmile.fromContracts(self.bsm, contracts, minPrice=1e6)).to(be_none)
+                expect(VolatilitySmile.fromContracts(self.bsm, [])).to(be_none)
+
+    with context('BSM.volatilitySmile'):
+        with it('fits the smile only once per time bar'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = create_chain(self.bsm, self.algorithm)
+                smile = self.bsm.volatilitySmile(contracts)
+                other = BSM(self.algorithm)
+                expect(other.volatilitySmile(contracts)).to(be(smile))
+                self.algorithm.Time = self.algorithm.Time + timedelta(minutes=1)
+                newSmile = self.bsm.volatilitySmile(contracts)
+                expect(newSmile is smile).to(equal(False))
+                expect(len(VolatilitySmiles.of(self.algorithm))).to(equal(1))
+
+        with it('does not retry a failed fit within the time bar'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = create_chain(self.bsm, self.algorithm)
+                self.bsm.smileMinPrice = 1e6
+                self.bsm.computeChainGreeks = MagicMock(side_effect=self.bsm.computeChainGreeks)
+                expect(self.bsm.volatilitySmile(contracts)).to(be_none)
+                expect(self.bsm.volatilitySmile(contracts)).to(be_none)
+                expect(self.bsm.fittedSmile(contracts[0])).to(be_none)
+                expect(self.bsm.computeChainGreeks.call_count).to(equal(0))
+
+        with it('keeps the European and American smiles apart'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = create_chain(self.bsm, self.algorithm)
+                smile = self.bsm.volatilitySmile(contracts)
+                american = BSM(self.algorithm, exerciseStyle="american")
+                american.contractUtils.midPrice = self.bsm.contractUtils.midPrice
+                expect(american.fittedSmile(contracts[0])).to(be_none)
+                americanSmile = american.volatilitySmile(contracts)
+                expect(americanSmile is smile).to(equal(False))
+                expect(self.bsm.fittedSmile(contracts[0])).to(be(smile))
+                expect(american.fittedSmile(contracts[0])).to(be(americanSmile))
+
+        with it('does not share the smiles between algorithms'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = create_chain(self.bsm, self.algorithm)
+                self.bsm.volatilitySmile(contracts)
+                other = Factory.create_algorithm()
+                other.executionTimer = MagicMock()
+                other.Time = self.algorithm.Time
+                otherBSM = BSM(other)
+                expect(otherBSM.fittedSmile(contracts[0])).to(be_none)
+                expect(VolatilitySmiles.of(other) is VolatilitySmiles.of(self.algorithm)).to(equal(False))
+
+        with it('is used by contractIV'):
+            with patch_imports()[0], patch_imports()[1]:
+                contracts = create_chain(self.bsm, self.algorithm)
+                smile = self.bsm.volatilitySmile(contracts)
+                self.bsm.bsmIV = MagicMock()
+                contract = contracts[7]
+                expect(self.bsm.contractIV(contract)).to(equal(smile.iv(contract.Strike)))
+                expect(self.bsm.bsmIV.called).to(equal(False))
@@ -0,0 +1,149 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import numpy as np
+from Tools.StandardNormal import StandardNormal as norm
+
+
+class AmericanPricer:
+    """
+    Vectorized Barone-Adesi-Whaley (1987) quadratic approximation of the price of American options (no dividends).
+
+    Without dividends an American Call is never exercised early, so it is worth as much as the European Call. An American Put
+    is worth the European Put plus an early exercise premium, A * (S/S*)^q, above the critical price S* (below S* the Put is
+    exercised and worth its intrinsic value). The critical prices of all the contracts are found at once with a vectorized
+    Newton iteration, so a whole chain is priced with a handful of NumPy operations.
+
+    The Greeks are computed with central finite differences of the (smooth) approximation.
+
+    Attributes:
+        tradingDays (float): Number of days per year (Theta is returned as a daily value, same as the BSM methods).
+        maxIter (int): Maximum number of Newton iterations used to find the critical prices.
+        tolerance (float): Relative tolerance of the critical prices.
+    """
+
+    # Relative bumps of the finite differences
+    SPOT_BUMP = 1e-3
+    VOL_BUMP = 1e-3
+    RATE_BUMP = 1e-4
+
+    def __init__(self, tradingDays = 365.0, maxIter = 50, tolerance = 1e-10):
+        self.tradingDays = tradingDays
+        self.maxIter = maxIter
+        self.tolerance = tolerance
+
+    @staticmethod
+    def flatten(spotPrice, strike, tau, sigma, isCall, ir):
+        # Broadcast all the inputs to the same shape and flatten them
+        arrays = np.broadcast_arrays(
+            np.asarray(spotPrice, dtype = float)
+            , np.asarray(strike, dtype = float)
+            , np.asarray(tau, dtype = float)
+            , np.asarray(sigma, dtype = float)
+            , np.asarray(isCall, dtype = bool)
+            , np.asarray(ir, dtype = float)
+        )
+        return arrays[0].shape, [array.ravel() for array in arrays]
+
+    @staticmethod
+    def europeanPut(spotPrice, strike, sigmaSqrtTau, discount, d1):
+        return strike*discount*norm.cdf(sigmaSqrtTau - d1) - spotPrice*norm.cdf(-d1)
+
+    def putPremium(self, spotPrice, strike, tau, sigma, ir):
+        """
+        Early exercise premium of American Puts (1-d arrays with tau > 0, sigma > 0 and ir > 0).
+
+        Returns:
+            tuple: Price of the American Puts and their critical prices.
+        """
+        sigmaSqrtTau = sigma*np.sqrt(tau)
+        discount = np.exp(-ir*tau)
+        M = 2.0*ir/(sigma*sigma)
+        # q1 < 0 is the negative root of the characteristic equation of the Put (cost of carry = r, N = M)
+        q1 = 0.5*(-(M - 1.0) - np.sqrt((M - 1.0)**2 + 4.0*M/(1.0 - discount)))
+
+        def d1(S, idx = slice(None)):
+            return (np.log(S/strike[idx]) + (ir[idx] + 0.5*sigma[idx]**2)*tau[idx])/sigmaSqrtTau[idx]
+
+        # Seed of the critical price (Barone-Adesi and Whaley): interpolate between the strike and the perpetual critical price
+        qInf = 0.5*(-(M - 1.0) - np.sqrt((M - 1.0)**2 + 4.0*M))
+        sInf = strike/(1.0 - 1.0/qInf)
+        h = (ir*tau + 2.0*sigmaSqrtTau)*strike/(strike - sInf)
+        critical = sInf + (strike - sInf)*np.exp(h)
+
+        # Newton iteration on g(S) = K - S - P(S) + (1 - N(-d1(S)))*S/q1
+        active = np.arange(critical.size)
+        for _ in range(self.maxIter):
+            if active.size == 0:
+                break
+            S, K, q, x = critical[active], strike[active], q1[active], d1(critical[active], active)
+            nd1 = norm.cdf(-x)
+            g = K - S - self.europeanPut(S, K, sigmaSqrtTau[active], discount[active], x) + (1.0 - nd1)*S/q
+            gPrime = -1.0 + nd1 + ((1.0 - nd1) + norm.pdf(x)/sigmaSqrtTau[active])/q
+            # The critical price is between 0 and the strike
+            newS = np.clip(S - g/gPrime, 1e-8*K, K)
+            critical[active] = newS
+            active = active[np.abs(newS - S) > self.tolerance*K]
+
+        x = d1(critical)
+        A = -(critical/q1)*(1.0 - norm.cdf(-x))
+        price = self.europeanPut(spotPrice, strike, sigmaSqrtTau, discount, d1(spotPrice)) + A*(spotPrice/critical)**q1
+        # Below the critical price the Put is exercised immediately
+        price = np.where(spotPrice > critical, price, strike - spotPrice)
+        return price, critical
+
+    def price(self, spotPrice, strike, tau, sigma, isCall, ir):
+        """Price of American options (all the inputs are broadcast together)."""
+        shape, (spotPrice, strike, tau, sigma, isCall, ir) = self.flatten(spotPrice, strike, tau, sigma, isCall, ir)
+        sign = np.where(isCall, 1.0, -1.0)
+        intrinsic = np.maximum(sign*(spotPrice - strike), 0.0)
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            # European price (edge cases: expired contracts or volatility not available -> d1 = +/-Inf)
+            sigmaSqrtTau = sigma*np.sqrt(tau)
+            edge = (tau == 0) | (sigma == 0)
+            d1 = np.where(edge
+                          , np.where(intrinsic > 0, sign*np.inf, -sign*np.inf)
+                          , (np.log(spotPrice/strike) + (ir + 0.5*sigma**2)*tau)/sigmaSqrtTau
+                          )
+            price = sign*(norm.cdf(sign*d1)*spotPrice - norm.cdf(sign*(d1 - sigmaSqrtTau))*strike*np.exp(-ir*tau))
+            # Early exercise premium of the Puts (only worth something with a positive interest rate)
+            early = ~isCall & ~edge & (ir > 0)
+            if early.any():
+                price[early] = self.putPremium(spotPrice[early], strike[early], tau[early], sigma[early], ir[early])[0]
+        # An American option is worth at least its intrinsic value
+        return np.maximum(price, intrinsic).reshape(shape)
+
+    def greeks(self, spotPrice, strike, tau, sigma, isCall, ir):
+        """
+        Price and Greeks of American options (all the inputs are broadcast together), using central finite differences.
+
+        Returns:
+            dict: Arrays of price, delta, gamma, vega, theta (daily), rho and vomma. Rho follows the convention of BSM.bsmRho (r * dV/dr).
+        """
+        shape, (spotPrice, strike, tau, sigma, isCall, ir) = self.flatten(spotPrice, strike, tau, sigma, isCall, ir)
+
+        def value(S = spotPrice, T = tau, vol = sigma, r = ir):
+            return self.price(S, strike, T, vol, isCall, r)
+
+        price = value()
+        # Delta and Gamma
+        dS = self.SPOT_BUMP*spotPrice
+        up, down = value(S = spotPrice + dS), value(S = spotPrice - dS)
+        delta = (up - down)/(2.0*dS)
+        gamma = (up - 2.0*price + down)/(dS*dS)
+        # Vega and Vomma (the volatility is only bumped down within its range)
+        dVol = np.maximum(self.VOL_BUMP*sigma, 1e-6)
+        up, down = value(vol = sigma + dVol), value(vol = np.maximum(sigma - dVol, 0.0))
+        vega = (up - down)/(2.0*dVol)
+        vomma = (up - 2.0*price + down)/(dVol*dVol)
+        # Theta (daily): change of value after one day (or half of the remaining time to expiration)
+        dT = np.minimum(1.0/self.tradingDays, 0.5*tau)
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            theta = np.where(dT > 0, (value(T = tau - dT) - price)/dT, 0.0)/self.tradingDays
+        # Rho (same convention as BSM.bsmRho: r * dV/dr)
+        dR = self.RATE_BUMP
+        rho = ir*(value(r = ir + dR) - value(r = ir - dR))/(2.0*dR)
+
+        greeks = {"price": price, "delta": delta, "gamma": gamma, "vega": vega, "theta": theta, "rho": rho, "vomma": vomma}
+        return {key: array.reshape(shape) for key, array in greeks.items()}
@@ -20,13 +20,24 @@ from AlgorithmImports import *
 
 import numpy as np
 from math import *
-from scipy import optimize
-from scipy.stats import norm
-from Tools import Logger, ContractUtils
+from collections import OrderedDict
+from Tools import Logger, ContractUtils, GreeksCache, VolatilitySmile, VolatilitySmiles, AmericanPricer
+# SciPy-free normal distribution (scipy.optimize is only imported by the bracketing fallback of bsmIV)
+from Tools.StandardNormal import StandardNormal as norm
 
 
 class BSM:
-    def __init__(self, context, tradingDays = 365.0):
+    # Bounds of the control parameter of the rational cubic interpolation
+    MIN_RATIONAL_CUBIC_CONTROL = -(1 - np.sqrt(np.finfo(float).eps))
+    MAX_RATIONAL_CUBIC_CONTROL = 2/np.finfo(float).eps**2
+    # Cache of the IV/Greeks shared by all the BSM instances
+    greeksCache = GreeksCache()
+    # Cache of the IV/Greeks shared by the BSM instances pricing American options
+    americanGreeksCache = GreeksCache()
+    # Maximum number of symbols tracked by the incremental mode
+    MAX_INCREMENTAL_SYMBOLS = 10000
+
+    def __init__(self, context, tradingDays = 365.0, ivMethod = "halley", incremental = False, midTolerance = 0.0, spotTolerance = 0.0005, tauTolerance = 0.01, smileMinPrice = 0.05, exerciseStyle = "european"):
         # Set the context
         self.context = context
         # Set the logger
@@ -37,6 +48,38 @@ class BSM:
         self.riskFreeRate = context.riskFreeRate
         # Set the number of trading days
         self.tradingDays = tradingDays
+        # Set the method used to compute the Implied Volatility ("halley" or "rational")
+        self.ivMethod = ivMethod
+        # Incremental mode: reuse the last IV of a contract as long as its inputs did not move more than the tolerances:
+        #  - midTolerance: absolute change of the mid-price of the contract
+        #  - spotTolerance: relative change of the price of the underlying
+        #  - tauTolerance: relative change of the time to expiration
+        self.incremental = incremental
+        self.midTolerance = midTolerance
+        self.spotTolerance = spotTolerance
+        self.tauTolerance = tauTolerance
+        # Inputs of the last IV solve of each symbol -> symbol: (mid, spot, tau, IV)
+        self.lastInputs = OrderedDict()
+        # Number of IV solves skipped/performed in incremental mode
+        self.incrementalSkips = 0
+        self.incrementalSolves = 0
+        # Minimum mid-price of the quotes used to fit the volatility smiles
+        self.smileMinPrice = smileMinPrice
+        # Exercise style of the options ("european" or "american"). American options are priced with the Barone-Adesi-Whaley approximation
+        self.exerciseStyle = exerciseStyle
+        self.americanPricer = None
+        if exerciseStyle == "american":
+            self.americanPricer = AmericanPricer(tradingDays = tradingDays)
+            # Do not mix the European and American values in the same cache
+            self.greeksCache = BSM.americanGreeksCache
+
+    # Key of the shared Greeks cache: (symbol, algorithm time, spot, mid, risk free rate, trading days)
+    def greeksCacheKey(self, contract, spotPrice = None, midPrice = None):
+        if spotPrice == None:
+            spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
+        if midPrice == None:
+            midPrice = self.contractUtils.midPrice(contract)
+        return GreeksCache.key(contract.Symbol, self.context.Time, spotPrice, midPrice, self.riskFreeRate, self.tradingDays)
 
     def isITM(self, contract, spotPrice = None):
         # Get the current price of the underlying unless otherwise specified
@@ -123,6 +166,9 @@ class BSM:
         # Get the current price of the underlying unless otherwise specified
         if spotPrice == None:
             spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
+        # American options
+        if self.americanPricer is not None:
+            return float(self.americanPricer.price(spotPrice, contract.Strike, tau, sigma, contract.Right == OptionRight.Call, self.riskFreeRate if ir == None else ir))
         # Compute D1
         d1 = self.bsmD1(contract, sigma, tau = tau, ir = ir, spotPrice = spotPrice)
         # Compute D2
@@ -241,12 +287,47 @@ class BSM:
             vomma = spotPrice * norm.pdf(d1) * np.sqrt(tau) * d1 * d2 / sigma
         return vomma
 
+    # Incremental mode: get the IV of the last solve for this symbol and whether its inputs are still within the tolerances (the IV can be reused as is)
+    def previousIV(self, symbol, midPrice, spotPrice, tau):
+        previous = self.lastInputs.get(symbol)
+        if previous is None:
+            return None, False
+        lastMid, lastSpot, lastTau, IV = previous
+        unchanged = (abs(midPrice - lastMid) <= self.midTolerance
+                     and abs(spotPrice - lastSpot) <= self.spotTolerance * lastSpot
+                     and abs(tau - lastTau) <= self.tauTolerance * lastTau
+                     )
+        if unchanged:
+            self.incrementalSkips += 1
+        return IV, unchanged
+
+    # Incremental mode: remember the inputs of the last IV solve for this symbol
+    def rememberInputs(self, symbol, midPrice, spotPrice, tau, IV):
+        self.incrementalSolves += 1
+        self.lastInputs[symbol] = (float(midPrice), float(spotPrice), float(tau), float(IV))
+        self.lastInputs.move_to_end(symbol)
+        # Forget the symbols that have not been used for the longest time
+        while len(self.lastInputs) > BSM.MAX_INCREMENTAL_SYMBOLS:
+            self.lastInputs.popitem(last = False)
+
     # Compute Implied Volatility from the price of an option
-    def bsmIV(self, contract, tau = None, saveIt = False):
+    def bsmIV(self, contract, tau = None, saveIt = False, x0 = None):
 
         # Start the timer
         self.context.executionTimer.start()
 
+        # Look for the IV in the shared cache (only if computed at the current time)
+        cacheKey = None
+        if tau == None and self.greeksCache.enabled:
+            cacheKey = self.greeksCacheKey(contract)
+            cached = self.greeksCache.get(cacheKey)
+            if cached is not None:
+                IV = cached[0]
+                if saveIt:
+                    contract.BSMImpliedVolatility = IV
+                self.context.executionTimer.stop()
+                return IV
+
         # Inner function used to compute the root
         def f(sigma, contract, tau):
             return self.bsmPrice(contract, sigma = sigma, tau = tau) - self.contractUtils.midPrice(contract)
@@ -262,45 +343,441 @@ class BSM:
         # Initialize the flag to mark whether we were able to find the root
         converged = False
 
-        # Find the root -> Implied Volatility: Use Halley's method
-        try:
-            # Start the search at the lastest known value for the IV (if previously calculated)
-            x0 = 0.1
-            if hasattr(contract, "BSMImpliedVolatility"):
-                x0 = contract.BSMImpliedVolatility
-            sol = optimize.root_scalar(f, x0 = x0, args = (contract, tau), fprime = fprime, fprime2 = fprime2, method = 'halley', xtol = 1e-6)
-            # Get the convergence status
-            converged = sol.converged
-            # Set the IV if we found the root
-            if converged:
-                IV = sol.root
-        except:
-            pass
-
-        # Fallback method (Bisection) if Halley's optimization failed
-        if not converged:
-            # Find the root -> Implied Volatility
+        if self.americanPricer is not None:
+            # American options: the derivatives come from the American pricer, use the batched solver
+            if tau == None:
+                tau = self.optionTau(contract)
+            if x0 == None:
+                x0 = getattr(contract, "BSMImpliedVolatility", 0.1)
+            IVs, _ = self.bsmIVArray(self.contractUtils.midPrice(contract)
+                                     , self.contractUtils.getUnderlyingLastPrice(contract)
+                                     , contract.Strike
+                                     , tau
+                                     , contract.Right == OptionRight.Call
+                                     , x0 = x0
+                                     )
+            IV = float(IVs[0])
+        elif self.ivMethod == "rational":
+            # Non-iterative method
+            if tau == None:
+                tau = self.optionTau(contract)
+            IVs, _ = self.bsmIVRational(self.contractUtils.midPrice(contract)
+                                        , self.contractUtils.getUnderlyingLastPrice(contract)
+                                        , contract.Strike
+                                        , tau
+                                        , contract.Right == OptionRight.Call
+                                        )
+            IV = float(IVs[0])
+        else:
+            # Find the root -> Implied Volatility: Use Halley's method
             try:
-                sol = optimize.root_scalar(f, bracket = [0.0001, 2], args = (contract, tau), xtol = 1e-6)
-                # Get the convergence status
-                converged = sol.converged
+                # Start the search at the lastest known value for the IV (if previously calculated) unless otherwise specified
+                if x0 == None:
+                    x0 = 0.1
+                    if hasattr(contract, "BSMImpliedVolatility"):
+                        x0 = contract.BSMImpliedVolatility
+                root, converged = self.halley(f, fprime, fprime2, x0, args = (contract, tau), xtol = 1e-6)
                 # Set the IV if we found the root
                 if converged:
-                    IV = sol.root
+                    IV = root
             except:
                 pass
 
+            # Fallback method (Bisection) if Halley's optimization failed
+            if not converged:
+                # Find the root -> Implied Volatility
+                try:
+                    # Only import SciPy if we really need it (slow import)
+                    from scipy import optimize
+                    sol = optimize.root_scalar(f, bracket = [0.0001, 2], args = (contract, tau), xtol = 1e-6)
+                    # Get the convergence status
+                    converged = sol.converged
+                    # Set the IV if we found the root
+                    if converged:
+                        IV = sol.root
+                except:
+                    pass
 
         # Check if we need to save the IV as an attribute of the contract object
         if saveIt:
             contract.BSMImpliedVolatility = IV
 
+        # Store the IV in the shared cache
+        if cacheKey is not None:
+            self.greeksCache.put(cacheKey, IV)
+
         # Stop the timer
         self.context.executionTimer.stop()
 
         # Return the result
         return IV
 
+    # Get the Implied Volatility of a contract at the current time: reuse the value computed at this time bar (if available), otherwise get it from the shared cache or solve for it
+    def contractIV(self, contract):
+        if hasattr(contract, "BSMImpliedVolatility") and hasattr(contract, "BSMGreeks") and contract.BSMGreeks.lastUpdated == self.context.Time:
+            return contract.BSMImpliedVolatility
+        # Use the volatility smile of the expiry if it has already been fitted at this time bar
+        smile = self.fittedSmile(contract)
+        if smile is not None:
+            return smile.iv(contract.Strike)
+        return self.bsmIV(contract)
+
+    # Get the volatility smile of the expiry of a contract if it has already been fitted at this time bar (None otherwise)
+    def fittedSmile(self, contract):
+        return VolatilitySmiles.of(self.context).get(self.context.Time, (contract.UnderlyingSymbol, contract.Expiry, self.exerciseStyle))
+
+    # Get the volatility smile of an expiry (default: the expiry of the first contract). The smile is fitted from the liquid OTM quotes
+    # of the given contracts only once per time bar, and it is then shared by all the BSM instances of the algorithm with the same exercise style
+    def volatilitySmile(self, contracts, expiry = None):
+        contracts = list(contracts)
+        if not contracts:
+            return None
+        if expiry == None:
+            expiry = contracts[0].Expiry
+        key = (contracts[0].UnderlyingSymbol, expiry, self.exerciseStyle)
+        return VolatilitySmiles.of(self.context).lookup(
+            self.context.Time, key,
+            lambda: VolatilitySmile.fromContracts(self, [contract for contract in contracts if contract.Expiry == expiry], minPrice = self.smileMinPrice)
+        )
+
+    # Halley's root finding method (same iteration and stopping rules as scipy.optimize.newton with fprime2). Returns the root and the convergence flag
+    @staticmethod
+    def halley(f, fprime, fprime2, x0, args = (), xtol = 1e-6, maxIter = 50):
+        x = float(x0)
+        for _ in range(maxIter):
+            fx = f(x, *args)
+            # We have found the root
+            if fx == 0:
+                return x, True
+            fp = fprime(x, *args)
+            # Cannot continue if the derivative is zero
+            if fp == 0:
+                return x, False
+            step = fx/fp
+            # Halley's correction (only if it does not change the direction of the Newton step)
+            adj = step * fprime2(x, *args)/fp/2
+            if abs(adj) < 1:
+                step /= 1.0 - adj
+            xNew = x - step
+            if abs(xNew - x) <= xtol:
+                return xNew, True
+            x = xNew
+        return x, False
+
+    # Compute the Implied Volatility of arrays of option prices with the selected method (see ivMethod)
+    def bsmIVChain(self, price, spotPrice, strike, tau, isCall, x0 = None):
+        # The rational method only applies to European options
+        if self.ivMethod == "rational" and self.americanPricer is None:
+            return self.bsmIVRational(price, spotPrice, strike, tau, isCall)
+        else:
+            return self.bsmIVArray(price, spotPrice, strike, tau, isCall, x0 = x0)
+
+    # Compute the Implied Volatility of arrays of option prices in one batch.
+    # All the contracts are solved in lockstep with a safeguarded Halley iteration (the step falls back to bisection whenever it leaves the bracket of the root).
+    # Contracts that did not converge are then solved with a vectorized bisection on the [0.0001, 2] interval (same as the scalar fallback).
+    # Returns the array of IVs (0 if it could not be computed) and the convergence mask
+    def bsmIVArray(self, price, spotPrice, strike, tau, isCall, x0 = None, xtol = 1e-6, maxIter = 50):
+        # Start the timer
+        self.context.executionTimer.start("Tools.BSMLibrary -> bsmIVArray")
+
+        price, spotPrice, strike, tau, isCall = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(price, dtype = float))
+            , np.asarray(spotPrice, dtype = float)
+            , np.asarray(strike, dtype = float)
+            , np.asarray(tau, dtype = float)
+            , np.asarray(isCall, dtype = bool)
+        )
+        # Initialize the IV to zero in case anything goes wrong
+        IV = np.zeros(price.shape)
+        converged = np.zeros(price.shape, dtype = bool)
+
+        # Inner function used to compute the root: f = price(sigma) - target price, along with its first (Vega) and second order (Vomma) derivatives
+        def f(sigma, idx):
+            greeks = self.bsmGreeksArray(spotPrice[idx], strike[idx], tau[idx], sigma, isCall[idx])
+            return greeks["price"] - price[idx], greeks["vega"], greeks["vomma"]
+
+        # Only the prices within the no-arbitrage bounds have a solution
+        with np.errstate(invalid = "ignore"):
+            Xert = strike * np.exp(-self.riskFreeRate*tau)
+            if self.americanPricer is not None:
+                # American options: bounded by the intrinsic value and by the strike (Puts)
+                Xert = strike
+            lowerBound = np.maximum(np.where(isCall, spotPrice - Xert, Xert - spotPrice), 0.0)
+            upperBound = np.where(isCall, spotPrice, Xert)
+            solvable = (tau > 0) & (price > lowerBound) & (price < upperBound)
+
+        # Start the search at the provided values (i.e. the latest known values for the IV) if available
+        if x0 is None:
+            sigma = np.full(price.shape, 0.1)
+        else:
+            sigma = np.array(np.broadcast_to(np.asarray(x0, dtype = float), price.shape))
+        sigma[~np.isfinite(sigma) | (sigma <= 0)] = 0.1
+
+        # Bracket of the root (the price is monotonically increasing with sigma)
+        lo = np.zeros(price.shape)
+        hi = np.full(price.shape, np.inf)
+
+        # Lockstep Halley's iterations on the contracts that are still active
+        active = np.flatnonzero(solvable)
+        for _ in range(maxIter):
+            if active.size == 0:
+                break
+            s = sigma[active]
+            fx, fprime, fprime2 = f(s, active)
+            # Update the bracket
+            above = fx > 0
+            hi[active] = np.where(above, s, hi[active])
+            lo[active] = np.where(above, lo[active], s)
+            # Halley's step
+            with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+                step = 2.0*fx*fprime/(2.0*fprime**2 - fx*fprime2)
+                newSigma = s - step
+            # Safeguard: bisect (or double the volatility if there is no upper bound yet) if the step is not usable
+            outside = ~np.isfinite(newSigma) | (newSigma <= lo[active]) | (newSigma >= hi[active])
+            bisection = np.where(np.isfinite(hi[active]), 0.5*(lo[active] + hi[active]), 2.0*s)
+            newSigma = np.where(fx == 0, s, np.where(outside, bisection, newSigma))
+            sigma[active] = newSigma
+            # Check the convergence (the Newton's step estimate must also be within tolerance to avoid stalling on the flat wings where Vega is ~0)
+            done = (fx == 0) | ((np.abs(newSigma - s) < xtol) & (np.abs(fx) < xtol*fprime))
+            converged[active[done]] = True
+            active = active[~done]
+
+        # Fallback method (vectorized Bisection) for the contracts where the Halley's iterations failed
+        retry = np.flatnonzero(solvable & ~converged)
+        if retry.size > 0:
+            a = np.full(retry.size, 0.0001)
+            b = np.full(retry.size, 2.0)
+            fa = f(a, retry)[0]
+            fb = f(b, retry)[0]
+            # The root must be bracketed
+            bracketed = np.sign(fa) != np.sign(fb)
+            retry, a, b, fa = retry[bracketed], a[bracketed], b[bracketed], fa[bracketed]
+            for _ in range(int(np.ceil(np.log2(2.0/xtol))) + 1):
+                if retry.size == 0:
+                    break
+                m = 0.5*(a + b)
+                fm = f(m, retry)[0]
+                left = np.sign(fm) == np.sign(fa)
+                a = np.where(left, m, a)
+                fa = np.where(left, fm, fa)
+                b = np.where(left, b, m)
+            sigma[retry] = 0.5*(a + b)
+            converged[retry] = True
+
+        # Set the IV where we found the root
+        IV[converged] = sigma[converged]
+
+        # Stop the timer
+        self.context.executionTimer.stop("Tools.BSMLibrary -> bsmIVArray")
+
+        return IV, converged
+
+    # Normalized Black price of an out-of-the-money Call: b(x, s) = e^(x/2)*N(x/s + s/2) - e^(-x/2)*N(x/s - s/2)
+    #  - x = ln(F/K) <= 0 is the log-moneyness with respect to the forward price
+    #  - s = sigma*sqrt(tau) is the total volatility
+    def normalizedBlack(self, x, s):
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            h = x/s
+            t = 0.5*s
+            return np.exp(0.5*x)*norm.cdf(h + t) - np.exp(-0.5*x)*norm.cdf(h - t)
+
+    # Normalized Vega: db/ds = exp(-(h^2 + t^2)/2)/sqrt(2*pi)
+    def normalizedVega(self, x, s):
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            h = x/s
+            t = 0.5*s
+            return np.exp(-0.5*(h*h + t*t))/np.sqrt(2.0*np.pi)
+
+    # Rational cubic interpolation (Delbourgo and Gregory) between (xl, yl) and (xr, yr) with slopes dl and dr, and control parameter r (r = 3 -> cubic Hermite)
+    @staticmethod
+    def rationalCubicInterpolation(x, xl, xr, yl, yr, dl, dr, r):
+        h = xr - xl
+        t = (x - xl)/h
+        omt = 1.0 - t
+        value = (yr*t**3 + (r*yr - h*dr)*t*t*omt + (r*yl + h*dl)*t*omt*omt + yl*omt**3)/(1.0 + (r - 3.0)*t*omt)
+        # A very large control parameter means linear interpolation
+        return np.where(r >= BSM.MAX_RATIONAL_CUBIC_CONTROL, yr*t + yl*omt, value)
+
+    # Control parameter of the rational cubic interpolation that matches the second derivative on one side (left or right),
+    # bounded from below to preserve the convexity/monotonicity of the data
+    @staticmethod
+    def rationalCubicControlParameter(xl, xr, yl, yr, dl, dr, secondDerivative, leftSide, preferShapePreservation):
+        h = xr - xl
+        slope = (yr - yl)/h
+        numerator = 0.5*h*secondDerivative + (dr - dl)
+        denominator = (slope - dl) if leftSide else (dr - slope)
+        r = np.where(numerator == 0
+                     , 0.0
+                     , np.where(denominator == 0
+                                , np.where(numerator > 0, BSM.MAX_RATIONAL_CUBIC_CONTROL, BSM.MIN_RATIONAL_CUBIC_CONTROL)
+                                , numerator/denominator
+                                )
+                     )
+        # Minimum value of the control parameter that preserves the shape of the data
+        monotonic = (dl*slope >= 0) & (dr*slope >= 0)
+        convex = (dl <= slope) & (slope <= dr)
+        concave = (dl >= slope) & (slope >= dr)
+        r1 = np.where(monotonic
+                      , np.where(slope != 0, (dr + dl)/slope, BSM.MAX_RATIONAL_CUBIC_CONTROL if preferShapePreservation else -np.inf)
+                      , -np.inf
+                      )
+        shape = convex | concave
+        r2 = np.where(shape & (slope - dl != 0) & (dr - slope != 0)
+                      , np.maximum(np.abs((dr - dl)/(dr - slope)), np.abs((dr - dl)/(slope - dl)))
+                      , np.where(preferShapePreservation & (shape | monotonic), BSM.MAX_RATIONAL_CUBIC_CONTROL, -np.inf)
+                      )
+        rMin = np.where(monotonic | shape, np.maximum(BSM.MIN_RATIONAL_CUBIC_CONTROL, np.maximum(r1, r2)), BSM.MIN_RATIONAL_CUBIC_CONTROL)
+        return np.maximum(r, rMin)
+
+    # Compute the Implied Volatility of arrays of option prices without iterating to convergence ("Let's be rational" approach, P. Jaeckel):
+    #  - The prices are normalized and mapped to out-of-the-money Calls (put-call parity)
+    #  - The initial guess is obtained with a rational cubic interpolation on one of four branches delimited by the inflection point of the normalized Black function:
+    #     - lower: interpolation of the asymptotic map for small volatilities (handles near-zero time value)
+    #     - lower-middle / upper-middle: interpolation of the inverse function
+    #     - upper: interpolation of the asymptotic map for large volatilities
+    #  - The guess is refined with (at most) two third-order Householder steps on an objective function transformed per branch
+    #    (1/ln(b) on the lower branch, b on the middle branches and ln(bMax - b) on the upper branch)
+    # Returns the array of IVs (0 if it could not be computed) and the convergence mask
+    def bsmIVRational(self, price, spotPrice, strike, tau, isCall, iterations = 2):
+        # Start the timer
+        self.context.executionTimer.start("Tools.BSMLibrary -> bsmIVRational")
+
+        price, spotPrice, strike, tau, isCall = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(price, dtype = float))
+            , np.asarray(spotPrice, dtype = float)
+            , np.asarray(strike, dtype = float)
+            , np.asarray(tau, dtype = float)
+            , np.asarray(isCall, dtype = bool)
+        )
+        # Initialize the IV to zero in case anything goes wrong
+        IV = np.zeros(price.shape)
+        converged = np.zeros(price.shape, dtype = bool)
+
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore", under = "ignore"):
+            # Forward price and log-moneyness
+            ert = np.exp(self.riskFreeRate*tau)
+            forward = spotPrice*ert
+            x = np.log(forward/strike)
+            # Normalized (undiscounted) price
+            normalizedPrice = price*ert/np.sqrt(forward*strike)
+            # Map in-the-money options to out-of-the-money options by subtracting the (normalized) intrinsic value
+            itm = np.where(isCall, x > 0, x < 0)
+            beta = np.where(itm, normalizedPrice - np.abs(np.exp(0.5*x) - np.exp(-0.5*x)), normalizedPrice)
+            # Out-of-the-money Call equivalent
+            x = -np.abs(x)
+            bMax = np.exp(0.5*x)
+            # Only the prices with a positive time value and below the upper bound have a solution.
+            # Deep ITM options whose time value is lost in the round-off of the price are not solvable either
+            valid = (tau > 0) & np.isfinite(beta) & (beta > 1e-10*normalizedPrice) & (beta < bMax)
+
+        idx = np.flatnonzero(valid)
+        if idx.size > 0:
+            x = x[idx]
+            beta = beta[idx]
+            bMax = bMax[idx]
+            with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore", under = "ignore"):
+                ax = np.abs(x)
+                # Inflection point of the normalized Black function
+                sc = np.sqrt(2.0*ax)
+                bc = self.normalizedBlack(x, sc)
+                vc = self.normalizedVega(x, sc)
+                # ATM options: the inflection point is at s = 0
+                bc = np.where(x == 0, 0.0, bc)
+                vc = np.where(x == 0, 1.0/np.sqrt(2.0*np.pi), vc)
+                # Lower and upper branch boundaries (tangents at the inflection point)
+                sl = sc - bc/vc
+                bl = np.where(x == 0, 0.0, self.normalizedBlack(x, sl))
+                vl = self.normalizedVega(x, sl)
+                sh = sc + (bMax - bc)/vc
+                bh = self.normalizedBlack(x, sh)
+                vh = self.normalizedVega(x, sh)
+
+                lower = beta < bl
+                lowerMiddle = ~lower & (beta < bc)
+                upper = ~lower & ~lowerMiddle & (beta > bh)
+
+                # Lower branch: f(s) = 2*pi*|x|/sqrt(27) * N(-z)^3, with z = |x|/(sqrt(3)*s), is asymptotically equivalent to b(s) for s -> 0
+                z = ax/(np.sqrt(3.0)*sl)
+                y = z*z
+                Phi = norm.cdf(-z)
+                phi = norm.pdf(z)
+                fl = 2.0*np.pi/np.sqrt(27.0)*ax*Phi**3
+                fpl = 2.0*np.pi*y*Phi*Phi*np.exp(y + 0.125*sl*sl)
+                fppl = np.pi/6.0*y/sl**3*Phi*(8.0*np.sqrt(3.0)*sl*ax + (3.0*sl*sl*(sl*sl - 8.0) - 8.0*x*x)*Phi/phi)*np.exp(2.0*y + 0.25*sl*sl)
+                rll = self.rationalCubicControlParameter(0.0, bl, 0.0, fl, 1.0, fpl, fppl, False, True)
+                f = self.rationalCubicInterpolation(beta, 0.0, bl, 0.0, fl, 1.0, fpl, rll)
+                # Quadratic interpolation if the rational cubic fails due to round off
+                t = beta/bl
+                f = np.where(f > 0, f, (fl*t + bl*(1.0 - t))*t)
+                sLower = ax/(np.sqrt(3.0)*np.abs(norm.ppf(np.cbrt(f/(2.0*np.pi/np.sqrt(27.0)*ax)))))
+
+                # Lower-middle branch: interpolation of s(b) between the lower boundary and the inflection point (where d2s/db2 = 0)
+                rlm = self.rationalCubicControlParameter(bl, bc, sl, sc, 1.0/vl, 1.0/vc, 0.0, False, False)
+                sLowerMiddle = self.rationalCubicInterpolation(beta, bl, bc, sl, sc, 1.0/vl, 1.0/vc, rlm)
+
+                # Upper-middle branch: interpolation of s(b) between the inflection point and the upper boundary
+                rhm = self.rationalCubicControlParameter(bc, bh, sc, sh, 1.0/vc, 1.0/vh, 0.0, True, False)
+                sUpperMiddle = self.rationalCubicInterpolation(beta, bc, bh, sc, sh, 1.0/vc, 1.0/vh, rhm)
+
+                # Upper branch: f(s) = N(-s/2) is asymptotically equivalent to (bMax - b(s))/2 for s -> Inf
+                fh = norm.cdf(-0.5*sh)
+                w = (x/sh)**2
+                fph = np.where(x == 0, -0.5, -0.5*np.exp(0.5*w))
+                fpph = np.where(x == 0, 0.0, np.sqrt(0.5*np.pi)*np.exp(w + 0.125*sh*sh)*w/sh)
+                rhh = self.rationalCubicControlParameter(bh, bMax, fh, 0.0, fph, -0.5, fpph, True, True)
+                f = self.rationalCubicInterpolation(beta, bh, bMax, fh, 0.0, fph, -0.5, rhh)
+                # Quadratic interpolation if the rational cubic fails due to round off
+                hu = bMax - bh
+                t = (beta - bh)/hu
+                f = np.where(f > 0, f, (fh*(1.0 - t) + 0.5*hu*t)*(1.0 - t))
+                sUpper = -2.0*norm.ppf(f)
+
+                s = np.where(lower, sLower, np.where(lowerMiddle, sLowerMiddle, np.where(upper, sUpper, sUpperMiddle)))
+                # The transformed objective function of the upper branch is only used far enough from the middle
+                upper = upper & (beta > 0.5*bMax)
+
+                # Householder's refinement steps
+                step = np.full(s.shape, np.inf)
+                lnBeta = np.log(beta)
+                for _ in range(iterations):
+                    b = self.normalizedBlack(x, s)
+                    bp = self.normalizedVega(x, s)
+                    h = x/s
+                    # b''/b' and b'''/b'
+                    b2 = h*h/s - 0.25*s
+                    b3 = b2*b2 - 3.0*(h/s)**2 - 0.25
+                    # Lower branch: g = 1/ln(b) - 1/ln(beta)
+                    lnb = np.log(b)
+                    p = bp/b
+                    nuL = (lnBeta - lnb)*lnb/lnBeta/p
+                    gammaL = b2 - p*(1.0 + 2.0/lnb)
+                    deltaL = b3 + 2.0*p*p*(1.0 + 3.0/lnb*(1.0 + 1.0/lnb)) - 3.0*b2*p*(1.0 + 2.0/lnb)
+                    # Upper branch: g = ln(bMax - beta) - ln(bMax - b)
+                    q = bp/(bMax - b)
+                    nuU = np.log((bMax - b)/(bMax - beta))/q
+                    gammaU = b2 + q
+                    deltaU = b3 + 3.0*q*b2 + 2.0*q*q
+                    # Middle branches: g = b - beta
+                    nuM = (beta - b)/bp
+                    # Select the objective function of each branch
+                    nu = np.where(lower, nuL, np.where(upper, nuU, nuM))
+                    gamma = np.where(lower, gammaL, np.where(upper, gammaU, b2))
+                    delta = np.where(lower, deltaL, np.where(upper, deltaU, b3))
+                    step = nu*(1.0 + 0.5*gamma*nu)/(1.0 + nu*(gamma + delta*nu/6.0))
+                    # The objective function cannot be evaluated any further (i.e. underflow) -> keep the current value
+                    step = np.where(np.isfinite(step), step, 0.0)
+                    # Keep the volatility positive
+                    s = np.where(s + step > 0, s + step, 0.5*s)
+
+            done = np.isfinite(s) & (s > 0) & (np.abs(step) <= 1e-6*s)
+            IV[idx[done]] = s[done]/np.sqrt(tau[idx[done]])
+            converged[idx[done]] = True
+
+        # Stop the timer
+        self.context.executionTimer.stop("Tools.BSMLibrary -> bsmIVRational")
+
+        return IV, converged
+
     # Compute the Delta of an option
     def bsmDelta(self, contract, sigma, tau = None, d1 = None, ir = None, spotPrice = None, atTime = None):
         if d1 == None:
@@ -327,32 +804,63 @@ class BSM:
         if hasattr(contract, "BSMGreeks") and contract.BSMGreeks.lastUpdated == self.context.Time:
             return contract.BSMGreeks
 
+        # Get the current price of the underlying unless otherwise specified
+        if spotPrice == None:
+            spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
+
+        # Look for the IV/Greeks in the shared cache (only if they are computed at the current time from the market quotes)
+        cacheKey = None
+        if sigma == None and ir == None and atTime == None and self.greeksCache.enabled:
+            cacheKey = self.greeksCacheKey(contract, spotPrice = spotPrice)
+            cached = self.greeksCache.get(cacheKey)
+            if cached is not None:
+                sigma, greeks = cached
+                if saveIt:
+                    contract.BSMImpliedVolatility = sigma
+                if greeks is not None:
+                    if saveIt:
+                        contract.BSMGreeks = greeks
+                    self.context.executionTimer.stop("Tools.BSMLibrary -> computeGreeks")
+                    return greeks
+
         # Get the DTE as a fraction of a year
         tau = self.optionTau(contract, atTime = atTime)
 
         if sigma == None:
-            # Compute Implied Volatility
-            sigma = self.bsmIV(contract, tau = tau, saveIt = saveIt)
+            if self.incremental and atTime == None:
+                # Reuse the last IV if the inputs did not move, otherwise start the search from it
+                midPrice = self.contractUtils.midPrice(contract)
+                sigma, unchanged = self.previousIV(contract.Symbol, midPrice, spotPrice, tau)
+                if unchanged:
+                    if saveIt:
+                        contract.BSMImpliedVolatility = sigma
+                else:
+                    sigma = self.bsmIV(contract, tau = tau, saveIt = saveIt, x0 = sigma)
+                    self.rememberInputs(contract.Symbol, midPrice, spotPrice, tau, sigma)
+            else:
+                # Compute Implied Volatility
+                sigma = self.bsmIV(contract, tau = tau, saveIt = saveIt)
         ### if (sigma == None)
 
-        # Get the current price of the underlying unless otherwise specified
-        if spotPrice == None:
-            spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
-
-        # Compute D1
-        d1 = self.bsmD1(contract, sigma, tau = tau, ir = ir, spotPrice = spotPrice)
-        # Compute D2
-        d2 = self.bsmD2(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
+        if self.americanPricer is not None:
+            # American options: get all the Greeks from the American pricer
+            treeGreeks = self.bsmGreeksArray(spotPrice, contract.Strike, tau, sigma, contract.Right == OptionRight.Call, ir = ir)
+            delta, theta, vega, rho, gamma, vomma = [float(treeGreeks[key]) for key in ["delta", "theta", "vega", "rho", "gamma", "vomma"]]
+        else:
+            # Compute D1
+            d1 = self.bsmD1(contract, sigma, tau = tau, ir = ir, spotPrice = spotPrice)
+            # Compute D2
+            d2 = self.bsmD2(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
 
-        # First order derivatives
-        delta = self.bsmDelta(contract, sigma = sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
-        theta = self.bsmTheta(contract, sigma, tau = tau, d1 = d1, d2 = d2, ir = ir, spotPrice = spotPrice)
-        vega = self.bsmVega(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
-        rho = self.bsmRho(contract, sigma, tau = tau, d1 = d1, d2 = d2, ir = ir, spotPrice = spotPrice)
+            # First order derivatives
+            delta = self.bsmDelta(contract, sigma = sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
+            theta = self.bsmTheta(contract, sigma, tau = tau, d1 = d1, d2 = d2, ir = ir, spotPrice = spotPrice)
+            vega = self.bsmVega(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
+            rho = self.bsmRho(contract, sigma, tau = tau, d1 = d1, d2 = d2, ir = ir, spotPrice = spotPrice)
 
-        # Second Order derivatives
-        gamma = self.bsmGamma(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
-        vomma = self.bsmVomma(contract, sigma, tau = tau, d1 = d1, d2 = d2, ir = ir, spotPrice = spotPrice)
+            # Second Order derivatives
+            gamma = self.bsmGamma(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
+            vomma = self.bsmVomma(contract, sigma, tau = tau, d1 = d1, d2 = d2, ir = ir, spotPrice = spotPrice)
 
         # Lambda (a.k.a. elasticity or leverage: the percentage change in option value per percentage change in the underlying price)
         elasticity = delta * np.float64(spotPrice)/np.float64(self.contractUtils.midPrice(contract))
@@ -374,24 +882,236 @@ class BSM:
         if saveIt:
             contract.BSMGreeks = greeks
 
+        # Store the IV/Greeks in the shared cache
+        if cacheKey is not None:
+            self.greeksCache.put(cacheKey, sigma, greeks)
+
         # Stop the timer
         self.context.executionTimer.stop("Tools.BSMLibrary -> computeGreeks")
 
         return greeks
 
 
+    # Build the NumPy input arrays (strike, right, tau, spot, mid) for a list of contracts
+    def chainArrays(self, contracts, spotPrice = None, atTime = None):
+        # Cache the values shared by many contracts (underlying price and tau of each expiry)
+        spotPrices = {}
+        taus = {}
+        # Initialize the arrays
+        n = len(contracts)
+        strike = np.empty(n)
+        isCall = np.empty(n, dtype = bool)
+        tau = np.empty(n)
+        spot = np.empty(n)
+        mid = np.empty(n)
+        for i, contract in enumerate(contracts):
+            strike[i] = contract.Strike
+            isCall[i] = contract.Right == OptionRight.Call
+            # Get the DTE as a fraction of a year (only once per expiry)
+            expiry = contract.Expiry
+            if expiry not in taus:
+                taus[expiry] = self.optionTau(contract, atTime = atTime)
+            tau[i] = taus[expiry]
+            # Get the current price of the underlying (only once per underlying) unless otherwise specified
+            if spotPrice is None:
+                underlying = contract.UnderlyingSymbol
+                if underlying not in spotPrices:
+                    spotPrices[underlying] = self.contractUtils.getUnderlyingLastPrice(contract)
+                spot[i] = spotPrices[underlying]
+            else:
+                spot[i] = spotPrice
+            mid[i] = self.contractUtils.midPrice(contract)
+        return {"strike": strike, "isCall": isCall, "tau": tau, "spot": spot, "mid": mid}
+
+    # Price arrays of European options in one pass (same as bsmPrice, broadcasting all the inputs). The edge cases (tau = 0 or sigma = 0) are handled as in the scalar methods
+    def bsmPriceArray(self, spotPrice, strike, tau, sigma, isCall, ir = None):
+        # Use the risk free rate unless otherwise specified
+        if ir is None:
+            ir = self.riskFreeRate
+        # American options
+        if self.americanPricer is not None:
+            return self.americanPricer.price(spotPrice, strike, tau, sigma, isCall, ir)
+        spotPrice = np.asarray(spotPrice, dtype = float)
+        strike = np.asarray(strike, dtype = float)
+        tau = np.asarray(tau, dtype = float)
+        sigma = np.asarray(sigma, dtype = float)
+        # Set the sign based on whether it is a Call (+1) or a Put (-1)
+        sign = np.where(isCall, 1.0, -1.0)
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            sigmaSqrtTau = sigma * np.sqrt(tau)
+            # Edge cases: expired contracts (tau = 0) or IV not available (sigma = 0) -> d1 = +/-Inf depending on the moneyness
+            edge = (tau == 0) | (sigma == 0)
+            itm = np.where(isCall, strike < spotPrice, spotPrice < strike)
+            d1 = np.where(edge
+                          , np.where(itm, sign * np.inf, -sign * np.inf)
+                          , (np.log(spotPrice/strike) + (ir + 0.5*sigma**2)*tau)/sigmaSqrtTau
+                          )
+            d2 = d1 - sigmaSqrtTau
+            # Price: Call -> N(d1)*S - N(d2)*Xert, Put -> N(-d2)*Xert - N(-d1)*S
+            price = sign * (norm.cdf(sign * d1)*spotPrice - norm.cdf(sign * d2)*strike*np.exp(-self.riskFreeRate*tau))
+        return price
+
+    # Compute all the Greeks on arrays of inputs in one pass. The edge cases (tau = 0 or sigma = 0) are handled as in the scalar methods
+    def bsmGreeksArray(self, spotPrice, strike, tau, sigma, isCall, ir = None):
+        # Use the risk free rate unless otherwise specified
+        if ir is None:
+            ir = self.riskFreeRate
+        # Broadcast all the inputs to the same shape
+        spotPrice, strike, tau, sigma, isCall = np.broadcast_arrays(
+            np.asarray(spotPrice, dtype = float)
+            , np.asarray(strike, dtype = float)
+            , np.asarray(tau, dtype = float)
+            , np.asarray(sigma, dtype = float)
+            , np.asarray(isCall, dtype = bool)
+        )
+        # Set the sign based on whether it is a Call (+1) or a Put (-1)
+        sign = np.where(isCall, 1.0, -1.0)
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            sqrtTau = np.sqrt(tau)
+            sigmaSqrtTau = sigma * sqrtTau
+            # Edge cases: expired contracts (tau = 0) or IV not available (sigma = 0) -> d1 = +/-Inf depending on the moneyness
+            edge = (tau == 0) | (sigma == 0)
+            itm = np.where(isCall, strike < spotPrice, spotPrice < strike)
+            d1 = np.where(edge
+                          , np.where(itm, sign * np.inf, -sign * np.inf)
+                          , (np.log(spotPrice/strike) + (ir + 0.5*sigma**2)*tau)/sigmaSqrtTau
+                          )
+            d2 = d1 - sigmaSqrtTau
+            # Normal CDF/PDF evaluated only once
+            cdfD1 = norm.cdf(sign * d1)
+            cdfD2 = norm.cdf(sign * d2)
+            pdfD1 = norm.pdf(d1)
+            # X*e^(-r*tau)
+            Xert = strike * np.exp(-self.riskFreeRate*tau)
+            # Price: Call -> N(d1)*S - N(d2)*Xert, Put -> N(-d2)*Xert - N(-d1)*S
+            price = sign * (cdfD1*spotPrice - cdfD2*Xert)
+            # Delta: Call -> N(d1), Put -> -N(-d1)
+            delta = sign * cdfD1
+            # Theta (daily): -S*N'(d1)*sigma/(2*sqrt(tau)) -/+ r*X*e^(-r*tau)*N(+/-d2)
+            SNs = -(spotPrice * pdfD1 * sigma) / (2.0 * sqrtTau)
+            theta = (SNs - sign * self.riskFreeRate * Xert * cdfD2)/self.tradingDays
+            # Rho
+            rho = sign * tau * self.riskFreeRate * Xert * cdfD2
+            # Gamma
+            gamma = np.where(edge, np.inf, pdfD1 / (spotPrice * sigmaSqrtTau))
+            # Vega
+            vega = spotPrice * pdfD1 * sqrtTau
+            # Vomma
+            vomma = np.where(sigma == 0, np.inf, vega * d1 * d2 / sigma)
+
+        greeks = {"d1": d1, "d2": d2, "price": price, "delta": delta, "gamma": gamma, "vega": vega, "theta": theta, "rho": rho, "vomma": vomma}
+        # American options: replace the price and the Greeks with the values of the American pricer (d1/d2 are the European values)
+        if self.americanPricer is not None:
+            greeks.update(self.americanPricer.greeks(spotPrice, strike, tau, sigma, isCall, ir))
+        return greeks
+
+    # Compute the Greeks for a whole chain (or any list of contracts) in one vectorized pass.
+    # Returns a dictionary of arrays (one element per contract) and stores the BSMGreeks on each contract if saveIt = True
+    def computeChainGreeks(self, contracts, sigma = None, ir = None, spotPrice = None, atTime = None, saveIt = True):
+        # Start the timer
+        self.context.executionTimer.start("Tools.BSMLibrary -> computeChainGreeks")
+
+        contracts = list(contracts)
+        # Build the input arrays only once
+        inputs = self.chainArrays(contracts, spotPrice = spotPrice, atTime = atTime)
+
+        # Contracts for which the Greeks have already been computed at this time bar
+        fresh = np.array([hasattr(contract, "BSMGreeks") and contract.BSMGreeks.lastUpdated == self.context.Time for contract in contracts], dtype = bool)
+
+        # Keys and entries of the shared cache (only used if the IV is computed from the market quotes)
+        cacheKeys = {}
+        cachedGreeks = {}
+        cachedIV = np.zeros(len(contracts), dtype = bool)
+
+        if sigma is None:
+            # Compute the Implied Volatility in one batch (reuse the value of the contracts that are already up to date)
+            IV = np.empty(len(contracts))
+            for i in np.flatnonzero(fresh):
+                IV[i] = contracts[i].BSMGreeks.IV
+            stale = np.flatnonzero(~fresh)
+            # Look for the IV/Greeks in the shared cache (only if they are computed at the current time)
+            if atTime is None and self.greeksCache.enabled:
+                for i in stale:
+                    cacheKeys[i] = GreeksCache.key(contracts[i].Symbol, self.context.Time, inputs["spot"][i], inputs["mid"][i], self.riskFreeRate, self.tradingDays)
+                    cached = self.greeksCache.get(cacheKeys[i])
+                    if cached is not None:
+                        IV[i] = cached[0]
+                        # The cached Greeks can only be reused if they have been computed with the default risk free rate
+                        if ir is None and cached[1] is not None:
+                            cachedGreeks[i] = cached[1]
+                        cachedIV[i] = True
+            unsolved = stale[~cachedIV[stale]]
+            # Start the search at the lastest known value for the IV (if previously calculated)
+            x0 = np.array([getattr(contracts[i], "BSMImpliedVolatility", 0.1) for i in unsolved], dtype = float)
+            incremental = self.incremental and atTime is None
+            if incremental and unsolved.size > 0:
+                # Reuse the last IV of the contracts whose inputs did not move, and start the search from it for the others
+                reused = np.zeros(unsolved.size, dtype = bool)
+                for k, i in enumerate(unsolved):
+                    previousIV, reused[k] = self.previousIV(contracts[i].Symbol, inputs["mid"][i], inputs["spot"][i], inputs["tau"][i])
+                    if previousIV is not None:
+                        if reused[k]:
+                            IV[i] = previousIV
+                        else:
+                            x0[k] = previousIV
+                unsolved = unsolved[~reused]
+                x0 = x0[~reused]
+            if unsolved.size > 0:
+                IV[unsolved], _ = self.bsmIVChain(inputs["mid"][unsolved], inputs["spot"][unsolved], inputs["strike"][unsolved], inputs["tau"][unsolved], inputs["isCall"][unsolved], x0 = x0)
+                if incremental:
+                    for i in unsolved:
+                        self.rememberInputs(contracts[i].Symbol, inputs["mid"][i], inputs["spot"][i], inputs["tau"][i], IV[i])
+            # Check if we need to save the IV as an attribute of the contract objects
+            if saveIt:
+                for i in stale:
+                    contracts[i].BSMImpliedVolatility = float(IV[i])
+        else:
+            IV = np.broadcast_to(np.asarray(sigma, dtype = float), (len(contracts),))
+
+        # Compute all the Greeks at once
+        greeks = self.bsmGreeksArray(inputs["spot"], inputs["strike"], inputs["tau"], IV, inputs["isCall"], ir = ir)
+        # Lambda (a.k.a. elasticity or leverage: the percentage change in option value per percentage change in the underlying price)
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            greeks["elasticity"] = greeks["delta"] * inputs["spot"]/inputs["mid"]
+        greeks["IV"] = IV
+        greeks.update(inputs)
+
+        # Check if we need to save the Greeks as an attribute of the contract objects and/or in the shared cache
+        if saveIt or cacheKeys:
+            for i, contract in enumerate(contracts):
+                if fresh[i]:
+                    continue
+                contractGreeks = cachedGreeks.get(i)
+                if contractGreeks is None:
+                    contractGreeks = BSMGreeks(delta = float(greeks["delta"][i])
+                                               , gamma = float(greeks["gamma"][i])
+                                               , vega = float(greeks["vega"][i])
+                                               , theta = float(greeks["theta"][i])
+                                               , rho = float(greeks["rho"][i])
+                                               , vomma = float(greeks["vomma"][i])
+                                               , elasticity = float(greeks["elasticity"][i])
+                                               , IV = float(IV[i])
+                                               , lastUpdated = self.context.Time
+                                               )
+                    if i in cacheKeys:
+                        # The Greeks computed with a custom risk free rate are not cached (only the IV)
+                        self.greeksCache.put(cacheKeys[i], float(IV[i]), contractGreeks if ir is None else None)
+                if saveIt:
+                    contract.BSMGreeks = contractGreeks
+
+        # Stop the timer
+        self.context.executionTimer.stop("Tools.BSMLibrary -> computeChainGreeks")
+
+        return greeks
+
     # Compute and store the Greeks for a list of contracts
     def setGreeks(self, contracts, sigma = None, ir = None):
         # Start the timer
         self.context.executionTimer.start("Tools.BSMLibrary -> setGreeks")
 
         if isinstance(contracts, list):
-            # Loop through all contracts
-            for contract in contracts:
-                # Get the current price of the underlying
-                spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
-                # Compute the Greeks for the contract
-                self.computeGreeks(contract, sigma = sigma, ir = ir, spotPrice = spotPrice, saveIt = True)
+            # Compute the Greeks for all the contracts in one vectorized pass
+            self.computeChainGreeks(contracts, sigma = sigma, ir = ir, saveIt = True)
         else:
             # Get the current price of the underlying
             spotPrice = self.contractUtils.getUnderlyingLastPrice(contracts)
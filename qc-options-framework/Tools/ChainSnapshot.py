@@ -0,0 +1,285 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import bisect
+import numpy as np
+from .ContractUtils import ContractUtils
+
+
+class ChainSnapshot:
+    """
+    Immutable columnar view of the option chain at a given time, built once per time bar from the slice or provider contracts.
+
+    The quotes of all the contracts are read once (through the contract utils) and stored in read-only NumPy columns. For each
+    right, the contracts are sorted by strike (stable sort, so contracts on the same strike keep the order of the chain), which
+    turns the strike lookups of the OrderBuilder into bisections instead of filtering and sorting the whole chain on every call.
+
+    The snapshot behaves as the list of contracts it was built from (len, iteration and indexing), so it can be passed anywhere
+    a list of contracts is expected. A snapshot can be shared by several strategies on the same underlying: each one gets a
+    view restricted to its own DTE/strike range (see select), built from the columns without reading the quotes again.
+
+    Attributes:
+        time (datetime): Time at which the snapshot was taken.
+        spotPrice (float): Price of the underlying when the snapshot was taken.
+        contracts (tuple[OptionContract]): Contracts of the chain (same order as the input).
+        columns (dict): Read-only arrays (same order as the input): strike, isCall, expiry, dte, bid, ask, mid, tradable, volume, openInterest.
+    """
+
+    RIGHTS = ("put", "call")
+
+    def __init__(self, context, contracts, spotPrice = None, time = None):
+        self.context = context
+        self.contractUtils = ContractUtils(context)
+        self.time = time if time is not None else context.Time
+        self.contracts = tuple(contracts)
+        if spotPrice is None and self.contracts:
+            spotPrice = self.contractUtils.getUnderlyingLastPrice(self.contracts[0])
+        self.spotPrice = spotPrice
+
+        # Read the quotes of all the contracts once
+        n = len(self.contracts)
+        columns = {
+            "strike": np.empty(n)
+            , "isCall": np.empty(n, dtype = bool)
+            , "expiry": np.empty(n, dtype = object)
+            , "dte": np.empty(n, dtype = int)
+            , "bid": np.empty(n)
+            , "ask": np.empty(n)
+            , "mid": np.empty(n)
+            , "tradable": np.empty(n, dtype = bool)
+            , "volume": np.empty(n)
+            , "openInterest": np.empty(n)
+        }
+        for i, contract in enumerate(self.contracts):
+            security = self.contractUtils.getSecurity(contract)
+            columns["strike"][i] = contract.Strike
+            columns["isCall"][i] = contract.Right == OptionRight.Call
+            columns["expiry"][i] = contract.Expiry
+            columns["dte"][i] = (contract.Expiry.date() - self.time.date()).days
+            columns["bid"][i] = security.BidPrice
+            columns["ask"][i] = security.AskPrice
+            columns["mid"][i] = self.contractUtils.midPrice(contract)
+            columns["tradable"][i] = security.IsTradable
+            columns["volume"][i] = self.number(getattr(security, "Volume", None))
+            columns["openInterest"][i] = self.number(getattr(security, "OpenInterest", None))
+        for column in columns.values():
+            column.flags.writeable = False
+        self.columns = columns
+        self.buildIndex()
+
+    def buildIndex(self):
+        """Builds the positions of the contracts of each right sorted by strike (from the columns)."""
+        columns = self.columns
+        # Positions of the contracts of each right, sorted by strike
+        self.order = {}
+        self.strikes = {}
+        self.distinctStrikes = {}
+        for right, isCall in zip(self.RIGHTS, (False, True)):
+            positions = np.flatnonzero(columns["isCall"] == isCall)
+            positions = positions[np.argsort(columns["strike"][positions], kind = "stable")]
+            positions.flags.writeable = False
+            self.order[right] = positions
+            # Plain lists are faster than arrays for the scalar bisections
+            self.strikes[right] = columns["strike"][positions].tolist()
+            self.distinctStrikes[right] = sorted(set(self.strikes[right]))
+
+    @staticmethod
+    def number(value):
+        # Numeric value of an attribute (NaN if it is not available)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float("nan")
+
+    def view(self, positions):
+        """
+        Snapshot of a subset of the contracts (same time and spot price), built from the columns without reading the quotes again.
+
+        Args:
+            positions (list[int]): Positions of the contracts to keep (in the order of this snapshot).
+
+        Returns:
+            ChainSnapshot: The read-only view.
+        """
+        positions = np.asarray(positions, dtype = int)
+        view = object.__new__(type(self))
+        view.context = self.context
+        view.contractUtils = self.contractUtils
+        view.time = self.time
+        view.spotPrice = self.spotPrice
+        view.contracts = tuple(self.contracts[i] for i in positions)
+        view.columns = {}
+        for name, column in self.columns.items():
+            column = column[positions]
+            column.flags.writeable = False
+            view.columns[name] = column
+        view.buildIndex()
+        return view
+
+    def select(self, minDte = None, maxDte = None, nStrikesLeft = None, nStrikesRight = None):
+        """
+        View of the contracts within a DTE range and a number of strikes around the ATM strike (same selection as the
+        option universe filter: Strikes(-nStrikesLeft, nStrikesRight).Expiration(minDte, maxDte)).
+
+        Args:
+            minDte (int, optional): Minimum days to expiration.
+            maxDte (int, optional): Maximum days to expiration.
+            nStrikesLeft (int, optional): Number of strikes below the ATM strike.
+            nStrikesRight (int, optional): Number of strikes above the ATM strike.
+
+        Returns:
+            ChainSnapshot: The read-only view.
+        """
+        keep = np.ones(len(self.contracts), dtype = bool)
+        dte = self.columns["dte"]
+        if minDte is not None:
+            keep &= dte >= minDte
+        if maxDte is not None:
+            keep &= dte <= maxDte
+        if (nStrikesLeft is not None or nStrikesRight is not None) and self.spotPrice is not None:
+            strike = self.columns["strike"]
+            strikes = np.unique(strike[keep])
+            if strikes.size > 0:
+                atm = int(np.argmin(np.abs(strikes - self.spotPrice)))
+                if nStrikesLeft is not None:
+                    keep &= strike >= strikes[max(0, atm - nStrikesLeft)]
+                if nStrikesRight is not None:
+                    keep &= strike <= strikes[min(strikes.size - 1, atm + nStrikesRight)]
+        return self.view(np.flatnonzero(keep))
+
+    def __len__(self):
+        return len(self.contracts)
+
+    def __iter__(self):
+        return iter(self.contracts)
+
+    def __getitem__(self, key):
+        return self.contracts[key]
+
+    def rights(self, type = None):
+        """Rights ("put"/"call") selected by the given type (None or any other value selects both)."""
+        type = (type or "").lower()
+        return (type,) if type in self.RIGHTS else self.RIGHTS
+
+    def column(self, name, type):
+        """Column of the contracts of the given right ("put"/"call"), sorted by strike."""
+        return self.columns[name][self.order[type.lower()]]
+
+    def sortedContracts(self, type):
+        """Contracts of the given right ("put"/"call"), sorted by strike."""
+        return [self.contracts[i] for i in self.order[type.lower()]]
+
+    def strikeSlice(self, type, fromStrike = None, toStrike = None):
+        """Range of positions (within the contracts of the given right sorted by strike) with fromStrike <= strike <= toStrike."""
+        strikes = self.strikes[type.lower()]
+        start = 0 if fromStrike is None else bisect.bisect_left(strikes, fromStrike)
+        stop = len(strikes) if toStrike is None else bisect.bisect_right(strikes, toStrike)
+        return slice(start, max(start, stop))
+
+    def getContracts(self, type, fromStrike = None, toStrike = None, fromPrice = None, toPrice = None, tradableOnly = True):
+        """
+        Contracts of the given right within the strike and mid-price ranges (both inclusive), sorted by strike.
+
+        Args:
+            type (str): The type of option ('put' or 'call').
+            fromStrike (float, optional): The minimum strike price.
+            toStrike (float, optional): The maximum strike price.
+            fromPrice (float, optional): The minimum mid-price.
+            toPrice (float, optional): The maximum mid-price.
+            tradableOnly (bool, optional): If True, only the tradable contracts are returned.
+
+        Returns:
+            list[OptionContract]: The selected contracts, sorted by ascending strike.
+        """
+        type = type.lower()
+        positions = self.order[type][self.strikeSlice(type, fromStrike, toStrike)]
+        keep = np.ones(positions.size, dtype = bool)
+        if tradableOnly:
+            keep &= self.columns["tradable"][positions]
+        if fromPrice is not None or toPrice is not None:
+            mid = self.columns["mid"][positions]
+            keep &= ((-np.inf if fromPrice is None else fromPrice) <= mid) & (mid <= (np.inf if toPrice is None else toPrice))
+        return [self.contracts[i] for i in positions[keep]]
+
+    def strikeRange(self, type, fromStrike = None, toStrike = None):
+        """Contracts of the given right with fromStrike <= strike <= toStrike, sorted by strike."""
+        return self.getContracts(type, fromStrike = fromStrike, toStrike = toStrike, tradableOnly = False)
+
+    def priceRange(self, type, fromPrice = None, toPrice = None):
+        """Contracts of the given right with fromPrice <= mid-price <= toPrice, sorted by strike."""
+        return self.getContracts(type, fromPrice = fromPrice, toPrice = toPrice, tradableOnly = False)
+
+    def nearestStrike(self, price = None, type = None):
+        """Listed strike closest to the given price (default: the price of the underlying), or None if there are no contracts."""
+        price = self.spotPrice if price is None else price
+        nearest = None
+        for right in self.rights(type):
+            strikes = self.distinctStrikes[right]
+            idx = bisect.bisect_left(strikes, price)
+            for strike in strikes[max(0, idx-1):idx+1]:
+                if nearest is None or abs(strike - price) < abs(nearest - price):
+                    nearest = strike
+        return nearest
+
+    def nearestContracts(self, count = 1, type = None, price = None):
+        """
+        The count contracts with the strike closest to the given price (default: the price of the underlying).
+        The result is the same as sorting the chain by the distance of the strike from the price (stable sort) and taking the
+        first count contracts, but only the contracts around the price are visited.
+
+        Args:
+            count (int, optional): Number of contracts to return.
+            type (str, optional): The type of option ('put', 'call' or None/'both' for any type).
+            price (float, optional): The reference price.
+
+        Returns:
+            list[OptionContract]: The closest contracts, sorted by distance from the price.
+        """
+        price = self.spotPrice if price is None else price
+        candidates = []
+        for right in self.rights(type):
+            strikes = self.strikes[right]
+            lo = hi = bisect.bisect_left(strikes, price)
+            # Expand the window around the price, always moving to the closest side
+            while hi - lo < count and (lo > 0 or hi < len(strikes)):
+                if hi == len(strikes) or (lo > 0 and price - strikes[lo-1] <= strikes[hi] - price):
+                    lo -= 1
+                else:
+                    hi += 1
+            if hi == lo:
+                continue
+            # Include the contracts tied with the furthest one
+            furthest = max(abs(strikes[lo] - price), abs(strikes[hi-1] - price))
+            while lo > 0 and abs(strikes[lo-1] - price) <= furthest:
+                lo -= 1
+            while hi < len(strikes) and abs(strikes[hi] - price) <= furthest:
+                hi += 1
+            candidates.extend((abs(strikes[j] - price), int(self.order[right][j])) for j in range(lo, hi))
+        # Ties are broken by the position in the chain (same as a stable sort)
+        return [self.contracts[i] for _, i in sorted(candidates)[:count]]
+
+    def kthOTM(self, type, k = 1, price = None):
+        """
+        Contract on the k-th OTM strike (k = 1: the first strike below the price for the Puts, above the price for the Calls).
+
+        Args:
+            type (str): The type of option ('put' or 'call').
+            k (int, optional): Rank of the OTM strike.
+            price (float, optional): The reference price (default: the price of the underlying).
+
+        Returns:
+            OptionContract: The first contract (in chain order) on the k-th OTM strike, or None if there are not enough strikes.
+        """
+        type = type.lower()
+        price = self.spotPrice if price is None else price
+        strikes = self.distinctStrikes[type]
+        if k < 1:
+            return None
+        if type == "call":
+            idx = bisect.bisect_right(strikes, price) + k - 1
+        else:
+            idx = bisect.bisect_left(strikes, price) - k
+        if not 0 <= idx < len(strikes):
+            return None
+        return self.contracts[self.order[type][bisect.bisect_left(self.strikes[type], strikes[idx])]]
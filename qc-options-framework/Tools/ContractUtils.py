@@ -3,6 +3,7 @@ from AlgorithmImports import *
 #endregion
 
 from .Logger import Logger
+from .TimeMemo import timeMemoized
 
 
 class ContractUtils:
@@ -62,6 +63,8 @@ class ContractUtils:
         
         bidAskSpread(contract):
             Calculates and returns the bid-ask spread of the given option
+
+    The price queries are memoized within the current time bar if context.timeMemoization is True (see TimeMemo).
     """
 
     def __init__(self, context, custom_greeks=False):
@@ -69,6 +72,7 @@ class ContractUtils:
         self.logger = Logger(context, className=type(self).__name__, logLevel=context.logLevel) # Set the logger
         self.custom_greeks = custom_greeks
 
+    @timeMemoized(lambda self, symbol: symbol)
     def getUnderlyingPrice(self, symbol):
         """
         Returns the latest price of the security associated with the given symbol.
@@ -80,6 +84,8 @@ class ContractUtils:
         security = self.context.Securities[symbol]
         return self.context.GetLastKnownPrice(security).Price
 
+    # Only the prices read from the Securities are memoized: the fallback on the contract itself is not keyed by symbol
+    @timeMemoized(lambda self, contract: contract.UnderlyingSymbol if contract.UnderlyingSymbol in self.context.Securities else None)
     def getUnderlyingLastPrice(self, contract):
         """
         Retrieves the last known price of the underlying security of the given contract.
@@ -103,6 +109,8 @@ class ContractUtils:
             # Get the UnderlyingLastPrice attribute of the contract
             return contract.UnderlyingLastPrice
 
+    # Only the Securities hits are memoized: a contract missing from the Securities is returned as is
+    @timeMemoized(lambda self, contract: contract.Symbol if contract.Symbol in self.context.Securities else None)
     def getSecurity(self, contract):
         """
         Retrieves the security object associated with the given contract.
@@ -123,6 +131,7 @@ class ContractUtils:
         return security
 
     # Returns the mid-price of an option contract
+    @timeMemoized(lambda self, contract: contract.Symbol)
     def midPrice(self, contract):
         """
         Calculates and returns the mid-price of the given option contract.
@@ -249,6 +258,7 @@ class ContractUtils:
             return contract.BSMGreeks.Rho if hasattr(contract, 'BSMGreeks') else contract.greeks.rho
         return contract.greeks.rho 
         
+    @timeMemoized(lambda self, contract: contract.Symbol)
     def bidPrice(self, contract):
         """
         Retrieves the bid price of the given option contract.
@@ -260,6 +270,7 @@ class ContractUtils:
         security = self.getSecurity(contract)
         return security.BidPrice
 
+    @timeMemoized(lambda self, contract: contract.Symbol)
     def askPrice(self, contract):
         """
         Retrieves the ask price of the given option contract.
@@ -271,6 +282,7 @@ class ContractUtils:
         security = self.getSecurity(contract)
         return security.AskPrice
 
+    @timeMemoized(lambda self, contract: contract.Symbol)
     def bidAskSpread(self, contract):
         """
         Calculates and returns the bid-ask spread of the given option contract.
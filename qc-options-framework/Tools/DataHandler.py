@@ -4,7 +4,12 @@ from AlgorithmImports import *
 
 from .Underlying import Underlying
 from .ProviderOptionContract import ProviderOptionContract
+from .ProviderChain import ProviderChain, ExpiryContracts
+from .OptionSubscriptions import OptionSubscriptions
+from .GreeksIndicators import GreeksIndicators
+from .ContractUtils import ContractUtils
 import operator
+import numpy as np
 
 class DataHandler:
     # The supported cash indices by QC https://www.quantconnect.com/docs/v2/writing-algorithms/datasets/tickdata/us-cash-indices#05-Supported-Indices
@@ -16,6 +21,11 @@ class DataHandler:
         self.context = context
         self.strategy = strategy
         self.is_future_option = self.__FutureTicker()  # Flag to identify if we're dealing with future options
+        self.contractUtils = ContractUtils(context)
+        # Cumulative number of contracts checked/dropped by the liquidity filter (by reason)
+        self.liquidityStats = {"checked": 0, "dropped": 0}
+        # Canonical option symbol used with the option chain provider (created on first use)
+        self.canonicalSymbol = None
 
     # Method to add the ticker[String] data to the context.
     # @param resolution [Resolution]
@@ -64,13 +74,28 @@ class DataHandler:
 
     # SECTION BELOW HANDLES OPTION CHAIN PROVIDER METHODS
     def optionChainProviderFilter(self, symbols, min_strike_rank, max_strike_rank, minDte, maxDte):
+        """
+        Selects the provider contracts of the strategy: one expiration date within the DTE range and the strikes ranked
+        min_strike_rank..max_strike_rank around the ATM strike.
+
+        Args:
+            symbols (ProviderChain | list[Symbol]): The listed contracts (a list is bucketed on the fly).
+            min_strike_rank (int): Rank of the lowest strike relative to the ATM strike (i.e. -nStrikesLeft).
+            max_strike_rank (int): Rank of the highest strike relative to the ATM strike (i.e. nStrikesRight).
+            minDte (int): Minimum days to expiration.
+            maxDte (int): Maximum days to expiration.
+
+        Returns:
+            list[ProviderOptionContract]: The selected contracts (provider order), or None if there are none.
+        """
         self.context.executionTimer.start('Tools.DataHandler -> optionChainProviderFilter')
 
-        if len(symbols) == 0:
+        chain = symbols if isinstance(symbols, ProviderChain) else ProviderChain(symbols)
+        if len(chain) == 0:
             self.context.logger.warning("No initial symbols provided to filter")
             return None
 
-        self.context.logger.warning(f"Initial filter state: {len(symbols)} symbols, DTE range: {minDte}-{maxDte}")
+        self.context.logger.debug(f"optionChainProviderFilter -> {len(chain)} symbols, {len(chain.expiries)} expiries, DTE range: {minDte}-{maxDte}")
 
         # Check minimum trade distance
         minimumTradeScheduleDistance = self.strategy.parameter("minimumTradeScheduleDistance", timedelta(hours=0))
@@ -79,26 +104,18 @@ class DataHandler:
             return None
 
         # Filter by DTE first
-        self.context.logger.warning(f"Filtering by DTE: {minDte}-{maxDte}")
-        self.context.logger.warning(f"Current time: {self.context.Time.date()}")
-        for symbol in symbols[:5]:  # Log first 5 symbols
-            dte = (symbol.ID.Date.date() - self.context.Time.date()).days
-            self.context.logger.warning(f"Symbol {symbol.ID.Symbol}: DTE={dte}, Strike={symbol.ID.StrikePrice}")
-
-        filteredSymbols = [symbol for symbol in symbols
-                          if minDte <= (symbol.ID.Date.date() - self.context.Time.date()).days <= maxDte]
-
-        if not filteredSymbols:
-            self.context.logger.warning(f"All {len(symbols)} symbols filtered out by DTE range {minDte}-{maxDte}")
-            if len(symbols) > 0:
-                available_dtes = sorted(set((symbol.ID.Date.date() - self.context.Time.date()).days for symbol in symbols))
-                self.context.logger.warning(f"Available DTEs were: {available_dtes}")
+        today = self.context.Time.date()
+        expiries = chain.expiriesWithin(today, minDte, maxDte)
+        if not expiries:
+            self.context.logger.warning(f"All {len(chain)} symbols filtered out by DTE range {minDte}-{maxDte}")
+            self.context.logger.warning(f"Available DTEs were: {[chain.dte(expiry, today) for expiry in chain.expiries]}")
             return None
 
         # Get unique expiry dates
-        expiry_dates = sorted(set(symbol.ID.Date for symbol in filteredSymbols), reverse=True)
+        expiry_dates = sorted(expiries, reverse=True)
         
         # Handle dynamic DTE selection if enabled
+        selected_expiry = None
         if (hasattr(self.strategy, 'dynamicDTESelection') and self.strategy.dynamicDTESelection and 
             hasattr(self.context, 'recentlyClosedDTE') and self.context.recentlyClosedDTE):
             valid_closed_trades = [
@@ -108,13 +125,13 @@ class DataHandler:
             if valid_closed_trades:
                 last_closed_dte = valid_closed_trades[0]["closeDte"]
                 # Find expiry date closest to last closed DTE
-                target_expiry = min(expiry_dates, 
+                selected_expiry = min(expiry_dates, 
                                   key=lambda x: abs((x.date() - self.context.Time.date()).days - last_closed_dte))
-                filteredSymbols = [s for s in filteredSymbols if s.ID.Date == target_expiry]
         else:
             # Use furthest/earliest expiry based on useFurthestExpiry
             selected_expiry = expiry_dates[0 if self.strategy.useFurthestExpiry else -1]
-            filteredSymbols = [s for s in filteredSymbols if s.ID.Date == selected_expiry]
+        # Without a recently closed trade, all the expiries within the DTE range are kept
+        selectedExpiries = expiries if selected_expiry is None else [selected_expiry]
 
         # Filter based on allowMultipleEntriesPerExpiry
         if (hasattr(self.strategy, 'allowMultipleEntriesPerExpiry') and 
@@ -125,35 +142,24 @@ class DataHandler:
                 if position.strategyTag == self.strategy.nameTag:
                     open_expiries.add(position.expiryStr)
             
-            filteredSymbols = [
-                symbol for symbol in filteredSymbols 
-                if symbol.ID.Date.strftime("%Y-%m-%d") not in open_expiries
-            ]
+            selectedExpiries = [expiry for expiry in selectedExpiries if expiry.strftime("%Y-%m-%d") not in open_expiries]
 
-        # Filter out non-tradable symbols for equities
-        if not self.__CashTicker():
-            before_tradable = len(filteredSymbols)
-            tradable_symbols = []
-            non_tradable_reasons = []
-
-            for symbol in filteredSymbols[:5]:  # Sample first 5 symbols for detailed logging
-                security = self.context.Securities[symbol.ID.Symbol]
-                if security.IsTradable:
-                    tradable_symbols.append(symbol)
-                else:
-                    non_tradable_reasons.append(f"Symbol {symbol.ID.Symbol}: IsTradable={security.IsTradable}")
+        contracts = [chain.contracts[expiry] for expiry in selectedExpiries]
+        if len(contracts) == 1:
+            contracts = contracts[0]
+        else:
+            # Several expiries: merge them (provider order)
+            contracts = ExpiryContracts([(strike, position, symbol) for expiryContracts in contracts for strike, position, symbol in zip(expiryContracts.strikes, expiryContracts.positions, expiryContracts.symbols)])
 
-            # If we found any tradable in the sample, use normal filtering
-            if tradable_symbols:
-                filteredSymbols = [x for x in filteredSymbols if self.context.Securities[x.ID.Symbol].IsTradable]
+        # Filter out non-tradable symbols for equities
+        if not self.__CashTicker() and len(contracts) > 0:
+            sample = contracts.providerOrder()[:5]  # Sample first 5 symbols for detailed logging
+            if any(self.context.Securities[symbol.ID.Symbol].IsTradable for symbol in sample):
+                contracts = contracts.filter(lambda x: self.context.Securities[x.ID.Symbol].IsTradable)
             else:
                 # If none in sample were tradable, log reasons and try proceeding anyway
-                self.context.logger.warning(f"Sample non-tradable reasons: {', '.join(non_tradable_reasons)}")
+                self.context.logger.warning(f"Sample non-tradable reasons: {', '.join(f'Symbol {symbol.ID.Symbol}: IsTradable=False' for symbol in sample)}")
                 self.context.logger.warning("Proceeding with all symbols despite tradability check")
-                # Don't filter out non-tradable symbols
-                tradable_symbols = filteredSymbols
-
-            self.context.logger.warning(f"Tradability filter: {before_tradable} -> {len(filteredSymbols)} symbols")
 
         # Get underlying price
         underlying = Underlying(self.context, self.strategy.underlyingSymbol)
@@ -163,48 +169,21 @@ class DataHandler:
             self.context.logger.warning(f"No price available for {self.strategy.underlyingSymbol}")
             return None
 
-        self.context.logger.warning(f"Underlying {self.strategy.underlyingSymbol} price: {underlyingLastPrice}")
-
-        # Find ATM strike
-        try:
-            atm_strike = sorted(filteredSymbols, key=lambda x: abs(x.ID.StrikePrice - underlyingLastPrice))[0].ID.StrikePrice
-            self.context.logger.warning(f"ATM strike found: {atm_strike} (Underlying: {underlyingLastPrice})")
-        except IndexError:
+        # Select the strikes around the ATM strike (bisections on the sorted strikes)
+        selectedSymbols = contracts.strikeRange(underlyingLastPrice, min_strike_rank, max_strike_rank)
+        if selectedSymbols is None:
             self.context.logger.warning("Unable to find ATM strike")
             return None
 
-        # Get sorted strike list and find strike range
-        strike_list = sorted(set([i.ID.StrikePrice for i in filteredSymbols]))
-        atm_strike = sorted(filteredSymbols, key=lambda x: abs(x.ID.StrikePrice - underlyingLastPrice))[0].ID.StrikePrice
-        
-        self.context.logger.warning(f"Strike list: {strike_list}")
-        self.context.logger.warning(f"ATM strike: {atm_strike}")
-        
-        # Find the index of the ATM strike
-        atm_index = strike_list.index(atm_strike)
-        
-        # Calculate min and max indices, ensuring we don't go out of bounds
-        min_index = max(0, atm_index + min_strike_rank)
-        max_index = min(len(strike_list) - 1, atm_index + max_strike_rank)
-        
-        # Get the actual strike prices at these indices
-        min_strike = strike_list[min_index]
-        max_strike = strike_list[max_index]
-        
-        self.context.logger.warning(f"Strike range: {min_strike} - {max_strike}")
-
-        # Filter by strike range (inclusive)
-        selectedSymbols = [symbol for symbol in filteredSymbols
-                                if min_strike <= symbol.ID.StrikePrice <= max_strike]
-
-        self.context.logger.warning(f"Strike filter: {len(filteredSymbols)} -> {len(selectedSymbols)} symbols")
+        self.context.logger.debug(f"optionChainProviderFilter -> ATM strike: {contracts.atmStrike(underlyingLastPrice)} (Underlying: {underlyingLastPrice}), selected {len(selectedSymbols)}/{len(contracts)} symbols")
 
         # Convert to ProviderOptionContract objects
-        contracts = []
-        for symbol in selectedSymbols:
-            self.AddOptionContracts([symbol], resolution=self.context.timeResolution)
-            contract = ProviderOptionContract(symbol, underlyingLastPrice, self.context)
-            contracts.append(contract)
+        self.AddOptionContracts(selectedSymbols, resolution=self.context.timeResolution)
+        # The strikes that left the window of the strategy are released (removed after the grace period if nothing else uses them)
+        OptionSubscriptions.of(self.context).setOwned(("chain", self.strategy.nameTag), selectedSymbols)
+        # Greeks on demand: only the contracts in a chain window or in a position have their indicators (see GreeksIndicators)
+        GreeksIndicators.of(self.context).sync()
+        contracts = [ProviderOptionContract(symbol, underlyingLastPrice, self.context) for symbol in selectedSymbols]
 
         self.context.executionTimer.stop('Tools.DataHandler -> optionChainProviderFilter')
 
@@ -220,40 +199,133 @@ class DataHandler:
         self.context.logger.debug(f"getOptionContracts -> maxDte: {maxDte}")
 
         if self.strategy.useSlice and slice is not None:
-            if self.is_future_option:
-                for continuous_future_symbol, futures_chain in slice.FuturesChains.items():
-                    if continuous_future_symbol == self.strategy.underlyingSymbol:
-                        for futures_contract in futures_chain:
-                            canonical_fop_symbol = Symbol.CreateCanonicalOption(futures_contract.Symbol)
-                            option_chain = slice.OptionChains.get(canonical_fop_symbol)
-                            if option_chain is not None and option_chain.contracts.count != 0:
-                                contracts = list(option_chain.Contracts.Values)
-                                break
-                        if contracts:
-                            break
-            else:
-                for chain in slice.OptionChains:
-                    if self.strategy.optionSymbol is None or chain.Key == self.strategy.optionSymbol:
-                        if chain.Value.Contracts.Count != 0:
-                            contracts = list(chain.Value)
-                            break
-            self.context.logger.debug(f"getOptionContracts -> number of contracts from slice: {len(contracts) if contracts else 0}")
+            contracts = self.getSliceContracts(slice)
 
         if contracts is None:
             if not self.is_future_option:
-                canonical_symbol = self.OptionsContract(self.strategy.underlyingSymbol)
-                symbols = self.context.OptionChainProvider.GetOptionContractList(canonical_symbol, self.context.Time)
+                if self.canonicalSymbol is None:
+                    self.canonicalSymbol = self.OptionsContract(self.strategy.underlyingSymbol)
+                # Listed contracts of the day, loaded from the provider once per day
+                symbols = ProviderChain.of(self.context, self.canonicalSymbol)
                 contracts = self.optionChainProviderFilter(symbols, -self.strategy.nStrikesLeft, self.strategy.nStrikesRight, minDte, maxDte)
 
+        # Drop the illiquid/stale contracts before any Greeks are computed on the chain
+        if contracts and self.strategy.parameter("liquidityFilter", False) is True:
+            contracts = self.liquidityFilter(contracts)
+
         self.context.executionTimer.stop('Tools.DataHandler -> getOptionContracts')
 
         return contracts
 
+    def getSliceContracts(self, slice):
+        """
+        Contracts of the option chain of the strategy contained in the slice.
+
+        Args:
+            slice (Slice): The data slice.
+
+        Returns:
+            list: The option contracts (None if the slice does not contain the chain).
+        """
+        contracts = None
+        if self.is_future_option:
+            for continuous_future_symbol, futures_chain in slice.FuturesChains.items():
+                if continuous_future_symbol == self.strategy.underlyingSymbol:
+                    for futures_contract in futures_chain:
+                        canonical_fop_symbol = Symbol.CreateCanonicalOption(futures_contract.Symbol)
+                        option_chain = slice.OptionChains.get(canonical_fop_symbol)
+                        if option_chain is not None and option_chain.contracts.count != 0:
+                            contracts = list(option_chain.Contracts.Values)
+                            break
+                    if contracts:
+                        break
+        else:
+            for chain in slice.OptionChains:
+                if self.strategy.optionSymbol is None or chain.Key == self.strategy.optionSymbol:
+                    if chain.Value.Contracts.Count != 0:
+                        contracts = list(chain.Value)
+                        break
+        self.context.logger.debug(f"getOptionContracts -> number of contracts from slice: {len(contracts) if contracts else 0}")
+        return contracts
+
+    def liquidityFilter(self, contracts):
+        """
+        Drops the contracts with an unusable quote, using the thresholds of the strategy:
+          - noBid: the bid is zero/missing or below liquidityMinBid
+          - crossed: the ask is below the bid
+          - wideSpread: the ratio between the Bid-Ask spread and the mid-price is above liquidityMaxSpreadRatio (if set)
+          - stale: the last update of the contract is older than liquidityMaxQuoteAge (if set)
+          - lowOpenInterest: the open interest is below liquidityMinOpenInterest
+
+        The quotes of the whole chain are read once and all the checks are evaluated on arrays. The number of contracts
+        dropped for each reason is logged and accumulated in self.liquidityStats (a contract failing several checks is
+        counted under each of them).
+
+        Args:
+            contracts (list): The option contracts (slice or provider contracts).
+
+        Returns:
+            list: The contracts that passed all the checks (same order as the input).
+        """
+        self.context.executionTimer.start('Tools.DataHandler -> liquidityFilter')
+
+        minBid = self.strategy.parameter("liquidityMinBid", 0.0) or 0.0
+        maxSpreadRatio = self.strategy.parameter("liquidityMaxSpreadRatio", None)
+        maxQuoteAge = self.strategy.parameter("liquidityMaxQuoteAge", None)
+        minOpenInterest = self.strategy.parameter("liquidityMinOpenInterest", 0) or 0
+
+        n = len(contracts)
+        bid = np.empty(n)
+        ask = np.empty(n)
+        age = np.full(n, np.nan)
+        openInterest = np.full(n, np.nan)
+        for i, contract in enumerate(contracts):
+            security = self.contractUtils.getSecurity(contract)
+            bid[i] = security.BidPrice
+            ask[i] = security.AskPrice
+            oi = getattr(security, "OpenInterest", None)
+            if isinstance(oi, (int, float)):
+                openInterest[i] = oi
+            # The provider contracts do not carry the time of their last update
+            lastUpdate = getattr(contract, "Time", None)
+            if maxQuoteAge is not None and isinstance(lastUpdate, datetime):
+                age[i] = (self.context.Time - lastUpdate).total_seconds()
+
+        mid = 0.5 * (bid + ask)
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            spreadRatio = (ask - bid) / mid
+
+        # Comparisons with NaN are False: missing values only fail the checks that require them
+        reasons = {
+            "noBid": ~(bid > 0) | (bid < minBid),
+            "crossed": ask < bid,
+            "lowOpenInterest": openInterest < minOpenInterest,
+        }
+        if maxSpreadRatio is not None:
+            reasons["wideSpread"] = spreadRatio > maxSpreadRatio
+        if maxQuoteAge is not None:
+            reasons["stale"] = age > maxQuoteAge.total_seconds()
+
+        drop = np.zeros(n, dtype = bool)
+        for mask in reasons.values():
+            drop |= mask
+        counts = {reason: int(mask.sum()) for reason, mask in reasons.items()}
+        self.liquidityStats["checked"] += n
+        self.liquidityStats["dropped"] += int(drop.sum())
+        for reason, count in counts.items():
+            self.liquidityStats[reason] = self.liquidityStats.get(reason, 0) + count
+        self.context.logger.debug(f"liquidityFilter -> dropped {int(drop.sum())}/{n} contracts: {counts}")
+
+        self.context.executionTimer.stop('Tools.DataHandler -> liquidityFilter')
+
+        return [contract for contract, dropped in zip(contracts, drop) if not dropped]
+
     # Method to add option contracts data to the context.
     # @param contracts [Array]
     # @param resolution [Resolution]
     # @return [Symbol]
     def AddOptionContracts(self, contracts, resolution = Resolution.Minute):
+        greeksIndicators = GreeksIndicators.of(self.context)
         # Add this contract to the data subscription so we can retrieve the Bid/Ask price
         for contract in contracts:
             if contract not in self.context.optionContractsSubscriptions:
@@ -263,9 +335,10 @@ class DataHandler:
                     self.context.AddIndexOptionContract(contract, resolution)
                 else:
                     self.context.AddOptionContract(contract, resolution)
-                self.context.optionContractsSubscriptions.append(contract)
-                # Calculate Greeks after adding the contract
-                self._initializeGreeks(self.context.Securities[contract])
+                self.context.optionContractsSubscriptions.add(contract)
+                # Calculate Greeks after adding the contract (unless they are attached on demand, see GreeksIndicators.sync)
+                if not greeksIndicators.onDemand:
+                    greeksIndicators.attach(self.context.Securities[contract])
 
     def OptionsContract(self, underlyingSymbol):
         if self.ticker == "SPX":
@@ -296,26 +369,3 @@ class DataHandler:
                 .IncludeWeeklys()
                 .Strikes(-self.strategy.nStrikesLeft, self.strategy.nStrikesRight)
                 .Expiration(max(0, self.strategy.dte - self.strategy.dteWindow), max(0, self.strategy.dte)))
-
-    def _initializeGreeks(self, security):
-        """Initialize Greeks for an option contract after it's been added"""
-        try:
-            if security.Type in [SecurityType.Option, SecurityType.IndexOption]:
-                right = OptionRight.CALL if security.symbol.ID.option_right == OptionRight.PUT else OptionRight.PUT
-                mirror_symbol = Symbol.create_option(
-                    security.symbol.ID.underlying.symbol,
-                    security.symbol.ID.market,
-                    security.symbol.ID.option_style,
-                    right,
-                    security.symbol.ID.strike_price,
-                    security.symbol.ID.date
-                )
-
-                security.iv = self.context.iv(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
-                security.delta = self.context.d(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
-                security.gamma = self.context.g(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
-                security.vega = self.context.v(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
-                security.rho = self.context.r(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
-                security.theta = self.context.t(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
-        except Exception as e:
-            self.context.logger.warning(f"Greeks Initialization: Data not available: {e}")
\ No newline at end of file
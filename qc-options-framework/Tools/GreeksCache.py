@@ -0,0 +1,95 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+from collections import OrderedDict
+
+
+class GreeksCache:
+    """
+    Bounded LRU cache of the Implied Volatility and Greeks of option contracts, shared by all the BSM instances.
+
+    Each entry is keyed by (symbol, algorithm time, spot price, mid price, risk free rate, trading days): as long as the
+    quotes of a contract and of its underlying do not change within the same time bar, the IV and the Greeks are the same
+    and can be reused, regardless of which object (OptionContract or ProviderOptionContract) or which BSM instance requested
+    them. The model parameters are part of the key so that BSM instances set up differently never share their values.
+
+    Attributes:
+        maxSize (int): Maximum number of entries. The least recently used entries are evicted first. A size of 0 disables the cache.
+        hits (int): Number of successful lookups.
+        misses (int): Number of failed lookups.
+    """
+
+    def __init__(self, maxSize = 10000):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        # key -> (IV, BSMGreeks)
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def key(symbol, time, spotPrice, midPrice, riskFreeRate, tradingDays):
+        return (symbol, time, float(spotPrice), float(midPrice), float(riskFreeRate), float(tradingDays))
+
+    @property
+    def enabled(self):
+        return self.maxSize > 0
+
+    def get(self, key):
+        """
+        Get the (IV, BSMGreeks) tuple stored for the given key (the BSMGreeks might be None if only the IV is known).
+
+        Returns:
+            tuple: The cached entry or None if the key is not in the cache.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Mark the entry as the most recently used
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, IV, greeks = None):
+        if not self.enabled:
+            return
+        # Do not lose the Greeks if we are only storing the IV of an existing entry
+        if greeks is None and key in self.entries:
+            greeks = self.entries[key][1]
+        self.entries[key] = (IV, greeks)
+        self.entries.move_to_end(key)
+        # Evict the least recently used entries
+        while len(self.entries) > self.maxSize:
+            self.entries.popitem(last = False)
+
+    def resize(self, maxSize):
+        self.maxSize = maxSize
+        while len(self.entries) > max(0, self.maxSize):
+            self.entries.popitem(last = False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits/lookups if lookups > 0 else None,
+            "size": len(self.entries),
+            "maxSize": self.maxSize,
+        }
+
+    def showStats(self, context):
+        context.Log("Greeks Cache Stats:")
+        for key, value in self.stats().items():
+            context.Log(f"  --> {key}:{value}")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
@@ -0,0 +1,163 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+from .OptionSubscriptions import OptionSubscriptions
+
+
+class GreeksIndicators:
+    """
+    Lean Greeks indicators (iv, delta, gamma, vega, rho, theta) of the option contracts added by
+    DataHandler.AddOptionContracts (option chain provider path).
+
+    Each contract gets six indicators computed against its mirror contract (same strike/expiry, opposite right), and
+    each of them is updated on every bar of the two contracts.
+      - Eager mode (default): the indicators are created as soon as the contract is subscribed.
+      - On-demand mode (context.greeksOnDemand): the indicators only exist while the contract is owned (see
+        OptionSubscriptions): a candidate in the chain window of a strategy or a leg of an open position/working order.
+        They are created when the contract gets its first owner and deregistered when it loses the last one.
+        Until the indicators are ready, the Greeks of ProviderOptionContract are seeded from the BSM values of the
+        contract (see seed).
+    In both modes, the indicators of the contracts removed by OptionSubscriptions.sweep are deregistered (see sync).
+
+    Attributes:
+        context (QCAlgorithm): The algorithm.
+        attached (dict): symbol -> security holding the indicators.
+        seeded (set): Symbols attached in on-demand mode whose indicators have not been ready yet.
+        created (int): Number of indicator sets created.
+        detached (int): Number of indicator sets deregistered.
+        seeds (int): Number of readings served from the BSM values.
+        bsm (BSM): The model computing the seeds (created on first use).
+    """
+
+    # Attributes of the security holding the indicators
+    NAMES = ("iv", "delta", "gamma", "vega", "rho", "theta")
+
+    def __init__(self, context):
+        self.context = context
+        self.attached = {}
+        self.seeded = set()
+        self.created = 0
+        self.detached = 0
+        self.seeds = 0
+        self.bsm = None
+
+    @classmethod
+    def of(cls, context):
+        """Returns the Greeks indicators manager of the context (created on first use)."""
+        indicators = getattr(context, "greeksIndicators", None)
+        if not isinstance(indicators, cls):
+            indicators = cls(context)
+            context.greeksIndicators = indicators
+        return indicators
+
+    @property
+    def onDemand(self):
+        return getattr(self.context, "greeksOnDemand", False) is True
+
+    def attach(self, security):
+        """
+        Creates the Greeks indicators of the option contract (no-op if they already exist).
+
+        Args:
+            security (Security): The option contract.
+        """
+        if security.symbol in self.attached:
+            return
+        try:
+            if security.Type in [SecurityType.Option, SecurityType.IndexOption]:
+                right = OptionRight.CALL if security.symbol.ID.option_right == OptionRight.PUT else OptionRight.PUT
+                mirror_symbol = Symbol.create_option(
+                    security.symbol.ID.underlying.symbol,
+                    security.symbol.ID.market,
+                    security.symbol.ID.option_style,
+                    right,
+                    security.symbol.ID.strike_price,
+                    security.symbol.ID.date
+                )
+
+                security.iv = self.context.iv(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
+                security.delta = self.context.d(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
+                security.gamma = self.context.g(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
+                security.vega = self.context.v(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
+                security.rho = self.context.r(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
+                security.theta = self.context.t(security.symbol, mirror_symbol, resolution=self.context.timeResolution)
+                self.attached[security.symbol] = security
+                self.created += 1
+                if self.onDemand:
+                    self.seeded.add(security.symbol)
+        except Exception as e:
+            self.context.logger.warning(f"Greeks Initialization: Data not available: {e}")
+
+    def isReady(self, security):
+        return all(getattr(security, name).is_ready for name in self.NAMES)
+
+    def detach(self, symbol):
+        """Deregisters the Greeks indicators of the option contract (no-op if it has none)."""
+        security = self.attached.pop(symbol, None)
+        if security is None:
+            return
+        self.seeded.discard(symbol)
+        for name in self.NAMES:
+            indicator = getattr(security, name, None)
+            if indicator is not None:
+                self.context.DeregisterIndicator(indicator)
+            setattr(security, name, None)
+        self.detached += 1
+
+    def sync(self):
+        """
+        Detaches the indicators of the contracts no longer subscribed. On-demand mode: also detaches the ones of the
+        contracts no longer owned by any strategy/position, and attaches the ones of the owned contracts.
+        """
+        subscribed = self.context.optionContractsSubscriptions
+        owners = OptionSubscriptions.of(self.context).owners if self.onDemand else subscribed
+        for symbol in [symbol for symbol in self.attached if symbol not in owners or symbol not in subscribed]:
+            self.detach(symbol)
+        if not self.onDemand:
+            return
+        # Warmed up: the indicators are used from now on
+        self.seeded = set(symbol for symbol in self.seeded if not self.isReady(self.attached[symbol]))
+        for symbol in owners:
+            if symbol not in self.attached and symbol in subscribed:
+                self.attach(self.context.Securities[symbol])
+
+    def seed(self, contract, name):
+        """
+        BSM value of a Greek (one of NAMES) of a contract attached in on-demand mode whose indicators are not ready yet.
+
+        The Greeks computed on the contract within the current bar (i.e. by the OrderBuilder) are reused, otherwise they
+        are computed (and cached on the contract) by the BSM model.
+
+        Args:
+            contract (ProviderOptionContract): The option contract.
+            name (str): The Greek.
+
+        Returns:
+            float: The BSM value, or None if the contract is not waiting for its indicators.
+        """
+        if contract.Symbol not in self.seeded or self.isReady(contract.security):
+            return None
+        greeks = getattr(contract, "BSMGreeks", None)
+        if greeks is None or greeks.lastUpdated != self.context.Time:
+            if self.bsm is None:
+                # Imported on first use: the BSMLibrary module imports the Tools package
+                from .BSMLibrary import BSM
+                self.bsm = BSM(self.context)
+            self.bsm.setGreeks(contract)
+            greeks = contract.BSMGreeks
+        self.seeds += 1
+        if name == "iv":
+            return contract.BSMImpliedVolatility
+        return getattr(greeks, name.capitalize())
+
+    def counts(self):
+        """Live indicator counts."""
+        return {
+            "attached": len(self.attached),
+            "indicators": len(self.attached) * len(self.NAMES),
+            "warmingUp": len(self.seeded),
+            "created": self.created,
+            "detached": self.detached,
+            "seeds": self.seeds,
+        }
@@ -0,0 +1,143 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+from bisect import bisect_left, bisect_right
+
+
+class MarketCalendar:
+    """
+    Trading calendar service for the expiry related computations (last trading day, market close cutoff, business days).
+
+    Once per day (the first time it is used on a new date of the algorithm) the business days of a window around the
+    current date are loaded from context.TradingCalendar with a single GetDaysByType call. The window is extended on demand
+    when an expiry falls outside of it. Every question is then answered with a bisect over the sorted business days, and
+    the answers for each expiry (last trading day, cutoff datetime) are memoized until the next day.
+
+    Attributes:
+        context (QCAlgorithm): The algorithm.
+        day (date): Date of the algorithm when the table was built.
+        dates (list[date]): Business days of the table, sorted.
+        days (list[datetime]): Business days of the table (as returned by the TradingCalendar).
+        start (date): First day covered by the table.
+        end (date): Last day covered by the table.
+        expiries (dict): expiry date -> last trading day.
+        cutoffs (dict): (expiry date, cutoff time) -> market close cutoff datetime.
+    """
+
+    # Window loaded around the current date (extended on demand)
+    LOOKBACK = timedelta(days = 30)
+    HORIZON = timedelta(days = 90)
+
+    def __init__(self, context):
+        self.context = context
+        self.day = None
+        self.dates = []
+        self.days = []
+        self.start = None
+        self.end = None
+        self.expiries = {}
+        self.cutoffs = {}
+
+    @classmethod
+    def of(cls, context):
+        """Returns the calendar of the context (created on first use)."""
+        calendar = getattr(context, "marketCalendar", None)
+        if not isinstance(calendar, cls):
+            calendar = cls(context)
+            context.marketCalendar = calendar
+        return calendar
+
+    @staticmethod
+    def toDate(value):
+        return value.date() if isinstance(value, datetime) else value
+
+    def load(self, start, end):
+        """Loads the business days between start and end (inclusive)."""
+        tradingDays = self.context.TradingCalendar.GetDaysByType(TradingDayType.BusinessDay, datetime.combine(start, time()), datetime.combine(end, time()))
+        self.days = sorted((tradingDay.Date for tradingDay in tradingDays), key = self.toDate)
+        self.dates = [self.toDate(day) for day in self.days]
+        self.start = start
+        self.end = end
+
+    def refresh(self):
+        """Rebuilds the table (and forgets the memoized answers) when the date of the algorithm changes."""
+        today = self.context.Time.date()
+        if today != self.day:
+            self.day = today
+            self.expiries = {}
+            self.cutoffs = {}
+            self.load(today - self.LOOKBACK, today + self.HORIZON)
+
+    def cover(self, value):
+        """Makes sure the table covers the given date (and the 20 days before it)."""
+        self.refresh()
+        value = self.toDate(value)
+        if value - timedelta(days = 20) < self.start or value > self.end:
+            self.load(min(self.start, value - self.LOOKBACK), max(self.end, value + self.HORIZON))
+        return value
+
+    def lastTradingDay(self, expiry):
+        """
+        Last business day on or before the given expiration date (in case it falls on a holiday).
+
+        Args:
+            expiry (datetime): The expiration date.
+
+        Returns:
+            datetime: The last trading day (as returned by the TradingCalendar).
+        """
+        expiryDate = self.cover(expiry)
+        lastDay = self.expiries.get(expiryDate)
+        if lastDay is None:
+            lastDay = self.days[bisect_right(self.dates, expiryDate) - 1]
+            self.expiries[expiryDate] = lastDay
+        return lastDay
+
+    def marketCloseCutoffDttm(self, expiry, cutoffTime):
+        """Datetime by which a position expiring on the given date must be closed (cutoffTime on the last trading day)."""
+        key = (self.toDate(expiry), cutoffTime)
+        cutoff = self.cutoffs.get(key)
+        if cutoff is None:
+            cutoff = datetime.combine(self.toDate(self.lastTradingDay(expiry)), cutoffTime)
+            self.cutoffs[key] = cutoff
+        return cutoff
+
+    def isTradingDay(self, value):
+        """Whether the given date is a business day."""
+        value = self.cover(value)
+        i = bisect_left(self.dates, value)
+        return i < len(self.dates) and self.dates[i] == value
+
+    def businessDays(self, start, end):
+        """Number of business days d with start < d <= end (negative if end is before start)."""
+        start = self.cover(start)
+        end = self.cover(end)
+        if end < start:
+            return -self.businessDays(end, start)
+        return bisect_right(self.dates, end) - bisect_right(self.dates, start)
+
+    def addBusinessDays(self, value, n):
+        """The n-th business day after (n > 0) or before (n < 0) the given date."""
+        value = self.cover(value)
+        if n >= 0:
+            i = bisect_right(self.dates, value) + n - 1
+            while i >= len(self.dates):
+                self.load(self.start, self.end + self.HORIZON)
+                i = bisect_right(self.dates, value) + n - 1
+        else:
+            i = bisect_left(self.dates, value) + n
+            while i < 0:
+                self.load(self.start - self.LOOKBACK, self.end)
+                i = bisect_left(self.dates, value) + n
+        return self.dates[i]
+
+    def dte(self, expiry, atTime = None):
+        """Business days to expiration: business days after the current date up to the last trading day of the expiry."""
+        atTime = atTime or self.context.Time
+        return self.businessDays(atTime, self.lastTradingDay(expiry))
+
+    def dit(self, openDttm, atTime = None):
+        """Business days in trade: business days after the open date up to the current date."""
+        atTime = atTime or self.context.Time
+        return self.businessDays(openDttm, atTime)
@@ -0,0 +1,145 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+
+class OptionSubscriptions:
+    """
+    Reference counts of the option contracts subscribed by DataHandler.AddOptionContracts (context.optionContractsSubscriptions).
+
+    Each contract is owned by:
+      - ("chain", nameTag): the contracts selected by the last chain window of the strategy (option chain provider path)
+      - ("position", orderTag): the legs of the open positions and of the working orders
+
+    The chain owners are set by DataHandler.optionChainProviderFilter. The position owners are synchronized with
+    context.openPositions/context.workingOrders on each sweep (SetupBaseStructure.checkOpenPositions). A contract left
+    without owners is removed from the algorithm (RemoveOptionContract) once the grace period has elapsed, unless it is
+    still held in the portfolio. Acquiring it again within the grace period cancels the removal.
+
+    Attributes:
+        context (QCAlgorithm): The algorithm.
+        gracePeriod (timedelta): Time a contract is kept after its last owner released it (None -> context.subscriptionGracePeriod).
+        owners (dict): symbol -> set of owners.
+        owned (dict): owner -> set of symbols.
+        releasedAt (dict): symbol -> time at which its last owner released it (pending removals).
+        removed (int): Number of contracts removed.
+    """
+
+    # Grace period used if the context does not define subscriptionGracePeriod
+    GRACE_PERIOD = timedelta(minutes = 30)
+
+    def __init__(self, context, gracePeriod = None):
+        self.context = context
+        self.gracePeriod = gracePeriod
+        self.owners = {}
+        self.owned = {}
+        self.releasedAt = {}
+        self.removed = 0
+
+    @classmethod
+    def of(cls, context):
+        """Returns the subscription manager of the context (created on first use)."""
+        subscriptions = getattr(context, "optionSubscriptions", None)
+        if not isinstance(subscriptions, cls):
+            subscriptions = cls(context)
+            context.optionSubscriptions = subscriptions
+        return subscriptions
+
+    def getGracePeriod(self):
+        if self.gracePeriod is not None:
+            return self.gracePeriod
+        gracePeriod = getattr(self.context, "subscriptionGracePeriod", None)
+        return gracePeriod if isinstance(gracePeriod, timedelta) else self.GRACE_PERIOD
+
+    def isSubscribed(self, symbol):
+        return symbol in self.context.optionContractsSubscriptions
+
+    def refCount(self, symbol):
+        """Number of owners of the contract."""
+        return len(self.owners.get(symbol, ()))
+
+    def setOwned(self, owner, symbols):
+        """
+        Sets the contracts owned by the owner: the new ones are acquired, the ones no longer in the list are released.
+
+        Args:
+            owner (tuple): The owner, i.e. ("chain", nameTag) or ("position", orderTag).
+            symbols (list[Symbol]): The contracts owned (an empty list releases all of them).
+        """
+        symbols = set(symbols)
+        previous = self.owned.get(owner, set())
+        for symbol in symbols - previous:
+            self.owners.setdefault(symbol, set()).add(owner)
+            self.releasedAt.pop(symbol, None)
+        for symbol in previous - symbols:
+            owners = self.owners.get(symbol)
+            if owners is None:
+                continue
+            owners.discard(owner)
+            if not owners:
+                del self.owners[symbol]
+                # Only the contracts added through DataHandler.AddOptionContracts are removed (not the universe ones)
+                if self.isSubscribed(symbol):
+                    self.releasedAt[symbol] = self.context.Time
+        if symbols:
+            self.owned[owner] = symbols
+        else:
+            self.owned.pop(owner, None)
+
+    def release(self, owner):
+        """Releases all the contracts of the owner."""
+        self.setOwned(owner, ())
+
+    def syncPositions(self):
+        """Synchronizes the position owners with the open positions and working orders."""
+        orderIds = dict(self.context.openPositions)
+        for orderTag, workingOrder in self.context.workingOrders.items():
+            orderIds.setdefault(orderTag, workingOrder.orderId)
+        positionOwners = set(owner for owner in self.owned if owner[0] == "position")
+        for owner in positionOwners:
+            if owner[1] not in orderIds:
+                self.release(owner)
+        for orderTag, orderId in orderIds.items():
+            owner = ("position", orderTag)
+            if owner not in positionOwners:
+                position = self.context.allPositions.get(orderId)
+                if position is not None:
+                    self.setOwned(owner, [leg.symbol for leg in position.legs])
+
+    def isInvested(self, symbol):
+        try:
+            return self.context.Portfolio[symbol].Invested
+        except KeyError:
+            return False
+
+    def sweep(self):
+        """Removes the contracts without owners for longer than the grace period."""
+        self.syncPositions()
+        if not self.releasedAt:
+            return
+        now = self.context.Time
+        gracePeriod = self.getGracePeriod()
+        for symbol, releasedAt in list(self.releasedAt.items()):
+            if now - releasedAt < gracePeriod:
+                continue
+            if self.isInvested(symbol):
+                # Still held (i.e. assignment in progress): check again after another grace period
+                self.releasedAt[symbol] = now
+                continue
+            del self.releasedAt[symbol]
+            if not self.isSubscribed(symbol):
+                continue
+            self.context.optionContractsSubscriptions.discard(symbol)
+            self.context.RemoveOptionContract(symbol)
+            self.removed += 1
+        self.context.logger.debug(f"{self.__class__.__name__} -> sweep -> {self.counts()}")
+
+    def counts(self):
+        """Live subscription counts."""
+        return {
+            "subscribed": len(self.context.optionContractsSubscriptions),
+            "owned": len(self.owners),
+            "pendingRemoval": len(self.releasedAt),
+            "removed": self.removed,
+            "owners": len(self.owned),
+        }
@@ -0,0 +1,167 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import numpy as np
+
+
+class Payoff:
+    """
+    Payoff at expiration of a multi-leg option position, as a piecewise linear function of the underlying price.
+
+    The function is fully described by its breakpoints (the strikes of the legs, sorted), its value at each breakpoint and
+    the slope of each segment (including the two tails). They are built in one pass (sort of the strikes + cumulative sums),
+    so the max profit/loss and the breakevens are exact and cost O(legs log legs), instead of evaluating the payoff of all the
+    legs at every strike. A strike shared by several legs is repeated in the breakpoints (the segment between them is empty).
+
+    Several positions with the same rights and sides (i.e. the candidates of a StructureSearch) can be described at once by
+    passing the strikes as an array of shape (positions, legs): the attributes then have one row per position and the
+    methods return one result per position. Internally, the positions are stored column by column (one column per
+    position), so that all the computations are done leg by leg on contiguous arrays of all the positions.
+
+    Attributes:
+        batch (bool): True if the payoff describes several positions.
+        breakpoints (np.ndarray): Strikes of the legs, sorted.
+        values (np.ndarray): Payoff at each breakpoint.
+        slopes (np.ndarray): Slope of each segment: [0, b0], [b0, b1], ..., [bn, +inf) (len(breakpoints) + 1 values).
+        value0 (float | np.ndarray): Payoff with the underlying at zero.
+    """
+
+    def __init__(self, strikes, isCall, sides):
+        """
+        Args:
+            strikes (list[float] | np.ndarray): Strike of each leg, or strikes of shape (positions, legs).
+            isCall (list[bool]): Right of each leg (True: Call, False: Put).
+            sides (list[float]): Signed quantity of each leg (+n: long, -n: short).
+        """
+        strikes = np.asarray(strikes, dtype = float)
+        isCall = np.asarray(isCall, dtype = bool).reshape(-1)
+        sides = np.asarray(sides, dtype = float).reshape(-1)
+        self.batch = strikes.ndim == 2
+        strikes = strikes.reshape(strikes.shape[0] if self.batch else 1, isCall.size)
+        order = np.argsort(strikes, axis = 1, kind = "stable")
+        # One column per position
+        breakpoints = np.ascontiguousarray(np.take_along_axis(strikes, order, axis = 1).T)
+        kinks = np.ascontiguousarray(sides[order].T)
+        # Below all the strikes only the Puts pay (slope -1 each), above them only the Calls (slope +1 each).
+        # Crossing a strike, the slope of a leg always increases by 1 (Put: -1 -> 0, Call: 0 -> +1)
+        value0 = strikes[:, ~isCall] @ sides[~isCall]
+        slopes = np.empty((isCall.size + 1, value0.size))
+        slopes[0] = -sides[~isCall].sum()
+        values = np.empty(breakpoints.shape)
+        previous = 0.0
+        value = value0
+        for i in range(isCall.size):
+            value = value + slopes[i] * (breakpoints[i] - previous)
+            values[i] = value
+            slopes[i + 1] = slopes[i] + kinks[i]
+            previous = breakpoints[i]
+        self.columns = (breakpoints, values, slopes, value0)
+        if self.batch:
+            self.breakpoints, self.values, self.slopes, self.value0 = breakpoints.T, values.T, slopes.T, value0
+        else:
+            self.breakpoints, self.values, self.slopes, self.value0 = breakpoints[:, 0], values[:, 0], slopes[:, 0], float(value0[0])
+
+    @classmethod
+    def fromContracts(cls, contracts, sides):
+        """Payoff of the given contracts (with the given sides)."""
+        return cls([contract.Strike for contract in contracts], [contract.Right == OptionRight.Call for contract in contracts], sides)
+
+    def result(self, values):
+        # One value per position, or the value of the single position
+        values = np.asarray(values, dtype = float)
+        return values if self.batch else float(values.reshape(-1)[0])
+
+    def evaluate(self, prices):
+        """Payoff at the given prices of the underlying, shape (prices, positions): one column of prices per position."""
+        breakpoints, values, slopes, value0 = self.columns
+        # Value at zero and slope of the left tail, corrected by the change of slope past each breakpoint
+        result = value0 + slopes[0] * prices
+        for i in range(breakpoints.shape[0]):
+            result += (slopes[i + 1] - slopes[i]) * np.maximum(0.0, prices - breakpoints[i])
+        return result
+
+    def __call__(self, prices):
+        """
+        Payoff at the given underlying price(s).
+
+        Args:
+            prices (float | np.ndarray): Price(s) of the underlying. Several positions: a price (or one per position), or
+                one row of prices per position.
+
+        Returns:
+            float | np.ndarray: The payoff (same shape as prices, one value per position if several positions).
+        """
+        prices = np.asarray(prices, dtype = float)
+        if not self.batch:
+            result = self.evaluate(prices.reshape(-1, 1)).reshape(prices.shape)
+            return float(result) if result.ndim == 0 else result
+        if prices.ndim == 2:
+            return self.evaluate(prices.T).T
+        return self.evaluate(np.broadcast_to(prices, self.value0.shape)[None])[0]
+
+    def points(self, upper = None):
+        """
+        Points where the extremes over [0, upper] can be found: 0, the breakpoints (capped at upper) and upper.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Prices of the underlying and payoff at those prices (one column per position).
+        """
+        breakpoints, values, slopes, value0 = self.columns
+        x = np.concatenate([np.zeros((1, value0.size)), breakpoints])
+        y = np.concatenate([value0[None], values])
+        if upper is None:
+            return x, y
+        # The breakpoints above upper are replaced by upper
+        yUpper = self.evaluate(np.full((1, value0.size), float(upper)))
+        beyond = x > upper
+        return np.concatenate([np.where(beyond, upper, x), np.full((1, value0.size), float(upper))]), np.concatenate([np.where(beyond, yUpper, y), yUpper])
+
+    def minimum(self, upper = None):
+        """Lowest payoff for an underlying price in [0, upper] (-inf if unbounded)."""
+        lowest = self.points(upper)[1].min(axis = 0)
+        if upper is None:
+            lowest = np.where(self.columns[2][-1] < 0, -np.inf, lowest)
+        return self.result(lowest)
+
+    def maximum(self, upper = None):
+        """Highest payoff for an underlying price in [0, upper] (+inf if unbounded)."""
+        highest = self.points(upper)[1].max(axis = 0)
+        if upper is None:
+            highest = np.where(self.columns[2][-1] > 0, np.inf, highest)
+        return self.result(highest)
+
+    def maxLoss(self, premium = 0.0, upper = None):
+        """Maximum loss (<= 0) of the position opened for the given premium (> 0: credit, < 0: debit)."""
+        return self.result(np.minimum(0.0, premium + self.minimum(upper)))
+
+    def maxProfit(self, premium = 0.0, upper = None):
+        """Maximum profit of the position opened for the given premium (> 0: credit, < 0: debit)."""
+        return self.result(premium + self.maximum(upper))
+
+    def breakevens(self, premium = 0.0):
+        """
+        Underlying prices at which the P&L at expiration (premium + payoff) changes sign.
+
+        Args:
+            premium (float | np.ndarray, optional): Premium received (> 0) or paid (< 0) to open the position (or one per position).
+
+        Returns:
+            list[float] | np.ndarray: The breakevens, sorted. Several positions: array of shape (positions, legs + 1), sorted
+                by row, with NaN where there is no breakeven.
+        """
+        x, pnl = self.points()
+        pnl = premium + pnl
+        profitable = pnl >= 0
+        crossing = profitable[:-1] != profitable[1:]
+        # Right tail
+        slope = self.columns[2][-1]
+        tailCrossing = (slope != 0) & (profitable[-1] != (slope > 0))
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            roots = x[:-1] - pnl[:-1] * (x[1:] - x[:-1]) / (pnl[1:] - pnl[:-1])
+            tail = x[-1] - pnl[-1] / slope
+        roots = np.where(np.concatenate([crossing, tailCrossing[None]]), np.concatenate([roots, tail[None]]), np.nan)
+        if self.batch:
+            return roots.T
+        roots = roots[:, 0]
+        return roots[~np.isnan(roots)].tolist()
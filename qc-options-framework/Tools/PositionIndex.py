@@ -0,0 +1,159 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+
+class PositionIndex:
+    """
+    Hash index of the legs of the open positions (context.openPositions) and of the working orders (context.workingOrders),
+    used by the duplicate order/leg checks.
+
+    Each position is indexed under a set of canonical signatures of its legs (expiry, strategy, strike, side, symbol) and of
+    its full structure, so the checks are dictionary lookups instead of scans of all the open positions and their legs.
+
+    The index mirrors the two dictionaries: each place setting, replacing or removing an entry (positions opened, filled,
+    closed, expired or cancelled) calls update() with its orderTag, so only that position is indexed again. A dictionary
+    replaced as a whole is indexed from scratch on the next lookup.
+
+    Attributes:
+        context (QCAlgorithm): The algorithm.
+        tracked (dict): source -> dictionary of the context mirrored by the index.
+        tags (dict): source -> {orderTag: signatures of the position}.
+        index (dict): source -> {signature: set of orderTags}.
+        pending (dict): source -> orderTags whose position is not in context.allPositions yet (retried on each lookup).
+    """
+
+    # Index source -> dictionary of the context: orderTag -> orderId (open positions) or WorkingOrder (working orders)
+    SOURCES = {"open": "openPositions", "working": "workingOrders"}
+
+    def __init__(self, context):
+        self.context = context
+        self.tracked = {source: None for source in self.SOURCES}
+        self.tags = {source: {} for source in self.SOURCES}
+        self.index = {source: {} for source in self.SOURCES}
+        self.pending = {source: set() for source in self.SOURCES}
+
+    @classmethod
+    def of(cls, context):
+        """Returns the index of the context (created on first use)."""
+        index = getattr(context, "positionIndex", None)
+        if not isinstance(index, cls):
+            index = cls(context)
+            context.positionIndex = index
+        return index
+
+    @staticmethod
+    def signatures(position, sign = 1):
+        """
+        Signatures of the legs and of the full structure of a position.
+
+        Args:
+            position (Position): The position.
+            sign (int, optional): Multiplier of the sides (-1 for the working orders closing the position).
+
+        Returns:
+            set: The signatures.
+        """
+        expiryStr = position.expiryStr
+        strategyId = position.strategyId
+        sides = [leg.contractSide if sign == 1 else -leg.contractSide for leg in position.legs]
+        legs = [(leg.strike, side) for leg, side in zip(position.legs, sides)]
+        signatures = {
+            ("expiryStrategy", expiryStr, strategyId),
+            ("expiryStructure", expiryStr, frozenset(legs)),
+            ("structure", frozenset((leg.symbol, side) for leg, side in zip(position.legs, sides))),
+        }
+        for strike, side in legs:
+            signatures.add(("expiryStrike", expiryStr, strike))
+            signatures.add(("strategyLeg", strategyId, strike, side))
+            signatures.add(("strategyExpiryLeg", strategyId, expiryStr, strike, side))
+        return signatures
+
+    def add(self, source, orderTag, value):
+        if source == "working":
+            position = self.context.allPositions.get(value.orderId)
+            sign = -1 if value.orderType == "close" else 1
+        else:
+            position = self.context.allPositions.get(value)
+            sign = 1
+        # Not indexed yet: retried on the next sync
+        if position is None:
+            self.pending[source].add(orderTag)
+            return
+        self.pending[source].discard(orderTag)
+        signatures = self.signatures(position, sign)
+        self.tags[source][orderTag] = signatures
+        index = self.index[source]
+        for signature in signatures:
+            index.setdefault(signature, set()).add(orderTag)
+
+    def remove(self, source, orderTag):
+        self.pending[source].discard(orderTag)
+        index = self.index[source]
+        for signature in self.tags[source].pop(orderTag, ()):
+            orderTags = index.get(signature)
+            if orderTags is not None:
+                orderTags.discard(orderTag)
+                if not orderTags:
+                    del index[signature]
+
+    def current(self, source):
+        current = getattr(self.context, self.SOURCES[source], None)
+        return current if isinstance(current, dict) else {}
+
+    def rebuild(self, source, current):
+        """Indexes the dictionary of the context from scratch."""
+        self.tracked[source] = current
+        self.tags[source].clear()
+        self.index[source].clear()
+        self.pending[source].clear()
+        for orderTag, value in current.items():
+            self.add(source, orderTag, value)
+
+    def update(self, source, orderTag):
+        """
+        Indexes again the entry of an orderTag after it was set, replaced or removed in the dictionary of the context.
+
+        Args:
+            source (str): "open" (context.openPositions) or "working" (context.workingOrders).
+            orderTag (str): The orderTag of the entry.
+        """
+        current = self.current(source)
+        if current is not self.tracked[source]:
+            self.rebuild(source, current)
+            return
+        self.remove(source, orderTag)
+        if orderTag in current:
+            self.add(source, orderTag, current[orderTag])
+
+    def sync(self, source):
+        """Indexes the dictionary of the context if it was replaced, and retries the positions not indexed yet."""
+        current = self.current(source)
+        if current is not self.tracked[source]:
+            self.rebuild(source, current)
+            return
+        for orderTag in list(self.pending[source]):
+            if orderTag in current:
+                self.add(source, orderTag, current[orderTag])
+            else:
+                self.pending[source].discard(orderTag)
+
+    def find(self, source, signature):
+        """
+        OrderTags of the open positions (source = "open") or working orders (source = "working") with the given signature.
+
+        Args:
+            source (str): "open" or "working".
+            signature (tuple): The signature (see signatures()).
+
+        Returns:
+            set: The matching orderTags (do not modify).
+        """
+        self.sync(source)
+        return self.index[source].get(signature, set())
+
+    def contains(self, source, signature):
+        return len(self.find(source, signature)) > 0
+
+    def __len__(self):
+        return sum(len(tags) for tags in self.tags.values())
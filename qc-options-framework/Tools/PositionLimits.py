@@ -0,0 +1,133 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import re
+from collections import Counter
+
+
+class PositionLimits:
+    """
+    Incremental counters of the invested securities and of the open orders, used by Order.Base.check_position_limits to
+    enforce maxActivePositions/maxOpenPositions without scanning context.Portfolio.Values and Transactions.GetOpenOrders()
+    on every order attempt.
+
+    The counters are built with a full recount on first use, and then kept up to date by HandleOrderEvents with each order
+    event: an order is open until it is Filled, Canceled or Invalid, and the holding of the symbol of a fill is checked to
+    know whether the security is still invested (fills, assignments, exercises and expirations all come as order events).
+
+    The open orders are also counted by strategy (the strategyId is taken from the order tag: <strategyId>-<orderId>). The
+    invested securities are only counted globally: the holdings are netted across strategies.
+
+    In self-check mode (selfCheck = True) each query compares the counters with a full recount and raises an error if
+    they differ.
+
+    Attributes:
+        context (QCAlgorithm): The algorithm.
+        selfCheck (bool): Compare the counters with a full recount on each query.
+        invested (set): Symbols of the invested securities (None until the first recount).
+        openOrders (dict): orderId -> strategyId of the open orders.
+        openOrdersByStrategy (Counter): strategyId -> number of open orders.
+    """
+
+    # Final statuses of an order. Any other status (New, Submitted, PartiallyFilled, UpdateSubmitted, CancelPending) is open
+    CLOSED_STATUSES = (OrderStatus.Filled, OrderStatus.Canceled, OrderStatus.Invalid)
+    FILL_STATUSES = (OrderStatus.Filled, OrderStatus.PartiallyFilled)
+
+    def __init__(self, context, selfCheck = False):
+        self.context = context
+        self.selfCheck = selfCheck
+        self.invested = None
+        self.openOrders = {}
+        self.openOrdersByStrategy = Counter()
+
+    @classmethod
+    def of(cls, context):
+        """Returns the counters of the context (created on first use)."""
+        limits = getattr(context, "positionLimits", None)
+        if not isinstance(limits, cls):
+            limits = cls(context)
+            context.positionLimits = limits
+        return limits
+
+    @staticmethod
+    def strategyOf(tag):
+        """StrategyId from an order tag (<strategyId>-<orderId>, with an optional ' - Warning...' suffix)."""
+        tag = re.sub(" - Warning.*", "", str(tag))
+        return tag.rsplit("-", 1)[0]
+
+    def recount(self):
+        """
+        Full recount of the invested securities and of the open orders.
+
+        Returns:
+            tuple: (set of invested symbols, {orderId: strategyId} of the open orders)
+        """
+        invested = set(holding.Symbol for holding in self.context.Portfolio.Values if holding.Invested)
+        openOrders = {order.Id: self.strategyOf(order.Tag) for order in self.context.Transactions.GetOpenOrders()}
+        return invested, openOrders
+
+    def reset(self):
+        """Rebuilds the counters from a full recount."""
+        self.invested, openOrders = self.recount()
+        self.openOrders = {}
+        self.openOrdersByStrategy = Counter()
+        for orderId, strategyId in openOrders.items():
+            self.addOrder(orderId, strategyId)
+
+    def addOrder(self, orderId, strategyId):
+        if orderId not in self.openOrders:
+            self.openOrders[orderId] = strategyId
+            self.openOrdersByStrategy[strategyId] += 1
+
+    def removeOrder(self, orderId):
+        strategyId = self.openOrders.pop(orderId, None)
+        if strategyId is not None:
+            self.openOrdersByStrategy[strategyId] -= 1
+            if self.openOrdersByStrategy[strategyId] <= 0:
+                del self.openOrdersByStrategy[strategyId]
+
+    def onOrderEvent(self, orderEvent):
+        """Updates the counters with an order event (called by HandleOrderEvents)."""
+        # Not counted yet: the first recount will include this event
+        if self.invested is None:
+            return
+        orderId = orderEvent.OrderId
+        if orderEvent.Status in self.CLOSED_STATUSES:
+            self.removeOrder(orderId)
+        elif orderId not in self.openOrders:
+            order = self.context.Transactions.GetOrderById(orderId)
+            self.addOrder(orderId, self.strategyOf(order.Tag if order is not None else ""))
+        # A fill changes the holding of the symbol
+        if orderEvent.Status in self.FILL_STATUSES:
+            if self.context.Portfolio[orderEvent.Symbol].Invested:
+                self.invested.add(orderEvent.Symbol)
+            else:
+                self.invested.discard(orderEvent.Symbol)
+
+    def verify(self):
+        """Compares the counters with a full recount. Raises a RuntimeError if they differ."""
+        invested, openOrders = self.recount()
+        if invested != self.invested or openOrders != self.openOrders:
+            raise RuntimeError(
+                f"PositionLimits out of sync: invested {len(self.invested)} (recount: {len(invested)}), "
+                f"open orders {len(self.openOrders)} (recount: {len(openOrders)})"
+            )
+
+    def sync(self):
+        if self.invested is None:
+            self.reset()
+        elif self.selfCheck:
+            self.verify()
+
+    def activePositions(self):
+        """Number of invested securities."""
+        self.sync()
+        return len(self.invested)
+
+    def openOrderCount(self, strategyId = None):
+        """Number of open orders (of the given strategy, or of all the strategies)."""
+        self.sync()
+        if strategyId is None:
+            return len(self.openOrders)
+        return self.openOrdersByStrategy.get(strategyId, 0)
@@ -7,6 +7,7 @@ import importlib
 from dataclasses import asdict, is_dataclass, fields
 from datetime import datetime, date, time
 from Strategy.Position import Position, Leg, OrderType, WorkingOrder
+from .PositionIndex import PositionIndex
 
 class PositionEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -170,5 +171,6 @@ class PositionsStore:
             for position in unpacked_positions.values():
                 if position.expiry and position.expiry.date() > self.context.Time.date() and not position.closeOrder.filled:
                     self.context.openPositions[position.orderTag] = position.orderId
+                    PositionIndex.of(self.context).update("open", position.orderTag)
         except Exception as e:
             self.context.logger.error(f"Error reading or deserializing JSON data: {e}")
\ No newline at end of file
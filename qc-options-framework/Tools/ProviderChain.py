@@ -0,0 +1,133 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+from bisect import bisect_left, bisect_right
+
+
+class ExpiryContracts:
+    """
+    Contracts of one expiration date, sorted by strike.
+
+    Attributes:
+        symbols (list[Symbol]): The contract symbols, sorted by strike (stable: same strike -> provider order).
+        strikes (list[float]): Strikes of the symbols (same order).
+        positions (list[int]): Positions of the symbols in the provider list (same order).
+        distinctStrikes (list[float]): The listed strikes, sorted.
+        firstPosition (dict): strike -> position in the provider list of the first contract on that strike.
+    """
+
+    __slots__ = ("symbols", "strikes", "positions", "distinctStrikes", "firstPosition")
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows (list[tuple]): (strike, position, symbol) of the contracts.
+        """
+        rows = sorted(rows, key = lambda row: (row[0], row[1]))
+        self.strikes = [strike for strike, _, _ in rows]
+        self.positions = [position for _, position, _ in rows]
+        self.symbols = [symbol for _, _, symbol in rows]
+        self.firstPosition = {}
+        for strike, position, _ in rows:
+            self.firstPosition.setdefault(strike, position)
+        self.distinctStrikes = sorted(self.firstPosition)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def providerOrder(self):
+        """The symbols in the order of the provider list."""
+        return [self.symbols[i] for i in sorted(range(len(self.symbols)), key = self.positions.__getitem__)]
+
+    def filter(self, predicate):
+        """Contracts for which the predicate is True."""
+        return ExpiryContracts([(strike, position, symbol) for strike, position, symbol in zip(self.strikes, self.positions, self.symbols) if predicate(symbol)])
+
+    def atmStrike(self, price):
+        """
+        Listed strike closest to the price. On a tie, the strike of the contract coming first in the provider list (same as
+        a stable sort of the contracts by the distance of the strike from the price).
+        """
+        idx = bisect_left(self.distinctStrikes, price)
+        candidates = self.distinctStrikes[max(0, idx-1):idx+1]
+        if not candidates:
+            return None
+        return min(candidates, key = lambda strike: (abs(strike - price), self.firstPosition[strike]))
+
+    def strikeRange(self, price, minRank, maxRank):
+        """
+        Contracts within the strikes ranked minRank..maxRank from the ATM strike (i.e. -2..2), in the provider order.
+
+        Args:
+            price (float): Price of the underlying.
+            minRank (int): Rank of the lowest strike (relative to the ATM strike).
+            maxRank (int): Rank of the highest strike (relative to the ATM strike).
+
+        Returns:
+            list[Symbol]: The selected symbols (None if there are no contracts).
+        """
+        atm = self.atmStrike(price)
+        if atm is None:
+            return None
+        atmIndex = bisect_left(self.distinctStrikes, atm)
+        minStrike = self.distinctStrikes[max(0, atmIndex + minRank)]
+        maxStrike = self.distinctStrikes[min(len(self.distinctStrikes) - 1, atmIndex + maxRank)]
+        selected = range(bisect_left(self.strikes, minStrike), bisect_right(self.strikes, maxStrike))
+        return [self.symbols[i] for i in sorted(selected, key = self.positions.__getitem__)]
+
+
+class ProviderChain:
+    """
+    Option contracts listed by the OptionChainProvider for one trading date, bucketed by expiration date.
+
+    The provider list only changes from one day to the next: ProviderChain.of loads it once per (canonical symbol, date)
+    and keeps it in context.providerChains, so the minutes after the first one of the day only select the expiry and
+    bisect the strikes around the ATM.
+
+    Attributes:
+        symbols (list[Symbol]): The listed contracts (provider order).
+        expiries (list[datetime]): The expiration dates, sorted.
+        contracts (dict): expiration date -> ExpiryContracts.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        rows = {}
+        for position, symbol in enumerate(self.symbols):
+            rows.setdefault(symbol.ID.Date, []).append((symbol.ID.StrikePrice, position, symbol))
+        self.expiries = sorted(rows)
+        self.contracts = {expiry: ExpiryContracts(expiryRows) for expiry, expiryRows in rows.items()}
+
+    @classmethod
+    def of(cls, context, canonicalSymbol):
+        """
+        Contracts listed for the canonical option symbol on the current date (the provider is queried once per day).
+
+        Args:
+            context (QCAlgorithm): The algorithm.
+            canonicalSymbol (Symbol): The canonical option symbol.
+
+        Returns:
+            ProviderChain: The listed contracts.
+        """
+        cache = getattr(context, "providerChains", None)
+        if not isinstance(cache, dict):
+            cache = {}
+            context.providerChains = cache
+        today = context.Time.date()
+        entry = cache.get(canonicalSymbol)
+        if entry is None or entry[0] != today:
+            entry = (today, cls(context.OptionChainProvider.GetOptionContractList(canonicalSymbol, context.Time)))
+            cache[canonicalSymbol] = entry
+        return entry[1]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def dte(self, expiry, today):
+        return (expiry.date() - today).days
+
+    def expiriesWithin(self, today, minDte, maxDte):
+        """Expiration dates with minDte <= DTE <= maxDte, sorted."""
+        return [expiry for expiry in self.expiries if minDte <= self.dte(expiry, today) <= maxDte]
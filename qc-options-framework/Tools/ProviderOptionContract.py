@@ -3,6 +3,7 @@ from AlgorithmImports import *
 # endregion
 
 from datetime import datetime
+from .GreeksIndicators import GreeksIndicators
 
 class ProviderOptionContract:
     def __init__(self, symbol, underlying_price, context):
@@ -15,32 +16,42 @@ class ProviderOptionContract:
         self.security = context.Securities[symbol]
         self.context = context
         # Instantiate the custom Greeks object
-        self.greeks = self.Greeks(context, self.security)
+        self.greeks = self.Greeks(context, self.security, self)
 
     class Greeks:
-        def __init__(self, context, security):
+        def __init__(self, context, security, contract = None):
             self.context = context
             self.security = security
-            
+            self.contract = contract
+
+        def reading(self, name):
+            indicator = getattr(self.security, name)
+            # Indicators attached on demand and still warming up: use the BSM value
+            if indicator and self.contract is not None and not indicator.is_ready:
+                seed = GreeksIndicators.of(self.context).seed(self.contract, name)
+                if seed is not None:
+                    return seed
+            return indicator.current.value if indicator else 0
+
         @property
         def delta(self):
-            return self.security.delta.current.value if self.security.delta else 0
+            return self.reading("delta")
 
         @property
         def gamma(self):
-            return self.security.gamma.current.value if self.security.gamma else 0
+            return self.reading("gamma")
 
         @property
         def theta(self):
-            return self.security.theta.current.value if self.security.theta else 0
+            return self.reading("theta")
 
         @property
         def vega(self):
-            return self.security.vega.current.value if self.security.vega else 0
+            return self.reading("vega")
 
         @property
         def rho(self):
-            return self.security.rho.current.value if self.security.rho else 0
+            return self.reading("rho")
 
 
     @property
@@ -77,6 +88,6 @@ class ProviderOptionContract:
 
     @property
     def implied_volatility(self):
-        return self.security.iv.current.value if self.security.iv else 0
+        return self.greeks.reading("iv")
 
     # Add any other properties or methods you commonly use from OptionContract
\ No newline at end of file
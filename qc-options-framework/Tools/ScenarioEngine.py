@@ -0,0 +1,61 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import numpy as np
+
+
+class ScenarioEngine:
+    """
+    Vectorized P&L of a position over a grid of scenarios (spot shifts x IV shifts x time offsets).
+
+    Each leg is priced with the BSM model using its current IV (see BSM.contractIV), shifted by the IV shifts of the grid.
+    All the scenarios are evaluated in a single NumPy broadcast, so a rich stress grid costs about as much as a single
+    scalar evaluation of the position (Order.fValue).
+
+    Attributes:
+        bsm (BSM): BSM pricing model used to get the IV and price the legs.
+    """
+
+    def __init__(self, bsm):
+        self.bsm = bsm
+        self.context = bsm.context
+
+    def pnl(self, contracts, sides, openPremium = 0.0, spotShifts = (0.0,), volShifts = (0.0,), timeOffsets = (timedelta(0),), spotPrice = None, atTime = None):
+        """
+        Computes the value of the position (open premium + value of the legs) on a grid of scenarios.
+        The scenario without any shift is the same as Order.fValue(spotPrice, contracts, sides, atTime, openPremium).
+
+        Args:
+            contracts (list[OptionContract]): Legs of the position.
+            sides (list[int]): Side of each leg (+n: long, -n: short).
+            openPremium (float, optional): Premium paid/received when the position was opened.
+            spotShifts (list[float], optional): Relative shifts of the underlying price (i.e. -0.1 -> 10% down).
+            volShifts (list[float], optional): Absolute shifts of the IV of each leg (i.e. 0.05 -> +5 vol points). The shifted IV is floored at zero.
+            timeOffsets (list[timedelta], optional): Offsets of the valuation time.
+            spotPrice (float, optional): Price of the underlying (default: last price of the underlying).
+            atTime (datetime, optional): Valuation time the offsets are added to (default: the algorithm time).
+
+        Returns:
+            np.ndarray: Value of the position with shape (len(spotShifts), len(volShifts), len(timeOffsets)).
+        """
+        if atTime is None:
+            atTime = self.context.Time
+        if spotPrice is None:
+            spotPrice = self.bsm.contractUtils.getUnderlyingLastPrice(contracts[0])
+
+        # Legs
+        strike = np.array([contract.Strike for contract in contracts], dtype = float)
+        isCall = np.array([contract.Right == OptionRight.Call for contract in contracts])
+        sigma = np.array([self.bsm.contractIV(contract) for contract in contracts], dtype = float)
+        sides = np.asarray(sides, dtype = float)
+        # Time to expiration of each leg at each time offset -> shape (T, L)
+        tau = np.array([[self.bsm.optionTau(contract, atTime = atTime + offset) for contract in contracts] for offset in timeOffsets], dtype = float)
+
+        # Scenario axes -> (S, V, T, L)
+        spot = (spotPrice * (1.0 + np.asarray(spotShifts, dtype = float)))[:, None, None, None]
+        shiftedSigma = np.maximum(sigma[None, :] + np.asarray(volShifts, dtype = float)[:, None], 0.0)[None, :, None, :]
+        prices = self.bsm.bsmPriceArray(spot, strike, tau[None, None, :, :], shiftedSigma, isCall)
+
+        # Total value of the position in each scenario
+        return openPremium + prices @ sides
@@ -0,0 +1,160 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import math
+import numpy as np
+
+
+class StandardNormal:
+    """
+    SciPy-free standard normal distribution (drop-in replacement of scipy.stats.norm.cdf/pdf/ppf).
+
+    Scalar inputs are evaluated with the math module (math.erfc/math.exp), which avoids the large per-call overhead of the
+    SciPy distributions. Array inputs are evaluated with NumPy, using W. J. Cody's rational Chebyshev approximation of the
+    complementary error function (relative accuracy close to the machine precision, also in the tails). Arrays smaller than
+    VECTORIZED_MIN_SIZE are evaluated element-wise with math.erfc, which is faster than the fixed cost of the NumPy operations.
+    The inverse CDF uses P. J. Acklam's rational approximation refined with one Halley step.
+    """
+
+    SQRT2 = math.sqrt(2.0)
+    SQRT2PI = math.sqrt(2.0*math.pi)
+    INV_SQRTPI = 1.0/math.sqrt(math.pi)
+
+    # Cody's coefficients: erf(x) on |x| <= 0.5
+    ERF_A = (3.16112374387056560e00, 1.13864154151050156e02, 3.77485237685302021e02, 3.20937758913846947e03, 1.85777706184603153e-1)
+    ERF_B = (2.36012909523441209e01, 2.44024637934444173e02, 1.28261652607737228e03, 2.84423683343917062e03)
+    # erfc(x) on 0.5 < |x| <= 4
+    ERFC_C = (5.64188496988670089e-1, 8.88314979438837594e00, 6.61191906371416295e01, 2.98635138197400131e02, 8.81952221241769090e02, 1.71204761263407058e03, 2.05107837782607147e03, 1.23033935479799725e03, 2.15311535474403846e-8)
+    ERFC_D = (1.57449261107098347e01, 1.17693950891312499e02, 5.37181101862009858e02, 1.62138957456669019e03, 3.29079923573345963e03, 4.36261909014324716e03, 3.43936767414372164e03, 1.23033935480374942e03)
+    # erfc(x) on |x| > 4
+    ERFC_P = (3.05326634961232344e-1, 3.60344899949804439e-1, 1.25781726111229246e-1, 1.60837851487422766e-2, 6.58749161529837803e-4, 1.63153871373020978e-2)
+    ERFC_Q = (2.56852019228982242e00, 1.87295284992346725e00, 5.27905102951428412e-1, 6.05183413124413191e-2, 2.33520497626869185e-3)
+
+    # Numerator/denominator coefficients (highest degree first) of the three rational approximations
+    ERF_AB = np.array([[ERF_A[4], ERF_A[0], ERF_A[1], ERF_A[2], ERF_A[3]], [1.0, *ERF_B]])
+    ERFC_CD = np.array([[ERFC_C[8], *ERFC_C[:8]], [1.0, *ERFC_D]])
+    ERFC_PQ = np.array([[ERFC_P[5], *ERFC_P[:5]], [1.0, *ERFC_Q]])
+    ERFC_MAX = 27.3
+    # Minimum size of the arrays evaluated with the vectorized approximation
+    VECTORIZED_MIN_SIZE = 2000
+
+    # Acklam's coefficients
+    PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+    PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01, -1.328068155288572e+01)
+    PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+    PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+    PPF_LOW = 0.02425
+
+    @staticmethod
+    def isScalar(x):
+        return isinstance(x, (float, int, np.number))
+
+    @staticmethod
+    def rational(coefficients, z):
+        # Evaluate the numerator and denominator polynomials (rows of the coefficients, highest degree first) in one Horner scheme
+        v = coefficients[:, :1] * z
+        for k in range(1, coefficients.shape[1] - 1):
+            v += coefficients[:, k:k+1]
+            v *= z
+        v += coefficients[:, -1:]
+        return v[0]/v[1]
+
+    @staticmethod
+    def erfc(x):
+        """Complementary error function of an array (W. J. Cody's rational approximation)."""
+        x = np.asarray(x, dtype = float)
+        if x.size < StandardNormal.VECTORIZED_MIN_SIZE:
+            return np.fromiter(map(math.erfc, x.ravel().tolist()), dtype = float, count = x.size).reshape(x.shape)
+        # erfc underflows to zero beyond this value (clipping also avoids the overflow warnings with infinite inputs)
+        y = np.minimum(np.abs(x), StandardNormal.ERFC_MAX)
+        result = np.empty_like(y)
+        small = y <= 0.5
+        large = y > 4.0
+        medium = ~(small | large)
+
+        # |x| <= 0.5: erfc = 1 - erf
+        if small.any():
+            xs = x[small]
+            result[small] = 1.0 - xs*StandardNormal.rational(StandardNormal.ERF_AB, xs*xs)
+
+        # 0.5 < |x| <= 4 and |x| > 4: erfc(y) = exp(-y^2) * R(y)
+        if medium.any():
+            ym = y[medium]
+            result[medium] = StandardNormal.scaledTail(ym, StandardNormal.rational(StandardNormal.ERFC_CD, ym))
+        if large.any():
+            yl = y[large]
+            z = 1.0/(yl*yl)
+            result[large] = StandardNormal.scaledTail(yl, (StandardNormal.INV_SQRTPI - z*StandardNormal.rational(StandardNormal.ERFC_PQ, z))/yl)
+
+        # erfc(-x) = 2 - erfc(x)
+        negative = (x < 0) & ~small
+        result[negative] = 2.0 - result[negative]
+        return result
+
+    @staticmethod
+    def scaledTail(y, value):
+        # exp(-y^2) * value, splitting y^2 to avoid the loss of accuracy of the exponential
+        ysq = np.trunc(y*16.0)/16.0
+        return np.exp(-ysq*ysq)*np.exp(-(y - ysq)*(y + ysq))*value
+
+    @staticmethod
+    def cdf(x):
+        if StandardNormal.isScalar(x):
+            return 0.5*math.erfc(-x/StandardNormal.SQRT2)
+        return 0.5*StandardNormal.erfc(-np.asarray(x, dtype = float)/StandardNormal.SQRT2)
+
+    @staticmethod
+    def pdf(x):
+        if StandardNormal.isScalar(x):
+            return math.exp(-0.5*x*x)/StandardNormal.SQRT2PI
+        x = np.asarray(x, dtype = float)
+        return np.exp(-0.5*x*x)/StandardNormal.SQRT2PI
+
+    @staticmethod
+    def ppf(p):
+        if StandardNormal.isScalar(p):
+            return StandardNormal.scalarPpf(p)
+        p = np.asarray(p, dtype = float)
+        A, B, C, D = StandardNormal.PPF_A, StandardNormal.PPF_B, StandardNormal.PPF_C, StandardNormal.PPF_D
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            # Central region
+            q = p - 0.5
+            r = q*q
+            x = (((((A[0]*r + A[1])*r + A[2])*r + A[3])*r + A[4])*r + A[5])*q/(((((B[0]*r + B[1])*r + B[2])*r + B[3])*r + B[4])*r + 1.0)
+            # Tails (use the symmetry for the upper tail)
+            t = np.sqrt(-2.0*np.log(np.minimum(p, 1.0 - p)))
+            xTail = (((((C[0]*t + C[1])*t + C[2])*t + C[3])*t + C[4])*t + C[5])/((((D[0]*t + D[1])*t + D[2])*t + D[3])*t + 1.0)
+            x = np.where(p < StandardNormal.PPF_LOW, xTail, np.where(p > 1.0 - StandardNormal.PPF_LOW, -xTail, x))
+            # Refine with one Halley step (the approximation has a relative error of about 1e-9)
+            e = StandardNormal.cdf(x) - p
+            u = e*StandardNormal.SQRT2PI*np.exp(0.5*x*x)
+            x = np.where((p > 0) & (p < 1), x - u/(1.0 + 0.5*x*u), x)
+            # Limits
+            x = np.where(p == 0, -np.inf, np.where(p == 1, np.inf, x))
+            x = np.where((p < 0) | (p > 1), np.nan, x)
+        return x
+
+    @staticmethod
+    def scalarPpf(p):
+        if not 0 < p < 1:
+            if p == 0:
+                return -math.inf
+            if p == 1:
+                return math.inf
+            return math.nan
+        A, B, C, D = StandardNormal.PPF_A, StandardNormal.PPF_B, StandardNormal.PPF_C, StandardNormal.PPF_D
+        if StandardNormal.PPF_LOW <= p <= 1.0 - StandardNormal.PPF_LOW:
+            # Central region
+            q = p - 0.5
+            r = q*q
+            x = (((((A[0]*r + A[1])*r + A[2])*r + A[3])*r + A[4])*r + A[5])*q/(((((B[0]*r + B[1])*r + B[2])*r + B[3])*r + B[4])*r + 1.0)
+        else:
+            # Tails (use the symmetry for the upper tail)
+            t = math.sqrt(-2.0*math.log(min(p, 1.0 - p)))
+            x = (((((C[0]*t + C[1])*t + C[2])*t + C[3])*t + C[4])*t + C[5])/((((D[0]*t + D[1])*t + D[2])*t + D[3])*t + 1.0)
+            if p > 0.5:
+                x = -x
+        # Refine with one Halley step
+        u = (StandardNormal.cdf(x) - p)*StandardNormal.SQRT2PI*math.exp(0.5*x*x)
+        return x - u/(1.0 + 0.5*x*u)
@@ -0,0 +1,111 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import functools
+
+
+class TimeMemo:
+    """
+    Memo of query results scoped to the current algorithm time.
+
+    Within the same time bar the quotes of the securities do not change, so queries like the mid-price of a contract or the
+    price of the underlying return the same value no matter how many times they are asked. The results are stored by
+    (function, key) and all of them are discarded as soon as the algorithm time advances.
+
+    Each algorithm has its own memo (TimeMemo.of(context)), so two algorithms at the same time never share results.
+
+    Attributes:
+        time (datetime): Algorithm time of the stored results.
+        entries (dict): (function name, key) -> result.
+        counters (dict): function name -> [hits, misses].
+    """
+
+    def __init__(self):
+        self.time = None
+        self.entries = {}
+        self.counters = {}
+
+    @classmethod
+    def of(cls, context):
+        """Returns the memo of the context (created on first use)."""
+        memo = getattr(context, "timeMemo", None)
+        if not isinstance(memo, cls):
+            memo = cls()
+            context.timeMemo = memo
+        return memo
+
+    def lookup(self, time, name, key, compute):
+        """
+        Returns the result stored for (name, key) at the given time, or computes and stores it.
+
+        Args:
+            time (datetime): Current algorithm time (the memo is invalidated when it changes).
+            name (str): Name of the memoized function.
+            key (hashable): Arguments of the call.
+            compute (callable): Function computing the result.
+        """
+        if time != self.time:
+            self.entries.clear()
+            self.time = time
+        counters = self.counters.setdefault(name, [0, 0])
+        entryKey = (name, key)
+        if entryKey in self.entries:
+            counters[0] += 1
+            return self.entries[entryKey]
+        counters[1] += 1
+        result = compute()
+        self.entries[entryKey] = result
+        return result
+
+    def clear(self):
+        self.time = None
+        self.entries.clear()
+        self.counters.clear()
+
+    def stats(self):
+        return {
+            name: {"hits": hits, "misses": misses, "hitRate": hits/(hits + misses) if hits + misses > 0 else None}
+            for name, (hits, misses) in self.counters.items()
+        }
+
+    def showStats(self, context):
+        context.Log("Time Memo Stats:")
+        for name, stats in self.stats().items():
+            context.Log(f"  --> {name}: {stats}")
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def timeMemoized(key):
+    """
+    Decorator memoizing a method of a class holding the algorithm (self.context) for the duration of the current time bar
+    (in the memo of the algorithm, see TimeMemo.of).
+
+    The memo is only used if context.timeMemoization is True. List results are copied so that the callers cannot alter the
+    stored values.
+
+    Args:
+        key (callable): Called with the same arguments as the method, returns the (hashable) key of the call or None if the
+            call must not be memoized.
+    """
+    def decorator(method):
+        name = method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            context = self.context
+            if getattr(context, "timeMemoization", False) is not True:
+                return method(self, *args, **kwargs)
+            try:
+                callKey = key(self, *args, **kwargs)
+                hash(callKey)
+            except (AttributeError, TypeError):
+                callKey = None
+            if callKey is None:
+                return method(self, *args, **kwargs)
+            result = TimeMemo.of(context).lookup(context.Time, name, callKey, lambda: method(self, *args, **kwargs))
+            return list(result) if isinstance(result, list) else result
+        return wrapper
+    return decorator
@@ -0,0 +1,211 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+import numpy as np
+
+
+class VolatilitySmile:
+    """
+    Implied Volatility smile of a single expiry, as a function of the log-moneyness k = ln(K/F).
+
+    The smile is fitted with a monotone piecewise cubic Hermite spline (PCHIP, Fritsch-Carlson slopes) through the IVs of the
+    liquid OTM quotes, which does not overshoot between strikes. The spline is then tabulated on a uniform grid of the
+    log-moneyness, so that the IV at any strike is answered in O(1) (linear interpolation between two grid nodes).
+    Outside of the range of the quotes the smile is extrapolated flat.
+
+    Attributes:
+        forward (float): Forward price of the underlying used to compute the log-moneyness.
+        tau (float): Time to expiration (as a fraction of a year).
+        time (datetime): Time at which the smile was fitted.
+        strikes (np.ndarray): Strikes of the quotes used for the fit.
+        IVs (np.ndarray): Market IVs of the quotes used for the fit.
+        residuals (np.ndarray): Smile IV minus market IV at each of the fitted strikes.
+    """
+
+    def __init__(self, strikes, IVs, forward, tau, time = None, gridSize = 512):
+        strikes = np.asarray(strikes, dtype = float)
+        IVs = np.asarray(IVs, dtype = float)
+        if strikes.size == 0:
+            raise ValueError("At least one quote is required to fit the volatility smile")
+
+        self.forward = float(forward)
+        self.tau = tau
+        self.time = time
+        self.strikes = strikes
+        self.IVs = IVs
+
+        # Sort the quotes by log-moneyness and average the IVs of duplicated strikes (i.e. Put and Call on the same strike)
+        k, inverse = np.unique(np.log(strikes/self.forward), return_inverse = True)
+        y = np.bincount(inverse, weights = IVs)/np.bincount(inverse)
+        self.k = k
+        self.knots = y
+
+        # Tabulate the spline on a uniform grid
+        if k.size == 1:
+            self.gridStart = k[0]
+            self.gridStep = 1.0
+            self.grid = np.array([y[0], y[0]])
+        else:
+            gridK = np.linspace(k[0], k[-1], gridSize)
+            self.gridStart = k[0]
+            self.gridStep = (k[-1] - k[0])/(gridSize - 1)
+            self.grid = self.pchip(k, y, gridK)
+
+        self.residuals = self.iv(strikes) - IVs
+
+    @staticmethod
+    def pchipSlopes(x, y):
+        # Fritsch-Carlson slopes of the monotone piecewise cubic Hermite interpolation (same as scipy.interpolate.PchipInterpolator)
+        h = np.diff(x)
+        delta = np.diff(y)/h
+        if x.size == 2:
+            return np.array([delta[0], delta[0]])
+        d = np.zeros_like(y)
+        # Interior points: weighted harmonic mean of the secants (zero at local extrema)
+        w1 = 2*h[1:] + h[:-1]
+        w2 = h[1:] + 2*h[:-1]
+        sameSign = delta[:-1]*delta[1:] > 0
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            d[1:-1] = np.where(sameSign, (w1 + w2)/(w1/delta[:-1] + w2/delta[1:]), 0.0)
+        # End points: one-sided three-point estimate, preserving the shape
+        d[0] = VolatilitySmile.endSlope(h[0], h[1], delta[0], delta[1])
+        d[-1] = VolatilitySmile.endSlope(h[-1], h[-2], delta[-1], delta[-2])
+        return d
+
+    @staticmethod
+    def endSlope(h0, h1, delta0, delta1):
+        d = ((2*h0 + h1)*delta0 - h0*delta1)/(h0 + h1)
+        if np.sign(d) != np.sign(delta0):
+            d = 0.0
+        elif np.sign(delta0) != np.sign(delta1) and abs(d) > abs(3*delta0):
+            d = 3*delta0
+        return d
+
+    @staticmethod
+    def pchip(x, y, xi):
+        d = VolatilitySmile.pchipSlopes(x, y)
+        # Interval of each point
+        i = np.clip(np.searchsorted(x, xi, side = "right") - 1, 0, x.size - 2)
+        h = x[i + 1] - x[i]
+        s = (xi - x[i])/h
+        s2 = s*s
+        s3 = s2*s
+        # Cubic Hermite basis
+        return ((2*s3 - 3*s2 + 1)*y[i]
+                + (s3 - 2*s2 + s)*h*d[i]
+                + (-2*s3 + 3*s2)*y[i + 1]
+                + (s3 - s2)*h*d[i + 1]
+                )
+
+    def ivLogMoneyness(self, k):
+        """IV at the given log-moneyness ln(K/F) (scalar or array)."""
+        position = np.clip((np.asarray(k, dtype = float) - self.gridStart)/self.gridStep, 0.0, self.grid.size - 1.0)
+        i = np.minimum(position.astype(int), self.grid.size - 2)
+        weight = position - i
+        IV = self.grid[i]*(1.0 - weight) + self.grid[i + 1]*weight
+        return float(IV) if IV.ndim == 0 else IV
+
+    def iv(self, strike):
+        """IV at the given strike (scalar or array)."""
+        return self.ivLogMoneyness(np.log(np.asarray(strike, dtype = float)/self.forward))
+
+    @property
+    def atmIV(self):
+        return self.ivLogMoneyness(0.0)
+
+    @property
+    def rmse(self):
+        return float(np.sqrt(np.mean(self.residuals**2)))
+
+    @staticmethod
+    def fromContracts(bsm, contracts, minPrice = 0.0, time = None):
+        """
+        Fit the smile of the expiry of the given contracts (all contracts are expected to have the same expiry).
+
+        Only the OTM quotes (Puts below the forward, Calls above) with a mid-price above minPrice are used.
+
+        Args:
+            bsm (BSM): BSM pricing model used to compute the IV of the quotes.
+            contracts (list[OptionContract]): Contracts of the expiry.
+            minPrice (float, optional): Minimum mid-price of the quotes used for the fit.
+            time (datetime, optional): Time of the fit (default: the algorithm time).
+
+        Returns:
+            VolatilitySmile: The fitted smile, or None if there are no usable quotes.
+        """
+        contracts = list(contracts)
+        if not contracts:
+            return None
+        inputs = bsm.chainArrays(contracts)
+        tau = inputs["tau"][0]
+        if tau <= 0:
+            return None
+        forward = inputs["spot"][0]*np.exp(bsm.riskFreeRate*tau)
+        # Liquid OTM quotes
+        otm = np.where(inputs["isCall"], inputs["strike"] >= forward, inputs["strike"] < forward)
+        selected = np.flatnonzero(otm & (inputs["mid"] > minPrice))
+        if selected.size == 0:
+            return None
+        # Compute the IVs (shared cache/incremental mode are used if available)
+        IV = bsm.computeChainGreeks([contracts[i] for i in selected], saveIt = False)["IV"]
+        valid = np.isfinite(IV) & (IV > 0)
+        if not valid.any():
+            return None
+        return VolatilitySmile(inputs["strike"][selected][valid], IV[valid], forward, tau, time = time if time is not None else bsm.context.Time)
+
+
+class VolatilitySmiles:
+    """
+    Volatility smiles fitted at the current algorithm time, by (underlying, expiry, exercise style).
+
+    The smile of an expiry is fitted at most once per time bar (failed fits are stored as None, so they are not retried
+    within the bar) and all the smiles are discarded as soon as the algorithm time advances. Each algorithm has its own
+    store (VolatilitySmiles.of(context)), so two algorithms at the same time never share their smiles.
+
+    Attributes:
+        time (datetime): Algorithm time of the stored smiles.
+        smiles (dict): (underlying, expiry, exercise style) -> VolatilitySmile (or None).
+    """
+
+    def __init__(self):
+        self.time = None
+        self.smiles = {}
+
+    @classmethod
+    def of(cls, context):
+        """Returns the smiles of the context (created on first use)."""
+        smiles = getattr(context, "volatilitySmiles", None)
+        if not isinstance(smiles, cls):
+            smiles = cls()
+            context.volatilitySmiles = smiles
+        return smiles
+
+    def get(self, time, key):
+        """Returns the smile fitted at the given time for the key, or None."""
+        if time != self.time:
+            return None
+        return self.smiles.get(key)
+
+    def lookup(self, time, key, fit):
+        """
+        Returns the smile fitted at the given time for the key, or fits and stores it.
+
+        Args:
+            time (datetime): Current algorithm time (the smiles are discarded when it changes).
+            key (tuple): (underlying, expiry, exercise style).
+            fit (callable): Function fitting the smile (returns None if it cannot be fitted).
+        """
+        if time != self.time:
+            self.smiles.clear()
+            self.time = time
+        if key not in self.smiles:
+            self.smiles[key] = fit()
+        return self.smiles[key]
+
+    def clear(self):
+        self.time = None
+        self.smiles.clear()
+
+    def __len__(self):
+        return len(self.smiles)
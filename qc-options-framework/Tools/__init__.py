@@ -1,12 +1,26 @@
 from AlgorithmImports import *
 from .Timer import Timer
 from .Logger import Logger
+from .TimeMemo import TimeMemo, timeMemoized
 from .ContractUtils import ContractUtils
 from .DataHandler import DataHandler
 from .Underlying import Underlying
+from .GreeksCache import GreeksCache
+from .StandardNormal import StandardNormal
+from .VolatilitySmile import VolatilitySmile, VolatilitySmiles
+from .AmericanPricer import AmericanPricer
 from .BSMLibrary import BSM, BSMGreeks
+from .ScenarioEngine import ScenarioEngine
+from .Payoff import Payoff
+from .ChainSnapshot import ChainSnapshot
 from .Helper import Helper
 from .Charting import Charting
 from .Performance import Performance
 from .ProviderOptionContract import ProviderOptionContract
+from .ProviderChain import ProviderChain
 from .PositionsStore import PositionsStore
+from .PositionIndex import PositionIndex
+from .PositionLimits import PositionLimits
+from .OptionSubscriptions import OptionSubscriptions
+from .MarketCalendar import MarketCalendar
+from .GreeksIndicators import GreeksIndicators
\ No newline at end of file
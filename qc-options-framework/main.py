@@ -9,10 +9,10 @@ from Execution import AutoExecutionModel, SmartPricingExecutionModel, SPXExecuti
 from Monitor import HedgeRiskManagementModel, NoStopLossModel, StopLossModel, FPLMonitorModel, SPXicMonitor, CCMonitor, SPXButterflyMonitor, SPXCondorMonitor
 from PortfolioConstruction import OptionsPortfolioConstruction
 # The alpha models
-from Alpha import FPLModel, CCModel, SPXic, SPXButterfly, SPXCondor, AssignmentModel, FutureSpread
+from Alpha import FPLModel, CCModel, SPXic, SPXButterfly, SPXCondor, AssignmentModel, FutureSpread, CompositeAlpha
 # The execution classes
 from Initialization import SetupBaseStructure, HandleOrderEvents
-from Tools import Performance, PositionsStore
+from Tools import Performance, PositionsStore, BSM, TimeMemo, MarketCalendar, OptionSubscriptions, GreeksIndicators
 
 
 """
@@ -88,6 +88,8 @@ class CentralAlgorithm(QCAlgorithm):
         # self.SetAlpha(AssignmentModel(self))
         # Use the FutureSpread alpha model
         # self.SetAlpha(FutureSpread(self))
+        # Run several strategies sharing the chain snapshot of each minute
+        # self.SetAlpha(CompositeAlpha(self, SPXic, SPXCondor, SPXButterfly))
 
         self.SetPortfolioConstruction(OptionsPortfolioConstruction(self))
 
@@ -152,6 +154,10 @@ class CentralAlgorithm(QCAlgorithm):
             self.Log("     Execution  Statistics       ")
             self.Log("---------------------------------")
             self.executionTimer.showStats()
+            BSM.greeksCache.showStats(self)
+            TimeMemo.of(self).showStats(self)
+            self.Log(f"Option subscriptions: {OptionSubscriptions.of(self).counts()}")
+            self.Log(f"Greeks indicators: {GreeksIndicators.of(self).counts()}")
             self.Log("")
         if self.showPerformanceStats:
             self.Log("---------------------------------")
@@ -177,11 +183,8 @@ class CentralAlgorithm(QCAlgorithm):
         self.Log("")
 
     def lastTradingDay(self, expiry):
-        # Get the trading calendar
-        tradingCalendar = self.TradingCalendar
-        # Find the last trading day for the given expiration date
-        lastDay = list(tradingCalendar.GetDaysByType(TradingDayType.BusinessDay, expiry - timedelta(days = 20), expiry))[-1].Date
-        return lastDay
+        # Find the last trading day for the given expiration date (memoized by the calendar service until the next day)
+        return MarketCalendar.of(self).lastTradingDay(expiry)
 
 
 